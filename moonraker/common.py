@@ -12,6 +12,7 @@ import re
 import inspect
 import dataclasses
 import time
+from collections import deque
 from enum import Enum, Flag, auto
 from abc import ABCMeta, abstractmethod
 from .utils import Sentinel
@@ -33,7 +34,8 @@ from typing import (
     Awaitable,
     ClassVar,
     Tuple,
-    Generic
+    Generic,
+    Deque
 )
 
 if TYPE_CHECKING:
@@ -43,7 +45,7 @@ if TYPE_CHECKING:
     from .components.history import History
     from .components.database import DBProviderWrapper
     from .utils import IPAddress
-    from asyncio import Future
+    from asyncio import Future, TimerHandle
     _C = TypeVar("_C", str, bool, float, int)
     _F = TypeVar("_F", bound="ExtendedFlag")
     ConvType = Union[str, bool, float, int]
@@ -341,7 +343,13 @@ class BaseRemoteConnection(APITransport):
         self.is_closed: bool = False
         self.queue_busy: bool = False
         self.pending_responses: Dict[int, Future] = {}
-        self.message_buf: List[Union[bytes, str]] = []
+        self.message_buf: Deque[Union[bytes, str, Sentinel]] = deque()
+        self.queued_bytes: int = 0
+        # Coalesced status updates, one for each placeholder in message_buf
+        self._pending_status: Deque[Tuple[Dict[str, Dict[str, Any]], float]]
+        self._pending_status = deque()
+        self._overflow_time: Optional[float] = None
+        self._overflow_handle: Optional[TimerHandle] = None
         self._connected_time: float = 0.
         self._identified: bool = False
         self._client_data: Dict[str, str] = {
@@ -409,14 +417,65 @@ class BaseRemoteConnection(APITransport):
             logging.exception("Websocket Command Error")
 
     def queue_message(self, message: Union[bytes, str, Dict[str, Any]]):
-        self.message_buf.append(
-            jsonw.dumps(message) if isinstance(message, dict) else message
-        )
+        if isinstance(message, dict):
+            message = jsonw.dumps(message)
+        self.message_buf.append(message)
+        self.queued_bytes += len(message)
+        self._check_queue_limits()
         if self.queue_busy:
             return
         self.queue_busy = True
         self.eventloop.register_callback(self._write_messages)
 
+    def _check_queue_limits(self) -> None:
+        if (
+            len(self.message_buf) <= self.wsm.queue_max_frames and
+            self.queued_bytes <= self.wsm.queue_max_bytes
+        ):
+            self._reset_overflow()
+            return
+        eventtime = self.eventloop.get_loop_time()
+        if self._overflow_time is None:
+            self._overflow_time = eventtime
+            logging.info(
+                f"Client {self.uid} outbound queue limit exceeded: "
+                f"{len(self.message_buf)} frames, {self.queued_bytes} bytes"
+            )
+        elif eventtime - self._overflow_time > self.wsm.queue_overflow_timeout:
+            if self.is_closed:
+                return
+            logging.info(
+                f"Client {self.uid} remained over its outbound queue limit for "
+                f"{eventtime - self._overflow_time:.2f}s, closing connection"
+            )
+            self.server.send_event("websockets:client_queue_overflow", self)
+            self.clear_message_queue()
+            self.close_socket(1008, "Outbound Queue Limit Exceeded")
+            return
+        if self._overflow_handle is None and not self.is_closed:
+            # Check again after the timeout, a stalled client may not
+            # queue any further messages
+            delay = self._overflow_time + self.wsm.queue_overflow_timeout - eventtime
+            self._overflow_handle = self.eventloop.delay_callback(
+                max(delay, 0.) + .1, self._on_overflow_timeout
+            )
+
+    def _on_overflow_timeout(self) -> None:
+        self._overflow_handle = None
+        self._check_queue_limits()
+
+    def _reset_overflow(self) -> None:
+        self._overflow_time = None
+        if self._overflow_handle is not None:
+            self._overflow_handle.cancel()
+            self._overflow_handle = None
+
+    def clear_message_queue(self) -> None:
+        self.message_buf.clear()
+        self.queued_bytes = 0
+        self._pending_status.clear()
+        self._reset_overflow()
+
     def authenticate(
         self,
         token: Optional[str] = None,
@@ -451,12 +510,24 @@ class BaseRemoteConnection(APITransport):
 
     async def _write_messages(self):
         if self.is_closed:
-            self.message_buf = []
+            self.clear_message_queue()
             self.queue_busy = False
             return
         while self.message_buf:
-            msg = self.message_buf.pop(0)
+            msg = self.message_buf.popleft()
+            if msg is Sentinel.MISSING:
+                # Placeholder for coalesced status updates
+                status, eventtime = self._pending_status.popleft()
+                msg = jsonw.dumps({
+                    'jsonrpc': "2.0",
+                    'method': "notify_status_update",
+                    'params': [status, eventtime]
+                })
+            else:
+                self.queued_bytes -= len(msg)
             await self.write_to_socket(msg)
+        self.queued_bytes = 0
+        self._reset_overflow()
         self.queue_busy = False
 
     async def write_to_socket(self, message: Union[bytes, str]) -> None:
@@ -468,10 +539,24 @@ class BaseRemoteConnection(APITransport):
                     ) -> None:
         if not status:
             return
-        self.queue_message({
-            'jsonrpc': "2.0",
-            'method': "notify_status_update",
-            'params': [status, eventtime]})
+        if not self.queue_busy:
+            self.queue_message({
+                'jsonrpc': "2.0",
+                'method': "notify_status_update",
+                'params': [status, eventtime]})
+            return
+        # The client is still writing, merge this update into the pending
+        # status frame so only the latest state is sent.  Merging is only
+        # possible when no other message was queued after the frame.
+        if self.message_buf and self.message_buf[-1] is Sentinel.MISSING:
+            pending = self._pending_status.pop()[0]
+        else:
+            self.message_buf.append(Sentinel.MISSING)
+            pending = {}
+        for obj, fields in status.items():
+            pending.setdefault(obj, {}).update(fields)
+        self._pending_status.append((pending, eventtime))
+        self._check_queue_limits()
 
     def call_method_with_response(
         self,
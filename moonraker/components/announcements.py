@@ -280,7 +280,7 @@ class EntryManager:
         database: MoonrakerDatabase
         database = self.server.lookup_component("database")
         database.register_local_namespace("announcements")
-        self.announce_db = database.wrap_namespace("announcements")
+        self.announce_db = database.wrap_namespace("announcements", cache_size=64)
         self.entry_id_map: Dict[str, str] = {}
         self.next_key = 0
         self.dismiss_handles: Dict[str, asyncio.TimerHandle] = {}
@@ -17,7 +17,7 @@ import tornado.iostream
 import tornado.httputil
 import tornado.web
 from asyncio import Lock
-from inspect import isclass
+from inspect import isclass, isasyncgen
 from tornado.escape import url_unescape, url_escape
 from tornado.routing import Rule, PathMatches, RuleRouter
 from tornado.http1connection import HTTP1Connection
@@ -48,7 +48,8 @@ from typing import (
     Dict,
     List,
     AsyncGenerator,
-    Type
+    Type,
+    cast
 )
 if TYPE_CHECKING:
     from tornado.websocket import WebSocketHandler
@@ -631,17 +632,22 @@ class DynamicRequestHandler(AuthorizedRequestHandler):
                 args[key_parts[0]] = self._convert_type(val, key_parts[1])
         return args
 
-    def _object_parser(self) -> Dict[str, Dict[str, Any]]:
+    def _object_parser(self) -> Dict[str, Any]:
         args: Dict[str, Any] = {}
+        fresh = False
         for key in self.request.arguments.keys():
             if key in EXCLUDED_ARGS:
                 continue
             val = self.get_argument(key)
-            if not val:
+            if key == "fresh":
+                fresh = val.lower() == "true"
+            elif not val:
                 args[key] = None
             else:
                 args[key] = val.split(',')
         logging.debug(f"Parsed Arguments: {args}")
+        if fresh:
+            return {'objects': args, 'fresh': True}
         return {'objects': args}
 
     def parse_args(self) -> Dict[str, Any]:
@@ -706,6 +712,9 @@ class DynamicRequestHandler(AuthorizedRequestHandler):
                 logging.exception("API Request Failure")
             raise tornado.web.HTTPError(
                 e.status_code, reason=str(e)) from e
+        if isasyncgen(result):
+            await self._stream_result(cast(AsyncGenerator[bytes, None], result))
+            return
         if self.wrap_result:
             result = {'result': result}
         self._log_debug(f"HTTP Response::{req}", result)
@@ -718,6 +727,22 @@ class DynamicRequestHandler(AuthorizedRequestHandler):
             self.set_header("Content-Type", self.content_type)
         self.finish(result)
 
+    async def _stream_result(self, result: AsyncGenerator[bytes, None]) -> None:
+        # Chunks are sent as they are generated, allowing large responses
+        # to be served without buffering the entire response in memory
+        if self.content_type is not None:
+            self.set_header("Content-Type", self.content_type)
+        try:
+            async for chunk in result:
+                self.write(chunk)
+                await self.flush()
+        except tornado.iostream.StreamClosedError:
+            logging.info(f"Client closed connection during {self.request.path}")
+            return
+        finally:
+            await result.aclose()
+        self.finish()
+
 class RPCHandler(AuthorizedRequestHandler, APITransport):
     def initialize(self) -> None:
         super(RPCHandler, self).initialize()
@@ -899,7 +924,9 @@ class FileRequestHandler(AuthorizedFileHandler):
         start: Optional[int] = None,
         end: Optional[int] = None
     ) -> AsyncGenerator[bytes, None]:
-        file: BufferedReader = await evt_loop.run_in_thread(open, abspath, "rb")
+        file: BufferedReader = await evt_loop.run_in_thread(
+            open, abspath, "rb", pool="disk_io"
+        )
         try:
             if start is not None:
                 file.seek(start)
@@ -911,7 +938,9 @@ class FileRequestHandler(AuthorizedFileHandler):
                 chunk_size = 64 * 1024
                 if remaining is not None and remaining < chunk_size:
                     chunk_size = remaining
-                chunk = await evt_loop.run_in_thread(file.read, chunk_size)
+                chunk = await evt_loop.run_in_thread(
+                    file.read, chunk_size, pool="disk_io"
+                )
                 if chunk:
                     if remaining is not None:
                         remaining -= len(chunk)
@@ -921,7 +950,7 @@ class FileRequestHandler(AuthorizedFileHandler):
                         assert remaining == 0
                     return
         finally:
-            await evt_loop.run_in_thread(file.close)
+            await evt_loop.run_in_thread(file.close, pool="disk_io")
 
     @classmethod
     def _get_cached_version(cls, abs_path: str) -> Optional[str]:
@@ -975,7 +1004,9 @@ class FileUploadHandler(AuthorizedRequestHandler):
             async with self.parse_lock:
                 evt_loop = self.server.get_event_loop()
                 try:
-                    await evt_loop.run_in_thread(self._parser.data_received, chunk)
+                    await evt_loop.run_in_thread(
+                        self._parser.data_received, chunk, pool="disk_io"
+                    )
                 except ParseFailedException:
                     logging.exception("Chunk Parsing Error")
                     self.parse_failed = True
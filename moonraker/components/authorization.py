@@ -17,6 +17,7 @@ import ipaddress
 import re
 import socket
 import logging
+from collections import OrderedDict, deque
 from tornado.web import HTTPError
 from libnacl.sign import Signer, Verifier
 from ..utils import json_wrapper as jsonw
@@ -31,6 +32,9 @@ from typing import (
     Union,
     Dict,
     List,
+    Callable,
+    Deque,
+    NamedTuple,
 )
 
 if TYPE_CHECKING:
@@ -68,11 +72,21 @@ API_USER = "_API_KEY_USER_"
 TRUSTED_USER = "_TRUSTED_USER_"
 RESERVED_USERS = [API_USER, TRUSTED_USER]
 JWT_EXP_TIME = datetime.timedelta(hours=1)
+JWT_CACHE_SIZE = 256
+JWT_CACHE_TTL = 300.
+AUTH_LATENCY_SAMPLES = 500
 JWT_HEADER = {
     'alg': "EdDSA",
     'typ': "JWT"
 }
 
+class ValidatedToken(NamedTuple):
+    jwk_id: str
+    username: str
+    token_type: str
+    exp: int
+    expires_at: float
+
 class UserSqlDefinition(SqlTableDefinition):
     name = USER_TABLE
     prototype = (
@@ -153,6 +167,13 @@ class Authorization:
         hi = self.server.get_host_info()
         self.issuer = f"http://{hi['hostname']}:{hi['port']}"
         self.public_jwks: Dict[str, Dict[str, Any]] = {}
+        self.jwk_verifiers: Dict[str, Verifier] = {}
+        # Tokens with a verified signature, keyed by the token's sha256 digest
+        self.token_cache: OrderedDict[bytes, ValidatedToken] = OrderedDict()
+        self.token_cache_hits: int = 0
+        self.token_cache_misses: int = 0
+        self.auth_latency: Deque[float] = deque(maxlen=AUTH_LATENCY_SAMPLES)
+        self.auth_count: int = 0
         self.trusted_users: Dict[IPAddr, Dict[str, Any]] = {}
         self.oneshot_tokens: Dict[str, OneshotToken] = {}
 
@@ -268,6 +289,10 @@ class Authorization:
             transports=TransportType.HTTP | TransportType.WEBSOCKET,
             auth_required=False
         )
+        self.server.register_endpoint(
+            "/access/stats", RequestType.GET, self._handle_stats_request,
+            transports=TransportType.HTTP | TransportType.WEBSOCKET
+        )
         wsm: WebsocketManager = self.server.lookup_component("websockets")
         wsm.register_notification("authorization:user_created")
         wsm.register_notification(
@@ -331,7 +356,7 @@ class Authorization:
                     self.users[username] = user_info
                     need_sync = True
                     continue
-                self.public_jwks[jwk_id] = self._generate_public_jwk(priv_key)
+                self._add_jwk(jwk_id, priv_key)
         return need_sync
 
     async def _handle_apikey_request(self, web_request: WebRequest) -> str:
@@ -378,7 +403,7 @@ class Authorization:
         self.users[username].jwt_secret = None
         self.users[username].jwk_id = None
         if jwk_id is not None:
-            self.public_jwks.pop(jwk_id, None)
+            self._remove_jwk(jwk_id)
         await self._sync_user(username)
         eventloop = self.server.get_event_loop()
         eventloop.delay_callback(
@@ -409,6 +434,29 @@ class Authorization:
             "trusted": request_trusted
         }
 
+    async def _handle_stats_request(self, web_request: WebRequest) -> Dict[str, Any]:
+        samples = sorted(self.auth_latency)
+        avg_ms = p95_ms = max_ms = 0.
+        if samples:
+            avg_ms = sum(samples) / len(samples) * 1000.
+            p95_ms = samples[int(len(samples) * .95)] * 1000.
+            max_ms = samples[-1] * 1000.
+        return {
+            "token_cache": {
+                "max_size": JWT_CACHE_SIZE,
+                "size": len(self.token_cache),
+                "hits": self.token_cache_hits,
+                "misses": self.token_cache_misses
+            },
+            "auth_latency": {
+                "total_requests": self.auth_count,
+                "samples": len(samples),
+                "average_ms": round(avg_ms, 3),
+                "p95_ms": round(p95_ms, 3),
+                "max_ms": round(max_ms, 3)
+            }
+        }
+
     async def _handle_refresh_jwt(self,
                                   web_request: WebRequest
                                   ) -> Dict[str, str]:
@@ -568,7 +616,7 @@ class Authorization:
             user_info.jwk_id = jwk_id
             self.users[username] = user_info
             await self._sync_user(username)
-            self.public_jwks[jwk_id] = self._generate_public_jwk(private_key)
+            self._add_jwk(jwk_id, private_key)
         else:
             private_key = self._load_private_key(jwt_secret_hex)
             if user_info.jwk_id is None:
@@ -609,8 +657,9 @@ class Authorization:
         if user_info is None:
             raise self.server.error(f"No registered user: {username}")
         if user_info.jwk_id is not None:
-            self.public_jwks.pop(user_info.jwk_id, None)
+            self._remove_jwk(user_info.jwk_id)
         del self.users[username]
+        self._evict_tokens(lambda entry: entry.username == username)
         async with self.user_table as tx:
             await tx.execute(
                 f"DELETE FROM {USER_TABLE} WHERE username = ?", (username,)
@@ -653,6 +702,34 @@ class Authorization:
     def decode_jwt(
         self, token: str, token_type: str = "access", check_exp: bool = True
     ) -> UserInfo:
+        token_hash = hashlib.sha256(token.encode()).digest()
+        entry = self.token_cache.get(token_hash)
+        if entry is not None:
+            if (
+                entry.token_type == token_type and
+                entry.jwk_id in self.jwk_verifiers and
+                entry.expires_at > time.monotonic()
+            ):
+                self.token_cache_hits += 1
+                self.token_cache.move_to_end(token_hash)
+                return self._get_token_user(entry, check_exp)
+            self.token_cache.pop(token_hash, None)
+        self.token_cache_misses += 1
+        entry = self._verify_jwt(token, token_type)
+        self.token_cache[token_hash] = entry
+        while len(self.token_cache) > JWT_CACHE_SIZE:
+            self.token_cache.popitem(last=False)
+        return self._get_token_user(entry, check_exp)
+
+    def _get_token_user(self, entry: ValidatedToken, check_exp: bool) -> UserInfo:
+        if check_exp and entry.exp < int(time.time()):
+            raise self.server.error("JWT Expired", 401)
+        user_info: Optional[UserInfo] = self.users.get(entry.username)
+        if user_info is None:
+            raise self.server.error("Unknown user", 401)
+        return user_info
+
+    def _verify_jwt(self, token: str, token_type: str) -> ValidatedToken:
         message, sig = token.rsplit('.', maxsplit=1)
         enc_header, enc_payload = message.split('.')
         header: Dict[str, Any] = jsonw.loads(base64url_decode(enc_header))
@@ -662,12 +739,11 @@ class Authorization:
         if header.get('typ') != "JWT" or header.get('alg') != "EdDSA":
             raise self.server.error("Invalid JWT header")
         jwk_id: Optional[str] = header.get('kid')
-        if jwk_id not in self.public_jwks:
+        if jwk_id is None or jwk_id not in self.jwk_verifiers:
             raise self.server.error("Invalid key ID")
 
         # validate signature
-        public_key = self._public_key_from_jwk(self.public_jwks[jwk_id])
-        public_key.verify(sig_bytes + message.encode())
+        self.jwk_verifiers[jwk_id].verify(sig_bytes + message.encode())
 
         # validate claims
         payload: Dict[str, Any] = jsonw.loads(base64url_decode(enc_payload))
@@ -679,17 +755,14 @@ class Authorization:
             raise self.server.error("Invalid JWT Issuer", 401)
         if payload['aud'] != "Moonraker":
             raise self.server.error("Invalid JWT Audience", 401)
-        if check_exp and payload['exp'] < int(time.time()):
-            raise self.server.error("JWT Expired", 401)
-
-        # get user
-        user_info: Optional[UserInfo] = self.users.get(
-            payload.get('username', ""), None)
-        if user_info is None:
-            raise self.server.error("Unknown user", 401)
-        return user_info
+        ttl_deadline = time.monotonic() + JWT_CACHE_TTL
+        return ValidatedToken(
+            jwk_id, payload.get('username', ""), token_type, payload['exp'],
+            ttl_deadline
+        )
 
     def validate_jwt(self, token: str) -> UserInfo:
+        start = time.perf_counter()
         try:
             user_info = self.decode_jwt(token)
         except Exception as e:
@@ -698,6 +771,8 @@ class Authorization:
             raise self.server.error(
                 f"Failed to decode JWT: {e}", 401
             ) from e
+        finally:
+            self._record_auth_latency(time.perf_counter() - start)
         return user_info
 
     def validate_api_key(self, api_key: str) -> UserInfo:
@@ -725,6 +800,25 @@ class Authorization:
             'use': "sig"
         }
 
+    def _add_jwk(self, jwk_id: str, private_key: Signer) -> None:
+        jwk = self._generate_public_jwk(private_key)
+        self.public_jwks[jwk_id] = jwk
+        self.jwk_verifiers[jwk_id] = self._public_key_from_jwk(jwk)
+
+    def _remove_jwk(self, jwk_id: str) -> None:
+        self.public_jwks.pop(jwk_id, None)
+        self.jwk_verifiers.pop(jwk_id, None)
+        self._evict_tokens(lambda entry: entry.jwk_id == jwk_id)
+
+    def _evict_tokens(self, predicate: Callable[[ValidatedToken], bool]) -> None:
+        for token_hash, entry in list(self.token_cache.items()):
+            if predicate(entry):
+                del self.token_cache[token_hash]
+
+    def _record_auth_latency(self, elapsed: float) -> None:
+        self.auth_count += 1
+        self.auth_latency.append(elapsed)
+
     def _public_key_from_jwk(self, jwk: Dict[str, Any]) -> Verifier:
         if jwk.get('kty') != "OKP":
             raise self.server.error("Not an Octet Key Pair")
@@ -748,6 +842,8 @@ class Authorization:
                 domain: str = fqdn_info["domain"]
                 self.fqdn_cache.pop(ip, None)
                 logging.info(f"Cached FQDN Expired, IP: {ip}, domain: {domain}")
+        mono_time = time.monotonic()
+        self._evict_tokens(lambda entry: entry.expires_at <= mono_time)
         return eventtime + PRUNE_CHECK_TIME
 
     def _oneshot_token_expire_handler(self, token):
@@ -795,7 +891,9 @@ class Authorization:
             else:
                 eventloop = self.server.get_event_loop()
                 try:
-                    fut = eventloop.run_in_thread(socket.getfqdn, str(ip))
+                    fut = eventloop.run_in_thread(
+                        socket.getfqdn, str(ip), pool="network"
+                    )
                     fqdn = await asyncio.wait_for(fut, 5.0)
                 except asyncio.TimeoutError:
                     logging.info("Call to socket.getfqdn() timed out")
@@ -852,7 +950,15 @@ class Authorization:
     ) -> Optional[UserInfo]:
         if request.method == "OPTIONS":
             return None
+        start = time.perf_counter()
+        try:
+            return await self._authenticate_request(request, auth_required)
+        finally:
+            self._record_auth_latency(time.perf_counter() - start)
 
+    async def _authenticate_request(
+        self, request: HTTPServerRequest, auth_required: bool = True
+    ) -> Optional[UserInfo]:
         # Check JSON Web Token
         jwt_user = self._check_json_web_token(request, auth_required)
         if jwt_user is not None:
@@ -14,12 +14,13 @@ import contextlib
 import time
 from asyncio import Future, Task, Lock
 from functools import reduce
-from queue import Queue
+from collections import deque, OrderedDict
+from queue import Queue, Empty as QueueEmpty
 from threading import Thread
 import sqlite3
 from ..utils import Sentinel, ServerError
 from ..utils import json_wrapper as jsonw
-from ..common import RequestType, SqlTableDefinition
+from ..common import RequestType, TransportType, SqlTableDefinition
 
 # Annotation imports
 from typing import (
@@ -35,7 +36,10 @@ from typing import (
     Set,
     Type,
     Sequence,
-    Generator
+    Generator,
+    AsyncGenerator,
+    Deque,
+    cast
 )
 if TYPE_CHECKING:
     from ..confighelper import ConfigHelper
@@ -43,6 +47,7 @@ if TYPE_CHECKING:
     from .klippy_connection import KlippyConnection
     from lmdb import Environment as LmdbEnvironment
     from types import TracebackType
+    from typing import Literal
     DBRecord = Optional[Union[int, float, bool, str, List[Any], Dict[str, Any]]]
     DBType = DBRecord
     SqlParams = Union[List[Any], Tuple[Any, ...], Dict[str, Any]]
@@ -56,6 +61,14 @@ SCHEMA_TABLE = (
     "sqlite_schema" if sqlite3.sqlite_version_info >= (3, 33, 0)
     else "sqlite_master"
 )
+JOURNAL_MODES = ["delete", "wal"]
+SYNCHRONOUS_MODES = ["full", "normal"]
+MAX_COMMIT_GROUP_SIZE = 256
+# Nested keys in object records are modified in place with the JSON
+# functions when available
+JSON_PATCH_SUPPORTED = sqlite3.sqlite_version_info >= (3, 38, 0)
+JSON_PATCH_MAX_FIELDS = 50
+EXPORT_BATCH_SIZE = 500
 
 RECORD_ENCODE_FUNCS: Dict[Type, Callable[..., bytes]] = {
     int: lambda x: b"q" + struct.pack("q", x),
@@ -204,6 +217,7 @@ class MoonrakerDatabase:
         self.registered_namespaces: Set[str] = set(["moonraker", "database"])
         self.registered_tables: Set[str] = set([NAMESPACE_TABLE, REGISTRATION_TABLE])
         self.backup_lock = Lock()
+        self.namespace_caches: Dict[str, NamespaceCache] = {}
         instance_id: str = self.server.get_app_args()["instance_uuid"]
         db_path = self._get_database_folder(config)
         self._sql_db = db_path.joinpath(SQL_DB_FILENAME)
@@ -257,6 +271,14 @@ class MoonrakerDatabase:
         self.server.register_endpoint(
             "/server/database/compact", RequestType.POST, self._handle_compact_request
         )
+        self.server.register_endpoint(
+            "/server/database/cache", RequestType.GET, self._handle_cache_request
+        )
+        self.server.register_endpoint(
+            "/server/database/export", RequestType.GET, self._handle_export_request,
+            transports=TransportType.HTTP, wrap_result=False,
+            content_type="application/x-ndjson"
+        )
         self.server.register_debug_endpoint(
             "/debug/database/list", RequestType.GET, self._handle_list_request
         )
@@ -322,23 +344,35 @@ class MoonrakerDatabase:
     def insert_item(
         self, namespace: str, key: Union[List[str], str], value: DBType
     ) -> Future[None]:
-        return self.db_provider.execute_db_function(
+        fut = self.db_provider.execute_db_function(
             self.db_provider.insert_item, namespace, key, value
         )
+        cache = self.namespace_caches.get(namespace)
+        if cache is not None:
+            cache.write_item(key, value, fut)
+        return fut
 
     def update_item(
         self, namespace: str, key: Union[List[str], str], value: DBType
     ) -> Future[None]:
-        return self.db_provider.execute_db_function(
+        fut = self.db_provider.execute_db_function(
             self.db_provider.update_item, namespace, key, value
         )
+        cache = self.namespace_caches.get(namespace)
+        if cache is not None:
+            cache.invalidate_item(key)
+        return fut
 
     def delete_item(
         self, namespace: str, key: Union[List[str], str]
     ) -> Future[Any]:
-        return self.db_provider.execute_db_function(
+        fut = self.db_provider.execute_db_function(
             self.db_provider.delete_item, namespace, key
         )
+        cache = self.namespace_caches.get(namespace)
+        if cache is not None:
+            cache.invalidate_item(key)
+        return fut
 
     def get_item(
         self,
@@ -346,9 +380,24 @@ class MoonrakerDatabase:
         key: Optional[Union[List[str], str]] = None,
         default: Any = Sentinel.MISSING
     ) -> Future[Any]:
-        return self.db_provider.execute_db_function(
-            self.db_provider.get_item, namespace, key, default
-        )
+        cache = self.namespace_caches.get(namespace)
+        if cache is None or key is None:
+            return self.db_provider.execute_read_function(
+                self.db_provider.get_item, namespace, key, default
+            )
+        return cache.get_item(key, default)
+
+    def get_cached_item(
+        self,
+        namespace: str,
+        key: Union[List[str], str],
+        default: Any = Sentinel.MISSING
+    ) -> Any:
+        # Returns Sentinel.MISSING if the item isn't held in a namespace cache
+        cache = self.namespace_caches.get(namespace)
+        if cache is None:
+            return Sentinel.MISSING
+        return cache.get_cached(key, default)
 
     # *** Batch operations***
     #  The insert_batch(), move_batch(), delete_batch(), and get_batch()
@@ -358,41 +407,55 @@ class MoonrakerDatabase:
     def insert_batch(
         self, namespace: str, records: Dict[str, Any]
     ) -> Future[None]:
-        return self.db_provider.execute_db_function(
+        fut = self.db_provider.execute_db_function(
             self.db_provider.insert_batch, namespace, records
         )
+        cache = self.namespace_caches.get(namespace)
+        if cache is not None:
+            cache.write_batch(records, fut)
+        return fut
 
     def move_batch(
         self, namespace: str, source_keys: List[str], dest_keys: List[str]
     ) -> Future[None]:
-        return self.db_provider.execute_db_function(
+        fut = self.db_provider.execute_db_function(
             self.db_provider.move_batch, namespace, source_keys, dest_keys
         )
+        cache = self.namespace_caches.get(namespace)
+        if cache is not None:
+            cache.invalidate_batch(source_keys + dest_keys)
+        return fut
 
     def delete_batch(
         self, namespace: str, keys: List[str]
     ) -> Future[Dict[str, Any]]:
-        return self.db_provider.execute_db_function(
+        fut = self.db_provider.execute_db_function(
             self.db_provider.delete_batch, namespace, keys
         )
+        cache = self.namespace_caches.get(namespace)
+        if cache is not None:
+            cache.invalidate_batch(keys)
+        return fut
 
     def get_batch(
         self, namespace: str, keys: List[str]
     ) -> Future[Dict[str, Any]]:
-        return self.db_provider.execute_db_function(
-            self.db_provider.get_batch, namespace, keys
-        )
+        cache = self.namespace_caches.get(namespace)
+        if cache is None:
+            return self.db_provider.execute_read_function(
+                self.db_provider.get_batch, namespace, keys
+            )
+        return cache.get_batch(keys)
 
     # *** Namespace level operations***
 
     def update_namespace(
         self, namespace: str, values: Dict[str, DBRecord]
     ) -> Future[None]:
-        return self.db_provider.execute_db_function(
-            self.db_provider.insert_batch, namespace, values
-        )
+        return self.insert_batch(namespace, values)
 
     def clear_namespace(self, namespace: str) -> Future[None]:
+        self.invalidate_cache(namespace)
         return self.db_provider.execute_db_function(
             self.db_provider.clear_namespace, namespace
         )
@@ -400,44 +463,74 @@ class MoonrakerDatabase:
     def sync_namespace(
         self, namespace: str, values: Dict[str, DBRecord]
     ) -> Future[None]:
+        self.invalidate_cache(namespace)
         return self.db_provider.execute_db_function(
             self.db_provider.sync_namespace, namespace, values
         )
 
+    def invalidate_cache(self, namespace: Optional[str] = None) -> None:
+        # Drops cached records for a namespace, or for all namespaces when
+        # no namespace is specified.  Must be called after modifying
+        # namespace records outside of the methods of this class.
+        if namespace is None:
+            for cache in self.namespace_caches.values():
+                cache.clear()
+        elif namespace in self.namespace_caches:
+            self.namespace_caches[namespace].clear()
+
     def ns_length(self, namespace: str) -> Future[int]:
-        return self.db_provider.execute_db_function(
+        return self.db_provider.execute_read_function(
             self.db_provider.get_namespace_length, namespace
         )
 
     def ns_keys(self, namespace: str) -> Future[List[str]]:
-        return self.db_provider.execute_db_function(
+        return self.db_provider.execute_read_function(
             self.db_provider.get_namespace_keys, namespace,
         )
 
     def ns_values(self, namespace: str) -> Future[List[Any]]:
-        return self.db_provider.execute_db_function(
+        return self.db_provider.execute_read_function(
             self.db_provider.get_namespace_values, namespace
         )
 
     def ns_items(self, namespace: str) -> Future[List[Tuple[str, Any]]]:
-        return self.db_provider.execute_db_function(
+        return self.db_provider.execute_read_function(
             self.db_provider.get_namespace_items, namespace
         )
 
+    def ns_page(
+        self, namespace: str, start_key: Optional[str] = None, count: int = 1000
+    ) -> Future[List[Tuple[str, Any]]]:
+        return self.db_provider.execute_read_function(
+            self.db_provider.get_namespace_page, namespace, start_key, count
+        )
+
+    async def iter_namespace_pages(
+        self, namespace: str, count: int = 1000
+    ) -> AsyncGenerator[List[Tuple[str, Any]], None]:
+        # Iterates a namespace in key order, holding one page in memory
+        start_key: Optional[str] = None
+        while True:
+            rows = await self.ns_page(namespace, start_key, count)
+            if not rows:
+                break
+            yield rows
+            if len(rows) < count:
+                break
+            start_key = rows[-1][0]
+
     def ns_contains(
         self, namespace: str, key: Union[List[str], str]
     ) -> Future[bool]:
-        return self.db_provider.execute_db_function(
-            self.db_provider.namespace_contains, namespace
+        return self.db_provider.execute_read_function(
+            self.db_provider.namespace_contains, namespace, key
         )
 
     # SQL direct query methods
     def sql_execute(
         self, sql: str, params: SqlParams = []
     ) -> Future[SqliteCursorProxy]:
-        return self.db_provider.execute_db_function(
-            self.db_provider.sql_execute, sql, params
-        )
+        return self.db_provider.execute_sql_statement(sql, params)
 
     def sql_executemany(
         self, sql: str, params: Sequence[SqlParams] = []
@@ -473,12 +566,17 @@ class MoonrakerDatabase:
         )
 
     def restore_database(self, restore_path: pathlib.Path) -> Future[Dict[str, Any]]:
+        self.invalidate_cache()
         return self.db_provider.execute_db_function(
             self.db_provider.restore_database, restore_path
         )
 
     def register_local_namespace(
-            self, namespace: str, forbidden: bool = False, parse_keys: bool = False
+        self,
+        namespace: str,
+        forbidden: bool = False,
+        parse_keys: bool = False,
+        cache_size: int = 0
     ) -> NamespaceWrapper:
         if namespace in self.registered_namespaces:
             raise self.server.error(f"Namespace '{namespace}' already registered")
@@ -496,16 +594,32 @@ class MoonrakerDatabase:
             self.insert_item(
                 "database", "protected_namespaces", sorted(self.protected_namespaces)
             )
+        self._enable_cache(namespace, cache_size)
         return NamespaceWrapper(namespace, self, parse_keys)
 
     def wrap_namespace(
-        self, namespace: str, parse_keys: bool = True
+        self, namespace: str, parse_keys: bool = True, cache_size: int = 0
     ) -> NamespaceWrapper:
         if namespace not in self.db_provider.namespaces:
             raise self.server.error(f"Namespace '{namespace}' not found", 404)
+        self._enable_cache(namespace, cache_size)
         return NamespaceWrapper(namespace, self, parse_keys)
 
+    def _enable_cache(self, namespace: str, cache_size: int) -> None:
+        # Records of a namespace are cached when at least one wrapper
+        # requests a cache.  The largest requested size is used.
+        if cache_size < 1:
+            return
+        cache = self.namespace_caches.get(namespace)
+        if cache is None:
+            self.namespace_caches[namespace] = NamespaceCache(
+                self, namespace, cache_size
+            )
+        elif cache_size > cache.max_size:
+            cache.max_size = cache_size
+
     def unregister_local_namespace(self, namespace: str) -> None:
+        self.namespace_caches.pop(namespace, None)
         if namespace in self.registered_namespaces:
             self.registered_namespaces.remove(namespace)
         if namespace in self.forbidden_namespaces:
@@ -628,6 +742,9 @@ class MoonrakerDatabase:
                     "Value for argument 'key' is an invalid type: "
                     f"{type(key).__name__}"
                 )
+            limit = web_request.get_int("limit", None)
+            if key is None and limit is not None:
+                return await self._get_namespace_page(web_request, namespace, limit)
             val = await self.get_item(namespace, key)
         else:
             if namespace in self.protected_namespaces and not is_debug:
@@ -662,6 +779,53 @@ class MoonrakerDatabase:
             )
         return {'namespace': namespace, 'key': key, 'value': val}
 
+    async def _get_namespace_page(
+        self, web_request: WebRequest, namespace: str, limit: int
+    ) -> Dict[str, Any]:
+        if limit < 1:
+            raise self.server.error("Argument 'limit' must be greater than 0")
+        if namespace not in self.db_provider.namespaces:
+            raise self.server.error(f"Namespace {namespace} not found", 404)
+        start_key = web_request.get_str("start_key", None)
+        rows = await self.ns_page(namespace, start_key, limit)
+        next_key = rows[-1][0] if len(rows) == limit else None
+        return {
+            "namespace": namespace,
+            "key": None,
+            "value": dict(rows),
+            "next_key": next_key
+        }
+
+    async def _handle_cache_request(
+        self, web_request: WebRequest
+    ) -> Dict[str, Any]:
+        return {
+            "namespaces": {
+                namespace: cache.get_stats()
+                for namespace, cache in self.namespace_caches.items()
+                if namespace not in self.forbidden_namespaces
+            }
+        }
+
+    async def _handle_export_request(
+        self, web_request: WebRequest
+    ) -> AsyncGenerator[bytes, None]:
+        namespace = web_request.get_str("namespace")
+        if namespace in self.forbidden_namespaces:
+            raise self.server.error(
+                f"Read/Write access to namespace '{namespace}' is forbidden", 403
+            )
+        if namespace not in self.db_provider.namespaces:
+            raise self.server.error(f"Namespace {namespace} not found", 404)
+        return self._generate_export(namespace)
+
+    async def _generate_export(self, namespace: str) -> AsyncGenerator[bytes, None]:
+        # Each record is exported as a line of JSON
+        async for rows in self.iter_namespace_pages(namespace, EXPORT_BATCH_SIZE):
+            yield b"".join(
+                [jsonw.dumps({"key": key, "value": val}) + b"\n" for key, val in rows]
+            )
+
     async def close(self) -> None:
         if not self.db_provider.is_restored():
             # Don't overwrite unsafe shutdowns on a restored database
@@ -735,6 +899,32 @@ class MoonrakerDatabase:
             "row": item
         }
 
+# A connection that can group the transactions of several commands into
+# a single commit.  While a group is active each "with conn:" block runs
+# in a savepoint, so a failed command only rolls back its own changes.
+class GroupCommitConnection(sqlite3.Connection):
+    group_active: bool = False
+
+    def __enter__(self) -> GroupCommitConnection:
+        if self.group_active:
+            self.execute("SAVEPOINT group_command")
+            return self
+        return super().__enter__()
+
+    def __exit__(
+        self,
+        exc_type: Optional[type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> Literal[False]:
+        if not self.group_active:
+            super().__exit__(exc_type, exc_value, traceback)
+            return False
+        if exc_value is not None:
+            self.execute("ROLLBACK TO group_command")
+        self.execute("RELEASE group_command")
+        return False
+
 class SqliteProvider(Thread):
     def __init__(self, config: ConfigHelper, db_path: pathlib.Path) -> None:
         super().__init__()
@@ -746,17 +936,68 @@ class SqliteProvider(Thread):
         self.restored: bool = False
         self.command_queue: Queue[Tuple[Future, Optional[Callable], Tuple[Any, ...]]]
         self.command_queue = Queue()
+        self.journal_mode = config.getchoice("journal_mode", JOURNAL_MODES, "delete")
+        self.synchronous = config.getchoice(
+            "synchronous", SYNCHRONOUS_MODES, "full"
+        )
+        self.wal_autocheckpoint = config.getint(
+            "wal_autocheckpoint", 1000, minval=0
+        )
+        # The maximum time the writer will wait for additional commands
+        # before committing a group
+        self.commit_delay = config.getfloat(
+            "commit_delay", 0., minval=0., maxval=1.
+        )
+        # Commands that modify or read the namespace store may share a
+        # transaction.  All other commands commit any pending group before
+        # they are executed.
+        self.group_commands: Set[Callable[..., Any]] = set([
+            self.insert_item, self.update_item, self.delete_item,
+            self.get_item, self.insert_batch, self.move_batch,
+            self.delete_batch, self.get_batch, self.clear_namespace,
+            self.sync_namespace, self.get_namespace_length,
+            self.get_namespace_keys, self.get_namespace_values,
+            self.get_namespace_items, self.get_namespace_page,
+            self.namespace_contains, self.drop_empty_namespace
+        ])
+        self.commit_count: int = 0
+        self.grouped_count: int = 0
+        # Reads are served by a pool of read only connections in wal mode
+        read_conns = config.getint("read_connections", 2, minval=0, maxval=8)
+        self.read_pool: Optional[SqliteReadPool] = None
+        if self.journal_mode == "wal" and read_conns:
+            self.read_pool = SqliteReadPool(self, read_conns)
+        # Number of queued commands per namespace.  Commands that do not
+        # operate on a namespace are tracked with a key of None.
+        self.pending_commands: Dict[Optional[str], int] = {}
+        self.writer_in_transaction: bool = False
         sqlite3.register_converter("record", decode_record)
         sqlite3.register_converter("pyjson", jsonw.loads)
         sqlite3.register_converter("pybool", lambda x: bool(x))
         sqlite3.register_adapter(list, jsonw.dumps)
         sqlite3.register_adapter(dict, jsonw.dumps)
-        self.sync_conn = sqlite3.connect(
-            str(db_path), timeout=1., detect_types=sqlite3.PARSE_DECLTYPES
-        )
-        self.sync_conn.row_factory = sqlite3.Row
+        self.sync_conn = self._connect()
+        mode: str = self.sync_conn.execute(
+            f"PRAGMA journal_mode={self.journal_mode}"
+        ).fetchone()[0]
+        if mode.lower() != self.journal_mode:
+            logging.info(
+                f"Unable to set database journal mode to {self.journal_mode}, "
+                f"current mode: {mode}"
+            )
         self.setup_database()
 
+    def _connect(self) -> GroupCommitConnection:
+        conn = sqlite3.connect(
+            str(self._db_path), timeout=1., detect_types=sqlite3.PARSE_DECLTYPES,
+            factory=GroupCommitConnection
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute(f"PRAGMA synchronous={self.synchronous}")
+        if self.journal_mode == "wal":
+            conn.execute(f"PRAGMA wal_autocheckpoint={self.wal_autocheckpoint}")
+        return cast(GroupCommitConnection, conn)
+
     @property
     def namespaces(self) -> Set[str]:
         return self._namespaces
@@ -768,40 +1009,154 @@ class SqliteProvider(Thread):
     def async_init(self) -> Future[str]:
         self.sync_conn.close()
         self.start()
+        if self.read_pool is not None:
+            self.read_pool.start()
         fut = self.asyncio_loop.create_future()
         self.command_queue.put_nowait((fut, lambda x: "sqlite", tuple()))
         return fut
 
     def run(self) -> None:
         loop = self.asyncio_loop
-        conn = sqlite3.connect(
-            str(self._db_path), timeout=1., detect_types=sqlite3.PARSE_DECLTYPES
-        )
-        conn.row_factory = sqlite3.Row
+        conn = self._connect()
+        group: Deque[Tuple[Future, Any, Optional[Exception]]] = deque()
+        deadline: float = 0.
         while True:
-            future, func, args = self.command_queue.get()
+            if not group:
+                future, func, args = self.command_queue.get()
+            else:
+                try:
+                    timeout = deadline - time.monotonic()
+                    if timeout > 0.:
+                        future, func, args = self.command_queue.get(timeout=timeout)
+                    else:
+                        future, func, args = self.command_queue.get_nowait()
+                except QueueEmpty:
+                    self._commit_group(conn, group)
+                    continue
+            if func in self.group_commands:
+                if not group:
+                    deadline = time.monotonic() + self.commit_delay
+                    if not conn.in_transaction:
+                        conn.execute("BEGIN")
+                    conn.group_active = True
+                try:
+                    group.append((future, func(conn, *args), None))
+                except Exception as e:
+                    group.append((future, None, e))
+                if len(group) >= MAX_COMMIT_GROUP_SIZE:
+                    self._commit_group(conn, group)
+                continue
+            self._commit_group(conn, group)
             if func is None:
                 break
             try:
                 ret = func(conn, *args)
             except Exception as e:
-                loop.call_soon_threadsafe(future.set_exception, e)
+                loop.call_soon_threadsafe(
+                    self._resolve_command, future, None, e, conn.in_transaction
+                )
             else:
-                loop.call_soon_threadsafe(future.set_result, ret)
+                loop.call_soon_threadsafe(
+                    self._resolve_command, future, ret, None, conn.in_transaction
+                )
         conn.close()
         loop.call_soon_threadsafe(future.set_result, None)
 
+    def _commit_group(
+        self,
+        conn: GroupCommitConnection,
+        group: Deque[Tuple[Future, Any, Optional[Exception]]]
+    ) -> None:
+        # Futures are resolved after the group is committed
+        if not group:
+            return
+        conn.group_active = False
+        commit_err: Optional[Exception] = None
+        try:
+            conn.commit()
+        except Exception as e:
+            logging.exception("Error committing database transaction")
+            commit_err = e
+            conn.rollback()
+        self.commit_count += 1
+        self.grouped_count += len(group)
+        loop = self.asyncio_loop
+        while group:
+            future, ret, err = group.popleft()
+            loop.call_soon_threadsafe(
+                self._resolve_command, future, ret, err or commit_err, False
+            )
+
+    def _resolve_command(
+        self,
+        future: Future,
+        result: Any,
+        err: Optional[Exception],
+        in_transaction: bool
+    ) -> None:
+        # Called on the event loop.  The transaction state of the writer
+        # is tracked here so reads may be routed without accessing state
+        # owned by the writer thread.
+        self.writer_in_transaction = in_transaction
+        if future.done():
+            return
+        if err is not None:
+            future.set_exception(err)
+        else:
+            future.set_result(result)
+
     def execute_db_function(
         self, command_func: Callable[..., _T], *args
     ) -> Future[_T]:
         fut = self.asyncio_loop.create_future()
         if self.is_alive():
+            self._track_pending(fut, command_func, args)
             self.command_queue.put_nowait((fut, command_func, args))
         else:
             ret = command_func(self.sync_conn, *args)
             fut.set_result(ret)
         return fut
 
+    def _track_pending(
+        self, fut: Future, command_func: Callable[..., Any], args: Tuple[Any, ...]
+    ) -> None:
+        key: Optional[str] = None
+        if command_func in self.group_commands:
+            key = args[0]
+        self.pending_commands[key] = self.pending_commands.get(key, 0) + 1
+
+        def _on_done(_: Future) -> None:
+            count = self.pending_commands[key] - 1
+            if count:
+                self.pending_commands[key] = count
+            else:
+                del self.pending_commands[key]
+        fut.add_done_callback(_on_done)
+
+    def execute_read_function(
+        self, command_func: Callable[..., _T], namespace: str, *args
+    ) -> Future[_T]:
+        # Namespace reads are executed on the read pool unless a queued
+        # command may modify the namespace, preserving request order.
+        if (
+            self.read_pool is not None and self.read_pool.enabled and
+            self.is_alive() and namespace not in self.pending_commands
+        ):
+            return self.read_pool.execute(command_func, namespace, *args)
+        return self.execute_db_function(command_func, namespace, *args)
+
+    def execute_sql_statement(
+        self, statement: str, params: SqlParams
+    ) -> Future[SqliteCursorProxy]:
+        if (
+            self.read_pool is not None and self.read_pool.enabled and
+            self.is_alive() and None not in self.pending_commands and
+            not self.writer_in_transaction and
+            statement.lstrip()[:6].upper() == "SELECT"
+        ):
+            return self.read_pool.execute(self.sql_query, statement, params)
+        return self.execute_db_function(self.sql_execute, statement, params)
+
     def setup_database(self) -> None:
         self.server.add_log_rollover_item(
             "sqlite_intro",
@@ -962,20 +1317,38 @@ class SqliteProvider(Thread):
             raise self.server.error("Cannot iterate a namespace asynchronously")
         if namespace not in self._namespaces:
             return
-        offset: int = 0
-        total = self.get_namespace_length(conn, namespace)
-        while offset < total:
+        start_key: Optional[str] = None
+        while True:
+            rows = self.get_namespace_page(conn, namespace, start_key, count)
+            if not rows:
+                return
+            yield dict(rows)
+            if len(rows) < count:
+                return
+            start_key = rows[-1][0]
+
+    def get_namespace_page(
+        self,
+        conn: sqlite3.Connection,
+        namespace: str,
+        start_key: Optional[str] = None,
+        count: int = 1000
+    ) -> List[Tuple[str, Any]]:
+        # Keyset pagination, returns up to "count" items following start_key
+        if start_key is None:
             cur = conn.execute(
                 f"SELECT key, value FROM {NAMESPACE_TABLE} WHERE namespace = ? "
-                f"LIMIT ? OFFSET ?",
-                (namespace, count, offset)
+                "ORDER BY key LIMIT ?",
+                (namespace, count)
             )
-            cur.arraysize = count
-            ret = cur.fetchall()
-            if not ret:
-                return
-            yield dict(ret)
-            offset += count
+        else:
+            cur = conn.execute(
+                f"SELECT key, value FROM {NAMESPACE_TABLE} WHERE namespace = ? "
+                "and key > ? ORDER BY key LIMIT ?",
+                (namespace, start_key, count)
+            )
+        cur.arraysize = count
+        return cur.fetchall()
 
     def clear_namespace(self, conn: sqlite3.Connection, namespace: str) -> None:
         with conn:
@@ -993,7 +1366,7 @@ class SqliteProvider(Thread):
     ) -> None:
         def generate_params():
             for key, val in values.items():
-                yield (namespace, key, val)
+                yield (namespace, key, encode_record(val))
         with conn:
             conn.execute(
                 f"DELETE FROM {NAMESPACE_TABLE} WHERE namespace = ?", (namespace,)
@@ -1055,6 +1428,160 @@ class SqliteProvider(Thread):
             return False
         return True
 
+    # Nested Key Patch Ops
+    #
+    # These operations modify a field within an object record without
+    # decoding and re-encoding the entire record.  They return False when
+    # a patch cannot be applied, in which case the caller must fall back
+    # to a read-modify-write of the record.
+
+    def _get_json_path(self, keys: List[str]) -> Optional[str]:
+        if any('"' in k or "\\" in k for k in keys):
+            return None
+        return "$" + "".join([f'."{k}"' for k in keys])
+
+    def _query_json_fields(
+        self,
+        conn: sqlite3.Connection,
+        namespace: str,
+        key: str,
+        parent: str,
+        path: str,
+        extract: bool = False
+    ) -> Optional[Tuple[Any, Any]]:
+        # Returns the type of the parent and either the type or the json
+        # text of the field at the path.  Non-object records are skipped.
+        leaf = "CAST(value AS TEXT) -> ?" if extract else \
+            "json_type(CAST(value AS TEXT), ?)"
+        cur = conn.execute(
+            "SELECT CASE WHEN substr(value, 1, 1) = X'7B' THEN "
+            "json_type(CAST(value AS TEXT), ?) END, "
+            f"CASE WHEN substr(value, 1, 1) = X'7B' THEN {leaf} END "
+            f"FROM {NAMESPACE_TABLE} WHERE namespace = ? and key = ?",
+            (parent, path, namespace, key)
+        )
+        row = cur.fetchone()
+        return None if row is None else (row[0], row[1])
+
+    def _set_json_fields(
+        self,
+        conn: sqlite3.Connection,
+        namespace: str,
+        key: str,
+        fields: Dict[str, DBType],
+        parent: Optional[str] = None
+    ) -> bool:
+        placeholders = ", ".join(["?, json(?)"] * len(fields))
+        params: List[Any] = []
+        for path, val in fields.items():
+            params.extend([path, jsonw.dumps(val).decode()])
+        sql = (
+            f"UPDATE {NAMESPACE_TABLE} SET value = "
+            f"CAST(json_set(CAST(value AS TEXT), {placeholders}) AS BLOB) "
+            "WHERE namespace = ? and key = ?"
+        )
+        params.extend([namespace, key])
+        if parent is not None:
+            # Only apply when the parent of the field is an object
+            sql += (
+                " and CASE WHEN substr(value, 1, 1) = X'7B' THEN "
+                "json_type(CAST(value AS TEXT), ?) END = 'object'"
+            )
+            params.append(parent)
+        with conn:
+            cur = conn.execute(sql, params)
+        return cur.rowcount == 1
+
+    def _patch_insert(
+        self,
+        conn: sqlite3.Connection,
+        namespace: str,
+        key_list: List[str],
+        value: DBType
+    ) -> bool:
+        parent = self._get_json_path(key_list[1:-1])
+        path = self._get_json_path(key_list[1:])
+        if not JSON_PATCH_SUPPORTED or parent is None or path is None:
+            return False
+        try:
+            return self._set_json_fields(
+                conn, namespace, key_list[0], {path: value}, parent
+            )
+        except sqlite3.Error:
+            logging.exception(f"Failed to patch key '{key_list}'")
+            return False
+
+    def _patch_update(
+        self,
+        conn: sqlite3.Connection,
+        namespace: str,
+        key_list: List[str],
+        value: DBType
+    ) -> bool:
+        parent = self._get_json_path(key_list[1:-1])
+        path = self._get_json_path(key_list[1:])
+        if not JSON_PATCH_SUPPORTED or parent is None or path is None:
+            return False
+        try:
+            fields = self._query_json_fields(
+                conn, namespace, key_list[0], parent, path
+            )
+            if fields is None or fields[0] != "object" or fields[1] is None:
+                return False
+            if fields[1] == "object" and isinstance(value, dict):
+                # Merge the value into the existing object
+                if len(value) > JSON_PATCH_MAX_FIELDS:
+                    return False
+                updates: Dict[str, DBType] = {}
+                for field, val in value.items():
+                    field_path = self._get_json_path([field])
+                    if field_path is None:
+                        return False
+                    updates[path + field_path[1:]] = val
+                if not updates:
+                    return True
+                return self._set_json_fields(conn, namespace, key_list[0], updates)
+            if len(key_list) == 1:
+                # Replacing the entire record is not a patch
+                return False
+            return self._set_json_fields(
+                conn, namespace, key_list[0], {path: value}
+            )
+        except sqlite3.Error:
+            logging.exception(f"Failed to patch key '{key_list}'")
+            return False
+
+    def _patch_delete(
+        self, conn: sqlite3.Connection, namespace: str, key_list: List[str]
+    ) -> Union[Sentinel, DBType]:
+        parent = self._get_json_path(key_list[1:-1])
+        path = self._get_json_path(key_list[1:])
+        if not JSON_PATCH_SUPPORTED or parent is None or path is None:
+            return Sentinel.MISSING
+        try:
+            fields = self._query_json_fields(
+                conn, namespace, key_list[0], parent, path, True
+            )
+            if fields is None or fields[0] != "object" or fields[1] is None:
+                return Sentinel.MISSING
+            with conn:
+                conn.execute(
+                    f"UPDATE {NAMESPACE_TABLE} SET value = "
+                    "CAST(json_remove(CAST(value AS TEXT), ?) AS BLOB) "
+                    "WHERE namespace = ? and key = ?",
+                    (path, namespace, key_list[0])
+                )
+                # Remove the record if no fields remain
+                conn.execute(
+                    f"DELETE FROM {NAMESPACE_TABLE} WHERE namespace = ? and "
+                    "key = ? and CAST(value AS TEXT) = '{}'",
+                    (namespace, key_list[0])
+                )
+        except sqlite3.Error:
+            logging.exception(f"Failed to patch key '{key_list}'")
+            return Sentinel.MISSING
+        return jsonw.loads(fields[1])
+
     def insert_item(
         self,
         conn: sqlite3.Connection,
@@ -1065,6 +1592,9 @@ class SqliteProvider(Thread):
         key_list = parse_namespace_key(key)
         record = value
         if len(key_list) > 1:
+            if self._patch_insert(conn, namespace, key_list, value):
+                self._namespaces.add(namespace)
+                return
             record = self._get_record(conn, namespace, key_list[0], default={})
             if not isinstance(record, dict):
                 prev_type = type(record)
@@ -1094,6 +1624,8 @@ class SqliteProvider(Thread):
         value: DBType
     ) -> None:
         key_list = parse_namespace_key(key)
+        if self._patch_update(conn, namespace, key_list, value):
+            return
         record = self._get_record(conn, namespace, key_list[0])
         if len(key_list) == 1:
             if isinstance(record, dict) and isinstance(value, dict):
@@ -1127,6 +1659,10 @@ class SqliteProvider(Thread):
         self, conn: sqlite3.Connection, namespace: str, key: Union[List[str], str]
     ) -> Any:
         key_list = parse_namespace_key(key)
+        if len(key_list) > 1:
+            val = self._patch_delete(conn, namespace, key_list)
+            if val is not Sentinel.MISSING:
+                return val
         val = record = self._get_record(conn, namespace, key_list[0])
         remove_record = True
         if len(key_list) > 1:
@@ -1259,6 +1795,16 @@ class SqliteProvider(Thread):
         cur.arraysize = 100
         return SqliteCursorProxy(self, cur)
 
+    def sql_query(
+        self,
+        conn: sqlite3.Connection,
+        statement: str,
+        params: SqlParams
+    ) -> SqliteCursorProxy:
+        cur = conn.execute(statement, params)
+        cur.arraysize = 100
+        return SqliteResultProxy(self, cur)
+
     def sql_executemany(
         self,
         conn: sqlite3.Connection,
@@ -1399,6 +1945,8 @@ class SqliteProvider(Thread):
         return self.restored
 
     def stop(self) -> Future[None]:
+        if self.read_pool is not None:
+            self.read_pool.stop()
         fut = self.asyncio_loop.create_future()
         if not self.is_alive():
             fut.set_result(None)
@@ -1406,6 +1954,99 @@ class SqliteProvider(Thread):
             self.command_queue.put_nowait((fut, None, tuple()))
         return fut
 
+# A pool of threads with read only connections, allowing reads to run in
+# parallel with the writer thread.  Only used in wal mode, as readers in
+# other journal modes block the writer from committing.
+class SqliteReadPool:
+    def __init__(self, provider: SqliteProvider, count: int) -> None:
+        self.provider = provider
+        self.asyncio_loop = provider.asyncio_loop
+        self.db_uri = f"{provider._db_path.as_uri()}?mode=ro"
+        self.command_queue: Queue[Tuple[Future, Optional[Callable], Tuple[Any, ...]]]
+        self.command_queue = Queue()
+        self.threads = [
+            Thread(target=self._run, name=f"sqlite-reader-{idx}", daemon=True)
+            for idx in range(count)
+        ]
+        # Cleared on the event loop if a reader fails to connect
+        self.enabled: bool = True
+
+    def start(self) -> None:
+        for thread in self.threads:
+            thread.start()
+
+    def _run(self) -> None:
+        loop = self.asyncio_loop
+        try:
+            conn = sqlite3.connect(
+                self.db_uri, uri=True, timeout=1.,
+                detect_types=sqlite3.PARSE_DECLTYPES
+            )
+        except Exception:
+            logging.exception("Failed to open read only database connection")
+            loop.call_soon_threadsafe(self._disable)
+            self._forward_commands()
+            return
+        conn.row_factory = sqlite3.Row
+        while True:
+            future, func, args = self.command_queue.get()
+            if func is None:
+                break
+            try:
+                ret = func(conn, *args)
+            except Exception as e:
+                loop.call_soon_threadsafe(self._resolve, future, None, e)
+            else:
+                loop.call_soon_threadsafe(self._resolve, future, ret, None)
+            if conn.in_transaction:
+                conn.rollback()
+        conn.close()
+
+    def _forward_commands(self) -> None:
+        # Commands taken by a reader without a connection are executed
+        # by the writer
+        loop = self.asyncio_loop
+        while True:
+            future, func, args = self.command_queue.get()
+            if func is None:
+                break
+            loop.call_soon_threadsafe(self._execute_on_writer, future, func, args)
+
+    def _disable(self) -> None:
+        if self.enabled:
+            logging.info("Database reads will be served by the writer thread")
+        self.enabled = False
+
+    def _execute_on_writer(
+        self, future: Future, func: Callable[..., Any], args: Tuple[Any, ...]
+    ) -> None:
+        def _on_done(writer_fut: Future) -> None:
+            exc = writer_fut.exception()
+            self._resolve(future, None if exc else writer_fut.result(), exc)
+        writer_fut = self.provider.execute_db_function(func, *args)
+        writer_fut.add_done_callback(_on_done)
+
+    def _resolve(
+        self, future: Future, result: Any, err: Optional[BaseException]
+    ) -> None:
+        if future.done():
+            return
+        if err is not None:
+            future.set_exception(err)
+        else:
+            future.set_result(result)
+
+    def execute(self, command_func: Callable[..., _T], *args) -> Future[_T]:
+        fut = self.asyncio_loop.create_future()
+        self.command_queue.put_nowait((fut, command_func, args))
+        return fut
+
+    def stop(self) -> None:
+        for _ in self.threads:
+            self.command_queue.put_nowait(
+                (self.asyncio_loop.create_future(), None, tuple())
+            )
+
 class DBProviderWrapper:
     def __init__(self, provider: SqliteProvider) -> None:
         self.server = provider.server
@@ -1438,6 +2079,7 @@ class DBProviderWrapper:
 
     def clear_namespace(self, namespace: str) -> None:
         self.provider.clear_namespace(self._sql_conn, namespace)
+        self._invalidate_cache(namespace)
 
     def get_item(
         self,
@@ -1448,31 +2090,43 @@ class DBProviderWrapper:
         return self.provider.get_item(self._sql_conn, namespace, key, default)
 
     def delete_item(self, namespace: str, key: Union[str, List[str]]) -> Any:
+        self._invalidate_cache(namespace)
         return self.provider.delete_item(self._sql_conn, namespace, key)
 
     def insert_item(
         self, namespace: str, key: Union[str, List[str]], value: DBType
     ) -> None:
         self.provider.insert_item(self._sql_conn, namespace, key, value)
+        self._invalidate_cache(namespace)
 
     def update_item(
         self, namespace: str, key: Union[str, List[str]], value: DBType
     ) -> None:
         self.provider.update_item(self._sql_conn, namespace, key, value)
+        self._invalidate_cache(namespace)
 
     def get_batch(self, namespace: str, keys: List[str]) -> Dict[str, Any]:
         return self.provider.get_batch(self._sql_conn, namespace, keys)
 
     def delete_batch(self, namespace: str, keys: List[str]) -> Dict[str, Any]:
+        self._invalidate_cache(namespace)
         return self.provider.delete_batch(self._sql_conn, namespace, keys)
 
     def insert_batch(self, namespace: str, records: Dict[str, Any]) -> None:
         self.provider.insert_batch(self._sql_conn, namespace, records)
+        self._invalidate_cache(namespace)
 
     def move_batch(
         self, namespace: str, source_keys: List[str], dest_keys: List[str]
     ) -> None:
         self.provider.move_batch(self._sql_conn, namespace, source_keys, dest_keys)
+        self._invalidate_cache(namespace)
+
+    def _invalidate_cache(self, namespace: str) -> None:
+        db: Optional[MoonrakerDatabase]
+        db = self.server.lookup_component("database", None)
+        if db is not None:
+            db.invalidate_cache(namespace)
 
     def wipe_local_namespace(self, namespace: str) -> None:
         """
@@ -1532,6 +2186,35 @@ class SqliteCursorProxy:
             return self._cursor.fetchall()
         return self._db_provider.execute_db_function(fetch_wrapper)
 
+# Proxy for queries executed on a read connection.  All rows are fetched
+# when the query executes, as cursors may not be shared between threads.
+class SqliteResultProxy(SqliteCursorProxy):
+    def __init__(self, provider: SqliteProvider, cursor: sqlite3.Cursor) -> None:
+        super().__init__(provider, cursor)
+        self._rows: Deque[sqlite3.Row] = deque(cursor.fetchall())
+        cursor.close()
+
+    def _completed(self, result: _T) -> Future[_T]:
+        fut = self._db_provider.asyncio_loop.create_future()
+        fut.set_result(result)
+        return fut
+
+    def set_arraysize(self, size: int) -> Future[None]:
+        self._array_size = size
+        return self._completed(None)
+
+    def fetchone(self) -> Future[Optional[sqlite3.Row]]:
+        return self._completed(self._rows.popleft() if self._rows else None)
+
+    def fetchmany(self, size: Optional[int] = None) -> Future[List[sqlite3.Row]]:
+        count = min(self._array_size if size is None else size, len(self._rows))
+        return self._completed([self._rows.popleft() for _ in range(count)])
+
+    def fetchall(self) -> Future[List[sqlite3.Row]]:
+        rows = list(self._rows)
+        self._rows.clear()
+        return self._completed(rows)
+
 class SqlTableWrapper(contextlib.AbstractAsyncContextManager):
     def __init__(
         self,
@@ -1571,9 +2254,7 @@ class SqlTableWrapper(contextlib.AbstractAsyncContextManager):
     def execute(
         self, sql: str, params: SqlParams = []
     ) -> Future[SqliteCursorProxy]:
-        return self._db_provider.execute_db_function(
-            self._db_provider.sql_execute, sql, params
-        )
+        return self._db_provider.execute_sql_statement(sql, params)
 
     def executemany(
         self, sql: str, params: Sequence[SqlParams] = []
@@ -1598,6 +2279,233 @@ class SqlTableWrapper(contextlib.AbstractAsyncContextManager):
         )
 
 
+class NamespaceCache:
+    # A write-through LRU cache of top level namespace records.  Records
+    # are held in their encoded form, so each hit decodes a private copy
+    # with the same types that a database read returns.
+    def __init__(
+        self, database: MoonrakerDatabase, namespace: str, max_size: int
+    ) -> None:
+        self.db = database
+        self.namespace = namespace
+        self.eventloop = database.eventloop
+        self.max_size = max_size
+        self.records: OrderedDict[str, bytes] = OrderedDict()
+        # Incremented on every modification.  A record read from the
+        # database is only cached if no modification was queued while
+        # the read was pending.
+        self.generation: int = 0
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+
+    def _lookup(self, key: str) -> Any:
+        bvalue = self.records.get(key)
+        if bvalue is None:
+            return Sentinel.MISSING
+        self.records.move_to_end(key)
+        return decode_record(bvalue)
+
+    def _store(self, key: str, value: DBRecord) -> None:
+        self.records[key] = encode_record(value)
+        self.records.move_to_end(key)
+        while len(self.records) > self.max_size:
+            self.records.popitem(last=False)
+            self.evictions += 1
+
+    def _discard(self, key: str) -> None:
+        self.generation += 1
+        self.records.pop(key, None)
+
+    def get_item(
+        self, key: Union[List[str], str], default: Any = Sentinel.MISSING
+    ) -> Future[Any]:
+        provider = self.db.db_provider
+        try:
+            key_list = parse_namespace_key(key)
+        except ServerError:
+            return provider.execute_read_function(
+                provider.get_item, self.namespace, key, default
+            )
+        record = self._lookup(key_list[0])
+        if record is Sentinel.MISSING:
+            self.misses += 1
+            fut = provider.execute_read_function(
+                provider.get_item, self.namespace, key_list[:1], Sentinel.MISSING
+            )
+            generation = self.generation
+            ret: Future[Any] = self.eventloop.create_future()
+
+            def _on_read(read_fut: Future) -> None:
+                exc = read_fut.exception()
+                if exc is not None:
+                    self._resolve_missing(ret, key, default, exc)
+                    return
+                record = read_fut.result()
+                if generation == self.generation:
+                    try:
+                        self._store(key_list[0], record)
+                    except ServerError:
+                        pass
+                self._resolve_item(ret, key, key_list, record, default)
+            fut.add_done_callback(_on_read)
+            return ret
+        self.hits += 1
+        ret = self.eventloop.create_future()
+        self._resolve_item(ret, key, key_list, record, default)
+        return ret
+
+    def get_cached(
+        self, key: Union[List[str], str], default: Any = Sentinel.MISSING
+    ) -> Any:
+        # Answers a lookup synchronously when the record is cached.  Returns
+        # Sentinel.MISSING when the record must be read from the database.
+        try:
+            key_list = parse_namespace_key(key)
+        except ServerError:
+            return Sentinel.MISSING
+        record = self._lookup(key_list[0])
+        if record is Sentinel.MISSING:
+            return Sentinel.MISSING
+        self.hits += 1
+        try:
+            return reduce(operator.getitem, key_list[1:], record)  # type: ignore
+        except Exception:
+            if default is not Sentinel.MISSING:
+                return default
+            raise ServerError(
+                f"Key '{key}' in namespace '{self.namespace}' not found", 404
+            )
+
+    def _resolve_item(
+        self,
+        fut: Future,
+        key: Union[List[str], str],
+        key_list: List[str],
+        record: DBRecord,
+        default: Any
+    ) -> None:
+        try:
+            val = reduce(operator.getitem, key_list[1:], record)  # type: ignore
+        except Exception as e:
+            self._resolve_missing(fut, key, default, e)
+        else:
+            if not fut.done():
+                fut.set_result(val)
+
+    def _resolve_missing(
+        self, fut: Future, key: Union[List[str], str], default: Any, exc: BaseException
+    ) -> None:
+        if fut.done():
+            return
+        if default is not Sentinel.MISSING:
+            fut.set_result(default)
+        elif isinstance(exc, ServerError) and exc.status_code != 404:
+            fut.set_exception(exc)
+        else:
+            fut.set_exception(ServerError(
+                f"Key '{key}' in namespace '{self.namespace}' not found", 404
+            ))
+
+    def get_batch(self, keys: List[str]) -> Future[Dict[str, Any]]:
+        result: Dict[str, Any] = {}
+        missing: List[str] = []
+        for key in keys:
+            record = self._lookup(key)
+            if record is Sentinel.MISSING:
+                missing.append(key)
+            else:
+                result[key] = record
+        self.hits += len(result)
+        ret: Future[Dict[str, Any]] = self.eventloop.create_future()
+        if not missing:
+            ret.set_result(result)
+            return ret
+        self.misses += len(missing)
+        provider = self.db.db_provider
+        fut = provider.execute_read_function(
+            provider.get_batch, self.namespace, missing
+        )
+        generation = self.generation
+
+        def _on_read(read_fut: Future) -> None:
+            exc = read_fut.exception()
+            if exc is not None:
+                if not ret.done():
+                    ret.set_exception(exc)
+                return
+            records: Dict[str, Any] = read_fut.result()
+            if generation == self.generation:
+                for key, record in records.items():
+                    self._store(key, record)
+            if not ret.done():
+                result.update(records)
+                ret.set_result(result)
+        fut.add_done_callback(_on_read)
+        return ret
+
+    def write_item(
+        self, key: Union[List[str], str], value: DBType, write_fut: Future
+    ) -> None:
+        try:
+            key_list = parse_namespace_key(key)
+        except ServerError:
+            return
+        self._discard(key_list[0])
+        if len(key_list) > 1:
+            return
+        try:
+            self._store(key_list[0], value)
+        except ServerError:
+            return
+        generation = self.generation
+
+        def _on_write(fut: Future) -> None:
+            if fut.exception() is not None and generation == self.generation:
+                self._discard(key_list[0])
+        write_fut.add_done_callback(_on_write)
+
+    def write_batch(self, records: Dict[str, Any], write_fut: Future) -> None:
+        self.invalidate_batch(list(records.keys()))
+        try:
+            for key, value in records.items():
+                self._store(key, value)
+        except ServerError:
+            self.clear()
+            return
+
+        def _on_write(fut: Future) -> None:
+            if fut.exception() is not None:
+                self.invalidate_batch(list(records.keys()))
+        write_fut.add_done_callback(_on_write)
+
+    def invalidate_item(self, key: Union[List[str], str]) -> None:
+        try:
+            key_list = parse_namespace_key(key)
+        except ServerError:
+            return
+        self._discard(key_list[0])
+
+    def invalidate_batch(self, keys: List[str]) -> None:
+        self.generation += 1
+        for key in keys:
+            self.records.pop(key, None)
+
+    def clear(self) -> None:
+        self.generation += 1
+        self.records.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "max_size": self.max_size,
+            "size": len(self.records),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.
+        }
+
 class NamespaceWrapper:
     def __init__(
         self,
@@ -1649,6 +2557,13 @@ class NamespaceWrapper:
             key = [key]
         return self.db.get_item(self.namespace, key, default)
 
+    def get_cached(
+        self, key: Union[List[str], str], default: Any = Sentinel.MISSING
+    ) -> Any:
+        if isinstance(key, str) and not self._parse_keys:
+            key = [key]
+        return self.db.get_cached_item(self.namespace, key, default)
+
     def delete(self, key: Union[List[str], str]) -> Future[Any]:
         if isinstance(key, str) and not self._parse_keys:
             key = [key]
@@ -15,12 +15,13 @@ import asyncio
 import zipfile
 import time
 import math
-import shlex
+import fnmatch
 import contextlib
-from copy import deepcopy
+from collections import deque
 from inotify_simple import INotify
 from inotify_simple import flags as iFlags
 from ...utils import source_info
+from ...utils import Sentinel
 from ...utils import json_wrapper as jsonw
 from ...common import RequestType, TransportType
 
@@ -39,11 +40,13 @@ from typing import (
     Callable,
     TypeVar,
     Type,
+    Deque,
     cast,
 )
 
 if TYPE_CHECKING:
     from inotify_simple import Event as InotifyEvent
+    from ...server import Server
     from ...confighelper import ConfigHelper
     from ...common import WebRequest, UserInfo
     from ..klippy_connection import KlippyConnection
@@ -52,11 +55,17 @@ if TYPE_CHECKING:
     from ..secrets import Secrets
     from ..klippy_apis import KlippyAPI as APIComp
     from ..database import MoonrakerDatabase as DBComp
-    from ..shell_command import ShellCommandFactory as SCMDComp
+    from ..database import NamespaceWrapper
     StrOrPath = Union[str, pathlib.Path]
+    ListingEntries = List[Tuple[str, Dict[str, Any]]]
+    IndexTree = Dict[str, Dict[str, Dict[str, Any]]]
+    # Path info, is directory, is volatile, indexed subtree, volatile subpaths
+    PathScan = Tuple[Dict[str, Any], bool, bool, IndexTree, Set[str]]
     _T = TypeVar("_T")
 
 VALID_GCODE_EXTS = ['.gcode', '.g', '.gco', '.ufp', '.nc']
+DIR_SORT_KEYS = ["name", "modified", "size"]
+DISK_USAGE_CACHE_TIME = 2.
 METADATA_SCRIPT = os.path.abspath(os.path.join(
     os.path.dirname(__file__), "metadata.py"))
 WATCH_FLAGS = iFlags.CREATE | iFlags.DELETE | iFlags.MODIFY \
@@ -103,6 +112,7 @@ class FileManager:
         )
         self.scheduled_notifications: Dict[str, asyncio.TimerHandle] = {}
         self.fixed_path_args: Dict[str, Any] = {}
+        self.disk_usage_cache: Dict[str, Tuple[float, Dict[str, int]]] = {}
         self.queue_gcodes: bool = config.getboolean('queue_gcode_uploads', False)
         self.check_klipper_path = config.getboolean("check_klipper_config_path", True)
 
@@ -116,6 +126,10 @@ class FileManager:
         self.server.register_endpoint(
             "/server/files/metascan", RequestType.POST, self._handle_metascan_request
         )
+        self.server.register_endpoint(
+            "/server/files/metascan/status", RequestType.GET,
+            self._handle_metascan_status
+        )
         self.server.register_endpoint(
             "/server/files/thumbnails", RequestType.GET, self._handle_list_thumbs
         )
@@ -261,6 +275,7 @@ class FileManager:
 
     def disable_write_access(self):
         self.full_access_roots.clear()
+        self.fs_observer.reset_file_indexes()
 
     def check_write_enabled(self):
         if not self.full_access_roots:
@@ -357,6 +372,8 @@ class FileManager:
             res_path = pathlib.Path(res_path)
         res_path = res_path.expanduser().resolve()
         self.reserved_paths[name] = (res_path, read_access)
+        if hasattr(self, "fs_observer"):
+            self.fs_observer.reset_file_indexes()
         return True
 
     def get_directory(self, root: str = "gcodes") -> str:
@@ -417,6 +434,10 @@ class FileManager:
                                        web_request: WebRequest
                                        ) -> List[Dict[str, Any]]:
         root = web_request.get_str('root', "gcodes")
+        index = self.fs_observer.get_file_index(root)
+        if index is not None:
+            # Build the index off of the event loop
+            await index.wait_ready()
         flist = self.get_file_list(root, list_format=True)
         return cast(List[Dict[str, Any]], flist)
 
@@ -425,7 +446,7 @@ class FileManager:
                                        ) -> Dict[str, Any]:
         requested_file: str = web_request.get_str('filename')
         metadata: Optional[Dict[str, Any]]
-        metadata = self.gcode_metadata.get(requested_file, None)
+        metadata = await self.gcode_metadata.fetch(requested_file, None)
         if metadata is None:
             raise self.server.error(
                 f"Metadata not available for <{requested_file}>", 404)
@@ -450,13 +471,18 @@ class FileManager:
             evt = self.gcode_metadata.parse_metadata(requested_file, path_info)
             await evt.wait()
             metadata: Optional[Dict[str, Any]]
-            metadata = self.gcode_metadata.get(requested_file, None)
+            metadata = await self.gcode_metadata.fetch(requested_file, None)
             if metadata is None:
                 raise self.server.error(
                     f"Failed to parse metadata for file '{requested_file}'", 500)
             metadata['filename'] = requested_file
             return metadata
 
+    async def _handle_metascan_status(
+        self, web_request: WebRequest
+    ) -> Dict[str, Any]:
+        return self.gcode_metadata.get_progress()
+
     async def _handle_list_roots(
         self, web_request: WebRequest
     ) -> List[Dict[str, Any]]:
@@ -475,18 +501,19 @@ class FileManager:
     ) -> List[Dict[str, Any]]:
         requested_file: str = web_request.get_str("filename")
         metadata: Optional[Dict[str, Any]]
-        metadata = self.gcode_metadata.get(requested_file, None)
+        metadata = await self.gcode_metadata.fetch(requested_file, None)
         if metadata is None:
             return []
         if "thumbnails" not in metadata:
             return []
-        thumblist: List[Dict[str, Any]] = metadata["thumbnails"]
-        for info in thumblist:
+        thumblist: List[Dict[str, Any]] = []
+        for thumb in metadata["thumbnails"]:
+            info = dict(thumb)
             relpath: Optional[str] = info.pop("relative_path", None)
-            if relpath is None:
-                continue
-            thumbpath = pathlib.Path(requested_file).parent.joinpath(relpath)
-            info["thumbnail_path"] = str(thumbpath)
+            if relpath is not None:
+                thumbpath = pathlib.Path(requested_file).parent.joinpath(relpath)
+                info["thumbnail_path"] = str(thumbpath)
+            thumblist.append(info)
         return thumblist
 
     async def _handle_directory_request(self,
@@ -497,9 +524,38 @@ class FileManager:
         req_type = web_request.get_request_type()
         if req_type == RequestType.GET:
             is_extended = web_request.get_boolean('extended', False)
+            options = self._parse_listing_options(web_request)
             # Get list of files and subdirectories for this target
-            dir_info = self._list_directory(dir_path, root, is_extended)
-            return dir_info
+            if not os.path.isdir(dir_path):
+                raise self.server.error(
+                    f"Directory does not exist ({dir_path})")
+            self.check_reserved_path(dir_path, False)
+            index = self.fs_observer.get_file_index(root)
+            if index is not None:
+                await index.wait_ready()
+                entries = index.get_directory(dir_path)
+            else:
+                entries = None
+            disk_usage = self._get_cached_disk_usage(dir_path)
+            if disk_usage is None:
+                listing, usage = await self.event_loop.run_in_thread(
+                    self._scan_listing, dir_path, root, entries, pool="disk_io"
+                )
+                self._cache_disk_usage(dir_path, usage)
+                entries, disk_usage = listing, usage
+            elif entries is None:
+                entries = await self.event_loop.run_in_thread(
+                    self._read_directory, dir_path, root, pool="disk_io"
+                )
+            dirs, files, total_files = self._select_entries(entries, options)
+            metadata: Dict[str, Dict[str, Any]] = {}
+            if is_extended:
+                md_keys = self._get_metadata_keys(dir_path, root, files)
+                records = await self.gcode_metadata.fetch_batch(list(md_keys))
+                metadata = {md_keys[key]: rec for key, rec in records.items()}
+            return self._build_listing(
+                root, dirs, files, total_files, metadata, disk_usage, options
+            )
         async with self.sync_lock:
             self.check_reserved_path(dir_path, True)
             action = "create_dir"
@@ -528,7 +584,7 @@ class FileManager:
                     self._handle_operation_check(dir_path)
                     try:
                         await self.event_loop.run_in_thread(
-                            shutil.rmtree, dir_path)
+                            shutil.rmtree, dir_path, pool="file_ops")
                     except Exception:
                         raise
                 else:
@@ -627,7 +683,7 @@ class FileManager:
             self.sync_lock.setup(action, dest_path, move_copy=True)
             try:
                 full_dest = await self.event_loop.run_in_thread(
-                    op_func, source_path, dest_path)
+                    op_func, source_path, dest_path, pool="file_ops")
                 if dest_root == "gcodes" and self.fs_observer.has_fast_observe:
                     await self.sync_lock.wait_inotify_event(full_dest)
             except Exception as e:
@@ -677,7 +733,7 @@ class FileManager:
                 )
             self.sync_lock.setup("create_file", dest_path)
             await self.event_loop.run_in_thread(
-                self._zip_files, items, dest_path, store_only
+                self._zip_files, items, dest_path, store_only, pool="file_ops"
             )
             self.fs_observer.on_item_create(dest_root, dest_path)
             ret = self._sched_changed_event("create_file", dest_root, str(dest_path))
@@ -738,45 +794,218 @@ class FileManager:
                             continue
         shutil.move(str(temp_dest), str(destination))
 
+    def _parse_listing_options(self, web_request: WebRequest) -> Dict[str, Any]:
+        options: Dict[str, Any] = {}
+        offset = web_request.get_int("offset", 0)
+        limit: Optional[int] = web_request.get_int("limit", None)
+        if offset < 0 or (limit is not None and limit < 0):
+            raise self.server.error("Offset and limit must be positive values")
+        sort_by: Optional[str] = web_request.get_str("sort_by", None)
+        if sort_by is not None and sort_by not in DIR_SORT_KEYS:
+            raise self.server.error(
+                f"Invalid value for 'sort_by': {sort_by}, must be one of "
+                f"{DIR_SORT_KEYS}"
+            )
+        sort_order = web_request.get_str("sort_order", "asc").lower()
+        if sort_order not in ["asc", "desc"]:
+            raise self.server.error(
+                f"Invalid value for 'sort_order': {sort_order}"
+            )
+        pattern: Optional[str] = web_request.get_str("pattern", None)
+        extensions: Optional[List[str]] = web_request.get_list("extensions", None)
+        fields: Optional[List[str]] = web_request.get_list("fields", None)
+        if offset or limit is not None:
+            options["offset"] = offset
+            options["limit"] = limit
+        if sort_by is not None:
+            options["sort_by"] = sort_by
+            options["reverse"] = sort_order == "desc"
+        if pattern:
+            options["pattern"] = pattern.lower()
+        if extensions:
+            options["extensions"] = [
+                "." + ext.strip().lstrip(".").lower() for ext in extensions
+            ]
+        if fields:
+            options["fields"] = [field.strip() for field in fields]
+        return options
+
+    def _get_cached_disk_usage(self, path: str) -> Optional[Dict[str, int]]:
+        cached = self.disk_usage_cache.get(path)
+        if (
+            cached is not None and
+            time.monotonic() - cached[0] < DISK_USAGE_CACHE_TIME
+        ):
+            return dict(cached[1])
+        return None
+
+    def _cache_disk_usage(self, path: str, usage: Dict[str, int]) -> None:
+        eventtime = time.monotonic()
+        self.disk_usage_cache = {
+            p: c for p, c in self.disk_usage_cache.items()
+            if eventtime - c[0] < DISK_USAGE_CACHE_TIME
+        }
+        self.disk_usage_cache[path] = (eventtime, dict(usage))
+
+    def _get_disk_usage(self, path: str) -> Dict[str, int]:
+        usage = self._get_cached_disk_usage(path)
+        if usage is None:
+            usage = shutil.disk_usage(path)._asdict()
+            self._cache_disk_usage(path, usage)
+        return usage
+
+    def _scan_listing(
+        self,
+        path: str,
+        root: str,
+        entries: Optional[Dict[str, Dict[str, Any]]]
+    ) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, int]]:
+        # Runs in a thread, reads the disk usage along with the directory
+        # if it is not indexed.  The caller updates the disk usage cache
+        # on the event loop.
+        if entries is None:
+            entries = self._read_directory(path, root)
+        return entries, shutil.disk_usage(path)._asdict()
+
     def _list_directory(self,
                         path: str,
                         root: str,
-                        is_extended: bool = False
+                        is_extended: bool = False,
+                        options: Optional[Dict[str, Any]] = None
                         ) -> Dict[str, Any]:
         if not os.path.isdir(path):
             raise self.server.error(
                 f"Directory does not exist ({path})")
         self.check_reserved_path(path, False)
+        index = self.fs_observer.get_file_index(root)
+        entries = None if index is None else index.get_directory(path)
+        if entries is None:
+            entries = self._read_directory(path, root)
+        options = options or {}
+        dirs, files, total_files = self._select_entries(entries, options)
+        metadata: Dict[str, Dict[str, Any]] = {}
+        if is_extended:
+            for key, fname in self._get_metadata_keys(path, root, files).items():
+                record = self.gcode_metadata.peek(key)
+                if record is not None:
+                    metadata[fname] = record
+        return self._build_listing(
+            root, dirs, files, total_files, metadata,
+            self._get_disk_usage(path), options
+        )
+
+    def _get_metadata_keys(
+        self, path: str, root: str, files: ListingEntries
+    ) -> Dict[str, str]:
+        # Maps the metadata keys of gcode files in a listing to file names
+        if root != "gcodes":
+            return {}
+        md_keys: Dict[str, str] = {}
+        for fname, _ in files:
+            ext = os.path.splitext(fname)[-1].lower()
+            if ext in VALID_GCODE_EXTS:
+                full_path = os.path.join(path, fname)
+                md_keys[self.get_relative_path(root, full_path)] = fname
+        return md_keys
+
+    def _select_entries(
+        self, entries: Dict[str, Dict[str, Any]], options: Dict[str, Any]
+    ) -> Tuple[ListingEntries, ListingEntries, int]:
+        # Returns the filtered and sorted directories and files, and the
+        # total number of files before pagination
+        files = list(entries["files"].items())
+        dirs = list(entries["dirs"].items())
+        pattern: Optional[str] = options.get("pattern")
+        if pattern is not None:
+            files = [
+                f for f in files if fnmatch.fnmatchcase(f[0].lower(), pattern)
+            ]
+        extensions: Optional[List[str]] = options.get("extensions")
+        if extensions is not None:
+            files = [
+                f for f in files
+                if os.path.splitext(f[0])[-1].lower() in extensions
+            ]
+        sort_by: Optional[str] = options.get("sort_by")
+        if sort_by is not None:
+            if sort_by == "name":
+                def sort_key(item: Tuple[str, Dict[str, Any]]) -> Any:
+                    return item[0].lower()
+            else:
+                def sort_key(item: Tuple[str, Dict[str, Any]]) -> Any:
+                    return item[1].get(sort_by, 0)
+            reverse: bool = options["reverse"]
+            files.sort(key=sort_key, reverse=reverse)
+            dirs.sort(key=sort_key, reverse=reverse)
+        total_files = len(files)
+        if "offset" in options:
+            offset: int = options["offset"]
+            limit: Optional[int] = options["limit"]
+            end = None if limit is None else offset + limit
+            files = files[offset:end]
+        return dirs, files, total_files
+
+    def _build_listing(
+        self,
+        root: str,
+        dirs: ListingEntries,
+        files: ListingEntries,
+        total_files: int,
+        metadata: Dict[str, Dict[str, Any]],
+        disk_usage: Dict[str, int],
+        options: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        fields: Optional[List[str]] = options.get("fields")
         flist: Dict[str, Any] = {'dirs': [], 'files': []}
+        for dname, path_info in dirs:
+            path_info['dirname'] = dname
+            if fields is not None:
+                path_info = self._project_fields(path_info, fields, "dirname")
+            flist['dirs'].append(path_info)
+        for fname, path_info in files:
+            path_info['filename'] = fname
+            record = metadata.get(fname)
+            if record is not None:
+                # Metadata is not copied, the listing is serialized
+                # before the cache can be modified
+                for key, val in record.items():
+                    if key != "filename":
+                        path_info[key] = val
+            if fields is not None:
+                path_info = self._project_fields(path_info, fields, "filename")
+            flist['files'].append(path_info)
+        flist['disk_usage'] = disk_usage
+        flist['root_info'] = {
+            'name': root,
+            'permissions': "rw" if root in self.full_access_roots else "r"
+        }
+        if options:
+            flist['total_files'] = total_files
+        return flist
+
+    def _project_fields(
+        self, path_info: Dict[str, Any], fields: List[str], name_key: str
+    ) -> Dict[str, Any]:
+        projected = {name_key: path_info[name_key]}
+        for field in fields:
+            if field in path_info:
+                projected[field] = path_info[field]
+        return projected
+
+    def _read_directory(
+        self, path: str, root: str
+    ) -> Dict[str, Dict[str, Any]]:
+        entries: Dict[str, Dict[str, Any]] = {"dirs": {}, "files": {}}
         for fname in os.listdir(path):
             full_path = os.path.join(path, fname)
             if not os.path.exists(full_path):
                 continue
             path_info = self.get_path_info(full_path, root)
             if os.path.isdir(full_path):
-                path_info['dirname'] = fname
-                flist['dirs'].append(path_info)
+                entries["dirs"][fname] = path_info
             elif os.path.isfile(full_path):
-                path_info['filename'] = fname
-                # Check to see if a filelist update is necessary
-                ext = os.path.splitext(fname)[-1].lower()
-                if (
-                    root == "gcodes" and
-                    ext in VALID_GCODE_EXTS and
-                    is_extended
-                ):
-                    rel_path = self.get_relative_path(root, full_path)
-                    metadata: Dict[str, Any] = self.gcode_metadata.get(
-                        rel_path, {})
-                    path_info.update(metadata)
-                flist['files'].append(path_info)
-        usage = shutil.disk_usage(path)
-        flist['disk_usage'] = usage._asdict()
-        flist['root_info'] = {
-            'name': root,
-            'permissions': "rw" if root in self.full_access_roots else "r"
-        }
-        return flist
+                entries["files"][fname] = path_info
+        return entries
 
     def get_path_info(
         self, path: StrOrPath, root: str, raise_error: bool = True
@@ -981,13 +1210,29 @@ class FileManager:
                       root: str,
                       list_format: bool = False
                       ) -> Union[Dict[str, Any], List[Dict[str, Any]]]:
-        # Use os.walk find files in sd path and subdirs
-        filelist: Dict[str, Any] = {}
+        filelist: Optional[Dict[str, Any]] = None
         path = self.file_paths.get(root, None)
         if path is None or not os.path.isdir(path):
             msg = f"Failed to build file list, invalid path: {root}: {path}"
             logging.info(msg)
             raise self.server.error(msg)
+        index = self.fs_observer.get_file_index(root)
+        if index is not None:
+            filelist = index.get_file_list()
+        if filelist is None:
+            filelist = self._walk_file_list(root, path)
+        if list_format:
+            flist: List[Dict[str, Any]] = []
+            for fname in sorted(filelist, key=str.lower):
+                fdict: Dict[str, Any] = {'path': fname}
+                fdict.update(filelist[fname])
+                flist.append(fdict)
+            return flist
+        return filelist
+
+    def _walk_file_list(self, root: str, path: str) -> Dict[str, Any]:
+        # Use os.walk find files in sd path and subdirs
+        filelist: Dict[str, Any] = {}
         logging.info(f"Updating File List <{root}>...")
         st = os.stat(path)
         visited_dirs = {(st.st_dev, st.st_ino)}
@@ -1016,13 +1261,6 @@ class FileManager:
                 fname = full_path[len(path) + 1:]
                 finfo = self.get_path_info(full_path, root)
                 filelist[fname] = finfo
-        if list_format:
-            flist: List[Dict[str, Any]] = []
-            for fname in sorted(filelist, key=str.lower):
-                fdict: Dict[str, Any] = {'path': fname}
-                fdict.update(filelist[fname])
-                flist.append(fdict)
-            return flist
         return filelist
 
     def get_file_metadata(self, filename: str) -> Dict[str, Any]:
@@ -1137,6 +1375,7 @@ class FileManager:
             hdl.cancel()
         self.scheduled_notifications.clear()
         self.fs_observer.close()
+        self.gcode_metadata.close()
 
 
 class NotifySyncLock(asyncio.Lock):
@@ -1290,6 +1529,256 @@ class NotifySyncLock(asyncio.Lock):
         self.finish()
 
 
+class FileListIndex:
+    """
+    In-memory index of the files and folders contained in a root.  The
+    index is built with a single walk of the root, then kept up to date
+    by marking paths reported by file system events as dirty.  Paths the
+    observer does not watch (symbolic links to files and readable reserved
+    folders) are rescanned each time the index is awaited.  Dirty paths
+    and unwatched paths are rescanned in a thread.
+    """
+    def __init__(
+        self, file_manager: FileManager, root: str, root_path: str
+    ) -> None:
+        self.file_manager = file_manager
+        self.event_loop = file_manager.event_loop
+        self.root = root
+        self.root_path = root_path
+        # Relative directory path -> {"dirs": {name: info}, "files": {...}}
+        self.directories: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self.dirty_paths: Dict[str, None] = {}
+        self.volatile_paths: Set[str] = set()
+        self.ready: bool = False
+        self.build_task: Optional[asyncio.Task] = None
+        self.refresh_task: Optional[asyncio.Task] = None
+
+    def _get_rel_path(self, full_path: str) -> str:
+        return full_path[len(self.root_path) + 1:]
+
+    def _scan_tree(
+        self, start_path: str
+    ) -> Tuple[Dict[str, Dict[str, Dict[str, Any]]], Set[str]]:
+        fm = self.file_manager
+        directories: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        volatile: Set[str] = set()
+        st = os.stat(start_path)
+        visited_dirs = {(st.st_dev, st.st_ino)}
+        for dir_path, dir_names, files in os.walk(start_path, followlinks=True):
+            entry: Dict[str, Dict[str, Any]] = {"dirs": {}, "files": {}}
+            parent_reserved = fm.check_reserved_path(dir_path, True, False)
+            scan_dirs: List[str] = []
+            for dname in dir_names:
+                full_path = os.path.join(dir_path, dname)
+                if not os.path.exists(full_path):
+                    continue
+                entry["dirs"][dname] = fm.get_path_info(
+                    full_path, self.root, raise_error=False
+                )
+                st = os.stat(full_path)
+                key = (st.st_dev, st.st_ino)
+                if key not in visited_dirs:
+                    visited_dirs.add(key)
+                    if not fm.check_reserved_path(full_path, False, False):
+                        scan_dirs.append(dname)
+                        if (
+                            not parent_reserved and
+                            fm.check_reserved_path(full_path, True, False)
+                        ):
+                            # Readable reserved paths are not observed
+                            volatile.add(self._get_rel_path(full_path))
+            dir_names[:] = scan_dirs
+            for name in files:
+                full_path = os.path.join(dir_path, name)
+                if not os.path.exists(full_path):
+                    continue
+                if os.path.islink(full_path):
+                    volatile.add(self._get_rel_path(full_path))
+                entry["files"][name] = fm.get_path_info(
+                    full_path, self.root, raise_error=False
+                )
+            directories[self._get_rel_path(dir_path)] = entry
+        return directories, volatile
+
+    def _build(self) -> Tuple[Dict[str, Dict[str, Dict[str, Any]]], Set[str]]:
+        logging.info(f"Building File List Index <{self.root}>...")
+        return self._scan_tree(self.root_path)
+
+    def _finish_build(
+        self, result: Tuple[Dict[str, Dict[str, Dict[str, Any]]], Set[str]]
+    ) -> None:
+        if self.ready:
+            return
+        self.directories, self.volatile_paths = result
+        self.ready = True
+
+    async def _build_async(self) -> None:
+        try:
+            result = await self.event_loop.run_in_thread(self._build, pool="file_ops")
+        except Exception:
+            # The build is retried on the next request
+            logging.exception(f"Failed to build File List Index <{self.root}>")
+            return
+        finally:
+            self.build_task = None
+        self._finish_build(result)
+
+    def _start_build(self) -> asyncio.Task:
+        if self.build_task is None:
+            self.build_task = self.event_loop.create_task(self._build_async())
+        return self.build_task
+
+    async def wait_ready(self) -> None:
+        if not self.ready:
+            await asyncio.shield(self._start_build())
+            if not self.ready:
+                return
+        if self.dirty_paths or self.volatile_paths:
+            await asyncio.shield(self._start_refresh())
+
+    def mark_dirty(self, full_path: str) -> None:
+        rel_path = self._get_rel_path(full_path)
+        if rel_path:
+            self.dirty_paths[rel_path] = None
+
+    def _drop_tree(self, rel_dir: str) -> None:
+        prefix = rel_dir + "/"
+        for dir_path in list(self.directories.keys()):
+            if dir_path == rel_dir or dir_path.startswith(prefix):
+                del self.directories[dir_path]
+        for item in list(self.volatile_paths):
+            if item.startswith(prefix):
+                self.volatile_paths.discard(item)
+
+    def _scan_path(self, rel_path: str) -> Optional[PathScan]:
+        # Called from a thread, the index itself is not modified
+        fm = self.file_manager
+        full_path = os.path.join(self.root_path, rel_path)
+        if not os.path.exists(full_path):
+            return None
+        info = fm.get_path_info(full_path, self.root, raise_error=False)
+        if not os.path.isdir(full_path):
+            return info, False, os.path.islink(full_path), {}, set()
+        if fm.check_reserved_path(full_path, False, False):
+            return info, True, False, {}, set()
+        volatile = (
+            fm.check_reserved_path(full_path, True, False) and
+            not fm.check_reserved_path(os.path.dirname(full_path), True, False)
+        )
+        directories, sub_volatile = self._scan_tree(full_path)
+        return info, True, volatile, directories, sub_volatile
+
+    def _scan_updates(
+        self, pending: List[str], parents: Set[str]
+    ) -> Tuple[Dict[str, Optional[PathScan]], Dict[str, Dict[str, Any]]]:
+        scans = {rel_path: self._scan_path(rel_path) for rel_path in pending}
+        # Modifying the contents of a folder updates its own path info
+        parent_info = {
+            rel_dir: self.file_manager.get_path_info(
+                os.path.join(self.root_path, rel_dir), self.root,
+                raise_error=False
+            ) for rel_dir in parents
+        }
+        return scans, parent_info
+
+    def _update_path(self, rel_path: str, scan: Optional[PathScan]) -> None:
+        parent, name = os.path.split(rel_path)
+        entry = self.directories.get(parent)
+        if entry is None:
+            # Parent folder is not indexed
+            return
+        entry["files"].pop(name, None)
+        if entry["dirs"].pop(name, None) is not None:
+            self._drop_tree(rel_path)
+        self.volatile_paths.discard(rel_path)
+        if scan is None:
+            return
+        info, is_dir, volatile, directories, sub_volatile = scan
+        if volatile:
+            self.volatile_paths.add(rel_path)
+        if not is_dir:
+            entry["files"][name] = info
+            return
+        entry["dirs"][name] = info
+        self.directories.update(directories)
+        self.volatile_paths.update(sub_volatile)
+
+    async def _refresh_async(self) -> None:
+        pending = list(self.dirty_paths.keys())
+        pending.extend(sorted(self.volatile_paths))
+        pending = list(dict.fromkeys(pending))
+        self.dirty_paths.clear()
+        parents = {os.path.dirname(rel_path) for rel_path in pending}
+        parents.discard("")
+        try:
+            scans, parent_info = await self.event_loop.run_in_thread(
+                self._scan_updates, pending, parents, pool="disk_io"
+            )
+        except Exception:
+            # The paths are rescanned on the next request
+            logging.exception(f"Failed to refresh File List Index <{self.root}>")
+            for rel_path in pending:
+                self.dirty_paths[rel_path] = None
+            return
+        finally:
+            self.refresh_task = None
+        for rel_path in pending:
+            self._update_path(rel_path, scans[rel_path])
+        for rel_dir, info in parent_info.items():
+            grandparent, name = os.path.split(rel_dir)
+            entry = self.directories.get(grandparent)
+            if entry is not None and name in entry["dirs"]:
+                entry["dirs"][name] = info
+
+    def _start_refresh(self) -> asyncio.Task:
+        if self.refresh_task is None:
+            self.refresh_task = self.event_loop.create_task(self._refresh_async())
+        return self.refresh_task
+
+    def refresh(self) -> bool:
+        # Returns False if the index is not yet built or has paths waiting
+        # to be rescanned.  The build and rescans are run in a thread,
+        # callers should read the file system directly until they complete.
+        if not self.ready:
+            self._start_build()
+            return False
+        if self.dirty_paths:
+            self._start_refresh()
+            return False
+        return True
+
+    def get_file_list(self) -> Optional[Dict[str, Dict[str, Any]]]:
+        if not self.refresh():
+            return None
+        filelist: Dict[str, Dict[str, Any]] = {}
+        for dir_path, entry in self.directories.items():
+            for name, info in entry["files"].items():
+                ext = os.path.splitext(name)[-1].lower()
+                if self.root == "gcodes" and ext not in VALID_GCODE_EXTS:
+                    continue
+                fname = os.path.join(dir_path, name) if dir_path else name
+                filelist[fname] = dict(info)
+        return filelist
+
+    def get_directory(
+        self, dir_path: str
+    ) -> Optional[Dict[str, Dict[str, Any]]]:
+        if not self.refresh():
+            return None
+        dir_path = os.path.normpath(dir_path)
+        if dir_path == self.root_path:
+            rel_dir = ""
+        else:
+            rel_dir = self._get_rel_path(dir_path)
+        entry = self.directories.get(rel_dir)
+        if entry is None:
+            return None
+        return {
+            "dirs": {n: dict(i) for n, i in entry["dirs"].items()},
+            "files": {n: dict(i) for n, i in entry["files"].items()}
+        }
+
+
 class BaseFileSystemObserver:
     def __init__(
         self,
@@ -1309,6 +1798,12 @@ class BaseFileSystemObserver:
     def has_fast_observe(self) -> bool:
         return False
 
+    def get_file_index(self, root: str) -> Optional[FileListIndex]:
+        return None
+
+    def reset_file_indexes(self) -> None:
+        pass
+
     def initialize(self) -> None:
         pass
 
@@ -1828,11 +2323,25 @@ class InotifyObserver(BaseFileSystemObserver):
         self.processing_gcode_files: Set[str] = set()
         self.pending_coroutines: List[Coroutine] = []
         self._gc_notify_task: Optional[asyncio.Task] = None
+        self.file_indexes: Dict[str, FileListIndex] = {}
 
     @property
     def has_fast_observe(self) -> bool:
         return True
 
+    def get_file_index(self, root: str) -> Optional[FileListIndex]:
+        root_node = self.watched_roots.get(root)
+        if root_node is None:
+            return None
+        index = self.file_indexes.get(root)
+        if index is None:
+            index = FileListIndex(self.file_manager, root, root_node.get_path())
+            self.file_indexes[root] = index
+        return index
+
+    def reset_file_indexes(self) -> None:
+        self.file_indexes.clear()
+
     # Override and pass the callbacks from the request handlers.  Inotify
     # detects events quickly and takes any required actions
     def on_item_create(
@@ -1863,6 +2372,7 @@ class InotifyObserver(BaseFileSystemObserver):
             old_root = self.watched_roots.pop(root)
             old_root.clear_watches()
             old_root.clear_events()
+        self.file_indexes.pop(root, None)
         try:
             root_node = InotifyRootNode(self, root, root_path)
         except Exception as e:
@@ -2007,6 +2517,11 @@ class InotifyObserver(BaseFileSystemObserver):
     def _handle_inotify_read(self) -> None:
         evt: InotifyEvent
         for evt in self.inotify.read(timeout=0):
+            if evt.mask & iFlags.Q_OVERFLOW:
+                # Events were dropped, indexes must be rebuilt
+                logging.info("Inotify event queue overflow")
+                self.file_indexes.clear()
+                continue
             if evt.mask & iFlags.IGNORED:
                 continue
             if evt.wd not in self.watched_nodes:
@@ -2017,6 +2532,9 @@ class InotifyObserver(BaseFileSystemObserver):
                     f"flags: {flags}")
                 continue
             node = self.watched_nodes[evt.wd]
+            index = self.file_indexes.get(node.get_root())
+            if index is not None and evt.name not in [".", ".."]:
+                index.mark_dirty(os.path.join(node.get_path(), evt.name))
             if evt.mask & iFlags.ISDIR:
                 self._process_dir_event(evt, node)
             else:
@@ -2299,6 +2817,147 @@ class InotifyObserver(BaseFileSystemObserver):
 
 METADATA_NAMESPACE = "gcode_metadata"
 METADATA_VERSION = 3
+METADATA_WORKER_IDLE_TIME = 60.
+METADATA_WORKER_LIMIT = 4 * 1024 * 1024
+METADATA_PROGRESS_INTERVAL = 25
+
+# Storage for gcode metadata records.  Stored records are immutable, updates
+# replace a record rather than modifying it, allowing records to be shared
+# with callers without a copy.  When the cache size is zero all records are
+# held in memory.  Otherwise only the size and modification time of each
+# file is kept in memory.  Full records are read from the database on demand
+# and retained in the namespace's cache.
+class MetadataRecords:
+    def __init__(
+        self, database: DBComp, mddb: NamespaceWrapper, cache_size: int = 0
+    ) -> None:
+        self.db = database
+        self.mddb = mddb
+        self.cache_size = cache_size
+        self.records: Dict[str, Dict[str, Any]] = {}
+        self.file_stats: Dict[str, Tuple[Any, Any]] = {}
+
+    @property
+    def is_lazy(self) -> bool:
+        return self.cache_size > 0
+
+    def load(self) -> None:
+        if not self.is_lazy:
+            self.records = self.mddb.as_dict()
+            for key, record in list(self.records.items()):
+                self._strip_thumbnail_data(key, record)
+            return
+        # Index the namespace a page at a time.  The database provider
+        # has not been started, so reads complete synchronously.
+        start_key: Optional[str] = None
+        while True:
+            rows = self.db.ns_page(METADATA_NAMESPACE, start_key, 200).result()
+            for key, record in rows:
+                self._strip_thumbnail_data(key, record)
+                self.file_stats[key] = (
+                    record.get("size"), record.get("modified")
+                )
+            if len(rows) < 200:
+                break
+            start_key = rows[-1][0]
+        logging.info(
+            f"Indexed metadata for {len(self.file_stats)} files, "
+            f"cache size: {self.cache_size}"
+        )
+
+    def _strip_thumbnail_data(self, key: str, record: Dict[str, Any]) -> None:
+        # Remove stale thumbnail data entries from previous versions
+        thumbs: Optional[List[Dict[str, Any]]] = record.get("thumbnails")
+        if not thumbs or not any("data" in thumb for thumb in thumbs):
+            return
+        record = dict(record)
+        record["thumbnails"] = [
+            {k: v for k, v in thumb.items() if k != "data"} for thumb in thumbs
+        ]
+        if not self.is_lazy:
+            self.records[key] = record
+        self.mddb[key] = record
+
+    def keys(self) -> List[str]:
+        if self.is_lazy:
+            return list(self.file_stats.keys())
+        return list(self.records.keys())
+
+    def __contains__(self, key: str) -> bool:
+        if self.is_lazy:
+            return key in self.file_stats
+        return key in self.records
+
+    def __len__(self) -> int:
+        if self.is_lazy:
+            return len(self.file_stats)
+        return len(self.records)
+
+    def get_file_stats(self, key: str) -> Optional[Tuple[Any, Any]]:
+        if self.is_lazy:
+            return self.file_stats.get(key)
+        record = self.records.get(key)
+        if record is None:
+            return None
+        return record.get("size"), record.get("modified")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        # When records are loaded on demand only cached records are
+        # returned.  A miss starts a read that caches the record.
+        if not self.is_lazy:
+            return self.records.get(key)
+        if key not in self.file_stats:
+            return None
+        record = self.mddb.get_cached(key, None)
+        if record is Sentinel.MISSING:
+            self.mddb.get(key)
+            return None
+        return record
+
+    async def fetch(self, key: str) -> Optional[Dict[str, Any]]:
+        if not self.is_lazy:
+            return self.records.get(key)
+        if key not in self.file_stats:
+            return None
+        return await self.mddb.get(key, None)
+
+    async def fetch_batch(self, keys: List[str]) -> Dict[str, Dict[str, Any]]:
+        if not self.is_lazy:
+            return {k: self.records[k] for k in keys if k in self.records}
+        keys = [k for k in keys if k in self.file_stats]
+        if not keys:
+            return {}
+        return await self.mddb.get_batch(keys)
+
+    def insert(self, key: str, record: Dict[str, Any]) -> None:
+        if self.is_lazy:
+            self.file_stats[key] = (record.get("size"), record.get("modified"))
+        else:
+            self.records[key] = record
+        self.mddb.insert(key, record)
+
+    def remove_batch(self, keys: List[str]) -> asyncio.Future:
+        # Returns a future resolving to the records removed from the database
+        for key in keys:
+            self.records.pop(key, None)
+            self.file_stats.pop(key, None)
+        return self.mddb.delete_batch(keys)
+
+    def move_batch(self, moves: List[Tuple[str, str]]) -> None:
+        moved = [(src, dest) for src, dest in moves if src in self]
+        if not moved:
+            return
+        for src, dest in moved:
+            if self.is_lazy:
+                self.file_stats[dest] = self.file_stats.pop(src)
+            else:
+                self.records[dest] = self.records.pop(src)
+        self.mddb.move_batch([m[0] for m in moved], [m[1] for m in moved])
+
+    def clear(self) -> None:
+        self.records.clear()
+        self.file_stats.clear()
+        self.mddb.clear()
 
 class MetadataStorage:
     def __init__(self,
@@ -2311,9 +2970,14 @@ class MetadataStorage:
         self.default_metadata_parser_timeout = config.getfloat(
             'default_metadata_parser_timeout', 20.)
         self.gc_path = ""
+        # Keep a local cache of the metadata.  This allows for synchronous
+        # queries.  Metadata is generally under 1KiB per entry, so even at
+        # 1000 gcode files we are using < 1MiB of additional memory.  Larger
+        # installations may limit the number of records held in memory.
+        cache_size = config.getint("metadata_cache_size", 0, minval=0)
         db.register_local_namespace(METADATA_NAMESPACE)
         self.mddb = db.wrap_namespace(
-            METADATA_NAMESPACE, parse_keys=False)
+            METADATA_NAMESPACE, parse_keys=False, cache_size=cache_size)
         version = db.get_item(
             "moonraker", "file_manager.metadata_version", 0).result()
         if version != METADATA_VERSION:
@@ -2322,38 +2986,32 @@ class MetadataStorage:
             db.insert_item(
                 "moonraker", "file_manager.metadata_version",
                 METADATA_VERSION)
-        # Keep a local cache of the metadata.  This allows for synchronous
-        # queries.  Metadata is generally under 1KiB per entry, so even at
-        # 1000 gcode files we are using < 1MiB of additional memory.
-        # That said, in the future all components that access metadata should
-        # be refactored to do so asynchronously.
-        self.metadata: Dict[str, Any] = self.mddb.as_dict()
+        self.metadata = MetadataRecords(db, self.mddb, cache_size)
+        self.metadata.load()
         self.pending_requests: Dict[
             str, Tuple[Dict[str, Any], asyncio.Event]] = {}
-        self.busy: bool = False
+        self.request_queue: Deque[str] = deque()
+        self.progress: Dict[str, int] = {"total": 0, "processed": 0, "failed": 0}
         self.processors: Dict[str, Dict[str, Any]] = {}
+        worker_count = config.getint(
+            "metadata_worker_count", os.cpu_count() or 1, minval=1
+        )
+        self.workers = [
+            MetadataWorker(self.server, idx) for idx in range(worker_count)
+        ]
+        self.idle_workers = list(reversed(self.workers))
+        self.idle_handle: Optional[asyncio.TimerHandle] = None
 
     def prune_storage(self) -> None:
         # Check for removed gcode files while moonraker was shutdown
         if self.gc_path:
-            del_keys: List[str] = []
-            for fname in list(self.metadata.keys()):
-                fpath = os.path.join(self.gc_path, fname)
-                if not os.path.isfile(fpath):
-                    del self.metadata[fname]
-                    del_keys.append(fname)
-                elif "thumbnails" in self.metadata[fname]:
-                    # Check for any stale data entries and remove them
-                    need_sync = False
-                    for thumb in self.metadata[fname]['thumbnails']:
-                        if 'data' in thumb:
-                            del thumb['data']
-                            need_sync = True
-                    if need_sync:
-                        self.mddb[fname] = self.metadata[fname]
+            del_keys: List[str] = [
+                fname for fname in self.metadata.keys()
+                if not os.path.isfile(os.path.join(self.gc_path, fname))
+            ]
             # Delete any removed keys from the database
             if del_keys:
-                ret = self.mddb.delete_batch(del_keys).result()
+                ret = self.metadata.remove_batch(del_keys).result()
                 self._remove_thumbs(ret)
                 pruned = '\n'.join(ret.keys())
                 if pruned:
@@ -2365,19 +3023,42 @@ class MetadataStorage:
             return
         if self.gc_path:
             self.metadata.clear()
-            self.mddb.clear()
         self.gc_path = path
 
     def get(self,
             key: str,
             default: Optional[_T] = None
             ) -> Union[_T, Dict[str, Any]]:
-        return deepcopy(self.metadata.get(key, default))
+        # Returns a shallow copy of the stored record.  Top level fields
+        # may be modified by the caller, nested values are shared with
+        # the store and must be copied before modification.
+        record = self.metadata.get(key)
+        if record is None:
+            return default  # type: ignore
+        return dict(record)
+
+    def peek(self, key: str) -> Optional[Dict[str, Any]]:
+        # Returns stored metadata without a copy.  The result must not
+        # be modified.
+        return self.metadata.get(key)
+
+    async def fetch(
+        self, key: str, default: Optional[_T] = None
+    ) -> Union[_T, Dict[str, Any]]:
+        # Like get(), however records not held in memory are read from
+        # the database
+        record = await self.metadata.fetch(key)
+        if record is None:
+            return default  # type: ignore
+        return dict(record)
+
+    async def fetch_batch(self, keys: List[str]) -> Dict[str, Dict[str, Any]]:
+        # Returns stored metadata without a copy, keyed by file name.  Files
+        # without metadata are omitted.
+        return await self.metadata.fetch_batch(keys)
 
     def insert(self, key: str, value: Dict[str, Any]) -> None:
-        val = deepcopy(value)
-        self.metadata[key] = val
-        self.mddb[key] = val
+        self.metadata.insert(key, dict(value))
 
     def is_processing(self) -> bool:
         return len(self.pending_requests) > 0
@@ -2409,37 +3090,43 @@ class MetadataStorage:
         if path_info.get('ufp_path', None) is not None:
             # UFP files always need processing
             return False
-        mdata: Dict[str, Any]
-        mdata = self.metadata.get(fname, {'size': "", 'modified': 0})
-        for field in ['size', 'modified']:
-            if mdata[field] != path_info.get(field, None):
-                return False
-        return True
+        stats = self.metadata.get_file_stats(fname)
+        if stats is None:
+            return False
+        size, modified = stats
+        return (
+            size == path_info.get("size", None) and
+            modified == path_info.get("modified", None)
+        )
 
     def remove_directory_metadata(self, dir_name: str) -> Optional[Awaitable]:
         if dir_name[-1] != "/":
             dir_name += "/"
-        del_items: Dict[str, Any] = {}
-        for fname in list(self.metadata.keys()):
-            if fname.startswith(dir_name):
-                md = self.metadata.pop(fname, None)
-                if md:
-                    del_items[fname] = md
-        if del_items:
-            # Remove items from persistent storage
-            self.mddb.delete_batch(list(del_items.keys()))
-            eventloop = self.server.get_event_loop()
-            # Remove thumbs in a nother thread
-            return eventloop.run_in_thread(self._remove_thumbs, del_items)
+        del_keys = [
+            fname for fname in self.metadata.keys() if fname.startswith(dir_name)
+        ]
+        if del_keys:
+            return self._remove_metadata(del_keys)
         return None
 
     def remove_file_metadata(self, fname: str) -> Optional[Awaitable]:
-        md: Optional[Dict[str, Any]] = self.metadata.pop(fname, None)
-        if md is None:
+        if fname not in self.metadata:
             return None
-        self.mddb.pop(fname, None)
-        eventloop = self.server.get_event_loop()
-        return eventloop.run_in_thread(self._remove_thumbs, {fname: md})
+        return self._remove_metadata([fname])
+
+    def _remove_metadata(self, keys: List[str]) -> Awaitable:
+        # Remove items from persistent storage, then remove thumbs
+        # in another thread
+        fut = self.metadata.remove_batch(keys)
+
+        async def _remove() -> None:
+            records: Dict[str, Dict[str, Any]] = await fut
+            if records:
+                eventloop = self.server.get_event_loop()
+                await eventloop.run_in_thread(
+                    self._remove_thumbs, records, pool="file_ops"
+                )
+        return self.server.get_event_loop().create_task(_remove())
 
     def _remove_thumbs(self, records: Dict[str, Dict[str, Any]]) -> None:
         for fname, metadata in records.items():
@@ -2462,39 +3149,35 @@ class MetadataStorage:
     def move_directory_metadata(self, prev_dir: str, new_dir: str) -> None:
         if prev_dir[-1] != "/":
             prev_dir += "/"
-        moved: List[Tuple[str, str, Dict[str, Any]]] = []
-        for prev_fname in list(self.metadata.keys()):
-            if prev_fname.startswith(prev_dir):
-                new_fname = os.path.join(new_dir, prev_fname[len(prev_dir):])
-                md: Optional[Dict[str, Any]]
-                md = self.metadata.pop(prev_fname, None)
-                if md is None:
-                    continue
-                self.metadata[new_fname] = md
-                moved.append((prev_fname, new_fname, md))
-        if moved:
-            source = [m[0] for m in moved]
-            dest = [m[1] for m in moved]
-            self.mddb.move_batch(source, dest)
-            # It shouldn't be necessary to move the thumbnails
-            # as they would be moved with the parent directory
+        moved: List[Tuple[str, str]] = [
+            (prev_fname, os.path.join(new_dir, prev_fname[len(prev_dir):]))
+            for prev_fname in self.metadata.keys()
+            if prev_fname.startswith(prev_dir)
+        ]
+        # It shouldn't be necessary to move the thumbnails
+        # as they would be moved with the parent directory
+        self.metadata.move_batch(moved)
 
     def move_file_metadata(
         self, prev_fname: str, new_fname: str
     ) -> Union[bool, Awaitable]:
-        metadata: Optional[Dict[str, Any]]
-        metadata = self.metadata.pop(prev_fname, None)
-        if metadata is None:
+        if prev_fname not in self.metadata:
             # If this move overwrites an existing file it is necessary
             # to rescan which requires that we remove any existing
             # metadata.
-            if self.metadata.pop(new_fname, None) is not None:
-                self.mddb.pop(new_fname, None)
+            if new_fname in self.metadata:
+                self.metadata.remove_batch([new_fname])
             return False
 
-        self.metadata[new_fname] = metadata
-        self.mddb.move_batch([prev_fname], [new_fname])
-        return self._move_thumbnails([(prev_fname, new_fname, metadata)])
+        self.metadata.move_batch([(prev_fname, new_fname)])
+        return self._move_file_thumbnails(prev_fname, new_fname)
+
+    async def _move_file_thumbnails(self, prev_fname: str, new_fname: str) -> None:
+        # The record is read after the move has been queued, reads of
+        # the namespace are ordered after pending writes
+        metadata = await self.metadata.fetch(new_fname)
+        if metadata is not None:
+            await self._move_thumbnails([(prev_fname, new_fname, metadata)])
 
     async def _move_thumbnails(
         self, records: List[Tuple[str, str, Dict[str, Any]]]
@@ -2520,7 +3203,7 @@ class MetadataStorage:
                             # Wait for inotify to register the node before the move
                             await asyncio.sleep(.2)
                         await eventloop.run_in_thread(
-                            shutil.move, thumb_path, new_path
+                            shutil.move, thumb_path, new_path, pool="file_ops"
                         )
                     except asyncio.CancelledError:
                         raise
@@ -2544,55 +3227,121 @@ class MetadataStorage:
             # request already pending or not necessary
             mevt.set()
             return mevt
+        if not self.pending_requests:
+            self.progress = {"total": 0, "processed": 0, "failed": 0}
         self.pending_requests[fname] = (path_info, mevt)
-        if self.busy:
-            return mevt
-        self.busy = True
-        event_loop = self.server.get_event_loop()
-        event_loop.register_callback(self._process_metadata_update)
+        self.request_queue.append(fname)
+        self.progress["total"] += 1
+        self._start_workers()
         return mevt
 
-    async def _process_metadata_update(self) -> None:
-        while self.pending_requests:
-            fname, (path_info, mevt) = \
-                list(self.pending_requests.items())[0]
-            if self._has_valid_data(fname, path_info):
-                mevt.set()
-                continue
-            ufp_path: Optional[str] = path_info.get('ufp_path', None)
-            retries = 3
-            while retries:
+    def get_progress(self) -> Dict[str, Any]:
+        return {
+            "pending_count": len(self.request_queue),
+            "active_count": len(self.pending_requests) - len(self.request_queue),
+            "processed_count": self.progress["processed"],
+            "failed_count": self.progress["failed"],
+            "total_count": self.progress["total"],
+            "worker_count": len(self.workers),
+            "running_workers": sum([w.is_running() for w in self.workers])
+        }
+
+    def _start_workers(self) -> None:
+        if self.idle_handle is not None:
+            self.idle_handle.cancel()
+            self.idle_handle = None
+        event_loop = self.server.get_event_loop()
+        while self.idle_workers and self.request_queue:
+            worker = self.idle_workers.pop()
+            fname = self.request_queue.popleft()
+            event_loop.register_callback(self._run_worker, worker, fname)
+
+    async def _run_worker(self, worker: MetadataWorker, fname: str) -> None:
+        next_fname: Optional[str] = fname
+        try:
+            while next_fname is not None:
                 try:
-                    await self._run_extract_metadata(fname, ufp_path)
-                except Exception:
-                    logging.exception("Error running extract_metadata.py")
-                    retries -= 1
-                else:
-                    await self.server.send_event(
-                        "file_manager:metadata_processed", fname
-                    )
-                    break
+                    await self._process_metadata_update(worker, next_fname)
+                finally:
+                    self.progress["processed"] += 1
+                    req = self.pending_requests.pop(next_fname, None)
+                    if req is not None:
+                        req[1].set()
+                    self._log_progress()
+                next_fname = (
+                    self.request_queue.popleft() if self.request_queue else None
+                )
+        finally:
+            # The worker is returned to the pool even if processing raised,
+            # files remaining in the queue are dispatched again
+            self.idle_workers.append(worker)
+            if self.request_queue:
+                self._start_workers()
+            elif not self.pending_requests and self.idle_handle is None:
+                # Release worker processes once the queue has been idle
+                event_loop = self.server.get_event_loop()
+                self.idle_handle = event_loop.delay_callback(
+                    METADATA_WORKER_IDLE_TIME, self._stop_idle_workers
+                )
+
+    def _log_progress(self) -> None:
+        total = self.progress["total"]
+        processed = self.progress["processed"]
+        if total < 2:
+            return
+        if processed == total or not processed % METADATA_PROGRESS_INTERVAL:
+            logging.info(
+                f"Metadata extraction progress: {processed}/{total} files "
+                f"processed, {self.progress['failed']} failed"
+            )
+
+    async def _stop_idle_workers(self) -> None:
+        self.idle_handle = None
+        if self.pending_requests:
+            return
+        for worker in self.idle_workers:
+            await worker.stop()
+
+    async def _process_metadata_update(
+        self, worker: MetadataWorker, fname: str
+    ) -> None:
+        if fname not in self.pending_requests:
+            return
+        path_info = self.pending_requests[fname][0]
+        if self._has_valid_data(fname, path_info):
+            return
+        ufp_path: Optional[str] = path_info.get('ufp_path', None)
+        retries = 3
+        while retries:
+            try:
+                await self._run_extract_metadata(worker, fname, ufp_path)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logging.exception("Error running extract_metadata.py")
+                retries -= 1
             else:
-                if ufp_path is None:
-                    self.metadata[fname] = {
-                        'size': path_info.get('size', 0),
-                        'modified': path_info.get('modified', 0),
-                        'print_start_time': None,
-                        'job_id': None
-                    }
-                    self.mddb[fname] = self.metadata[fname]
-                logging.info(
-                    f"Unable to extract metadata from file: {fname}")
-            self.pending_requests.pop(fname, None)
-            mevt.set()
-        self.busy = False
+                await self.server.send_event(
+                    "file_manager:metadata_processed", fname
+                )
+                break
+        else:
+            self.progress["failed"] += 1
+            if ufp_path is None:
+                self.metadata.insert(fname, {
+                    'size': path_info.get('size', 0),
+                    'modified': path_info.get('modified', 0),
+                    'print_start_time': None,
+                    'job_id': None
+                })
+            logging.info(
+                f"Unable to extract metadata from file: {fname}")
 
     async def _run_extract_metadata(self,
+                                    worker: MetadataWorker,
                                     filename: str,
                                     ufp_path: Optional[str]
                                     ) -> None:
-        # Escape single quotes in the file name so that it may be
-        # properly loaded
         config: Dict[str, Any] = {
             "filename": filename,
             "gcode_dir": self.gc_path,
@@ -2608,42 +3357,130 @@ class MetadataStorage:
                 [proc.get("timeout", 0) for proc in self.processors.values()]
             )
             timeout = max(timeout, proc_timeout)
-        eventloop = self.server.get_event_loop()
-        md_cfg = await eventloop.run_in_thread(self._create_metadata_cfg, config)
-        cmd = " ".join([sys.executable, METADATA_SCRIPT, "-c", shlex.quote(md_cfg)])
-        result = bytearray()
-        try:
-            sc: SCMDComp = self.server.lookup_component('shell_command')
-            scmd = sc.build_shell_command(
-                cmd, callback=result.extend, log_stderr=True
+        decoded_resp = await worker.run(config, timeout)
+        if "error" in decoded_resp:
+            raise self.server.error(
+                f"Extract Metadata returned with error: {decoded_resp['error']}"
             )
-            if not await scmd.run(timeout=timeout):
-                raise self.server.error("Extract Metadata returned with error")
-        finally:
-            def _rm_md_config():
-                with contextlib.suppress(OSError):
-                    os.remove(md_cfg)
-            await eventloop.run_in_thread(_rm_md_config)
-        try:
-            decoded_resp: Dict[str, Any] = jsonw.loads(result.strip())
-        except Exception:
-            logging.debug(f"Invalid metadata response:\n{result}")
-            raise
         path: str = decoded_resp['file']
         metadata: Dict[str, Any] = decoded_resp['metadata']
         if not metadata:
             # This indicates an error, do not add metadata for this
             raise self.server.error("Unable to extract metadata")
         metadata.update({'print_start_time': None, 'job_id': None})
-        self.metadata[path] = metadata
-        self.mddb[path] = metadata
-
-    def _create_metadata_cfg(self, config: Dict[str, Any]) -> str:
-        with tempfile.NamedTemporaryFile(
-            prefix="metacfg-", suffix=".json", delete=False
-        ) as f:
-            f.write(jsonw.dumps(config))
-            return f.name
+        self.metadata.insert(path, metadata)
+
+    def close(self) -> None:
+        if self.idle_handle is not None:
+            self.idle_handle.cancel()
+            self.idle_handle = None
+        for worker in self.workers:
+            worker.kill()
+
+# A persistent metadata.py process.  Requests are written to the worker's
+# stdin and responses read from its stdout, one json object per line.  The
+# worker is restarted on demand if it exits or a request times out, isolating
+# Moonraker from crashes in the parser and file processors.
+class MetadataWorker:
+    def __init__(self, server: Server, index: int) -> None:
+        self.server = server
+        self.index = index
+        self.proc: Optional[asyncio.subprocess.Process] = None
+        self.stderr_task: Optional[asyncio.Task] = None
+
+    def is_running(self) -> bool:
+        return self.proc is not None and self.proc.returncode is None
+
+    async def _start(self) -> asyncio.subprocess.Process:
+        proc = await asyncio.create_subprocess_exec(
+            sys.executable, METADATA_SCRIPT, "--worker",
+            stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE, limit=METADATA_WORKER_LIMIT
+        )
+        logging.debug(f"Metadata worker {self.index} started, pid: {proc.pid}")
+        self.proc = proc
+        event_loop = self.server.get_event_loop()
+        self.stderr_task = event_loop.create_task(self._log_stderr(proc))
+        return proc
+
+    async def _log_stderr(self, proc: asyncio.subprocess.Process) -> None:
+        assert proc.stderr is not None
+        while True:
+            try:
+                line = await proc.stderr.readline()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                break
+            if not line:
+                break
+            logging.info(line.decode(errors="ignore").rstrip())
+
+    async def run(self, config: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+        proc = self.proc
+        if proc is None or proc.returncode is not None:
+            proc = await self._start()
+        assert proc.stdin is not None and proc.stdout is not None
+        try:
+            proc.stdin.write(jsonw.dumps(config) + b"\n")
+            await proc.stdin.drain()
+            resp = await asyncio.wait_for(proc.stdout.readline(), timeout)
+        except asyncio.TimeoutError:
+            self.kill()
+            raise self.server.error(
+                f"Metadata worker {self.index} timed out after {timeout}s"
+            ) from None
+        except asyncio.CancelledError:
+            self.kill()
+            raise
+        except Exception:
+            self.kill()
+            raise
+        if not resp:
+            self.kill()
+            raise self.server.error(
+                f"Metadata worker {self.index} exited unexpectedly"
+            )
+        try:
+            return jsonw.loads(resp)
+        except Exception:
+            logging.debug(f"Invalid metadata response:\n{resp!r}")
+            raise
+
+    def _cancel_stderr_task(self) -> None:
+        if self.stderr_task is not None:
+            self.stderr_task.cancel()
+            self.stderr_task = None
+
+    def kill(self) -> None:
+        proc = self.proc
+        self.proc = None
+        if proc is not None and proc.returncode is None:
+            with contextlib.suppress(ProcessLookupError):
+                proc.kill()
+        self._cancel_stderr_task()
+
+    async def stop(self) -> None:
+        proc = self.proc
+        if proc is None or proc.returncode is not None:
+            self.proc = None
+            self._cancel_stderr_task()
+            return
+        self.proc = None
+        assert proc.stdin is not None
+        proc.stdin.close()
+        try:
+            await asyncio.wait_for(proc.wait(), 5.)
+        except asyncio.TimeoutError:
+            with contextlib.suppress(ProcessLookupError):
+                proc.kill()
+        stderr_task = self.stderr_task
+        self.stderr_task = None
+        if stderr_task is not None:
+            # Log any remaining output, the pipe closes when the process exits
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(stderr_task, 1.)
+        logging.debug(f"Metadata worker {self.index} stopped")
 
 def load_component(config: ConfigHelper) -> FileManager:
     return FileManager(config)
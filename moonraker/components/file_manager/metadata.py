@@ -10,8 +10,11 @@ import json
 import argparse
 import re
 import os
+import mmap
 import sys
 import io
+import stat
+import time
 import base64
 import traceback
 import tempfile
@@ -32,21 +35,32 @@ from typing import (
     List,
     Tuple,
     Type,
+    Callable,
 )
 if TYPE_CHECKING:
     pass
 
 READ_SIZE = 1024 * 1024  # 1 MiB
+COPY_BUFFER_SIZE = 1024 * 1024
 UFP_MODEL_PATH = "/3D/model.gcode"
 UFP_THUMB_PATH = "/Metadata/thumbnail.png"
 SUPPORTED_THUMB_FORMATS = ("png", "jpg", "qoi")
 FMT_CONV_MAP = {
     "qoi": "png"
 }
+# Slicer config lines in the form of "; key = value"
+CONFIG_LINE_RE = re.compile(r"\n; ([^\n=]+?) = (.*)")
+CONFIG_FIRST_LINE_RE = re.compile(r"; ([^\n=]+?) = (.*)")
+GCODE_START_RE = re.compile(r"\n[MG]\d+\s.*\n")
+FLOAT_RE = re.compile(r"[0-9]*\.?[0-9]+")
+INT_RE = re.compile(r"[0-9]+")
 
 logging.basicConfig(stream=sys.stderr, level=logging.INFO)
 logger = logging.getLogger("metadata")
 
+class MetadataError(Exception):
+    pass
+
 # Regex helpers.  These methods take patterns with placeholders
 # to insert the correct regex capture group for floats, ints,
 # and strings:
@@ -75,21 +89,24 @@ def regex_find_ints(pattern: str, data: str) -> List[int]:
             pass
     return []
 
+def split_string_values(value: str, separators: str) -> List[str]:
+    separators = re.escape(separators)
+    pattern = rf'\s*(")(?:\\"|[^"])*"\s*|[^{separators}]+'
+    parsed_matches: List[str] = []
+    for m in re.finditer(pattern, value):
+        (val, sep) = m.group(0, 1)
+        val = val.strip()
+        if sep:
+            val = val[1:-1].replace(rf'\{sep}', sep).strip()
+        if val:
+            parsed_matches.append(val)
+    return parsed_matches
+
 def regex_find_strings(pattern: str, separators: str, data: str) -> List[str]:
     pattern = pattern.replace(r"(%S)", r"(.*)")
     match = re.search(pattern, data)
     if match and match.group(1):
-        separators = re.escape(separators)
-        pattern = rf'\s*(")(?:\\"|[^"])*"\s*|[^{separators}]+'
-        parsed_matches: List[str] = []
-        for m in re.finditer(pattern, match.group(1)):
-            (val, sep) = m.group(0, 1)
-            val = val.strip()
-            if sep:
-                val = val[1:-1].replace(rf'\{sep}', sep).strip()
-            if val:
-                parsed_matches.append(val)
-        return parsed_matches
+        return split_string_values(match.group(1), separators)
     return []
 
 def regex_find_float(pattern: str, data: str) -> Optional[float]:
@@ -129,6 +146,21 @@ def regex_find_max_float(pattern: str, data: str) -> Optional[float]:
     result = regex_find_floats(pattern, data)
     return max(result) if result else None
 
+def build_config_index(data: str) -> Dict[str, str]:
+    """
+    Builds a key -> value index of "; key = value" comment lines in a
+    single pass.  The first occurrence of a key takes precedence, matching
+    the behavior of a forward regex search.
+    """
+    index: Dict[str, str] = {}
+    first = CONFIG_FIRST_LINE_RE.match(data)
+    if first is not None:
+        index[first.group(1)] = first.group(2)
+    for key, value in CONFIG_LINE_RE.findall(data):
+        if key not in index:
+            index[key] = value
+    return index
+
 # Slicer parsing implementations
 class SlicerType(type):
     '''
@@ -169,10 +201,48 @@ class BaseSlicer(metaclass=SlicerType):
         self.path = file_path
         self.layer_height: Optional[float] = None
         self.has_m486_objects: bool = False
+        self.has_labelled_objects: bool = False
         self._file_data = data
         self.header_data = data[:READ_SIZE]
         self.footer_data = data[-READ_SIZE:]
         self.size: int = file_size
+        self._config_index: Optional[Dict[str, str]] = None
+
+    @property
+    def config_data(self) -> str:
+        return self.footer_data
+
+    @property
+    def config_index(self) -> Dict[str, str]:
+        if self._config_index is None:
+            self._config_index = build_config_index(self.config_data)
+        return self._config_index
+
+    def config_find_float(self, key: str) -> Optional[float]:
+        value = self.config_index.get(key)
+        if value is None:
+            return None
+        match = FLOAT_RE.match(value)
+        return float(match.group()) if match is not None else None
+
+    def config_find_int(self, key: str) -> Optional[int]:
+        value = self.config_index.get(key)
+        if value is None:
+            return None
+        match = INT_RE.match(value)
+        return int(match.group()) if match is not None else None
+
+    def config_find_string(self, key: str) -> Optional[str]:
+        value = self.config_index.get(key)
+        if value is None:
+            return None
+        return value.strip('"')
+
+    def config_find_strings(self, key: str, separators: str) -> List[str]:
+        value = self.config_index.get(key)
+        if not value:
+            return []
+        return split_string_values(value, separators)
 
     def _check_has_objects(self,
                            data: str,
@@ -195,6 +265,13 @@ class BaseSlicer(metaclass=SlicerType):
                     "compatible with official versions of Klipper."
                 )
             return False
+        if re.search(r"\nEXCLUDE_OBJECT_START NAME=", data) is not None:
+            # Objects are labelled but not defined, definitions may be
+            # injected without modifying the body of the file.  This does
+            # not depend on the slicer, so files from slicers without a
+            # preprocessor are also reported as having objects.
+            self.has_labelled_objects = True
+            return True
         # Always check M486
         patterns = [r"\nM486"]
         if pattern is not None:
@@ -209,18 +286,26 @@ class BaseSlicer(metaclass=SlicerType):
     def from_file(cls, file_path: str) -> BaseSlicer:
         header = tail = ""
         with open(file_path, 'rb') as f:
-            size = f.seek(0, os.SEEK_END)
-            f.seek(0)
-            header = f.read(READ_SIZE).decode(errors="ignore")
-            if size > READ_SIZE * 2:
-                f.seek(size - READ_SIZE)
-            if size > READ_SIZE:
-                tail = f.read().decode(errors="ignore")
-        for slicercls in cls.registered_slicers:
-            ident = slicercls.identify(header)
-            if ident is not None:
-                name, ver = ident
-                return slicercls(file_path, size, header + tail, name, ver)
+            size = os.fstat(f.fileno()).st_size
+            if size:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    header = mm[:READ_SIZE].decode(errors="ignore")
+                    if size > READ_SIZE:
+                        tail_start = max(READ_SIZE, size - READ_SIZE)
+                        tail = mm[tail_start:].decode(errors="ignore")
+        # Slicers identify themselves in the leading comment block.  Attempt
+        # identification there first, so that slicers that fail to match
+        # don't each scan the entire header.
+        match = GCODE_START_RE.search(header)
+        ident_blocks = [header]
+        if match is not None:
+            ident_blocks.insert(0, header[:match.start()])
+        for block in ident_blocks:
+            for slicercls in cls.registered_slicers:
+                ident = slicercls.identify(block)
+                if ident is not None:
+                    name, ver = ident
+                    return slicercls(file_path, size, header + tail, name, ver)
         return UnknownSlicer(file_path, size, header + tail)
 
     @classmethod
@@ -469,29 +554,28 @@ class PrusaSlicer(BaseSlicer):
             exclusions.add(sc.regex_id().lower())
         return exclusions
 
-    @property
-    def config_data(self) -> str:
-        return self.footer_data
-
     def has_objects(self) -> bool:
         return self._check_has_objects(
             self.header_data, r"\n; printing object")
 
     def parse_first_layer_height(self) -> Optional[float]:
+        value = self.config_index.get("first_layer_height")
+        if value is None:
+            return None
+        match = FLOAT_RE.match(value)
+        if match is None:
+            return None
         # Check percentage
-        pct = regex_find_float(r"; first_layer_height = (%F)%", self.config_data)
-        if pct is not None:
+        if value[match.end():match.end() + 1] == "%":
             if self.layer_height is None:
                 # Failed to parse the original layer height, so it is not
                 # possible to calculate a percentage
                 return None
-            return round(pct / 100. * self.layer_height, 6)
-        return regex_find_float(r"; first_layer_height = (%F)", self.config_data)
+            return round(float(match.group()) / 100. * self.layer_height, 6)
+        return float(match.group())
 
     def parse_layer_height(self) -> Optional[float]:
-        self.layer_height = regex_find_float(
-            r"; layer_height = (%F)", self.config_data
-        )
+        self.layer_height = self.config_find_float("layer_height")
         return self.layer_height
 
     def parse_object_height(self) -> Optional[float]:
@@ -507,7 +591,7 @@ class PrusaSlicer(BaseSlicer):
         return regex_find_max_float(r"G1\sZ(%F)\sF", self.footer_data)
 
     def parse_filament_total(self) -> Optional[float]:
-        line = regex_find_string(r'filament\sused\s\[mm\]\s=\s(%S)\n', self.config_data)
+        line = self.config_find_string("filament used [mm]")
         if line:
             filament = regex_find_floats(
                 r"(%F)", line
@@ -517,13 +601,10 @@ class PrusaSlicer(BaseSlicer):
         return None
 
     def parse_filament_weight_total(self) -> Optional[float]:
-        return regex_find_float(
-            r"total\sfilament\sused\s\[g\]\s=\s(%F)",
-            self.config_data
-        )
+        return self.config_find_float("total filament used [g]")
 
     def parse_filament_weights(self) -> Optional[List[float]]:
-        line = regex_find_string(r'filament\sused\s\[g\]\s=\s(%S)\n', self.config_data)
+        line = self.config_find_string("filament used [g]")
         if line:
             weights = regex_find_floats(
                 r"(%F)", line
@@ -533,9 +614,7 @@ class PrusaSlicer(BaseSlicer):
         return None
 
     def parse_filament_type(self) -> Optional[str]:
-        result = regex_find_strings(
-            r";\sfilament_type\s=\s(%S)", ",;", self.config_data
-        )
+        result = self.config_find_strings("filament_type", ",;")
         if len(result) > 1:
             return json.dumps(result)
         elif result:
@@ -543,9 +622,7 @@ class PrusaSlicer(BaseSlicer):
         return None
 
     def parse_filament_name(self) -> Optional[str]:
-        result = regex_find_strings(
-            r";\sfilament_settings_id\s=\s(%S)", ",;", self.config_data
-        )
+        result = self.config_find_strings("filament_settings_id", ",;")
         if len(result) > 1:
             return json.dumps(result)
         elif result:
@@ -553,46 +630,39 @@ class PrusaSlicer(BaseSlicer):
         return None
 
     def parse_filament_colors(self) -> Optional[List[str]]:
-        return regex_find_strings(
-            r";\sfilament_colour\s=\s(%S)", ",;", self.config_data
-        )
+        return self.config_find_strings("filament_colour", ",;")
 
     def parse_extruder_colors(self) -> Optional[List[str]]:
-        return regex_find_strings(
-            r";\sextruder_colour\s=\s(%S)", ",;", self.config_data
-        )
+        return self.config_find_strings("extruder_colour", ",;")
 
     def parse_filament_temps(self) -> Optional[List[int]]:
-        temps = regex_find_strings(
-            r";\s(?:nozzle_)?temperature\s=\s(%S)", ",;", self.config_data
-        )
+        temps: List[str] = []
+        for key, value in self.config_index.items():
+            if key in ("temperature", "nozzle_temperature"):
+                temps = split_string_values(value, ",;")
+                break
         try:
             return [int(t) for t in temps]
         except ValueError:
             return None
 
     def parse_referenced_tools(self) -> Optional[List[int]]:
-        tools = regex_find_strings(
-            r";\sreferenced_tools\s=\s(%S)", ",;", self.config_data
-        )
+        tools = self.config_find_strings("referenced_tools", ",;")
         try:
             return [int(t) for t in tools]
         except ValueError:
             return None
 
     def parse_mmu_print(self) -> Optional[int]:
-        return regex_find_int(
-            r";\ssingle_extruder_multi_material\s=\s(%D)", self.config_data
-        )
+        return self.config_find_int("single_extruder_multi_material")
 
     def parse_estimated_time(self) -> Optional[float]:
-        time_match = re.search(
-            r';\sestimated\sprinting\stime.*', self.config_data
-        )
-        if not time_match:
+        for key, time_group in self.config_index.items():
+            if key.startswith("estimated printing time"):
+                break
+        else:
             return None
         total_time = 0
-        time_group = time_match.group()
         time_patterns = [(r"(\d+)d", 24*60*60), (r"(\d+)h", 60*60),
                          (r"(\d+)m", 60), (r"(\d+)s", 1)]
         try:
@@ -605,45 +675,37 @@ class PrusaSlicer(BaseSlicer):
         return round(total_time, 2)
 
     def parse_first_layer_extr_temp(self) -> Optional[float]:
-        return regex_find_float(
-            r"; first_layer_temperature = (%F)", self.config_data
-        )
+        return self.config_find_float("first_layer_temperature")
 
     def parse_first_layer_bed_temp(self) -> Optional[float]:
-        return regex_find_float(
-            r"; first_layer_bed_temperature = (%F)", self.config_data
-        )
+        return self.config_find_float("first_layer_bed_temperature")
 
     def parse_chamber_temp(self) -> Optional[float]:
-        return regex_find_float(
-            r"; chamber_temperature = (%F)", self.config_data
-        )
+        return self.config_find_float("chamber_temperature")
 
     def parse_nozzle_diameter(self) -> Optional[float]:
-        return regex_find_float(
-            r";\snozzle_diameter\s=\s(%F)", self.config_data
-        )
+        return self.config_find_float("nozzle_diameter")
 
     def parse_layer_count(self) -> Optional[int]:
-        return regex_find_int(r"; total layers count = (%D)", self.config_data)
+        return self.config_find_int("total layers count")
 
     def parse_filament_change_count(self) -> Optional[int]:
-        res = regex_find_int(r"; total toolchanges = (%D)", self.config_data)
+        res = self.config_find_int("total toolchanges")
         if res is not None:
             return res
-        return regex_find_int(r"; total filament change = (%D)", self.config_data)
+        return self.config_find_int("total filament change")
 
     def parse_printer_vendor(self) -> Optional[str]:
-        return regex_find_string(r'; printer_vendor = (%S)', self.footer_data)
+        return self.config_find_string("printer_vendor")
 
     def parse_printer_model(self) -> Optional[str]:
-        return regex_find_string(r'; printer_model = (%S)', self.footer_data)
+        return self.config_find_string("printer_model")
 
     def parse_printer_variant(self) -> Optional[str]:
-        return regex_find_string(r'; printer_variant = (%S)', self.footer_data)
+        return self.config_find_string("printer_variant")
 
     def parse_profile_version(self) -> Optional[str]:
-        return regex_find_string(r'; profile_version = (%S)', self.footer_data)
+        return self.config_find_string("profile_version")
 
 class Slic3rPE(PrusaSlicer):
     @classmethod
@@ -672,15 +734,13 @@ class Slic3r(PrusaSlicer):
         return None
 
     def parse_filament_total(self) -> Optional[float]:
-        filament = regex_find_float(
-            r";\sfilament\_length\_m\s=\s(%F)", self.footer_data
-        )
+        filament = self.config_find_float("filament_length_m")
         if filament is not None:
             filament *= 1000
         return filament
 
     def parse_filament_weight_total(self) -> Optional[float]:
-        return regex_find_float(r";\sfilament\smass\_g\s=\s(%F)", self.footer_data)
+        return self.config_find_float("filament mass_g")
 
     def parse_estimated_time(self) -> Optional[float]:
         return None
@@ -701,9 +761,7 @@ class BambuStudio(PrusaSlicer):
         return self.header_data
 
     def parse_first_layer_height(self) -> Optional[float]:
-        return regex_find_float(
-            r"; initial_layer_print_height = (%F)", self.config_data
-        )
+        return self.config_find_float("initial_layer_print_height")
 
     def parse_object_height(self) -> float | None:
         return regex_find_float(r"; max_z_height: (%F)", self.config_data)
@@ -722,19 +780,13 @@ class BambuStudio(PrusaSlicer):
         return None
 
     def parse_first_layer_extr_temp(self) -> Optional[float]:
-        return regex_find_float(
-            r"; nozzle_temperature_initial_layer = (%F)", self.config_data
-        )
+        return self.config_find_float("nozzle_temperature_initial_layer")
 
     def parse_first_layer_bed_temp(self) -> Optional[float]:
-        return regex_find_float(
-            r"; hot_plate_temp_initial_layer = (%F)", self.config_data
-        )
+        return self.config_find_float("hot_plate_temp_initial_layer")
 
     def parse_chamber_temp(self) -> Optional[float]:
-        return regex_find_float(
-            r"; chamber_temperatures = (%F)", self.config_data
-        )
+        return self.config_find_float("chamber_temperatures")
 
     def parse_layer_count(self) -> Optional[int]:
         return regex_find_int(r"; total layer number: (%D)", self.config_data)
@@ -1212,51 +1264,170 @@ PPC_REGEX = (
     r"by preprocess_cancellation (?P<version>v?\d+(?:\.\d+)*)"
 )
 
+def replace_file(file_path: str, write_func: Callable[[int], None]) -> int:
+    """
+    Replaces the contents of a file with data written by the supplied
+    callback.  Data is written to a temporary file in the same folder,
+    so the replacement is an atomic rename that never crosses filesystems.
+    Returns the size of the new file.
+    """
+    file_dir, fname = os.path.split(file_path)
+    fd, tmp_path = tempfile.mkstemp(
+        prefix=f".{fname}.", suffix=".tmp", dir=file_dir
+    )
+    try:
+        os.fchmod(fd, stat.S_IMODE(os.stat(file_path).st_mode))
+        write_func(fd)
+        os.fsync(fd)
+        # Rename before closing so the inotify close event is reported
+        # against the destination rather than the temporary file
+        os.replace(tmp_path, file_path)
+        return os.fstat(fd).st_size
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    finally:
+        os.close(fd)
+
+def splice_file(src_fd: int, dest_fd: int, offset: int, count: int) -> None:
+    # Copy a region of a file in kernel space when possible
+    if hasattr(os, "copy_file_range"):
+        try:
+            while count > 0:
+                copied = os.copy_file_range(src_fd, dest_fd, count, offset)
+                if not copied:
+                    break
+                offset += copied
+                count -= copied
+        except OSError:
+            pass
+    while count > 0:
+        data = os.pread(src_fd, min(count, COPY_BUFFER_SIZE), offset)
+        if not data:
+            break
+        os.write(dest_fd, data)
+        offset += len(data)
+        count -= len(data)
+
+def scan_labelled_objects(
+    file_path: str, ppc: Any
+) -> Tuple[int, Dict[str, Any]]:
+    # Locates the end of the header and generates hulls for objects
+    # labelled with EXCLUDE_OBJECT_START/END
+    known_objects: Dict[str, Any] = {}
+    current_hull: Any = None
+    header_end = -1
+    offset = 0
+    with open(file_path, "rb", buffering=COPY_BUFFER_SIZE) as f:
+        for line in f:
+            if header_end < 0 and line.strip() and not line.startswith(b";"):
+                header_end = offset
+            offset += len(line)
+            if line.startswith(b"EXCLUDE_OBJECT_START"):
+                match = re.search(rb"NAME=(\S+)", line)
+                if match is None:
+                    continue
+                name = match.group(1).decode(errors="ignore")
+                if name not in known_objects:
+                    known_objects[name] = ppc.HullTracker.create()
+                current_hull = known_objects[name]
+            elif line.startswith(b"EXCLUDE_OBJECT_END"):
+                current_hull = None
+            elif current_hull is not None and line.lstrip()[:1] in (b"G", b"g"):
+                _, params = ppc.parse_gcode(line.decode(errors="ignore"))
+                if (
+                    float(params.get("E", -1)) > 0 and
+                    "X" in params and "Y" in params
+                ):
+                    point = ppc.Point(float(params["X"]), float(params["Y"]))
+                    current_hull.add_point(point)
+    return header_end, known_objects
+
+def inject_object_definitions(file_path: str, ppc: Any) -> Optional[int]:
+    header_end, known_objects = scan_labelled_objects(file_path, ppc)
+    if header_end < 0 or not known_objects:
+        return None
+    definitions: List[str] = list(ppc.header(len(known_objects)))
+    for name, hull in known_objects.items():
+        definitions.extend(
+            ppc.define_object(name, center=hull.center(), polygon=hull.exterior())
+        )
+    file_size = os.path.getsize(file_path)
+
+    # The definitions can't be inserted in place, the body follows them in
+    # a new copy of the file.  The body is copied without being parsed.
+    def _write_file(dest_fd: int) -> None:
+        with open(file_path, "rb") as f:
+            src_fd = f.fileno()
+            splice_file(src_fd, dest_fd, 0, header_end)
+            os.write(dest_fd, "".join(definitions).encode())
+            splice_file(src_fd, dest_fd, header_end, file_size - header_end)
+    return replace_file(file_path, _write_file)
+
+def stream_objects(file_path: str, processor: Callable) -> int:
+    def _write_file(dest_fd: int) -> None:
+        with open(file_path, "r", buffering=COPY_BUFFER_SIZE) as in_file:
+            with open(
+                dest_fd, "w", buffering=COPY_BUFFER_SIZE, closefd=False
+            ) as out_file:
+                out_file.writelines(processor(in_file))
+    return replace_file(file_path, _write_file)
+
 def process_objects(file_path: str, slicer: BaseSlicer) -> bool:
     name = slicer.slicer_name
     if not slicer.has_objects():
         return False
     try:
-        from preprocess_cancellation import (
-            preprocess_slicer,
-            preprocess_cura,
-            preprocess_ideamaker,
-            preprocess_m486
-        )
+        import preprocess_cancellation as ppc
     except ImportError:
         logger.info("Module 'preprocess-cancellation' failed to load")
         return False
+    if os.path.islink(file_path):
+        file_path = os.path.realpath(file_path)
     fname = os.path.basename(file_path)
+    in_size = os.path.getsize(file_path)
+    start_time = time.monotonic()
+    try:
+        if slicer.has_labelled_objects:
+            logger.info(
+                f"Injecting Object Definitions into file: {fname}, sliced "
+                f"by {name}"
+            )
+            out_size = inject_object_definitions(file_path, ppc)
+            if out_size is None:
+                logger.info(f"No labelled objects found in file: {fname}")
+                return False
+        else:
+            if slicer.has_m486_objects:
+                processor = ppc.preprocess_m486
+            elif isinstance(slicer, PrusaSlicer):
+                processor = ppc.preprocess_slicer
+            elif isinstance(slicer, Cura):
+                processor = ppc.preprocess_cura
+            elif isinstance(slicer, IdeaMaker):
+                processor = ppc.preprocess_ideamaker
+            else:
+                logger.info(
+                    f"Object Processing Failed, slicer {name} "
+                    "not supported"
+                )
+                return False
+            logger.info(
+                f"Performing Object Processing on file: {fname}, sliced by "
+                f"{name}"
+            )
+            out_size = stream_objects(file_path, processor)
+    except Exception as e:
+        logger.info(f"Object processing failed: {e}")
+        return False
+    elapsed = max(time.monotonic() - start_time, .001)
+    mib = 1024. * 1024.
     logger.info(
-        f"Performing Object Processing on file: {fname}, sliced by {name}"
+        f"Object processing complete: read {in_size / mib:.2f} MiB, wrote "
+        f"{out_size / mib:.2f} MiB in {elapsed:.2f}s "
+        f"({in_size / mib / elapsed:.2f} MiB/s)"
     )
-    with tempfile.TemporaryDirectory() as tmp_dir_name:
-        tmp_file = os.path.join(tmp_dir_name, fname)
-        with open(file_path, 'r') as in_file:
-            with open(tmp_file, 'w') as out_file:
-                try:
-                    if slicer.has_m486_objects:
-                        processor = preprocess_m486
-                    elif isinstance(slicer, PrusaSlicer):
-                        processor = preprocess_slicer
-                    elif isinstance(slicer, Cura):
-                        processor = preprocess_cura
-                    elif isinstance(slicer, IdeaMaker):
-                        processor = preprocess_ideamaker
-                    else:
-                        logger.info(
-                            f"Object Processing Failed, slicer {name}"
-                            "not supported"
-                        )
-                        return False
-                    for line in processor(in_file):
-                        out_file.write(line)
-                except Exception as e:
-                    logger.info(f"Object processing failed: {e}")
-                    return False
-        if os.path.islink(file_path):
-            file_path = os.path.realpath(file_path)
-        shutil.move(tmp_file, file_path)
     return True
 
 def run_gcode_processors(
@@ -1347,41 +1518,36 @@ def extract_metadata(
 
 def extract_ufp(ufp_path: str, dest_path: str) -> None:
     if not os.path.isfile(ufp_path):
-        logger.info(f"UFP file Not Found: {ufp_path}")
-        sys.exit(-1)
+        raise MetadataError(f"UFP file Not Found: {ufp_path}")
     thumb_name = os.path.splitext(
         os.path.basename(dest_path))[0] + ".png"
     dest_thumb_dir = os.path.join(os.path.dirname(dest_path), ".thumbs")
     dest_thumb_path = os.path.join(dest_thumb_dir, thumb_name)
-    try:
-        with tempfile.TemporaryDirectory() as tmp_dir_name:
-            tmp_thumb_path = ""
-            with zipfile.ZipFile(ufp_path) as zf:
-                tmp_model_path = zf.extract(
-                    UFP_MODEL_PATH, path=tmp_dir_name)
-                if UFP_THUMB_PATH in zf.namelist():
-                    tmp_thumb_path = zf.extract(
-                        UFP_THUMB_PATH, path=tmp_dir_name)
-            if os.path.islink(dest_path):
-                dest_path = os.path.realpath(dest_path)
-            shutil.move(tmp_model_path, dest_path)
-            if tmp_thumb_path:
-                if not os.path.exists(dest_thumb_dir):
-                    os.mkdir(dest_thumb_dir)
-                shutil.move(tmp_thumb_path, dest_thumb_path)
-    except Exception:
-        logger.info(traceback.format_exc())
-        sys.exit(-1)
+    with tempfile.TemporaryDirectory() as tmp_dir_name:
+        tmp_thumb_path = ""
+        with zipfile.ZipFile(ufp_path) as zf:
+            tmp_model_path = zf.extract(
+                UFP_MODEL_PATH, path=tmp_dir_name)
+            if UFP_THUMB_PATH in zf.namelist():
+                tmp_thumb_path = zf.extract(
+                    UFP_THUMB_PATH, path=tmp_dir_name)
+        if os.path.islink(dest_path):
+            dest_path = os.path.realpath(dest_path)
+        shutil.move(tmp_model_path, dest_path)
+        if tmp_thumb_path:
+            # Multiple workers may extract into the same folder
+            os.makedirs(dest_thumb_dir, exist_ok=True)
+            shutil.move(tmp_thumb_path, dest_thumb_path)
     try:
         os.remove(ufp_path)
     except Exception:
         logger.info(f"Error removing ufp file: {ufp_path}")
 
-def main(config: Dict[str, Any]) -> None:
+def process_file(config: Dict[str, Any]) -> Dict[str, Any]:
     gc_path: str = config["gcode_dir"]
     filename: str = config["filename"]
     file_path = os.path.join(gc_path, filename)
-    processors: List[Dict[str, Any]] = config.get("processors", [])
+    processors: List[Dict[str, Any]] = list(config.get("processors", []))
     processors.append(
         {
             "name": "preprocess_cancellation",
@@ -1396,18 +1562,12 @@ def main(config: Dict[str, Any]) -> None:
     ufp = config.get("ufp_path")
     if ufp is not None:
         extract_ufp(ufp, file_path)
-    metadata: Dict[str, Any] = {}
     if not os.path.isfile(file_path):
-        logger.info(f"File Not Found: {file_path}")
-        sys.exit(-1)
-    try:
-        metadata = extract_metadata(file_path, processors)
-    except Exception:
-        logger.info(traceback.format_exc())
-        sys.exit(-1)
-    fd = sys.stdout.fileno()
-    data = json.dumps(
-        {'file': filename, 'metadata': metadata}).encode()
+        raise MetadataError(f"File Not Found: {file_path}")
+    metadata = extract_metadata(file_path, processors)
+    return {'file': filename, 'metadata': metadata}
+
+def write_output(fd: int, data: bytes) -> None:
     while data:
         try:
             ret = os.write(fd, data)
@@ -1415,6 +1575,48 @@ def main(config: Dict[str, Any]) -> None:
             continue
         data = data[ret:]
 
+def main(config: Dict[str, Any]) -> None:
+    try:
+        result = process_file(config)
+    except MetadataError as e:
+        logger.info(str(e))
+        sys.exit(-1)
+    except Exception:
+        logger.info(traceback.format_exc())
+        sys.exit(-1)
+    write_output(sys.stdout.fileno(), json.dumps(result).encode())
+
+def run_worker() -> None:
+    # Persistent worker mode.  Each line received on stdin contains a json
+    # encoded configuration, the result is written to stdout as a single
+    # line.  The original stdout is moved to a private descriptor and stdout
+    # redirected to stderr so output from libraries and processors can't
+    # corrupt a response.
+    out_fd = os.dup(sys.stdout.fileno())
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    for line in sys.stdin.buffer:
+        line = line.strip()
+        if not line:
+            continue
+        filename: Optional[str] = None
+        try:
+            config: Dict[str, Any] = json.loads(line)
+            filename = config.get("filename")
+            if filename is None:
+                raise MetadataError(
+                    "The 'filename' field must be present in the configuration"
+                )
+            if config.get("gcode_dir") is None:
+                config["gcode_dir"] = os.path.abspath(os.path.dirname(__file__))
+            result = process_file(config)
+        except MetadataError as e:
+            logger.info(str(e))
+            result = {"file": filename, "error": str(e)}
+        except Exception:
+            logger.info(traceback.format_exc())
+            result = {"file": filename, "error": "Metadata extraction failed"}
+        write_output(out_fd, json.dumps(result).encode() + b"\n")
+
 
 if __name__ == "__main__":
     # Parse start arguments
@@ -1438,7 +1640,13 @@ if __name__ == "__main__":
     parser.add_argument(
         "-o", "--check-objects", dest='check_objects', action='store_true',
         help="process gcode file for exclude object functionality")
+    parser.add_argument(
+        "-w", "--worker", action='store_true',
+        help="run as a persistent worker, reading requests from stdin")
     args = parser.parse_args()
+    if args.worker:
+        run_worker()
+        sys.exit(0)
     config: Dict[str, Any] = {}
     if args.config is None:
         if args.filename is None:
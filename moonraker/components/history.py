@@ -412,7 +412,7 @@ class History:
             self.current_job = job
             self.current_job_id = None
             self.current_job.user = self.job_user
-            self.grab_job_metadata()
+            await self.grab_job_metadata()
             for field in self.auxiliary_fields:
                 field.tracker.reset()
             self.current_job.set_aux_data(self.auxiliary_fields)
@@ -422,7 +422,7 @@ class History:
                 return
             self.current_job_id = new_id
             job_id = f"{new_id:06X}"
-            self.update_metadata(job_id)
+            await self.update_metadata(job_id)
             logging.debug(
                 f"History Job Added - Id: {job_id}, File: {job.filename}"
             )
@@ -472,11 +472,11 @@ class History:
             self.current_job.user = self.job_user
             self.current_job.finish(status, pstats)
             # Regrab metadata incase metadata wasn't parsed yet due to file upload
-            self.grab_job_metadata()
+            await self.grab_job_metadata()
             self.current_job.set_aux_data(self.auxiliary_fields)
             job_id = f"{self.current_job_id:06X}"
             await self.save_job(self.current_job, self.current_job_id)
-            self.update_metadata(job_id)
+            await self.update_metadata(job_id)
             await self._update_job_totals()
             logging.debug(
                 f"History Job Finished - Id: {job_id}, "
@@ -502,28 +502,31 @@ class History:
         result = await cursor.fetchone()
         return dict(result) if result is not None else result
 
-    def grab_job_metadata(self) -> None:
+    async def grab_job_metadata(self) -> None:
         if self.current_job is None:
             return
         filename: str = self.current_job.filename
         mdst = self.file_manager.get_metadata_storage()
-        metadata: Dict[str, Any] = mdst.get(filename, {})
+        metadata: Dict[str, Any] = await mdst.fetch(filename, {})
         # We don't need to store these fields in the
         # job metadata, as they are redundant
         metadata.pop('print_start_time', None)
         metadata.pop('job_id', None)
         if "thumbnails" in metadata:
-            thumb: Dict[str, Any]
-            for thumb in metadata['thumbnails']:
-                thumb.pop('data', None)
+            # Nested values are shared with the metadata storage, copy
+            # thumbnails before modification
+            metadata["thumbnails"] = [
+                {k: v for k, v in thumb.items() if k != "data"}
+                for thumb in metadata["thumbnails"]
+            ]
         self.current_job.metadata = metadata
 
-    def update_metadata(self, job_id: str) -> None:
+    async def update_metadata(self, job_id: str) -> None:
         if self.current_job is None:
             return
         mdst = self.file_manager.get_metadata_storage()
         filename: str = self.current_job.filename
-        metadata: Dict[str, Any] = mdst.get(filename, {})
+        metadata: Dict[str, Any] = await mdst.fetch(filename, {})
         if metadata:
             # Add the start time and job id to the
             # persistent metadata storage
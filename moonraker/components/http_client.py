@@ -5,13 +5,16 @@
 # This file may be distributed under the terms of the GNU GPLv3 license
 
 from __future__ import annotations
+import os
 import re
 import time
 import asyncio
 import pathlib
 import tempfile
 import logging
+import hashlib
 import copy
+from collections import OrderedDict
 from ..utils import ServerError
 from ..utils import json_wrapper as jsonw
 from tornado.escape import url_unescape
@@ -25,6 +28,7 @@ from typing import (
     Union,
     Dict,
     List,
+    Set,
     Any
 )
 if TYPE_CHECKING:
@@ -40,12 +44,24 @@ AsyncHTTPClient.configure(
 )
 
 GITHUB_PREFIX = "https://api.github.com/"
+CACHE_FOLDER = "cache/http"
 
 class HttpClient:
     def __init__(self, config: ConfigHelper) -> None:
         self.server = config.get_server()
         self.client = AsyncHTTPClient()
-        self.response_cache: Dict[str, HttpResponse] = {}
+        cache_path: Optional[pathlib.Path] = None
+        if config.getboolean("enable_disk_cache", True):
+            data_path = pathlib.Path(self.server.get_app_args()["data_path"])
+            cache_path = data_path.joinpath(CACHE_FOLDER)
+        max_size = config.getint("cache_max_size", 8, minval=1)
+        max_age = config.getfloat("cache_max_age", 30., above=0.)
+        stale_time = config.getfloat("cache_stale_time", 60., minval=0.)
+        self.response_cache = HttpCache(
+            self.server, cache_path, max_size * 1024 * 1024,
+            max_age * 86400., stale_time
+        )
+        self.revalidating: Set[str] = set()
 
         self.gh_rate_limit: Optional[int] = None
         self.gh_limit_remaining: Optional[int] = None
@@ -66,7 +82,10 @@ class HttpClient:
             raise self.server.error(
                 "Either an Etag or Last Modified Date must be specified")
         empty_resp = HttpResponse(url, url, 200, b"", headers, None)
-        self.response_cache[url] = empty_resp
+        self.response_cache.set_memory_entry(url, empty_resp)
+
+    async def component_init(self) -> None:
+        await self.response_cache.load()
 
     async def request(
         self,
@@ -84,21 +103,70 @@ class HttpClient:
         basic_auth_user: Optional[str] = None,
         basic_auth_pass: Optional[str] = None
     ) -> HttpResponse:
-        cache_key = url.split("?", 1)[0]
+        cache_key = url
         method = method.upper()
+        cached: Optional[HttpResponse] = None
+        if enable_cache:
+            entry = self.response_cache.get(cache_key)
+            if entry is not None:
+                cached = await self.response_cache.get_response(entry)
+            if (
+                cached is not None and entry is not None and method == "GET" and
+                not entry.validator_only
+            ):
+                age = entry.get_age()
+                if age < entry.lifetime:
+                    logging.debug(f"Request served from fresh cache: {url}")
+                    return cached
+                if (
+                    entry.allow_stale() and
+                    age < entry.lifetime + self.response_cache.stale_time
+                ):
+                    # Return the stale response and revalidate it in
+                    # the background
+                    if cache_key not in self.revalidating:
+                        self.revalidating.add(cache_key)
+                        self.server.get_event_loop().register_callback(
+                            self._revalidate, cache_key, url, cached,
+                            dict(headers or {}), connect_timeout,
+                            request_timeout, basic_auth_user, basic_auth_pass
+                        )
+                    logging.debug(f"Request served from stale cache: {url}")
+                    return cached
+        return await self._fetch(
+            method, url, cache_key if enable_cache else None, cached, body,
+            headers, connect_timeout, request_timeout, attempts,
+            retry_pause_time, send_etag, send_if_modified_since,
+            basic_auth_user, basic_auth_pass
+        )
+
+    async def _fetch(
+        self,
+        method: str,
+        url: str,
+        cache_key: Optional[str],
+        cached: Optional[HttpResponse],
+        body: Optional[Union[bytes, str, List[Any], Dict[str, Any]]],
+        headers: Optional[Dict[str, Any]],
+        connect_timeout: float,
+        request_timeout: float,
+        attempts: int,
+        retry_pause_time: float,
+        send_etag: bool,
+        send_if_modified_since: bool,
+        basic_auth_user: Optional[str],
+        basic_auth_pass: Optional[str]
+    ) -> HttpResponse:
         # prepare the body if required
         req_headers: Dict[str, Any] = {}
         if isinstance(body, (list, dict)):
             body = jsonw.dumps(body)
             req_headers["Content-Type"] = "application/json"
-        cached: Optional[HttpResponse] = None
-        if enable_cache:
-            cached = self.response_cache.get(cache_key)
-            if cached is not None and send_etag:
-                if cached.etag is not None and send_etag:
-                    req_headers["If-None-Match"] = cached.etag
-                if cached.last_modified and send_if_modified_since:
-                    req_headers["If-Modified-Since"] = cached.last_modified
+        if cached is not None and send_etag:
+            if cached.etag is not None and send_etag:
+                req_headers["If-None-Match"] = cached.etag
+            if cached.last_modified and send_if_modified_since:
+                req_headers["If-Modified-Since"] = cached.last_modified
         if headers is not None:
             headers.update(req_headers)
         elif req_headers:
@@ -132,7 +200,7 @@ class HttpClient:
                 if resp.code == 304:
                     err = None
                     if cached is None:
-                        if enable_cache:
+                        if cache_key is not None:
                             logging.info(
                                 "Request returned 304, however no cached "
                                 "item was found")
@@ -151,13 +219,41 @@ class HttpClient:
                 break
         else:
             ret = HttpResponse(url, url, 500, b"", HTTPHeaders(), err)
-        if enable_cache and ret.is_cachable():
-            logging.debug(f"Caching HTTP Response: {url}")
-            self.response_cache[cache_key] = ret
-        else:
-            self.response_cache.pop(cache_key, None)
+        if cache_key is not None:
+            if ret.status_code == 304:
+                if cached is not None:
+                    await self.response_cache.revalidate(cache_key, ret.headers)
+            elif ret.is_cachable() and not ret.has_error():
+                logging.debug(f"Caching HTTP Response: {url}")
+                await self.response_cache.store(cache_key, ret)
+            elif ret.status_code < 500:
+                # Cached responses are retained through network and
+                # server errors
+                await self.response_cache.remove(cache_key)
         return ret
 
+    async def _revalidate(
+        self,
+        cache_key: str,
+        url: str,
+        cached: HttpResponse,
+        headers: Dict[str, Any],
+        connect_timeout: float,
+        request_timeout: float,
+        basic_auth_user: Optional[str],
+        basic_auth_pass: Optional[str]
+    ) -> None:
+        try:
+            resp = await self._fetch(
+                "GET", url, cache_key, cached, None, headers, connect_timeout,
+                request_timeout, 1, 0., True, True, basic_auth_user,
+                basic_auth_pass
+            )
+        finally:
+            self.revalidating.discard(cache_key)
+        if resp.has_error():
+            logging.debug(f"Background revalidation failed: {url}")
+
     async def get(
         self, url: str, headers: Optional[Dict[str, Any]] = None, **kwargs
     ) -> HttpResponse:
@@ -206,7 +302,7 @@ class HttpClient:
             url, headers, attempts=attempts,
             retry_pause_time=retry_pause_time)
         resp_hdrs = resp.headers
-        if 'X-Ratelimit-Limit' in resp_hdrs:
+        if 'X-Ratelimit-Limit' in resp_hdrs and not resp.from_cache:
             self.gh_rate_limit = int(resp_hdrs['X-Ratelimit-Limit'])
             self.gh_limit_remaining = int(
                 resp_hdrs['X-Ratelimit-Remaining'])
@@ -338,7 +434,8 @@ class HttpResponse:
                  code: int,
                  result: bytes,
                  response_headers: HTTPHeaders,
-                 error: Optional[BaseException]
+                 error: Optional[BaseException],
+                 from_cache: bool = False
                  ) -> None:
         self._url = url
         self._final_url = final_url
@@ -350,6 +447,7 @@ class HttpResponse:
         self._error = error
         self._last_modified: Optional[str] = response_headers.get(
             "last-modified", None)
+        self._from_cache = from_cache
 
     def json(self) -> Union[List[Any], Dict[str, Any]]:
         return jsonw.loads(self._result)
@@ -416,6 +514,281 @@ class HttpResponse:
     def error(self) -> Optional[BaseException]:
         return self._error
 
+    @property
+    def from_cache(self) -> bool:
+        return self._from_cache
+
+def parse_cache_lifetime(headers: Dict[str, str]) -> float:
+    # Returns the time in seconds a response is fresh, per the max-age
+    # directive of its Cache-Control header
+    lifetime = 0.
+    cache_control = headers.get("Cache-Control", "")
+    for directive in cache_control.lower().split(","):
+        name, _, value = directive.strip().partition("=")
+        if name in ("no-cache", "no-store"):
+            return 0.
+        if name == "max-age":
+            try:
+                lifetime = max(0., float(value.strip('"')))
+            except ValueError:
+                pass
+    return lifetime
+
+def requires_revalidation(headers: Dict[str, str]) -> bool:
+    # Responses that may not be served stale without revalidation
+    cache_control = headers.get("Cache-Control", "")
+    for directive in cache_control.lower().split(","):
+        name = directive.strip().partition("=")[0]
+        if name in ("no-cache", "must-revalidate"):
+            return True
+    return False
+
+class HttpCacheEntry:
+    def __init__(
+        self,
+        key: str,
+        url: str,
+        code: int,
+        headers: Dict[str, str],
+        size: int,
+        validated: float
+    ) -> None:
+        self.key = key
+        self.url = url
+        self.code = code
+        self.headers = headers
+        self.size = size
+        self.validated = validated
+        self.lifetime = parse_cache_lifetime(headers)
+        self.must_revalidate = requires_revalidation(headers)
+        self.content: Optional[bytes] = None
+        self.persist: bool = True
+        # Registered validators are sent with requests but never served
+        self.validator_only: bool = False
+
+    def allow_stale(self) -> bool:
+        return self.lifetime > 0. and not self.must_revalidate
+
+    def get_age(self) -> float:
+        return time.time() - self.validated
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "key": self.key,
+            "url": self.url,
+            "code": self.code,
+            "headers": self.headers,
+            "size": self.size,
+            "validated": self.validated
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> HttpCacheEntry:
+        return cls(
+            data["key"], data["url"], data["code"], data["headers"],
+            data["size"], data["validated"]
+        )
+
+class HttpCache:
+    """
+    LRU cache of HTTP responses with an ETag or Last-Modified header.
+    Entries are persisted to the data path so conditional requests may
+    be sent after a restart.  Entries are evicted when the total size of
+    their content exceeds the size limit, or when they have not been
+    validated by the remote within the maximum age.
+    """
+    def __init__(
+        self,
+        server: Server,
+        path: Optional[pathlib.Path],
+        max_size: int,
+        max_age: float,
+        stale_time: float
+    ) -> None:
+        self.server = server
+        self.event_loop = server.get_event_loop()
+        self.path = path
+        self.max_size = max_size
+        self.max_age = max_age
+        self.stale_time = stale_time
+        self.entries: OrderedDict[str, HttpCacheEntry] = OrderedDict()
+        self.total_size: int = 0
+        self.disk_lock = asyncio.Lock()
+
+    def _get_file_base(self, key: str) -> pathlib.Path:
+        assert self.path is not None
+        return self.path.joinpath(hashlib.sha256(key.encode()).hexdigest())
+
+    async def load(self) -> None:
+        if self.path is None:
+            return
+        async with self.disk_lock:
+            try:
+                entries = await self.event_loop.run_in_thread(
+                    self._load_entries, pool="disk_io"
+                )
+            except Exception:
+                logging.exception("Failed to load HTTP response cache")
+                self.path = None
+                return
+        for entry in sorted(entries, key=lambda e: e.validated):
+            if entry.get_age() > self.max_age:
+                await self.remove(entry.key, entry)
+                continue
+            self._add_entry(entry)
+        await self._evict()
+        logging.info(
+            f"Loaded {len(self.entries)} cached HTTP responses, "
+            f"total size: {self.total_size} bytes"
+        )
+
+    def _load_entries(self) -> List[HttpCacheEntry]:
+        assert self.path is not None
+        self.path.mkdir(parents=True, exist_ok=True)
+        entries: List[HttpCacheEntry] = []
+        for item in self.path.iterdir():
+            if item.suffix == ".json":
+                body = item.with_suffix(".body")
+                try:
+                    entry = HttpCacheEntry.from_dict(jsonw.loads(item.read_bytes()))
+                    assert body.is_file()
+                except Exception:
+                    logging.info(f"Removing invalid HTTP cache entry: {item.name}")
+                    item.unlink(missing_ok=True)
+                    body.unlink(missing_ok=True)
+                    continue
+                entries.append(entry)
+            elif item.suffix == ".body":
+                if not item.with_suffix(".json").exists():
+                    item.unlink(missing_ok=True)
+            elif item.suffix == ".tmp":
+                item.unlink(missing_ok=True)
+        return entries
+
+    def _add_entry(self, entry: HttpCacheEntry) -> None:
+        prev = self.entries.pop(entry.key, None)
+        if prev is not None:
+            self.total_size -= prev.size
+        self.entries[entry.key] = entry
+        self.total_size += entry.size
+
+    def get(self, key: str) -> Optional[HttpCacheEntry]:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        if entry.persist and entry.get_age() > self.max_age:
+            self.event_loop.register_callback(self.remove, key, entry)
+            return None
+        self.entries.move_to_end(key)
+        return entry
+
+    def set_memory_entry(self, key: str, response: HttpResponse) -> None:
+        entry = HttpCacheEntry(
+            key, response.url, response.status_code,
+            dict(response.headers.get_all()), 0, time.time()
+        )
+        entry.content = response.content
+        entry.persist = False
+        entry.validator_only = True
+        self._add_entry(entry)
+
+    async def get_response(self, entry: HttpCacheEntry) -> Optional[HttpResponse]:
+        content = entry.content
+        if content is None:
+            base = self._get_file_base(entry.key)
+            try:
+                async with self.disk_lock:
+                    content = await self.event_loop.run_in_thread(
+                        base.with_suffix(".body").read_bytes, pool="disk_io"
+                    )
+            except Exception:
+                logging.info(f"Failed to read cached response for {entry.url}")
+                await self.remove(entry.key, entry)
+                return None
+            entry.content = content
+        return HttpResponse(
+            entry.url, entry.url, entry.code, content,
+            HTTPHeaders(entry.headers), None, True
+        )
+
+    async def store(self, key: str, response: HttpResponse) -> None:
+        headers = dict(response.headers.get_all())
+        cache_control = headers.get("Cache-Control", "").lower()
+        content = response.content
+        if "no-store" in cache_control or len(content) > self.max_size:
+            await self.remove(key)
+            return
+        entry = HttpCacheEntry(
+            key, response.url, response.status_code, headers, len(content),
+            time.time()
+        )
+        entry.content = content
+        entry.persist = self.path is not None
+        self._add_entry(entry)
+        if entry.persist:
+            await self._write_entry(entry, content)
+        await self._evict()
+
+    async def revalidate(self, key: str, headers: HTTPHeaders) -> None:
+        entry = self.entries.get(key)
+        if entry is None:
+            return
+        entry.validated = time.time()
+        for name in ("Cache-Control", "Expires", "Etag", "Last-Modified", "Date"):
+            if name in headers:
+                entry.headers[name] = headers[name]
+        entry.lifetime = parse_cache_lifetime(entry.headers)
+        entry.must_revalidate = requires_revalidation(entry.headers)
+        if entry.persist:
+            await self._write_entry(entry)
+
+    async def remove(
+        self, key: str, entry: Optional[HttpCacheEntry] = None
+    ) -> None:
+        cur_entry = self.entries.get(key)
+        if cur_entry is not None and (entry is None or cur_entry is entry):
+            del self.entries[key]
+            self.total_size -= cur_entry.size
+            entry = cur_entry
+        if entry is None or not entry.persist or self.path is None:
+            return
+        base = self._get_file_base(key)
+
+        def _remove_files() -> None:
+            base.with_suffix(".json").unlink(missing_ok=True)
+            base.with_suffix(".body").unlink(missing_ok=True)
+        async with self.disk_lock:
+            try:
+                await self.event_loop.run_in_thread(_remove_files, pool="disk_io")
+            except Exception:
+                logging.exception(f"Failed to remove cached response for {key}")
+
+    async def _evict(self) -> None:
+        while self.total_size > self.max_size and self.entries:
+            key = next(iter(self.entries))
+            await self.remove(key)
+
+    async def _write_entry(
+        self, entry: HttpCacheEntry, content: Optional[bytes] = None
+    ) -> None:
+        base = self._get_file_base(entry.key)
+        meta = jsonw.dumps(entry.to_dict())
+
+        def _write_file(dest: pathlib.Path, data: bytes) -> None:
+            tmp = dest.with_suffix(".tmp")
+            tmp.write_bytes(data)
+            os.replace(tmp, dest)
+
+        def _write() -> None:
+            if content is not None:
+                _write_file(base.with_suffix(".body"), content)
+            _write_file(base.with_suffix(".json"), meta)
+        async with self.disk_lock:
+            try:
+                await self.event_loop.run_in_thread(_write, pool="disk_io")
+            except Exception:
+                logging.exception(f"Failed to write cached response for {entry.url}")
+
 class StreamingDownload:
     def __init__(
         self,
@@ -155,7 +155,7 @@ class JobQueue:
         # Query the latest stats
         kapis: KlippyAPI = self.server.lookup_component('klippy_apis')
         try:
-            result = await kapis.query_objects({"print_stats": None})
+            result = await kapis.query_objects({"print_stats": None}, fresh=True)
         except Exception:
             # Klippy not connected
             return False
@@ -223,9 +223,14 @@ class KlippyAPI(APITransport):
 
     async def query_objects(self,
                             objects: Mapping[str, Optional[List[str]]],
-                            default: Union[Sentinel, _T] = Sentinel.MISSING
+                            default: Union[Sentinel, _T] = Sentinel.MISSING,
+                            fresh: bool = False
                             ) -> Union[_T, Dict[str, Any]]:
-        params = {'objects': objects}
+        # Queries for subscribed objects are answered from the subscription
+        # cache unless a fresh read from Klippy is requested
+        params: Dict[str, Any] = {'objects': objects}
+        if fresh:
+            params['fresh'] = True
         result = await self._send_klippy_request(
             STATUS_ENDPOINT, params, default)
         if isinstance(result, dict) and "status" in result:
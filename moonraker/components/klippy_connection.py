@@ -11,10 +11,11 @@ import time
 import logging
 import getpass
 import asyncio
+import functools
 import pathlib
 from ..utils import ServerError, get_unix_peer_credentials
 from ..utils import json_wrapper as jsonw
-from ..common import KlippyState, RequestType
+from ..common import KlippyState, RequestType, BaseRemoteConnection
 
 # Annotation imports
 from typing import (
@@ -31,7 +32,7 @@ from typing import (
     Union
 )
 if TYPE_CHECKING:
-    from ..common import WebRequest, APITransport, BaseRemoteConnection
+    from ..common import WebRequest, APITransport
     from ..confighelper import ConfigHelper
     from .klippy_apis import KlippyAPI
     from .file_manager.file_manager import FileManager
@@ -40,6 +41,9 @@ if TYPE_CHECKING:
     from .database import MoonrakerDatabase as Database
     FlexCallback = Callable[..., Optional[Coroutine]]
     Subscription = Dict[str, Optional[List[str]]]
+    StatusIndex = Dict[
+        str, Tuple[List["SubscriptionGroup"], Dict[str, List["SubscriptionGroup"]]]
+    ]
 
 # These endpoints are reserved for klippy/moonraker communication only and are
 # not exposed via http or the websocket
@@ -55,10 +59,14 @@ CACHE_EXCLUSIONS = {
     "configfile": ["config", "settings"]
 }
 
+# Time to wait for additional subscription requests before sending
+# the combined request to Klippy
+SUBSCRIPTION_BATCH_TIME = .02
 INIT_TIME = .25
 LOG_ATTEMPT_INTERVAL = int(2. / INIT_TIME + .5)
 MAX_LOG_ATTEMPTS = 10 * LOG_ATTEMPT_INTERVAL
 UNIX_BUFFER_LIMIT = 20 * 1024 * 1024
+UNIX_READ_SIZE = 64 * 1024
 SVC_INFO_KEY = "klippy_connection.service_info"
 SRC_PATH_KEY = "klippy_connection.path"
 PY_EXEC_KEY = "klippy_connection.executable"
@@ -93,10 +101,18 @@ class KlippyConnection:
         self._state.set_message("Klippy Disconnected")
         self.subscriptions: Dict[APITransport, Subscription] = {}
         self.subscription_cache: Dict[str, Dict[str, Any]] = {}
+        self.status_index: StatusIndex = {}
+        self.sub_registry = SubscriptionRegistry()
+        self._pending_sub_request: Optional[asyncio.Future] = None
+        self._pending_queries: Dict[Tuple[Any, ...], asyncio.Future] = {}
+        self._last_eventtime: float = 0.
         # Setup remote methods accessible to Klippy.  Note that all
         # registered remote methods should be of the notification type,
         # they do not return a response to Klippy after execution
         self.pending_requests: Dict[int, KlippyRequest] = {}
+        # Requests queued in the same loop iteration are sent in one write
+        self.write_buffer: List[KlippyRequest] = []
+        self.write_busy: bool = False
         self.remote_methods: Dict[str, FlexCallback] = {}
         self.klippy_reg_methods: List[str] = []
         self.register_remote_method(
@@ -185,11 +201,15 @@ class KlippyConnection:
         return self.is_connected()
 
     async def _read_stream(self, reader: asyncio.StreamReader) -> None:
+        # Each read may contain several complete frames and the start of a
+        # partial frame, which is buffered until its terminator arrives.
         errors_remaining: int = 10
+        partial: List[bytes] = []
+        partial_size: int = 0
         while not reader.at_eof():
             try:
-                data = await reader.readuntil(b'\x03')
-            except (ConnectionError, asyncio.IncompleteReadError):
+                data = await reader.read(UNIX_READ_SIZE)
+            except ConnectionError:
                 break
             except asyncio.CancelledError:
                 logging.exception("Klippy Stream Read Cancelled")
@@ -200,33 +220,85 @@ class KlippyConnection:
                 if not errors_remaining or not self.is_connected():
                     break
                 continue
+            if not data:
+                break
             errors_remaining = 10
-            try:
-                decoded_cmd = jsonw.loads(data[:-1])
-                self._process_command(decoded_cmd)
-            except Exception:
-                logging.exception(
-                    f"Error processing Klippy Host Response: {data.decode()}")
+            if b"\x03" not in data:
+                partial.append(data)
+                partial_size += len(data)
+                if partial_size > UNIX_BUFFER_LIMIT:
+                    logging.info(
+                        "Klippy frame exceeds buffer limit, discarding "
+                        f"{partial_size} bytes"
+                    )
+                    partial.clear()
+                    partial_size = 0
+                continue
+            if partial:
+                partial.append(data)
+                data = b"".join(partial)
+                partial.clear()
+                partial_size = 0
+            frames = data.split(b"\x03")
+            remaining = frames.pop()
+            if remaining:
+                partial.append(remaining)
+                partial_size = len(remaining)
+            for frame in frames:
+                try:
+                    decoded_cmd = jsonw.loads(frame)
+                    self._process_command(decoded_cmd)
+                except Exception:
+                    logging.exception(
+                        f"Error processing Klippy Host Response: {frame.decode()}")
         if not self.closing:
             logging.debug("Klippy Disconnection From _read_stream()")
             await self.close()
 
-    async def _write_request(self, request: KlippyRequest) -> None:
-        if self.writer is None or self.closing:
-            request.set_exception(ServerError("Klippy Host not connected", 503))
+    def _queue_request(self, request: KlippyRequest) -> None:
+        self.write_buffer.append(request)
+        if self.write_busy:
             return
-        data = jsonw.dumps(request.to_dict()) + b"\x03"
-        try:
-            self.writer.write(data)
-            await self.writer.drain()
-        except asyncio.CancelledError:
-            request.set_exception(ServerError("Klippy Write Request Cancelled", 503))
-            raise
-        except Exception:
-            request.set_exception(ServerError("Klippy Write Request Error", 503))
-            if not self.closing:
-                logging.debug("Klippy Disconnection From _write_request()")
-                await self.close()
+        self.write_busy = True
+        self.event_loop.register_callback(self._write_requests)
+
+    async def _write_requests(self) -> None:
+        while self.write_buffer:
+            requests = self.write_buffer
+            self.write_buffer = []
+            if self.writer is None or self.closing:
+                for request in requests:
+                    request.set_exception(
+                        ServerError("Klippy Host not connected", 503)
+                    )
+                continue
+            chunks: List[bytes] = []
+            for request in requests:
+                try:
+                    chunks.append(jsonw.dumps(request.to_dict()) + b"\x03")
+                except Exception as e:
+                    request.set_exception(
+                        ServerError(f"Error encoding Klippy request: {e}", 400)
+                    )
+            try:
+                self.writer.write(b"".join(chunks))
+                await self.writer.drain()
+            except asyncio.CancelledError:
+                for request in requests:
+                    request.set_exception(
+                        ServerError("Klippy Write Request Cancelled", 503)
+                    )
+                self.write_busy = False
+                raise
+            except Exception:
+                for request in requests:
+                    request.set_exception(
+                        ServerError("Klippy Write Request Error", 503)
+                    )
+                if not self.closing:
+                    logging.debug("Klippy Disconnection From _write_requests()")
+                    await self.close()
+        self.write_busy = False
 
     def register_remote_method(self,
                                method_name: str,
@@ -570,6 +642,7 @@ class KlippyConnection:
     def _process_status_update(
         self, eventtime: float, status: Dict[str, Dict[str, Any]]
     ) -> None:
+        self._last_eventtime = eventtime
         for field, item in status.items():
             self.subscription_cache.setdefault(field, {}).update(item)
         if 'webhooks' in status:
@@ -591,16 +664,55 @@ class KlippyConnection:
                     logging.info("Klippy has shutdown")
                     self.server.send_event("server:klippy_shutdown")
                 self._state = new_state
+        # Filter the update in a single pass using the compiled index.  Groups
+        # of connections with identical subscriptions share a status dict.
+        group_status: Dict[SubscriptionGroup, Dict[str, Dict[str, Any]]] = {}
+        for obj_name, fields in status.items():
+            entry = self.status_index.get(obj_name)
+            if entry is None or not fields:
+                continue
+            all_groups, field_map = entry
+            for group in all_groups:
+                group_status.setdefault(group, {})[obj_name] = dict(fields)
+            if not field_map:
+                continue
+            if len(field_map) < len(fields):
+                field_items = (
+                    (fname, groups) for fname, groups in field_map.items()
+                    if fname in fields
+                )
+            else:
+                field_items = (
+                    (fname, field_map[fname]) for fname in fields
+                    if fname in field_map
+                )
+            for fname, groups in field_items:
+                val = fields[fname]
+                for group in groups:
+                    group_status.setdefault(group, {}).setdefault(
+                        obj_name, {}
+                    )[fname] = val
+        for group, gstatus in group_status.items():
+            group.send_status(gstatus, eventtime)
+
+    def _compile_subscriptions(self) -> None:
+        groups: Dict[Tuple[Any, ...], SubscriptionGroup] = {}
         for conn, sub in self.subscriptions.items():
-            conn_status: Dict[str, Any] = {}
-            for name, fields in sub.items():
-                if name in status:
-                    val: Dict[str, Any] = dict(status[name])
-                    if fields is not None:
-                        val = {k: v for k, v in val.items() if k in fields}
-                    if val:
-                        conn_status[name] = val
-            conn.send_status(conn_status, eventtime)
+            key = subscription_key(sub)
+            group = groups.get(key)
+            if group is None:
+                group = groups[key] = SubscriptionGroup(sub)
+            group.connections.append(conn)
+        index: StatusIndex = {}
+        for group in groups.values():
+            for obj_name, fields in group.subscription.items():
+                all_groups, field_map = index.setdefault(obj_name, ([], {}))
+                if fields is None:
+                    all_groups.append(group)
+                    continue
+                for fname in set(fields):
+                    field_map.setdefault(fname, []).append(group)
+        self.status_index = index
 
     async def request(self, web_request: WebRequest) -> Any:
         if not self.is_connected():
@@ -608,6 +720,8 @@ class KlippyConnection:
         rpc_method = web_request.get_endpoint()
         if rpc_method == "objects/subscribe":
             return await self._request_subscripton(web_request)
+        elif rpc_method == "objects/query":
+            return await self._request_query(web_request)
         else:
             if rpc_method == "gcode/script":
                 script = web_request.get_str('script', "")
@@ -617,36 +731,119 @@ class KlippyConnection:
             return await self._request_standard(web_request)
 
     async def _request_subscripton(self, web_request: WebRequest) -> Dict[str, Any]:
+        args = web_request.get_args()
+        conn = web_request.get_subscribable()
+        if conn is None:
+            raise self.server.error(
+                "No connection associated with subscription request"
+            )
+        # if the connection has an existing subscription pop it off
+        prev_sub = self.subscriptions.pop(conn, None)
+        if prev_sub is not None:
+            self.sub_registry.remove(prev_sub)
+            self._compile_subscriptions()
+        requested_sub: Subscription = args.get('objects', {})
+        self.sub_registry.add(requested_sub)
+        try:
+            if self.sub_registry.is_covered(requested_sub):
+                # Klippy is already subscribed to every requested object and
+                # field, the response may be generated from the cache
+                all_status = self.subscription_cache
+                result: Dict[str, Any] = {"eventtime": self._last_eventtime}
+            else:
+                result = await self._batch_subscription_request()
+                all_status = result["status"]
+        except Exception:
+            self.sub_registry.remove(requested_sub)
+            raise
+        if requested_sub:
+            self.subscriptions[conn] = requested_sub
+            self._compile_subscriptions()
+        return {**result, "status": prune_status(requested_sub, all_status)}
+
+    async def _request_query(self, web_request: WebRequest) -> Dict[str, Any]:
+        fresh = web_request.get_boolean("fresh", False)
+        requested: Subscription = web_request.get_args().get("objects", {})
+        if not isinstance(requested, dict):
+            raise self.server.error("Invalid argument 'objects'", 400)
+        try:
+            key = subscription_key(requested)
+        except TypeError:
+            raise self.server.error("Invalid argument 'objects'", 400) from None
+        if fresh:
+            return await self._send_request(
+                "objects/query", {"objects": requested}
+            )
+        if requested and self.sub_registry.is_covered(requested):
+            # Every requested object and field is kept current by the
+            # subscription, respond from the cache
+            return {
+                "eventtime": self._last_eventtime,
+                "status": prune_status(requested, self.subscription_cache)
+            }
+        # Identical queries received while a query is pending share
+        # its response
+        fut = self._pending_queries.get(key)
+        if fut is None:
+            fut = self.event_loop.create_task(
+                self._send_request("objects/query", {"objects": requested})
+            )
+            self._pending_queries[key] = fut
+            fut.add_done_callback(
+                functools.partial(self._on_query_done, key)
+            )
+        result = await asyncio.shield(fut)
+        if not isinstance(result, dict) or "status" not in result:
+            return result
+        return {**result, "status": prune_status(requested, result["status"])}
+
+    def _on_query_done(self, key: Tuple[Any, ...], fut: asyncio.Future) -> None:
+        if self._pending_queries.get(key) is fut:
+            del self._pending_queries[key]
+        if not fut.cancelled():
+            # Retrieve the exception in the event all waiters were cancelled
+            fut.exception()
+
+    def _batch_subscription_request(self) -> Awaitable[Dict[str, Any]]:
+        # Subscription requests received within the batch window are sent
+        # to Klippy as a single request for the current superset.
+        if self._pending_sub_request is None:
+            self._pending_sub_request = self.event_loop.create_future()
+            self.event_loop.delay_callback(
+                SUBSCRIPTION_BATCH_TIME, self._send_subscription_request
+            )
+        return asyncio.shield(self._pending_sub_request)
+
+    async def _send_subscription_request(self) -> None:
+        fut = self._pending_sub_request
+        self._pending_sub_request = None
+        if fut is None or fut.done():
+            return
+        try:
+            result = await self._update_subscription()
+        except asyncio.CancelledError:
+            fut.cancel()
+            raise
+        except Exception as e:
+            if not fut.done():
+                fut.set_exception(e)
+                # Avoid "exception never retrieved" warnings when all
+                # waiters have been cancelled
+                fut.exception()
+        else:
+            if not fut.done():
+                fut.set_result(result)
+
+    async def _update_subscription(self) -> Dict[str, Any]:
         async with self.subscription_lock:
-            args = web_request.get_args()
-            conn = web_request.get_subscribable()
-            if conn is None:
-                raise self.server.error(
-                    "No connection associated with subscription request"
-                )
-            # if the connection has an existing subscription pop it off
-            self.subscriptions.pop(conn, None)
-            requested_sub: Subscription = args.get('objects', {})
-            all_subs: Subscription = dict(requested_sub)
-            # Build the subscription request from a superset of all client subscriptions
-            for sub in self.subscriptions.values():
-                for obj, items in sub.items():
-                    if obj in all_subs:
-                        prev_items = all_subs[obj]
-                        if items is None or prev_items is None:
-                            all_subs[obj] = None
-                        else:
-                            uitems = list(set(prev_items) | set(items))
-                            all_subs[obj] = uitems
-                    else:
-                        all_subs[obj] = items
-            args['objects'] = all_subs
-            args['response_template'] = {'method': "process_status_update"}
-
-            result = await self._request_standard(web_request, 20.0)
-
-            # prune the status response
-            pruned_status: Dict[str, Dict[str, Any]] = {}
+            all_subs = self.sub_registry.get_superset()
+            args: Dict[str, Any] = {
+                'objects': all_subs,
+                'response_template': {'method': "process_status_update"}
+            }
+            result = await self._send_request("objects/subscribe", args, 20.0)
+            self.sub_registry.set_upstream(all_subs)
+            self._last_eventtime = result["eventtime"]
             status_diff: Dict[str, Dict[str, Any]] = {}
             all_status: Dict[str, Dict[str, Any]] = result['status']
             for obj, fields in all_status.items():
@@ -658,10 +855,10 @@ class KlippyConnection:
                             continue
                         if value != cached_status[field_name]:
                             status_diff.setdefault(obj, {})[field_name] = value
+                # Make a shallow copy so we can pop off fields we want to
+                # exclude from the cache without modifying the return value
+                fields_to_cache = dict(fields)
                 if obj in CACHE_EXCLUSIONS:
-                    # Make a shallow copy so we can pop off fields we want to
-                    # exclude from the cache without modifying the return value
-                    fields_to_cache = dict(fields)
                     removed: List[str] = []
                     for excluded_field in CACHE_EXCLUSIONS[obj]:
                         if excluded_field in fields_to_cache:
@@ -672,18 +869,7 @@ class KlippyConnection:
                             "Removed excluded fields from subscription cache: "
                             f"{obj}: {removed}"
                         )
-                    self.subscription_cache[obj] = fields_to_cache
-                else:
-                    self.subscription_cache[obj] = fields
-                # Prune Response
-                if obj in requested_sub:
-                    valid_fields = requested_sub[obj]
-                    if valid_fields is None:
-                        pruned_status[obj] = fields
-                    else:
-                        pruned_status[obj] = {
-                            k: v for k, v in fields.items() if k in valid_fields
-                        }
+                self.subscription_cache[obj] = fields_to_cache
             if status_diff:
                 # The response to the status request contains changed data, so it
                 # is necessary to manually push the status update to existing
@@ -696,9 +882,6 @@ class KlippyConnection:
                 # Prune the cache to match the current status response
                 if obj_name not in all_status:
                     del self.subscription_cache[obj_name]
-            result['status'] = pruned_status
-            if requested_sub:
-                self.subscriptions[conn] = requested_sub
             return result
 
     async def _request_standard(
@@ -706,17 +889,28 @@ class KlippyConnection:
     ) -> Any:
         rpc_method = web_request.get_endpoint()
         args = web_request.get_args()
+        return await self._send_request(rpc_method, args, timeout)
+
+    async def _send_request(
+        self,
+        rpc_method: str,
+        args: Dict[str, Any],
+        timeout: Optional[float] = None
+    ) -> Any:
         # Create a base klippy request
         base_request = KlippyRequest(rpc_method, args)
         self.pending_requests[base_request.id] = base_request
-        self.event_loop.register_callback(self._write_request, base_request)
+        self._queue_request(base_request)
         try:
             return await base_request.wait(timeout)
         finally:
             self.pending_requests.pop(base_request.id, None)
 
     def remove_subscription(self, conn: APITransport) -> None:
-        self.subscriptions.pop(conn, None)
+        sub = self.subscriptions.pop(conn, None)
+        if sub is not None:
+            self.sub_registry.remove(sub)
+            self._compile_subscriptions()
 
     def is_connected(self) -> bool:
         return self.writer is not None and not self.closing
@@ -776,6 +970,15 @@ class KlippyConnection:
             request.set_exception(ServerError("Klippy Disconnected", 503))
         self.pending_requests = {}
         self.subscriptions = {}
+        self.status_index = {}
+        self.sub_registry.clear()
+        if self._pending_sub_request is not None:
+            if not self._pending_sub_request.done():
+                self._pending_sub_request.set_exception(
+                    ServerError("Klippy Disconnected", 503)
+                )
+                self._pending_sub_request.exception()
+            self._pending_sub_request = None
         self.subscription_cache.clear()
         self._peer_cred = {}
         self._missing_reqs.clear()
@@ -809,6 +1012,118 @@ class KlippyConnection:
                 await self._on_connection_closed()
         self.closing = False
 
+def subscription_key(sub: Subscription) -> Tuple[Any, ...]:
+    return tuple(sorted(
+        (obj, None if fields is None else tuple(sorted(set(fields))))
+        for obj, fields in sub.items()
+    ))
+
+def prune_status(
+    sub: Subscription, all_status: Dict[str, Dict[str, Any]]
+) -> Dict[str, Dict[str, Any]]:
+    pruned_status: Dict[str, Dict[str, Any]] = {}
+    for obj, valid_fields in sub.items():
+        if obj not in all_status:
+            continue
+        fields = all_status[obj]
+        if valid_fields is None:
+            pruned_status[obj] = dict(fields)
+        else:
+            pruned_status[obj] = {
+                k: fields[k] for k in valid_fields if k in fields
+            }
+    return pruned_status
+
+# Reference counted registry of the objects and fields requested by all
+# subscribers.  Tracks the subscription last sent to Klippy so requests
+# that do not extend it can be answered locally.
+class SubscriptionRegistry:
+    def __init__(self) -> None:
+        self.all_refs: Dict[str, int] = {}
+        self.field_refs: Dict[str, Dict[str, int]] = {}
+        self.upstream: Subscription = {}
+
+    def add(self, sub: Subscription) -> None:
+        for obj, fields in sub.items():
+            if fields is None:
+                self.all_refs[obj] = self.all_refs.get(obj, 0) + 1
+                continue
+            frefs = self.field_refs.setdefault(obj, {})
+            for fname in set(fields):
+                frefs[fname] = frefs.get(fname, 0) + 1
+
+    def remove(self, sub: Subscription) -> None:
+        for obj, fields in sub.items():
+            if fields is None:
+                count = self.all_refs.get(obj, 0) - 1
+                if count > 0:
+                    self.all_refs[obj] = count
+                else:
+                    self.all_refs.pop(obj, None)
+                continue
+            frefs = self.field_refs.get(obj, {})
+            for fname in set(fields):
+                count = frefs.get(fname, 0) - 1
+                if count > 0:
+                    frefs[fname] = count
+                else:
+                    frefs.pop(fname, None)
+            if not frefs:
+                self.field_refs.pop(obj, None)
+
+    def get_superset(self) -> Subscription:
+        superset: Subscription = {obj: None for obj in self.all_refs}
+        for obj, frefs in self.field_refs.items():
+            if obj not in superset:
+                superset[obj] = list(frefs.keys())
+        return superset
+
+    def set_upstream(self, sub: Subscription) -> None:
+        self.upstream = sub
+
+    def is_covered(self, sub: Subscription) -> bool:
+        for obj, fields in sub.items():
+            if obj not in self.upstream:
+                return False
+            upstream_fields = self.upstream[obj]
+            excluded = CACHE_EXCLUSIONS.get(obj, [])
+            if fields is None:
+                if upstream_fields is not None or excluded:
+                    return False
+                continue
+            if upstream_fields is not None:
+                if not set(fields).issubset(upstream_fields):
+                    return False
+            if excluded and not set(fields).isdisjoint(excluded):
+                return False
+        return True
+
+    def clear(self) -> None:
+        self.all_refs.clear()
+        self.field_refs.clear()
+        self.upstream = {}
+
+# Connections sharing an identical subscription receive the same filtered
+# status.  Remote connections that are not busy share one encoded frame.
+class SubscriptionGroup:
+    def __init__(self, subscription: Subscription) -> None:
+        self.subscription = subscription
+        self.connections: List[APITransport] = []
+
+    def send_status(self, status: Dict[str, Any], eventtime: float) -> None:
+        frame: Optional[bytes] = None
+        for conn in self.connections:
+            if isinstance(conn, BaseRemoteConnection) and not conn.queue_busy:
+                if frame is None:
+                    frame = jsonw.dumps({
+                        'jsonrpc': "2.0",
+                        'method': "notify_status_update",
+                        'params': [status, eventtime]
+                    })
+                conn.queue_message(frame)
+            else:
+                conn.send_status(status, eventtime)
+
 # Basic KlippyRequest class, easily converted to dict for json encoding
 class KlippyRequest:
     def __init__(self, rpc_method: str, params: Dict[str, Any]) -> None:
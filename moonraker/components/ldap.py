@@ -68,7 +68,7 @@ class MoonrakerLDAP:
         eventloop = self.server.get_event_loop()
         async with self.lock:
             await eventloop.run_in_thread(
-                self._perform_ldap_auth, username, password
+                self._perform_ldap_auth, username, password, pool="network"
             )
 
     def _perform_ldap_auth(self, username: str, password: str) -> None:
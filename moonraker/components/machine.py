@@ -864,12 +864,14 @@ class Machine:
     async def detect_serial_devices(self) -> List[Dict[str, Any]]:
         async with self.periph_lock:
             eventloop = self.server.get_event_loop()
-            return await eventloop.run_in_thread(sysfs_devs.find_serial_devices)
+            return await eventloop.run_in_thread(
+                sysfs_devs.find_serial_devices, pool="system"
+            )
 
     async def detect_usb_devices(self) -> List[Dict[str, Any]]:
         async with self.periph_lock:
             eventloop = self.server.get_event_loop()
-            return await eventloop.run_in_thread(self._do_usb_detect)
+            return await eventloop.run_in_thread(self._do_usb_detect, pool="system")
 
     def _do_usb_detect(self) -> List[Dict[str, Any]]:
         data_path = pathlib.Path(self.server.get_app_args()["data_path"])
@@ -898,8 +900,12 @@ class Machine:
     async def detect_video_devices(self) -> Dict[str, List[Dict[str, Any]]]:
         async with self.periph_lock:
             eventloop = self.server.get_event_loop()
-            v4l2_devs = await eventloop.run_in_thread(sysfs_devs.find_video_devices)
-            libcam_devs = await eventloop.run_in_thread(self.get_libcamera_devices)
+            v4l2_devs = await eventloop.run_in_thread(
+                sysfs_devs.find_video_devices, pool="system"
+            )
+            libcam_devs = await eventloop.run_in_thread(
+                self.get_libcamera_devices, pool="system"
+            )
         return {
             "v4l2_devices": v4l2_devs,
             "libcamera_devices": libcam_devs
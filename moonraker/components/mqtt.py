@@ -20,6 +20,7 @@ from ..common import (
     APITransport,
     KlippyState
 )
+from ..utils import Sentinel
 from ..utils import json_wrapper as jsonw
 try:
     from paho.mqtt.reasoncodes import ReasonCode
@@ -324,6 +325,138 @@ class AIOHelper:
         logging.info("MQTT Misc Loop Complete")
 
 
+class SplitStatusPublisher:
+    # Filters the per field publishes of split status updates.  Unchanged
+    # values, numeric changes smaller than a configured delta and updates
+    # arriving faster than a configured rate are suppressed.  The latest
+    # rate limited value is published once its interval elapses.
+    def __init__(
+        self, config: ConfigHelper, publish_cb: Callable[[str, Any, float], None]
+    ) -> None:
+        self.eventloop = config.get_server().get_event_loop()
+        self.publish_cb = publish_cb
+        self.change_only = config.getboolean("split_status_change_only", True)
+        self.rate_limits = self._get_limits(config, "split_status_rate_limits")
+        self.min_deltas = self._get_limits(config, "split_status_min_deltas")
+        self.field_limits: Dict[Tuple[str, str], Tuple[float, float]] = {}
+        self.last_values: Dict[str, Any] = {}
+        self.last_publish_times: Dict[str, float] = {}
+        self.pending: Dict[str, Tuple[Any, float]] = {}
+        self.pending_handles: Dict[str, asyncio.TimerHandle] = {}
+        self.published_count: int = 0
+        self.suppressed: Dict[str, int] = {
+            "unchanged": 0, "below_delta": 0, "rate_limited": 0
+        }
+
+    def _get_limits(self, config: ConfigHelper, option: str) -> Dict[str, float]:
+        limits: Dict[str, str] = config.getdict(option, {})
+        ret: Dict[str, float] = {}
+        for key, val in limits.items():
+            try:
+                ret[key] = float(val)
+            except ValueError:
+                raise config.error(
+                    f"[{config.get_name()}]: Option '{option}', invalid "
+                    f"value '{val}' for '{key}'"
+                ) from None
+            if ret[key] < 0:
+                raise config.error(
+                    f"[{config.get_name()}]: Option '{option}', value "
+                    f"for '{key}' must be greater than or equal to 0"
+                )
+        return ret
+
+    def _lookup_limits(self, objkey: str, statekey: str) -> Tuple[float, float]:
+        limits = self.field_limits.get((objkey, statekey))
+        if limits is None:
+            field = f"{objkey}/{statekey}"
+            rate = self.rate_limits.get(field, self.rate_limits.get(objkey, 0.))
+            delta = self.min_deltas.get(field, self.min_deltas.get(objkey, 0.))
+            limits = self.field_limits[(objkey, statekey)] = (rate, delta)
+        return limits
+
+    def _below_delta(self, last_val: Any, value: Any, delta: float) -> bool:
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            if isinstance(last_val, (int, float)) and not isinstance(last_val, bool):
+                return abs(value - last_val) < delta
+            return False
+        if (
+            isinstance(value, list) and isinstance(last_val, list) and
+            len(value) == len(last_val)
+        ):
+            return all(
+                self._below_delta(last, val, delta)
+                for last, val in zip(last_val, value)
+            )
+        return False
+
+    def process_field(
+        self, topic: str, objkey: str, statekey: str, value: Any, eventtime: float
+    ) -> None:
+        last_val = self.last_values.get(topic, Sentinel.MISSING)
+        if last_val is not Sentinel.MISSING:
+            if self.change_only and value == last_val:
+                self.pending.pop(topic, None)
+                self.suppressed["unchanged"] += 1
+                return
+            rate, delta = self._lookup_limits(objkey, statekey)
+            if delta and self._below_delta(last_val, value, delta):
+                self.pending.pop(topic, None)
+                self.suppressed["below_delta"] += 1
+                return
+            if rate:
+                remaining = (
+                    self.last_publish_times[topic] + rate -
+                    self.eventloop.get_loop_time()
+                )
+                if remaining > 0:
+                    self.pending[topic] = (value, eventtime)
+                    self.suppressed["rate_limited"] += 1
+                    if topic not in self.pending_handles:
+                        self.pending_handles[topic] = self.eventloop.delay_callback(
+                            remaining, self._flush_topic, topic
+                        )
+                    return
+        self._publish(topic, value, eventtime)
+
+    def _publish(self, topic: str, value: Any, eventtime: float) -> None:
+        self.pending.pop(topic, None)
+        self.last_values[topic] = value
+        self.last_publish_times[topic] = self.eventloop.get_loop_time()
+        self.published_count += 1
+        self.publish_cb(topic, value, eventtime)
+
+    def _flush_topic(self, topic: str) -> None:
+        self.pending_handles.pop(topic, None)
+        pending = self.pending.get(topic)
+        if pending is not None:
+            self._publish(topic, *pending)
+
+    def flush(self) -> None:
+        for hdl in self.pending_handles.values():
+            hdl.cancel()
+        self.pending_handles.clear()
+        for topic, (value, eventtime) in list(self.pending.items()):
+            self._publish(topic, value, eventtime)
+
+    def reset(self) -> None:
+        # Forget published values so the next update of each field is
+        # published.  Pending values are discarded.
+        for hdl in self.pending_handles.values():
+            hdl.cancel()
+        self.pending_handles.clear()
+        self.pending.clear()
+        self.last_values.clear()
+        self.last_publish_times.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "published": self.published_count,
+            "suppressed": dict(self.suppressed),
+            "pending": len(self.pending)
+        }
+
+
 class MQTTClient(APITransport):
     def __init__(self, config: ConfigHelper) -> None:
         self.server = config.get_server()
@@ -365,6 +498,11 @@ class MQTTClient(APITransport):
                 "between 0 and 2")
         self.publish_split_status = \
             config.getboolean("publish_split_status", False)
+        self.split_publisher: Optional[SplitStatusPublisher] = None
+        if self.publish_split_status:
+            self.split_publisher = SplitStatusPublisher(
+                config, self._publish_split_field
+            )
         client_id: str = config.get("client_id", "")
         if PAHO_MQTT_VERSION < (2, 0):
             self.client = ExtPahoClient(
@@ -400,6 +538,10 @@ class MQTTClient(APITransport):
             self._handle_subscription_request,
             transports=ep_transports
         )
+        self.server.register_endpoint(
+            "/server/mqtt/status_stats", RequestType.GET,
+            self._handle_status_stats_request, transports=ep_transports
+        )
 
         # Subscribe to API requests
         self.api_request_topic = f"{self.instance_name}/moonraker/api/request"
@@ -485,6 +627,8 @@ class MQTTClient(APITransport):
             payload = self.status_cache
             self.status_cache = {}
             self._publish_status_update(payload, self.last_status_time)
+        if self.split_publisher is not None:
+            self.split_publisher.flush()
 
     def _on_message(self,
                     client: str | paho_mqtt.Client,
@@ -513,6 +657,10 @@ class MQTTClient(APITransport):
         if reason_code == 0:
             self.publish_topic(self.moonraker_status_topic,
                                {'server': 'online'}, retain=True)
+            if self.split_publisher is not None:
+                # The broker may not have retained previously published
+                # values, publish all fields on their next update
+                self.split_publisher.reset()
             subs = [(k, v[0]) for k, v in self.subscribed_topics.items()]
             if subs:
                 _, msg_id = client.subscribe(subs)
@@ -825,19 +973,27 @@ class MQTTClient(APITransport):
         return eventtime + self.status_interval
 
     def _publish_status_update(self, status: Dict[str, Any], eventtime: float) -> None:
-        if self.publish_split_status:
-            for objkey in status:
-                objval = status[objkey]
-                for statekey in objval:
-                    payload = {'eventtime': eventtime, 'value': objval[statekey]}
-                    self.publish_topic(
+        if self.split_publisher is not None:
+            for objkey, objval in status.items():
+                for statekey, value in objval.items():
+                    self.split_publisher.process_field(
                         f"{self.klipper_state_prefix}/{objkey}/{statekey}",
-                        payload, retain=True
+                        objkey, statekey, value, eventtime
                     )
         else:
             payload = {'eventtime': eventtime, 'status': status}
             self.publish_topic(self.klipper_status_topic, payload)
 
+    def _publish_split_field(self, topic: str, value: Any, eventtime: float) -> None:
+        payload = {'eventtime': eventtime, 'value': value}
+        self.publish_topic(topic, payload, retain=True)
+
+    async def _handle_status_stats_request(
+        self, web_request: WebRequest
+    ) -> Dict[str, Any]:
+        if self.split_publisher is None:
+            raise self.server.error("Split status publishing is not enabled")
+        return self.split_publisher.get_stats()
 
     def get_instance_name(self) -> str:
         return self.instance_name
@@ -119,7 +119,7 @@ class ProcStats:
         if self.vcgencmd is not None:
             ts = await self._check_throttled_state()
         cpu_temp = await self.event_loop.run_in_thread(
-            self._get_cpu_temperature)
+            self._get_cpu_temperature, pool="system")
         wsm: WebsocketManager = self.server.lookup_component("websockets")
         websocket_count = wsm.get_count()
         return {
@@ -138,7 +138,7 @@ class ProcStats:
         for stats in self.proc_stat_queue:
             msg += f"\n{self._format_stats(stats)}"
         cpu_temp = await self.event_loop.run_in_thread(
-            self._get_cpu_temperature)
+            self._get_cpu_temperature, pool="system")
         msg += f"\nCPU Temperature: {cpu_temp}"
         logging.info(msg)
         if self.vcgencmd is not None:
@@ -151,7 +151,9 @@ class ProcStats:
         time_diff = update_time - self.last_update_time
         usage = round((proc_time - self.last_proc_time) / time_diff * 100, 2)
         cpu_temp, mem, mem_units, net = (
-            await self.event_loop.run_in_thread(self._read_system_files)
+            await self.event_loop.run_in_thread(
+                self._read_system_files, pool="system"
+            )
         )
         for dev in net:
             bytes_sec = 0.
@@ -207,7 +209,9 @@ class ProcStats:
         if self.vcgencmd is not None:
             async with self.throttle_check_lock:
                 try:
-                    resp = await self.event_loop.run_in_thread(self.vcgencmd.run)
+                    resp = await self.event_loop.run_in_thread(
+                        self.vcgencmd.run, pool="system"
+                    )
                     ret["bits"] = tstate = int(resp.strip().split("=")[-1], 16)
                     ret["flags"] = [
                         desc for flag, desc in THROTTLED_FLAGS.items() if flag & tstate
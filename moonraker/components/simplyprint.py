@@ -1429,7 +1429,7 @@ class WebcamStream:
         resp = await self.client.get(self.url, headers, enable_cache=False)
         resp.raise_for_status()
         return await self.eventloop.run_in_thread(
-            self._encode_image, resp.content
+            self._encode_image, resp.content, pool="cpu"
         )
 
     def _encode_image(self, image: bytes) -> str:
@@ -1595,7 +1595,7 @@ class PrintHandler:
             return False
         kapi: KlippyAPI = self.server.lookup_component("klippy_apis")
         try:
-            result = await kapi.query_objects({"print_stats": None})
+            result = await kapi.query_objects({"print_stats": None}, fresh=True)
         except Exception:
             # Klippy not connected
             return False
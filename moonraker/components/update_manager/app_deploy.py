@@ -351,7 +351,7 @@ class AppDeploy(BaseDeploy):
             return hashlib.sha256(f.read_bytes()).hexdigest()
         try:
             event_loop = self.server.get_event_loop()
-            return await event_loop.run_in_thread(hash_func, filename)
+            return await event_loop.run_in_thread(hash_func, filename, pool="cpu")
         except Exception:
             return None
 
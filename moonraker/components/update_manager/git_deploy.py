@@ -13,21 +13,26 @@ import re
 import logging
 from .app_deploy import AppDeploy
 from .common import Channel
+from .git_state import GitStateReader
 from ...utils.versions import GitVersion
 
 # Annotation imports
 from typing import (
     TYPE_CHECKING,
     Any,
+    Callable,
     Optional,
     Dict,
     List,
+    Tuple,
+    TypeVar,
 )
 if TYPE_CHECKING:
     from ...confighelper import ConfigHelper
     from ..shell_command import ShellCommand
     from .update_manager import CommandHelper
     from ..http_client import HttpClient
+    _T = TypeVar("_T")
 
 class GitDeploy(AppDeploy):
     def __init__(self, config: ConfigHelper) -> None:
@@ -247,6 +252,8 @@ class GitRepo:
         self.channel = channel
         self.pinned_commit = pinned_commit
         self.is_shallow = False
+        self.state_reader: Optional[GitStateReader] = None
+        self.tag_cache: Optional[Tuple[Tuple[Any, ...], Dict[str, str]]] = None
 
     async def restore_state(self, storage: Dict[str, Any]) -> None:
         self.valid_git_repo: bool = storage.get('repo_valid', False)
@@ -349,7 +356,8 @@ class GitRepo:
                     )
                     self.recovery_url = "?"
             if need_fetch:
-                await self.fetch()
+                async with self.cmd_helper.get_network_semaphore():
+                    await self.fetch()
             self.diverged = await self.check_diverged()
 
             # Parse GitHub Owner from URL
@@ -466,10 +474,45 @@ class GitRepo:
             self.git_folder_path = resolved_path
         if self.git_folder_path.is_dir():
             self.is_shallow = self.git_folder_path.joinpath("shallow").is_file()
+            reader = self.state_reader
+            if reader is None or reader.git_dir != self.git_folder_path:
+                self.state_reader = GitStateReader(self.git_folder_path)
             return True
         return False
 
+    async def _read_git_state(
+        self, func: Callable[[GitStateReader], Optional[_T]]
+    ) -> Optional[_T]:
+        # Queries state directly from the git folder.  Returns None when
+        # the state must be read using the git cli.
+        reader = self.state_reader
+        if reader is None:
+            return None
+
+        def _read() -> Optional[_T]:
+            if not reader.is_supported():
+                return None
+            return func(reader)
+
+        eventloop = self.server.get_event_loop()
+        try:
+            return await eventloop.run_in_thread(_read, pool="disk_io")
+        except Exception:
+            logging.exception(f"Git Repo {self.alias}: Failed to read git state")
+            return None
+
     async def _find_current_branch(self) -> None:
+        # An attached HEAD is resolved from the git folder.  Git infers the
+        # ref checked out by a detached HEAD from the reflog, so use the cli.
+        branch_state = await self._read_git_state(
+            lambda reader: reader.branch_state()
+        )
+        if branch_state is not None:
+            self.head_detached = False
+            self.git_branch, self.branches = branch_state
+            rkey = f"branch.{self.git_branch}.remote"
+            self.git_remote = (await self.config_get(rkey)) or "?"
+            return
         # Populate list of current branches
         blist = await self.list_branches()
         current_branch = ""
@@ -828,6 +871,19 @@ class GitRepo:
     async def remote(self, command: str = "", validate: bool = False) -> str:
         self._verify_repo(check_remote=validate)
         async with self.git_operation_lock:
+            if not command:
+                names = await self._read_git_state(
+                    lambda reader: reader.remote_names()
+                )
+                if names is not None:
+                    return "\n".join(names)
+            elif command.startswith("get-url ") and len(command.split()) == 2:
+                remote = command.split()[1]
+                url = await self._read_git_state(
+                    lambda reader: reader.remote_url(remote)
+                )
+                if url is not None:
+                    return url
             resp = await self._run_git_cmd(
                 f"remote {command}")
             return resp.strip()
@@ -841,6 +897,11 @@ class GitRepo:
     async def rev_parse(self, args: str = "") -> str:
         self._verify_repo()
         async with self.git_operation_lock:
+            sha = await self._read_git_state(
+                lambda reader: reader.rev_parse(args)
+            )
+            if sha is not None:
+                return sha
             resp = await self._run_git_cmd(f"rev-parse {args}".strip())
             return resp.strip()
 
@@ -857,6 +918,12 @@ class GitRepo:
         get_all: bool = False,
         local_only: bool = False
     ) -> Optional[str]:
+        if not pattern and not get_all:
+            value = await self._read_git_state(
+                lambda reader: reader.config_get(key)
+            )
+            if value is not None:
+                return value
         local = "--local " if local_only else ""
         cmd = f"{local}--get-all" if get_all else f"{local}--get"
         args = f"{cmd} {key} '{pattern}'" if pattern else f"{cmd} {key}"
@@ -927,7 +994,9 @@ class GitRepo:
                 f"Git Repo {self.alias}: Starting Clone Recovery...")
             event_loop = self.server.get_event_loop()
             if self.backup_path.exists():
-                await event_loop.run_in_thread(shutil.rmtree, self.backup_path)
+                await event_loop.run_in_thread(
+                    shutil.rmtree, self.backup_path, pool="file_ops"
+                )
             await self._check_lock_file_exists(remove=True)
             cmd = (
                 f"clone --branch {self.primary_branch} --filter=blob:none "
@@ -940,9 +1009,13 @@ class GitRepo:
                     f"Git Repo {self.alias}: Git Clone Failed")
                 raise self.server.error("Git Clone Error") from e
             if self.src_path.exists():
-                await event_loop.run_in_thread(shutil.rmtree, self.src_path)
+                await event_loop.run_in_thread(
+                    shutil.rmtree, self.src_path, pool="file_ops"
+                )
             await event_loop.run_in_thread(
-                shutil.move, str(self.backup_path), str(self.src_path))
+                shutil.move, str(self.backup_path), str(self.src_path),
+                pool="file_ops"
+            )
             self.repo_corrupt = False
             self.valid_git_repo = True
             self.cmd_helper.notify_update_response(
@@ -1011,6 +1084,22 @@ class GitRepo:
         tip = f"{self.git_remote}/{self.git_branch}"
         cnt_arg = f"--count={count} " if count > 0 else ""
         async with self.git_operation_lock:
+            # Finding tags merged between HEAD and the tip requires a commit
+            # walk.  The result is reused until HEAD, the tip or the tags
+            # change.
+            tag_state = await self._read_git_state(
+                lambda reader: (
+                    count, reader.resolve_ref("HEAD"), reader.rev_parse(tip),
+                    tuple(sorted(reader.list_refs("refs/tags/").items()))
+                )
+            )
+            if tag_state is not None and None in tag_state:
+                tag_state = None
+            if (
+                tag_state is not None and self.tag_cache is not None and
+                self.tag_cache[0] == tag_state
+            ):
+                return dict(self.tag_cache[1])
             resp = await self._run_git_cmd(
                 f"for-each-ref {cnt_arg}--sort='-creatordate' --contains=HEAD "
                 f"--merged={tip} --format={GIT_REF_FMT} 'refs/tags'"
@@ -1023,6 +1112,8 @@ class GitRepo:
                 sha, ref = parts[1:]
                 tag = ref.split('/')[-1]
                 tagged_commits[sha] = tag
+            if tag_state is not None:
+                self.tag_cache = (tag_state, dict(tagged_commits))
             # Return tagged commits as SHA keys mapped to tag values
             return tagged_commits
 
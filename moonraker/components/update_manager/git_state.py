@@ -0,0 +1,341 @@
+# Read git repository state from disk
+#
+# Copyright (C) 2026 agent <agent@local>
+#
+# This file may be distributed under the terms of the GNU GPLv3 license.
+
+from __future__ import annotations
+import os
+import re
+import pathlib
+
+# Annotation imports
+from typing import (
+    Any,
+    Callable,
+    Optional,
+    Dict,
+    List,
+    Tuple,
+)
+
+SHA_PATTERN = re.compile(r"^[0-9a-f]{40}(?:[0-9a-f]{24})?$")
+REF_NAME_PATTERN = re.compile(r"^[A-Za-z0-9_][A-Za-z0-9_./-]*$")
+CONFIG_SECTION_PATTERN = re.compile(r'^\[\s*([A-Za-z0-9.-]+)(?:\s+"(.*)")?\s*\]')
+CONFIG_ESCAPES = {"n": "\n", "t": "\t", "b": "\b", "\\": "\\", '"': '"'}
+# Refs that are stored per worktree rather than in the common directory
+WORKTREE_REFS = ("HEAD", "ORIG_HEAD", "refs/worktree/", "refs/bisect/")
+MAX_SYMREF_DEPTH = 5
+
+ConfigEntries = List[Tuple[str, str]]
+
+class GitStateReader:
+    """
+    Reads branches, refs, tags and configuration directly from the files
+    in a repo's git folder, avoiding a git process for simple queries.
+    Queries return None when the answer cannot be determined from disk
+    alone, in which case the caller should fall back to the git cli.
+    """
+    def __init__(self, git_dir: pathlib.Path) -> None:
+        self.git_dir = git_dir
+        self.common_dir = git_dir
+        commondir_file = git_dir.joinpath("commondir")
+        if commondir_file.is_file():
+            # Linked worktrees share refs and config with the main repo
+            common = commondir_file.read_text().strip()
+            self.common_dir = git_dir.joinpath(common).resolve()
+        self.file_cache: Dict[pathlib.Path, Tuple[Tuple[int, int], Any]] = {}
+
+    def _read_cached(
+        self, path: pathlib.Path, parser: Callable[[str], Any]
+    ) -> Any:
+        # Parsed results are reused until the file is modified
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            self.file_cache.pop(path, None)
+            return None
+        key = (st.st_mtime_ns, st.st_size)
+        cached = self.file_cache.get(path)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        result = parser(path.read_text(errors="ignore"))
+        self.file_cache[path] = (key, result)
+        return result
+
+    def _ref_path(self, ref: str) -> pathlib.Path:
+        if ref.startswith(WORKTREE_REFS):
+            return self.git_dir.joinpath(ref)
+        return self.common_dir.joinpath(ref)
+
+    def _read_loose_ref(self, ref: str) -> Optional[str]:
+        try:
+            return self._ref_path(ref).read_text().strip()
+        except (FileNotFoundError, NotADirectoryError, IsADirectoryError):
+            return None
+
+    def _get_packed_refs(self) -> Dict[str, str]:
+        packed = self._read_cached(
+            self.common_dir.joinpath("packed-refs"), parse_packed_refs
+        )
+        return packed or {}
+
+    def _get_config(self) -> Optional[ConfigEntries]:
+        return self._read_cached(
+            self.common_dir.joinpath("config"), parse_config
+        )
+
+    def is_supported(self) -> bool:
+        # The reftable backend and per worktree config are not handled
+        entries = self._get_config()
+        if entries is None:
+            return False
+        for key, value in entries:
+            if key == "extensions.refstorage" and value.lower() != "files":
+                return False
+            if key == "extensions.worktreeconfig" and value.lower() == "true":
+                return False
+        return True
+
+    def resolve_ref(self, ref: str) -> Optional[str]:
+        """
+        Resolves a full ref name, such as HEAD or refs/heads/master, to the
+        object name it references.  Returns None if the ref does not exist.
+        """
+        for _ in range(MAX_SYMREF_DEPTH):
+            if ".." in ref or not REF_NAME_PATTERN.match(ref):
+                return None
+            value = self._read_loose_ref(ref)
+            if value is None:
+                value = self._get_packed_refs().get(ref)
+                if value is None:
+                    return None
+            if value.startswith("ref:"):
+                ref = value[4:].strip()
+                continue
+            value = value.lower()
+            return value if SHA_PATTERN.match(value) else None
+        return None
+
+    def rev_parse(self, name: str) -> Optional[str]:
+        """
+        Resolves a ref using the rules git uses to disambiguate short
+        names.  Revision expressions and abbreviated object names are
+        not handled.
+        """
+        if SHA_PATTERN.match(name):
+            return name
+        if (
+            name.startswith("-") or ".." in name or
+            name.endswith((".lock", "/")) or not REF_NAME_PATTERN.match(name)
+        ):
+            return None
+        if name in ("HEAD", "ORIG_HEAD"):
+            return self.resolve_ref(name)
+        if name.isupper():
+            # Special refs such as FETCH_HEAD have their own format
+            return None
+        candidates = [
+            f"refs/{name}", f"refs/tags/{name}", f"refs/heads/{name}",
+            f"refs/remotes/{name}", f"refs/remotes/{name}/HEAD"
+        ]
+        if name.startswith("refs/"):
+            # Full ref names are matched as given first
+            candidates.insert(0, name)
+        for ref in candidates:
+            sha = self.resolve_ref(ref)
+            if sha is not None:
+                return sha
+        return None
+
+    def list_refs(self, prefix: str) -> Dict[str, str]:
+        """
+        Returns a mapping of ref names under the prefix, with the prefix
+        removed, to the object names they reference.
+        """
+        refs: Dict[str, str] = {}
+        for ref, sha in self._get_packed_refs().items():
+            if ref.startswith(prefix):
+                refs[ref[len(prefix):]] = sha
+        base = self._ref_path(prefix)
+        for root, _, files in os.walk(base):
+            for fname in files:
+                full_path = pathlib.Path(root).joinpath(fname)
+                name = full_path.relative_to(base).as_posix()
+                if name.endswith(".lock"):
+                    continue
+                loose_sha = self.resolve_ref(f"{prefix}{name}")
+                if loose_sha is not None:
+                    refs[name] = loose_sha
+        return refs
+
+    def branch_state(self) -> Optional[Tuple[str, List[str]]]:
+        """
+        Returns the checked out branch and a sorted list of local branches.
+        Returns None when HEAD is detached, as git infers the detached ref
+        from the reflog.
+        """
+        head = self._read_loose_ref("HEAD")
+        if head is None or not head.startswith("ref: refs/heads/"):
+            return None
+        current = head[len("ref: refs/heads/"):].strip()
+        branches = sorted(self.list_refs("refs/heads/").keys())
+        if current not in branches:
+            # Unborn branch
+            return None
+        return current, branches
+
+    def config_get(self, key: str) -> Optional[str]:
+        """
+        Returns the last value set for the key in the repo's local
+        config, or None if it isn't set locally.
+        """
+        entries = self._get_config()
+        if entries is None:
+            return None
+        key = normalize_config_key(key)
+        value: Optional[str] = None
+        for entry_key, entry_val in entries:
+            if entry_key == key:
+                value = entry_val
+        return value
+
+    def remote_names(self) -> Optional[List[str]]:
+        entries = self._get_config()
+        if entries is None:
+            return None
+        for legacy in ("remotes", "branches"):
+            path = self.common_dir.joinpath(legacy)
+            if path.is_dir() and any(path.iterdir()):
+                return None
+        names = set()
+        for key, _ in entries:
+            section = key.rpartition(".")[0]
+            if section.startswith("remote."):
+                names.add(section[7:])
+        return sorted(names)
+
+    def remote_url(self, remote: str) -> Optional[str]:
+        entries = self._get_config()
+        if entries is None or self._has_url_rewrites(entries):
+            return None
+        url: Optional[str] = None
+        key = normalize_config_key(f"remote.{remote}.url")
+        for entry_key, entry_val in entries:
+            if entry_key == key:
+                # The first configured url is the fetch url
+                url = entry_val
+                break
+        return url
+
+    def _has_url_rewrites(self, entries: ConfigEntries) -> bool:
+        # Remote urls may be rewritten by "insteadOf" in any config
+        for key, _ in entries:
+            if key.startswith("url.") and key.endswith("insteadof"):
+                return True
+        home = pathlib.Path.home()
+        xdg_home = os.environ.get("XDG_CONFIG_HOME", str(home.joinpath(".config")))
+        global_paths = [
+            home.joinpath(".gitconfig"),
+            pathlib.Path(xdg_home).joinpath("git/config"),
+            pathlib.Path("/etc/gitconfig")
+        ]
+        for path in global_paths:
+            if self._read_cached(path, lambda d: "insteadof" in d.lower()):
+                return True
+        return False
+
+def normalize_config_key(key: str) -> str:
+    # Section and variable names are case insensitive, subsections are not
+    section, _, remaining = key.partition(".")
+    subsection, _, name = remaining.rpartition(".")
+    section = section.lower()
+    if subsection:
+        section = f"{section}.{subsection}"
+    return f"{section}.{name.lower()}"
+
+def parse_packed_refs(data: str) -> Dict[str, str]:
+    refs: Dict[str, str] = {}
+    for line in data.splitlines():
+        if not line or line[0] in "#^":
+            # Skip the header and peeled tag entries
+            continue
+        sha, _, ref = line.partition(" ")
+        refs[ref.strip()] = sha.strip()
+    return refs
+
+def parse_config(data: str) -> Optional[ConfigEntries]:
+    """
+    Parses a git config file into a list of (key, value) entries in the
+    order they were set.  Returns None if the config includes other
+    files or can't be parsed.
+    """
+    entries: ConfigEntries = []
+    section = ""
+    lines = iter(data.splitlines())
+    for line in lines:
+        line = line.strip()
+        if not line or line[0] in "#;":
+            continue
+        if line[0] == "[":
+            match = CONFIG_SECTION_PATTERN.match(line)
+            if match is None:
+                return None
+            name, subsection = match.groups()
+            name = name.lower()
+            section = name
+            if subsection is not None:
+                subsection = re.sub(r"\\(.)", r"\1", subsection)
+                section = f"{name}.{subsection}"
+            if name in ("include", "includeif"):
+                return None
+            line = line[match.end():].strip()
+            if not line or line[0] in "#;":
+                continue
+        if not section:
+            return None
+        var, sep, raw = line.partition("=")
+        var = var.strip().lower()
+        if not re.match(r"^[a-z][a-z0-9-]*$", var):
+            return None
+        if not sep:
+            # A variable without a value is a boolean true
+            entries.append((f"{section}.{var}", "true"))
+            continue
+        while raw.endswith("\\") and not raw.endswith("\\\\"):
+            # Line continuation
+            raw = raw[:-1] + next(lines, "")
+        value = parse_config_value(raw)
+        if value is None:
+            return None
+        entries.append((f"{section}.{var}", value))
+    return entries
+
+def parse_config_value(raw: str) -> Optional[str]:
+    value: List[str] = []
+    pending_space = ""
+    in_quote = False
+    idx = 0
+    raw = raw.strip()
+    while idx < len(raw):
+        char = raw[idx]
+        idx += 1
+        if char == "\\":
+            if idx >= len(raw) or raw[idx] not in CONFIG_ESCAPES:
+                return None
+            value.append(pending_space + CONFIG_ESCAPES[raw[idx]])
+            pending_space = ""
+            idx += 1
+        elif char == '"':
+            in_quote = not in_quote
+        elif char in "#;" and not in_quote:
+            break
+        elif char.isspace() and not in_quote:
+            # Internal whitespace is preserved, trailing whitespace is not
+            pending_space += char
+        else:
+            value.append(pending_space + char)
+            pending_space = ""
+    if in_quote:
+        return None
+    return "".join(value)
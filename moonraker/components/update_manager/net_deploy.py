@@ -445,10 +445,11 @@ class NetDeploy(AppDeploy):
                 await self._finalize_executable(temp_download_file, new_ver)
             else:
                 await event_loop.run_in_thread(
-                    self._extract_release, temp_persist_dir, temp_download_file
+                    self._extract_release, temp_persist_dir, temp_download_file,
+                    pool="file_ops"
                 )
         finally:
-            await event_loop.run_in_thread(td.cleanup)
+            await event_loop.run_in_thread(td.cleanup, pool="file_ops")
         if dep_info is not None:
             await self._update_dependencies(dep_info, force_dep_update)
         self.version = new_ver
@@ -96,7 +96,8 @@ class PackageDeploy(BaseDeploy):
         try:
             # Do not force a refresh until the server has started
             if self.server.is_running():
-                await self._update_package_cache(force=True)
+                async with self.cmd_helper.get_network_semaphore():
+                    await self._update_package_cache(force=True)
             self.available_packages = await self.provider.get_packages()
             pkg_msg = "\n".join(self.available_packages)
             self.log_info(
@@ -87,6 +87,9 @@ class UpdateManager:
             raise config.error("The start and end hours specified"
                                " in 'refresh_window' cannot be the same.")
 
+        self.refresh_concurrency = config.getint(
+            "refresh_concurrency", 4, minval=1
+        )
         self.cmd_helper = CommandHelper(config, self.get_updaters)
         BaseDeploy.set_command_helper(self.cmd_helper)
         self.updaters: Dict[str, BaseDeploy] = {}
@@ -257,6 +260,25 @@ class UpdateManager:
         if notify:
             self.cmd_helper.notify_update_refreshed()
 
+    async def _refresh_updaters(self, updaters: List[BaseDeploy]) -> None:
+        # Refresh updaters concurrently, limited to the configured number
+        # of refreshes in flight.  A refreshed notification is sent as each
+        # updater completes so clients are not left waiting on the slowest.
+        sem = asyncio.Semaphore(self.refresh_concurrency)
+
+        async def _refresh(updater: BaseDeploy) -> None:
+            async with sem:
+                await updater.refresh()
+            self.cmd_helper.notify_update_refreshed()
+
+        results = await asyncio.gather(
+            *[_refresh(updater) for updater in updaters],
+            return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+
     def _is_within_refresh_window(self) -> bool:
         cur_hour = time.localtime(time.time()).tm_hour
         if self.refresh_window[0] < self.refresh_window[1]:
@@ -276,7 +298,6 @@ class UpdateManager:
                 # Don't Refresh during a print
                 logging.info("Klippy is printing, auto refresh aborted")
                 return eventtime + UPDATE_REFRESH_INTERVAL
-        need_notify = False
         machine: Machine = self.server.lookup_component("machine")
         if machine.validation_enabled():
             logging.info(
@@ -286,18 +307,17 @@ class UpdateManager:
             self.initial_refresh_complete = True
             return eventtime + UPDATE_REFRESH_INTERVAL
         async with self.cmd_request_lock:
+            pending = [
+                updater for updater in list(self.updaters.values())
+                if updater.needs_refresh(log_remaining_time)
+            ]
             try:
-                for name, updater in list(self.updaters.items()):
-                    if updater.needs_refresh(log_remaining_time):
-                        await updater.refresh()
-                        need_notify = True
+                await self._refresh_updaters(pending)
             except Exception:
                 logging.exception("Unable to Refresh Status")
                 return eventtime + UPDATE_REFRESH_INTERVAL
             finally:
                 self.initial_refresh_complete = True
-        if need_notify:
-            self.cmd_helper.notify_update_refreshed()
         return eventtime + UPDATE_REFRESH_INTERVAL
 
     async def _handle_update_request(self, web_request: WebRequest) -> str:
@@ -419,12 +439,10 @@ class UpdateManager:
                 self.cmd_request_lock.release()
         vinfo: Dict[str, Any] = {}
         try:
+            if check_refresh:
+                await self._refresh_updaters(list(self.updaters.values()))
             for name, updater in list(self.updaters.items()):
-                if check_refresh:
-                    await updater.refresh()
                 vinfo[name] = updater.get_update_status()
-        except Exception:
-            raise
         finally:
             if check_refresh:
                 self.cmd_request_lock.release()
@@ -455,10 +473,12 @@ class UpdateManager:
                 "Server is busy, cannot perform refresh", 503
             )
         async with self.cmd_request_lock:
+            await self._refresh_updaters([
+                updater for updater_name, updater in list(self.updaters.items())
+                if name is None or updater_name == name
+            ])
             vinfo: Dict[str, Any] = {}
             for updater_name, updater in list(self.updaters.items()):
-                if name is None or updater_name == name:
-                    await updater.refresh()
                 vinfo[updater_name] = updater.get_update_status()
             ret = self.cmd_helper.get_rate_limit_stats()
             ret['version_info'] = vinfo
@@ -541,13 +561,18 @@ class CommandHelper:
         # database management
         db: DBComp = self.server.lookup_component('database')
         db.register_local_namespace("update_manager")
-        self.umdb = db.wrap_namespace("update_manager")
+        self.umdb = db.wrap_namespace("update_manager", cache_size=32)
 
         # Refresh Time Tracking (default is to refresh every 7 days)
         refresh_interval = config.getint('refresh_interval', 168)
         # Convert to seconds
         self.refresh_interval = refresh_interval * 60 * 60
 
+        # Limit concurrent network fetches so they do not starve the local
+        # git queries of refreshes running in parallel
+        network_concurrency = config.getint("network_concurrency", 2, minval=1)
+        self.network_sem = asyncio.Semaphore(network_concurrency)
+
         # GitHub API Rate Limit Tracking
         self.gh_rate_limit: Optional[int] = None
         self.gh_limit_remaining: Optional[int] = None
@@ -572,6 +597,9 @@ class CommandHelper:
     def get_refresh_interval(self) -> float:
         return self.refresh_interval
 
+    def get_network_semaphore(self) -> asyncio.Semaphore:
+        return self.network_sem
+
     def get_umdb(self) -> NamespaceWrapper:
         return self.umdb
 
@@ -322,9 +322,9 @@ class WebClientDeploy(BaseDeploy):
                 f"Download Complete, extracting release to '{self.path}'")
             await event_loop.run_in_thread(
                 self._extract_release, temp_persist_dir,
-                temp_download_file)
+                temp_download_file, pool="file_ops")
         finally:
-            await event_loop.run_in_thread(td.cleanup)
+            await event_loop.run_in_thread(td.cleanup, pool="file_ops")
         self.version = self.remote_version
         await self._validate_client_info()
         if self._valid and rollback_info is None:
@@ -323,7 +323,7 @@ class WebCam:
         try:
             eventloop = self._server.get_event_loop()
             addr_info = await eventloop.run_in_thread(
-                socket.getaddrinfo, addr, int(port)
+                socket.getaddrinfo, addr, int(port), pool="network"
             )
             if addr_info:
                 addr = addr_info[0][4][0]
@@ -16,6 +16,7 @@ from ..common import (
     TransportType,
 )
 from ..utils import ServerError, parse_ip_address
+from ..utils import json_wrapper as jsonw
 
 # Annotation imports
 from typing import (
@@ -51,6 +52,15 @@ class WebsocketManager:
         self.clients: Dict[int, BaseRemoteConnection] = {}
         self.bridge_connections: Dict[int, BridgeSocket] = {}
         self.closed_event: Optional[asyncio.Event] = None
+        self.queue_max_frames = config.getint(
+            "max_websocket_queue_frames", 1000, minval=10
+        )
+        self.queue_max_bytes = config.getint(
+            "max_websocket_queue_size", 4096, minval=64
+        ) * 1024
+        self.queue_overflow_timeout = config.getfloat(
+            "websocket_queue_timeout", 30., minval=0.
+        )
         app: MoonrakerApp = self.server.lookup_component("application")
         app.register_websocket_handler("/websocket", WebSocket)
         app.register_websocket_handler("/klippysocket", BridgeSocket)
@@ -209,10 +219,16 @@ class WebsocketManager:
         msg: Dict[str, Any] = {'jsonrpc': "2.0", 'method': "notify_" + name}
         if data:
             msg['params'] = data
+        # Encode the notification once and share the resulting (immutable)
+        # frame among all eligible clients.  Encoding is deferred until
+        # the first eligible client is found.
+        frame: Optional[bytes] = None
         for sc in list(self.clients.values()):
             if sc.uid in mask or sc.need_auth:
                 continue
-            sc.queue_message(msg)
+            if frame is None:
+                frame = jsonw.dumps(msg)
+            sc.queue_message(frame)
 
     def get_count(self) -> int:
         return len(self.clients)
@@ -279,7 +295,7 @@ class WebSocket(WebSocketHandler, BaseRemoteConnection):
         self.__class__.connection_count -= 1
         kconn: Klippy = self.server.lookup_component("klippy_connection")
         kconn.remove_subscription(self)
-        self.message_buf = []
+        self.clear_message_queue()
         now = self.eventloop.get_loop_time()
         pong_elapsed = now - self.last_pong_time
         for resp in self.pending_responses.values():
@@ -300,7 +316,7 @@ class WebSocket(WebSocketHandler, BaseRemoteConnection):
             await self.write_message(message)
         except WebSocketClosedError:
             self.is_closed = True
-            self.message_buf.clear()
+            self.clear_message_queue()
             logging.info(
                 f"Websocket closed while writing: {self.uid}")
         except Exception:
@@ -6,6 +6,7 @@
 
 from __future__ import annotations
 import os
+import sys
 import contextlib
 import asyncio
 import inspect
@@ -13,10 +14,19 @@ import functools
 import socket
 import time
 import logging
+import threading
+import traceback
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from .utils import ServerError
 from typing import (
     TYPE_CHECKING,
+    Any,
     Awaitable,
     Callable,
+    Deque,
+    Dict,
+    List,
     Optional,
     Tuple,
     TypeVar,
@@ -38,6 +48,31 @@ if TYPE_CHECKING:
     FlexCallback = Callable[..., Optional[Awaitable]]
     TimerCallback = Callable[[float], Union[float, Awaitable[float]]]
 
+# Named executor pools and their default worker count.  Work submitted
+# without a pool name runs in asyncio's default executor.
+#   disk_io:  Reads and writes of file content, ie: downloads and uploads
+#   file_ops: Bulk file system operations such as copies, removal of
+#             directory trees and archive creation
+#   cpu:      CPU bound work such as hashing and parsing
+#   network:  Blocking network calls such as DNS lookups
+#   system:   Probes of /proc, /sys and system utilities
+EXECUTOR_POOLS: Dict[str, int] = {
+    "disk_io": 4,
+    "file_ops": 2,
+    "cpu": 2,
+    "network": 4,
+    "system": 2
+}
+
+# Loop lag is measured by a probe scheduled at a fixed interval.  The lag
+# histogram buckets are upper bounds in milliseconds.
+LOOP_PROBE_INTERVAL = .1
+LAG_BUCKETS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+SLOW_CALLBACK_REPORT_SIZE = 20
+SLOW_CALLBACK_TRACK_SIZE = 100
+STALL_SAMPLE_SIZE = 10
+STALL_STACK_DEPTH = 12
+
 class EventLoop:
     UVLOOP_ENABLED = _uvl_enabled
     TimeoutError = asyncio.TimeoutError
@@ -51,6 +86,11 @@ class EventLoop:
     def reset(self) -> None:
         self.aioloop = asyncio.get_running_loop()
         self.bg_tasks: Set[asyncio.Task] = set()
+        self.executor_pools: Dict[str, ExecutorPool] = {}
+        self.loop_monitor: Optional[LoopMonitor] = None
+        self.pool_config: Dict[str, Tuple[int, int]] = {
+            name: (workers, 0) for name, workers in EXECUTOR_POOLS.items()
+        }
         self.add_signal_handler = self.aioloop.add_signal_handler
         self.remove_signal_handler = self.aioloop.remove_signal_handler
         self.add_reader = self.aioloop.add_reader
@@ -60,6 +100,7 @@ class EventLoop:
         self.get_loop_time = self.aioloop.time
         self.create_future = self.aioloop.create_future
         self.call_at = self.aioloop.call_at
+        self.call_soon = self.aioloop.call_soon
         self.set_debug = self.aioloop.set_debug
         self.is_running = self.aioloop.is_running
 
@@ -116,9 +157,65 @@ class EventLoop:
 
     def run_in_thread(self,
                       callback: Callable[..., _T],
-                      *args
+                      *args,
+                      pool: Optional[str] = None
                       ) -> Awaitable[_T]:
-        return self.aioloop.run_in_executor(None, callback, *args)
+        if pool is None:
+            return self.aioloop.run_in_executor(None, callback, *args)
+        return self.get_executor_pool(pool).submit(callback, *args)
+
+    def configure_executor_pool(
+        self, name: str, max_workers: int, queue_limit: int = 0
+    ) -> None:
+        if name not in self.pool_config:
+            raise ServerError(f"Unknown executor pool '{name}'")
+        if name in self.executor_pools:
+            raise ServerError(f"Executor pool '{name}' is already running")
+        self.pool_config[name] = (max_workers, queue_limit)
+
+    def get_executor_pool(self, name: str) -> ExecutorPool:
+        exec_pool = self.executor_pools.get(name)
+        if exec_pool is None:
+            if name not in self.pool_config:
+                raise ServerError(f"Unknown executor pool '{name}'")
+            max_workers, queue_limit = self.pool_config[name]
+            exec_pool = ExecutorPool(self, name, max_workers, queue_limit)
+            self.executor_pools[name] = exec_pool
+        return exec_pool
+
+    def get_executor_stats(self) -> Dict[str, Dict[str, Any]]:
+        stats: Dict[str, Dict[str, Any]] = {}
+        for name, (max_workers, queue_limit) in self.pool_config.items():
+            exec_pool = self.executor_pools.get(name)
+            if exec_pool is None:
+                stats[name] = ExecutorPool.idle_stats(max_workers, queue_limit)
+            else:
+                stats[name] = exec_pool.get_stats()
+        return stats
+
+    def shutdown_executor_pools(self) -> None:
+        for exec_pool in self.executor_pools.values():
+            exec_pool.shutdown()
+        self.executor_pools.clear()
+
+    def start_loop_monitor(
+        self, slow_callback_threshold: float, stall_threshold: float
+    ) -> None:
+        if self.loop_monitor is not None:
+            return
+        self.loop_monitor = LoopMonitor(
+            self, slow_callback_threshold, stall_threshold
+        )
+        self.loop_monitor.start()
+
+    def stop_loop_monitor(self) -> None:
+        if self.loop_monitor is not None:
+            self.loop_monitor.stop()
+
+    def get_loop_stats(self) -> Dict[str, Any]:
+        if self.loop_monitor is None:
+            return {"enabled": False}
+        return self.loop_monitor.get_stats()
 
     async def create_socket_connection(
         self, address: Tuple[str, int], timeout: Optional[float] = None
@@ -162,6 +259,317 @@ class EventLoop:
     def close(self):
         self.aioloop.close()
 
+class ExecutorPool:
+    def __init__(
+        self, eventloop: EventLoop, name: str, max_workers: int, queue_limit: int
+    ) -> None:
+        self.eventloop = eventloop
+        self.name = name
+        self.max_workers = max_workers
+        self.queue_limit = queue_limit
+        self.executor = ThreadPoolExecutor(
+            max_workers, thread_name_prefix=f"moonraker-{name}"
+        )
+        self.lock = threading.Lock()
+        # Counts of work submitted and not completed, and of work running
+        # in a worker thread.  The difference is the queue depth.
+        self.pending: int = 0
+        self.active: int = 0
+        self.peak_queued: int = 0
+        self.submitted: int = 0
+        self.completed: int = 0
+        self.rejected: int = 0
+        self.queued_submissions: int = 0
+        self.total_wait: float = 0.
+        self.max_wait: float = 0.
+        self.total_run: float = 0.
+        self.max_run: float = 0.
+
+    def submit(self, callback: Callable[..., _T], *args) -> Awaitable[_T]:
+        with self.lock:
+            queued = self.pending - self.active
+        if self.queue_limit and queued >= self.queue_limit:
+            self.rejected += 1
+            fut = self.eventloop.create_future()
+            fut.set_exception(ServerError(
+                f"Executor pool '{self.name}' queue limit reached", 503
+            ))
+            return fut
+        if self.pending >= self.max_workers:
+            self.queued_submissions += 1
+            self.peak_queued = max(self.peak_queued, queued + 1)
+        self.submitted += 1
+        self.pending += 1
+        times: List[float] = [time.monotonic(), 0., 0.]
+
+        def _run() -> _T:
+            times[1] = time.monotonic()
+            with self.lock:
+                self.active += 1
+            try:
+                return callback(*args)
+            finally:
+                times[2] = time.monotonic()
+                with self.lock:
+                    self.active -= 1
+
+        def _on_done(_: asyncio.Future) -> None:
+            with self.lock:
+                self.pending -= 1
+            self.completed += 1
+            if not times[2]:
+                # Cancelled before the callback completed
+                return
+            wait_time = times[1] - times[0]
+            run_time = times[2] - times[1]
+            self.total_wait += wait_time
+            self.max_wait = max(self.max_wait, wait_time)
+            self.total_run += run_time
+            self.max_run = max(self.max_run, run_time)
+
+        fut = self.eventloop.asyncio_loop.run_in_executor(self.executor, _run)
+        fut.add_done_callback(_on_done)
+        return fut
+
+    @staticmethod
+    def idle_stats(max_workers: int, queue_limit: int) -> Dict[str, Any]:
+        return {
+            "max_workers": max_workers,
+            "queue_limit": queue_limit,
+            "active": 0,
+            "queued": 0,
+            "peak_queued": 0,
+            "submitted": 0,
+            "completed": 0,
+            "rejected": 0,
+            "saturation": 0.,
+            "avg_wait_ms": 0.,
+            "max_wait_ms": 0.,
+            "avg_run_ms": 0.,
+            "max_run_ms": 0.
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self.lock:
+            active = self.active
+            queued = self.pending - self.active
+        ran = max(self.completed, 1)
+        submitted = max(self.submitted, 1)
+        return {
+            "max_workers": self.max_workers,
+            "queue_limit": self.queue_limit,
+            "active": active,
+            "queued": queued,
+            "peak_queued": self.peak_queued,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "saturation": round(self.queued_submissions / submitted, 4),
+            "avg_wait_ms": round(self.total_wait / ran * 1000., 3),
+            "max_wait_ms": round(self.max_wait * 1000., 3),
+            "avg_run_ms": round(self.total_run / ran * 1000., 3),
+            "max_run_ms": round(self.max_run * 1000., 3)
+        }
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(wait=False)
+
+def _describe_callback(callback: Any) -> str:
+    while isinstance(callback, functools.partial):
+        callback = callback.func
+    owner = getattr(callback, "__self__", None)
+    if isinstance(owner, asyncio.Task):
+        # Steps and wakeups of a task are identified by its coroutine
+        coro = owner.get_coro()
+        name = getattr(coro, "__qualname__", type(coro).__name__)
+        return f"Task {owner.get_name()} <{name}>"
+    name = getattr(callback, "__qualname__", None)
+    if name is None:
+        return repr(callback)
+    module = getattr(callback, "__module__", None)
+    return f"{module}.{name}" if module else name
+
+class LoopMonitor:
+    """
+    Tracks the health of the event loop.  A probe records how late the
+    loop runs a timer in a histogram.  Callbacks that run longer than
+    the slow callback threshold are tracked by name, which requires
+    the pure Python asyncio loop.  When the stall threshold is set a
+    thread samples the stack of the loop while it is stalled.
+    """
+    _active: Optional[LoopMonitor] = None
+    _orig_handle_run: Optional[Callable[[asyncio.Handle], None]] = None
+
+    def __init__(
+        self,
+        eventloop: EventLoop,
+        slow_callback_threshold: float,
+        stall_threshold: float
+    ) -> None:
+        self.eventloop = eventloop
+        self.slow_threshold = slow_callback_threshold
+        self.stall_threshold = stall_threshold
+        self.profile_callbacks = (
+            slow_callback_threshold > 0 and not eventloop.UVLOOP_ENABLED
+        )
+        self.probe_handle: Optional[asyncio.TimerHandle] = None
+        self.probe_time: float = 0.
+        self.heartbeat: float = time.monotonic()
+        self.lag_histogram: List[int] = [0] * (len(LAG_BUCKETS) + 1)
+        self.lag_samples: int = 0
+        self.total_lag: float = 0.
+        self.max_lag: float = 0.
+        self.slow_count: int = 0
+        self.slow_callbacks: Dict[str, List[float]] = {}
+        self.stalls: Deque[Dict[str, Any]] = deque(maxlen=STALL_SAMPLE_SIZE)
+        self.stall_count: int = 0
+        self.loop_thread_id = threading.get_ident()
+        self.stall_thread: Optional[threading.Thread] = None
+        self.stop_evt = threading.Event()
+
+    def start(self) -> None:
+        self.probe_time = self.eventloop.get_loop_time() + LOOP_PROBE_INTERVAL
+        self.probe_handle = self.eventloop.call_at(self.probe_time, self._probe)
+        if self.profile_callbacks and LoopMonitor._active is None:
+            LoopMonitor._active = self
+            LoopMonitor._orig_handle_run = asyncio.Handle._run
+            asyncio.Handle._run = _profiled_handle_run  # type: ignore
+        if self.stall_threshold > 0:
+            self.stall_thread = threading.Thread(
+                target=self._watch_stalls, name="moonraker-loop-monitor",
+                daemon=True
+            )
+            self.stall_thread.start()
+
+    def stop(self) -> None:
+        if self.probe_handle is not None:
+            self.probe_handle.cancel()
+            self.probe_handle = None
+        if LoopMonitor._active is self:
+            asyncio.Handle._run = LoopMonitor._orig_handle_run  # type: ignore
+            LoopMonitor._active = None
+            LoopMonitor._orig_handle_run = None
+        self.stop_evt.set()
+        if self.stall_thread is not None:
+            self.stall_thread.join(1.)
+            self.stall_thread = None
+
+    def _probe(self) -> None:
+        now = self.eventloop.get_loop_time()
+        self.heartbeat = time.monotonic()
+        lag = max(0., now - self.probe_time)
+        lag_ms = lag * 1000.
+        for idx, bound in enumerate(LAG_BUCKETS):
+            if lag_ms < bound:
+                break
+        else:
+            idx = len(LAG_BUCKETS)
+        self.lag_histogram[idx] += 1
+        self.lag_samples += 1
+        self.total_lag += lag
+        self.max_lag = max(self.max_lag, lag)
+        self.probe_time = now + LOOP_PROBE_INTERVAL
+        self.probe_handle = self.eventloop.call_at(self.probe_time, self._probe)
+
+    def record_callback(self, handle: asyncio.Handle, elapsed: float) -> None:
+        self.slow_count += 1
+        name = _describe_callback(handle._callback)  # type: ignore
+        entry = self.slow_callbacks.get(name)
+        if entry is None:
+            if len(self.slow_callbacks) >= SLOW_CALLBACK_TRACK_SIZE:
+                # Replace the tracked callback with the lowest max duration
+                fastest = min(
+                    self.slow_callbacks,
+                    key=lambda k: self.slow_callbacks[k][2]
+                )
+                if self.slow_callbacks[fastest][2] > elapsed:
+                    return
+                del self.slow_callbacks[fastest]
+            # count, total duration, max duration, last time
+            entry = self.slow_callbacks[name] = [0, 0., 0., 0.]
+        entry[0] += 1
+        entry[1] += elapsed
+        entry[2] = max(entry[2], elapsed)
+        entry[3] = time.time()
+
+    def _watch_stalls(self) -> None:
+        interval = self.stall_threshold / 2.
+        limit = LOOP_PROBE_INTERVAL + self.stall_threshold
+        last_sampled: float = 0.
+        while not self.stop_evt.wait(interval):
+            beat = self.heartbeat
+            stalled = time.monotonic() - beat
+            if stalled < limit or beat == last_sampled:
+                continue
+            # Sample each stall once
+            last_sampled = beat
+            frame = sys._current_frames().get(self.loop_thread_id)
+            if frame is None:
+                continue
+            stack = traceback.format_list(
+                traceback.extract_stack(frame)[-STALL_STACK_DEPTH:]
+            )
+            del frame
+            self.stall_count += 1
+            self.stalls.append({
+                "time": time.time(),
+                "stalled_ms": round(stalled * 1000., 3),
+                "stack": [line.rstrip() for line in stack]
+            })
+            logging.info(
+                f"EVENT LOOP STALLED: {stalled:.3f} seconds, loop stack:\n"
+                + "".join(stack).rstrip()
+            )
+
+    def get_summary(self) -> str:
+        samples = max(self.lag_samples, 1)
+        return (
+            f"Event Loop Lag: avg {self.total_lag / samples * 1000.:.3f}ms, "
+            f"max {self.max_lag * 1000.:.3f}ms, slow callbacks: "
+            f"{self.slow_count}, stalls: {self.stall_count}"
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        labels = [f"<{bound}ms" for bound in LAG_BUCKETS]
+        labels.append(f">={LAG_BUCKETS[-1]}ms")
+        slowest = sorted(
+            self.slow_callbacks.items(), key=lambda item: item[1][2],
+            reverse=True
+        )[:SLOW_CALLBACK_REPORT_SIZE]
+        samples = max(self.lag_samples, 1)
+        return {
+            "enabled": True,
+            "callback_profiling": self.profile_callbacks,
+            "slow_callback_threshold": self.slow_threshold,
+            "stall_threshold": self.stall_threshold,
+            "loop_lag": {
+                "samples": self.lag_samples,
+                "avg_ms": round(self.total_lag / samples * 1000., 3),
+                "max_ms": round(self.max_lag * 1000., 3),
+                "histogram": dict(zip(labels, self.lag_histogram))
+            },
+            "slow_callback_count": self.slow_count,
+            "slow_callbacks": [
+                {
+                    "name": name,
+                    "count": count,
+                    "avg_ms": round(total / count * 1000., 3),
+                    "max_ms": round(max_time * 1000., 3),
+                    "last_time": last_time
+                } for name, (count, total, max_time, last_time) in slowest
+            ],
+            "stall_count": self.stall_count,
+            "stalls": list(self.stalls)
+        }
+
+def _profiled_handle_run(handle: asyncio.Handle) -> None:
+    start = time.perf_counter()
+    LoopMonitor._orig_handle_run(handle)  # type: ignore
+    elapsed = time.perf_counter() - start
+    monitor = LoopMonitor._active
+    if monitor is not None and elapsed >= monitor.slow_threshold:
+        monitor.record_callback(handle, elapsed)
+
 class FlexTimer:
     def __init__(self,
                  eventloop: EventLoop,
@@ -18,9 +18,10 @@ import logging
 import signal
 import asyncio
 import uuid
+import inspect
 import traceback
 from . import confighelper
-from .eventloop import EventLoop
+from .eventloop import EventLoop, EXECUTOR_POOLS
 from .utils import (
     ServerError,
     Sentinel,
@@ -36,6 +37,7 @@ from .common import RequestType
 from typing import (
     TYPE_CHECKING,
     Any,
+    Awaitable,
     Optional,
     Callable,
     Coroutine,
@@ -57,6 +59,7 @@ if TYPE_CHECKING:
     _T = TypeVar("_T", Sentinel, Any)
 
 API_VERSION = (1, 5, 0)
+PERF_ROLLOVER_INTERVAL = 60.
 SERVER_COMPONENTS = ['application', 'websockets', 'klippy_connection']
 CORE_COMPONENTS = [
     'dbus_manager', 'database', 'file_manager', 'authorization',
@@ -78,6 +81,8 @@ class Server:
         self.log_manager = log_manager
         self.app_args = args
         self.events: Dict[str, List[FlexCallback]] = {}
+        self.pending_events: List[Tuple[asyncio.Future, str, Tuple]] = []
+        self.event_dispatch_pending: bool = False
         self.components: Dict[str, Any] = {}
         self.failed_components: List[str] = []
         self.warnings: Dict[str, str] = {}
@@ -98,6 +103,17 @@ class Server:
         log_level = logging.DEBUG if args["verbose"] else logging.INFO
         logging.getLogger().setLevel(log_level)
         self.event_loop.set_debug(args["asyncio_debug"])
+        self._configure_executor_pools(config)
+        self.loop_monitor_enabled = config.getboolean("enable_loop_monitor", True)
+        self.slow_callback_threshold = config.getfloat(
+            "slow_callback_threshold", 0., minval=0.
+        )
+        self.stall_sample_threshold = config.getfloat(
+            "stall_sample_threshold", 0., minval=0.
+        )
+        self.perf_rollover_timer = self.event_loop.register_timer(
+            self._update_perf_rollover
+        )
         self.klippy_connection: KlippyConnection
         self.klippy_connection = self.load_component(config, "klippy_connection")
 
@@ -124,12 +140,40 @@ class Server:
         self.register_endpoint(
             "/server/restart", RequestType.POST, self._handle_server_restart
         )
+        self.register_endpoint(
+            "/server/executors", RequestType.GET, self._handle_executors_request
+        )
+        self.register_endpoint(
+            "/server/perf", RequestType.GET, self._handle_perf_request
+        )
         self.register_notification("server:klippy_ready")
         self.register_notification("server:klippy_shutdown")
         self.register_notification("server:klippy_disconnect",
                                    "klippy_disconnected")
         self.register_notification("server:gcode_response")
 
+    def _configure_executor_pools(self, config: confighelper.ConfigHelper) -> None:
+        # Each line is in the format "pool=max_workers[,queue_limit]"
+        pool_cfg: Dict[str, str] = config.getdict("executor_pools", {})
+        for name, val in pool_cfg.items():
+            if name not in EXECUTOR_POOLS:
+                raise config.error(
+                    f"[server]: Option 'executor_pools', unknown pool '{name}'. "
+                    f"Must be one of {list(EXECUTOR_POOLS.keys())}"
+                )
+            try:
+                parts = [int(p.strip()) for p in val.split(",")]
+            except ValueError:
+                parts = []
+            if not 1 <= len(parts) <= 2 or parts[0] < 1 or min(parts) < 0:
+                raise config.error(
+                    f"[server]: Option 'executor_pools', invalid value "
+                    f"'{val}' for pool '{name}'"
+                )
+            max_workers = parts[0]
+            queue_limit = parts[1] if len(parts) > 1 else 0
+            self.event_loop.configure_executor_pool(name, max_workers, queue_limit)
+
     def get_app_args(self) -> Dict[str, Any]:
         return dict(self.app_args)
 
@@ -221,6 +265,11 @@ class Server:
             f"Hostname: {socket.gethostname()}")
         self.moonraker_app.listen(self.host, self.port, self.ssl_port)
         self.server_running = True
+        if self.loop_monitor_enabled:
+            self.event_loop.start_loop_monitor(
+                self.slow_callback_threshold, self.stall_sample_threshold
+            )
+            self.perf_rollover_timer.start(PERF_ROLLOVER_INTERVAL)
         if connect_to_klippy:
             self.klippy_connection.connect()
 
@@ -392,36 +441,61 @@ class Server:
 
     def send_event(self, event: str, *args) -> asyncio.Future:
         fut = self.event_loop.create_future()
-        self.event_loop.register_callback(
-            self._process_event, fut, event, *args)
+        self.pending_events.append((fut, event, args))
+        if not self.event_dispatch_pending:
+            self.event_dispatch_pending = True
+            self.event_loop.call_soon(self._dispatch_events)
         return fut
 
-    async def _process_event(
-        self, fut: asyncio.Future, event: str, *args
+    def _dispatch_events(self) -> None:
+        # All events sent since the last dispatch are processed in a single
+        # loop iteration.  Synchronous handlers are called inline, a task is
+        # only created for events with handlers that return awaitables.
+        # Events sent by handlers are deferred to the next dispatch.
+        self.event_dispatch_pending = False
+        pending = self.pending_events
+        self.pending_events = []
+        for fut, event, args in pending:
+            awaitables: List[Awaitable] = []
+            for func in self.events.get(event, []):
+                try:
+                    ret = func(*args)
+                except Exception:
+                    logging.exception(f"Error processing callback in event {event}")
+                else:
+                    if inspect.isawaitable(ret):
+                        awaitables.append(ret)
+            if awaitables:
+                self.event_loop.create_task(
+                    self._await_event_handlers(fut, event, awaitables)
+                )
+            elif not fut.done():
+                fut.set_result(None)
+
+    async def _await_event_handlers(
+        self, fut: asyncio.Future, event: str, awaitables: List[Awaitable]
     ) -> None:
-        events = self.events.get(event, [])
-        coroutines: List[Coroutine] = []
-        for func in events:
+        if len(awaitables) == 1:
+            # Avoid the overhead of gather for the common single handler case
             try:
-                ret = func(*args)
-            except Exception:
-                logging.exception(f"Error processing callback in event {event}")
+                await awaitables[0]
+            except Exception as e:
+                results: List[Any] = [e]
             else:
-                if ret is not None:
-                    coroutines.append(ret)
-        if coroutines:
-            results = await asyncio.gather(*coroutines, return_exceptions=True)
-            for val in results:
-                if isinstance(val, Exception):
-                    if sys.version_info < (3, 10):
-                        exc_info = "".join(traceback.format_exception(
-                            type(val), val, val.__traceback__
-                        ))
-                    else:
-                        exc_info = "".join(traceback.format_exception(val))
-                    logging.info(
-                        f"\nError processing callback in event {event}\n{exc_info}"
-                    )
+                results = []
+        else:
+            results = await asyncio.gather(*awaitables, return_exceptions=True)
+        for val in results:
+            if isinstance(val, Exception):
+                if sys.version_info < (3, 10):
+                    exc_info = "".join(traceback.format_exception(
+                        type(val), val, val.__traceback__
+                    ))
+                else:
+                    exc_info = "".join(traceback.format_exception(val))
+                logging.info(
+                    f"\nError processing callback in event {event}\n{exc_info}"
+                )
         if not fut.done():
             fut.set_result(None)
 
@@ -498,6 +572,9 @@ class Server:
                         f"Error executing 'close()' for component: {name}")
         # Allow cancelled tasks a chance to run in the eventloop
         await asyncio.sleep(.001)
+        self.event_loop.shutdown_executor_pools()
+        self.perf_rollover_timer.stop()
+        self.event_loop.stop_loop_monitor()
 
         self.exit_reason = exit_reason
         self.event_loop.remove_signal_handler(signal.SIGTERM)
@@ -507,6 +584,22 @@ class Server:
         self.event_loop.register_callback(self._stop_server)
         return "ok"
 
+    async def _handle_executors_request(
+        self, web_request: WebRequest
+    ) -> Dict[str, Any]:
+        return {"pools": self.event_loop.get_executor_stats()}
+
+    async def _handle_perf_request(
+        self, web_request: WebRequest
+    ) -> Dict[str, Any]:
+        return self.event_loop.get_loop_stats()
+
+    def _update_perf_rollover(self, eventtime: float) -> float:
+        monitor = self.event_loop.loop_monitor
+        if monitor is not None:
+            self.add_log_rollover_item("loop_perf", monitor.get_summary(), log=False)
+        return eventtime + PERF_ROLLOVER_INTERVAL
+
     async def _handle_info_request(self, web_request: WebRequest) -> Dict[str, Any]:
         raw = web_request.get_boolean("raw", False)
         file_manager: Optional[FileManager] = self.lookup_component(
@@ -0,0 +1,127 @@
+#! /usr/bin/python3
+# Benchmark for database write throughput
+#
+# Copyright (C) 2026 agent <agent@local>
+#
+# This file may be distributed under the terms of the GNU GPLv3 license
+#
+# Measures namespace writes per second from concurrent writers when each
+# command commits its own transaction, as earlier releases did, and with
+# group commits, in both the default rollback journal and WAL modes.  Also
+# measures nested key updates of a large record, comparing a full
+# read-modify-write of the record with in place JSON patches.
+import os
+import sys
+import time
+import asyncio
+import logging
+import pathlib
+import argparse
+import tempfile
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, str(pathlib.Path(__file__).parents[2]))
+from moonraker.components import database  # noqa: E402
+from moonraker.components.database import SqliteProvider  # noqa: E402
+from tests.mocks import MockServer, create_config  # noqa: E402
+
+MODES: Dict[str, Dict[str, Any]] = {
+    "legacy": {"group": False},
+    "group": {},
+    "group-2ms": {"commit_delay": .002},
+    "wal-legacy": {"group": False, "journal_mode": "wal"},
+    "wal-group": {"journal_mode": "wal"},
+    "wal-normal": {"journal_mode": "wal", "synchronous": "normal"},
+}
+
+async def run_mode(
+    db_path: pathlib.Path, options: Dict[str, Any], writers: int, count: int
+) -> List[float]:
+    if db_path.exists():
+        db_path.unlink()
+    config = create_config(MockServer(), "database", options)
+    provider = SqliteProvider(config, db_path)
+    if not options.get("group", True):
+        provider.group_commands.clear()
+    await provider.async_init()
+    value: Dict[str, Any] = {
+        "layout": {f"widget_{i}": {"x": i, "y": i * 2} for i in range(20)}
+    }
+
+    async def writer(idx: int) -> None:
+        for i in range(count):
+            await provider.execute_db_function(
+                provider.insert_item, "bench", f"client_{idx}.item_{i % 10}",
+                value
+            )
+    start = time.perf_counter()
+    await asyncio.gather(*[writer(i) for i in range(writers)])
+    elapsed = time.perf_counter() - start
+    commits = provider.commit_count or writers * count
+    await provider.stop()
+    provider.join()
+    return [writers * count / elapsed, writers * count / commits]
+
+def run_leaf_updates(db_path: pathlib.Path, record_kib: int, count: int) -> None:
+    print(f"\n{'leaf update':<12} {'record KiB':>10} {'updates/s':>10}")
+    widgets = {
+        f"widget_{i}": {"x": i, "y": i * 2, "title": "x" * 40}
+        for i in range(record_kib * 1024 // 64)
+    }
+    for patch in (False, True):
+        if db_path.exists():
+            db_path.unlink()
+        database.JSON_PATCH_SUPPORTED = patch
+        config = create_config(MockServer(), "database")
+        provider = SqliteProvider(config, db_path)
+        conn = provider.sync_conn
+        provider.insert_item(conn, "bench", "dashboard", {"layout": widgets})
+        start = time.perf_counter()
+        for i in range(count):
+            provider.insert_item(
+                conn, "bench", f"dashboard.layout.widget_{i % 50}.x", i
+            )
+        rate = count / (time.perf_counter() - start)
+        label = "json patch" if patch else "legacy"
+        print(f"{label:<12} {record_kib:>10} {rate:>10.1f}")
+        conn.close()
+
+async def main(
+    modes: List[str], writers: int, count: int, path: Optional[str],
+    record_kib: int
+) -> None:
+    print(f"{'mode':<12} {'writes/s':>10} {'writes/commit':>14}")
+    with tempfile.TemporaryDirectory(dir=path) as tmpdir:
+        db_path = pathlib.Path(tmpdir).joinpath("moonraker-sql.db")
+        for mode in modes:
+            rate, per_commit = await run_mode(db_path, MODES[mode], writers, count)
+            print(f"{mode:<12} {rate:>10.1f} {per_commit:>14.1f}")
+            for fname in os.listdir(tmpdir):
+                os.remove(os.path.join(tmpdir, fname))
+        if database.JSON_PATCH_SUPPORTED:
+            run_leaf_updates(db_path, record_kib, count)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark database write throughput")
+    parser.add_argument(
+        "-w", "--writers", type=int, default=8,
+        help="Number of concurrent writers")
+    parser.add_argument(
+        "-n", "--count", type=int, default=200,
+        help="Number of writes issued by each writer")
+    parser.add_argument(
+        "-m", "--modes", nargs="+", choices=list(MODES.keys()),
+        default=list(MODES.keys()), help="Modes to benchmark")
+    parser.add_argument(
+        "-d", "--directory", default=None,
+        help="Directory in which the database is created, for example a "
+        "path on the SD card.  Defaults to the system temp folder")
+    parser.add_argument(
+        "-r", "--record-size", type=int, default=256,
+        help="Size in KiB of the record used for nested key updates")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+    asyncio.run(main(
+        args.modes, args.writers, args.count, args.directory, args.record_size
+    ))
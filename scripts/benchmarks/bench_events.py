@@ -0,0 +1,131 @@
+#! /usr/bin/python3
+# Benchmark for server event dispatch
+#
+# Copyright (C) 2026 agent <agent@local>
+#
+# This file may be distributed under the terms of the GNU GPLv3 license
+#
+# Measures events dispatched per second when every handler of an event
+# is scheduled as its own task, the original dispatcher, and with batched
+# dispatch, where synchronous handlers are called inline and tasks are
+# only created for handlers that return awaitables.
+import sys
+import time
+import asyncio
+import logging
+import pathlib
+import argparse
+from typing import Any, Callable, Dict, List, Optional
+
+sys.path.insert(0, str(pathlib.Path(__file__).parents[2]))
+from moonraker.server import Server  # noqa: E402
+from moonraker.eventloop import EventLoop  # noqa: E402
+
+class LegacyDispatcher:
+    # Mirrors the dispatch path used prior to batched events
+    def __init__(self, event_loop: EventLoop) -> None:
+        self.event_loop = event_loop
+        self.events: Dict[str, List[Callable]] = {}
+
+    def send_event(self, event: str, *args) -> asyncio.Future:
+        fut = self.event_loop.create_future()
+        self.event_loop.register_callback(
+            self._process_event, fut, event, *args)
+        return fut
+
+    async def _process_event(
+        self, fut: asyncio.Future, event: str, *args
+    ) -> None:
+        coroutines: List[Any] = []
+        for func in self.events.get(event, []):
+            try:
+                ret = func(*args)
+            except Exception:
+                logging.exception(f"Error processing callback in event {event}")
+            else:
+                if ret is not None:
+                    coroutines.append(ret)
+        if coroutines:
+            await asyncio.gather(*coroutines, return_exceptions=True)
+        if not fut.done():
+            fut.set_result(None)
+
+def create_server(event_loop: EventLoop) -> Server:
+    # Only the attributes used by event dispatch are initialized
+    server = Server.__new__(Server)
+    server.event_loop = event_loop
+    server.events = {}
+    server.pending_events = []
+    server.event_dispatch_pending = False
+    return server
+
+def sync_handler(status: Dict[str, Any]) -> None:
+    status.get("eventtime")
+
+async def async_handler(status: Dict[str, Any]) -> None:
+    status.get("eventtime")
+
+async def run_dispatch(
+    dispatcher: Any, handlers: List[Callable], count: int, burst: int
+) -> float:
+    dispatcher.events["server:status_update"] = list(handlers)
+    status = {"eventtime": 0., "toolhead": {"position": [0., 0., 0., 0.]}}
+    start = time.perf_counter()
+    sent = 0
+    while sent < count:
+        futs: List[asyncio.Future] = []
+        for _ in range(min(burst, count - sent)):
+            futs.append(dispatcher.send_event("server:status_update", status))
+        sent += len(futs)
+        await futs[-1]
+    elapsed = time.perf_counter() - start
+    return count / elapsed
+
+async def main(count: int, burst: int, handler_count: int) -> None:
+    event_loop = EventLoop()
+    scenarios: Dict[str, List[Callable]] = {
+        "sync": [sync_handler] * handler_count,
+        "mixed": [sync_handler] * (handler_count - 1) + [async_handler],
+        "async": [async_handler] * handler_count,
+    }
+    print(
+        f"{'handlers':<10} {'legacy ev/s':>14} {'batched ev/s':>14} "
+        f"{'speedup':>8}"
+    )
+    for name, handlers in scenarios.items():
+        legacy = await run_dispatch(
+            LegacyDispatcher(event_loop), handlers, count, burst
+        )
+        batched = await run_dispatch(
+            create_server(event_loop), handlers, count, burst
+        )
+        print(
+            f"{name:<10} {legacy:>14.1f} {batched:>14.1f} "
+            f"{batched / legacy:>7.1f}x"
+        )
+
+def run(count: int, burst: int, handlers: int, uvloop: Optional[bool]) -> None:
+    if uvloop:
+        import uvloop as uvl
+        uvl.install()
+    asyncio.run(main(count, burst, handlers))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark server event dispatch")
+    parser.add_argument(
+        "-n", "--count", type=int, default=100000,
+        help="Number of events sent per scenario")
+    parser.add_argument(
+        "-b", "--burst", type=int, default=10,
+        help="Number of events sent before awaiting dispatch")
+    parser.add_argument(
+        "-H", "--handlers", type=int, default=3,
+        help="Number of handlers registered for the event")
+    parser.add_argument(
+        "-u", "--uvloop", action="store_true",
+        help="Run the benchmark with uvloop installed")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+    run(args.count, args.burst, max(1, args.handlers), args.uvloop)
@@ -0,0 +1,173 @@
+#! /usr/bin/python3
+# Benchmark for requests sent over the Klippy Unix socket
+#
+# Copyright (C) 2026 agent <agent@local>
+#
+# This file may be distributed under the terms of the GNU GPLv3 license
+#
+# Measures request/response throughput against a stand-in Klippy socket
+# server.  The "legacy" mode writes and drains each request and parses a
+# single frame per read, as the connection previously did.  The
+# "coalesced" mode gathers requests into one write per loop iteration and
+# parses every complete frame in a read.
+import sys
+import time
+import asyncio
+import logging
+import pathlib
+import argparse
+import tempfile
+from typing import Any, Dict, List
+
+sys.path.insert(0, str(pathlib.Path(__file__).parents[2]))
+from moonraker.utils import ServerError  # noqa: E402
+from moonraker.utils import json_wrapper as jsonw  # noqa: E402
+from moonraker.eventloop import EventLoop  # noqa: E402
+from moonraker.components.klippy_connection import (  # noqa: E402
+    KlippyConnection, KlippyRequest, UNIX_BUFFER_LIMIT
+)
+
+STATUS = {
+    "eventtime": 1234.5678,
+    "status": {
+        "toolhead": {"position": [110.2, 95.1, 12.4, 2415.8], "homed_axes": "xyz"},
+        "extruder": {"temperature": 239.87, "target": 240., "power": 0.41},
+        "heater_bed": {"temperature": 84.95, "target": 85., "power": 0.23}
+    }
+}
+
+async def handle_klippy_client(
+    reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+) -> None:
+    # Responds to each request with a status result, writing all
+    # responses for a read at once as Klippy's reactor does
+    buf = b""
+    while True:
+        data = await reader.read(UNIX_BUFFER_LIMIT)
+        if not data:
+            break
+        frames = (buf + data).split(b"\x03")
+        buf = frames.pop()
+        out: List[bytes] = []
+        for frame in frames:
+            req = jsonw.loads(frame)
+            out.append(jsonw.dumps({"id": req["id"], "result": STATUS}) + b"\x03")
+        writer.write(b"".join(out))
+        await writer.drain()
+    writer.close()
+
+class WriteCounter:
+    def __init__(self, writer: asyncio.StreamWriter) -> None:
+        self.writer = writer
+        self.count = 0
+
+    def write(self, data: bytes) -> None:
+        self.count += 1
+        self.writer.write(data)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.writer, name)
+
+class LegacyConnection:
+    # Mirrors the request path used prior to write coalescing
+    def __init__(self, event_loop: EventLoop, writer: Any) -> None:
+        self.event_loop = event_loop
+        self.writer = writer
+        self.closing = False
+        self.pending_requests: Dict[int, KlippyRequest] = {}
+
+    async def _read_stream(self, reader: asyncio.StreamReader) -> None:
+        while not reader.at_eof():
+            try:
+                data = await reader.readuntil(b'\x03')
+            except (ConnectionError, asyncio.IncompleteReadError):
+                break
+            cmd = jsonw.loads(data[:-1])
+            request = self.pending_requests.pop(cmd["id"], None)
+            if request is not None:
+                request.set_result(cmd["result"])
+
+    async def _write_request(self, request: KlippyRequest) -> None:
+        data = jsonw.dumps(request.to_dict()) + b"\x03"
+        try:
+            self.writer.write(data)
+            await self.writer.drain()
+        except Exception:
+            request.set_exception(ServerError("Klippy Write Request Error", 503))
+
+    async def _send_request(self, rpc_method: str, args: Dict[str, Any]) -> Any:
+        base_request = KlippyRequest(rpc_method, args)
+        self.pending_requests[base_request.id] = base_request
+        self.event_loop.register_callback(self._write_request, base_request)
+        try:
+            return await base_request.wait()
+        finally:
+            self.pending_requests.pop(base_request.id, None)
+
+def create_connection(event_loop: EventLoop, writer: Any) -> KlippyConnection:
+    # Only the attributes used to send requests and read responses
+    # are initialized
+    conn = KlippyConnection.__new__(KlippyConnection)
+    conn.event_loop = event_loop
+    conn.writer = writer
+    conn.closing = False
+    conn.pending_requests = {}
+    conn.remote_methods = {}
+    conn.write_buffer = []
+    conn.write_busy = False
+    return conn
+
+async def run_mode(
+    mode: str, sock_path: str, clients: int, count: int
+) -> List[float]:
+    event_loop = EventLoop()
+    reader, writer = await asyncio.open_unix_connection(
+        sock_path, limit=UNIX_BUFFER_LIMIT
+    )
+    counter = WriteCounter(writer)
+    conn: Any
+    if mode == "legacy":
+        conn = LegacyConnection(event_loop, counter)
+    else:
+        conn = create_connection(event_loop, counter)
+    read_task = asyncio.create_task(conn._read_stream(reader))
+    params = {"objects": {"toolhead": None, "extruder": None, "heater_bed": None}}
+
+    async def client() -> None:
+        for _ in range(count):
+            await conn._send_request("objects/query", params)
+    start = time.perf_counter()
+    await asyncio.gather(*[client() for _ in range(clients)])
+    elapsed = time.perf_counter() - start
+    conn.closing = True
+    writer.close()
+    await writer.wait_closed()
+    read_task.cancel()
+    total = clients * count
+    return [total / elapsed, total / counter.count]
+
+async def main(clients: int, count: int) -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        sock_path = str(pathlib.Path(tmpdir).joinpath("klippy_uds"))
+        server = await asyncio.start_unix_server(
+            handle_klippy_client, sock_path, limit=UNIX_BUFFER_LIMIT
+        )
+        print(f"{'mode':<12} {'requests/s':>12} {'requests/write':>15}")
+        for mode in ("legacy", "coalesced"):
+            rate, per_write = await run_mode(mode, sock_path, clients, count)
+            print(f"{mode:<12} {rate:>12.1f} {per_write:>15.1f}")
+        server.close()
+        await server.wait_closed()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark Klippy socket request throughput")
+    parser.add_argument(
+        "-c", "--clients", type=int, default=16,
+        help="Number of concurrent clients issuing requests")
+    parser.add_argument(
+        "-n", "--count", type=int, default=500,
+        help="Number of sequential requests issued by each client")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+    asyncio.run(main(args.clients, args.count))
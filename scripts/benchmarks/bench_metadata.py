@@ -0,0 +1,157 @@
+#! /usr/bin/python3
+# Benchmark for gcode metadata extraction
+#
+# Copyright (C) 2026 agent <agent@local>
+#
+# This file may be distributed under the terms of the GNU GPLv3 license
+#
+# Measures slicer identification and field parsing for a set of gcode
+# files.  When no files are supplied synthetic files are generated for
+# several slicer flavors.
+import os
+import sys
+import time
+import random
+import pathlib
+import argparse
+import tempfile
+from typing import Dict, List
+
+sys.path.insert(0, str(pathlib.Path(__file__).parents[2]))
+from moonraker.components.file_manager.metadata import (  # noqa: E402
+    BaseSlicer
+)
+
+PRUSA_CONFIG = {
+    "layer_height": "0.2",
+    "first_layer_height": "0.2",
+    "filament used [mm]": "4521.12",
+    "filament used [cm3]": "10.87",
+    "filament used [g]": "13.48",
+    "total filament used [g]": "13.48",
+    "estimated printing time (normal mode)": "1h 2m 3s",
+    "filament_type": "PETG",
+    "filament_settings_id": "\"Prusament PETG\"",
+    "filament_colour": "#FF8000",
+    "extruder_colour": "\"\"",
+    "temperature": "240",
+    "first_layer_temperature": "230",
+    "first_layer_bed_temperature": "85",
+    "chamber_temperature": "0",
+    "nozzle_diameter": "0.4",
+    "single_extruder_multi_material": "0",
+    "printer_model": "MK4",
+    "printer_vendor": "Prusa",
+    "printer_variant": "0.4",
+    "profile_version": "1.9.0",
+}
+
+def gcode_body(target_size: int) -> List[str]:
+    rnd = random.Random(0)
+    lines: List[str] = ["G28", "M190 S85", "M109 S230"]
+    size = 0
+    z = 0.2
+    layer = 0
+    while size < target_size:
+        lines.append(";BEFORE_LAYER_CHANGE")
+        lines.append(f";{z:.2f}")
+        lines.append(f"G1 Z{z:.2f} F720")
+        lines.append(f";LAYER:{layer}")
+        for _ in range(200):
+            line = (
+                f"G1 X{rnd.uniform(0, 250):.3f} Y{rnd.uniform(0, 210):.3f} "
+                f"E{rnd.uniform(0, 1):.5f}"
+            )
+            size += len(line) + 1
+            lines.append(line)
+        z += 0.2
+        layer += 1
+    lines.append("M84")
+    return lines
+
+def prusa_gcode(name: str, size: int) -> str:
+    lines = [
+        f"; generated by {name} 2.7.1 on 2026-01-01 at 12:00:00 UTC", "",
+        "; external perimeters extrusion width = 0.45mm", ""
+    ]
+    lines.extend(gcode_body(size))
+    lines.extend(f"; {key} = {val}" for key, val in PRUSA_CONFIG.items())
+    lines.append("; prusaslicer_config = begin")
+    for i in range(400):
+        lines.append(f"; setting_{i} = {i}")
+    lines.append("; prusaslicer_config = end")
+    return "\n".join(lines) + "\n"
+
+def cura_gcode(size: int) -> str:
+    lines = [
+        ";FLAVOR:Marlin", ";TIME:3723", ";Filament used: 4.52m",
+        ";Layer height: 0.2", ";MINZ:0.2", ";MAXZ:24.6",
+        ";Generated with Cura_SteamEngine 5.6.0"
+    ]
+    lines.extend(gcode_body(size))
+    return "\n".join(lines) + "\n"
+
+def unknown_gcode(size: int) -> str:
+    return "\n".join(gcode_body(size)) + "\n"
+
+def generate_files(dest: str, size: int) -> List[str]:
+    files: Dict[str, str] = {
+        "prusaslicer.gcode": prusa_gcode("PrusaSlicer", size),
+        "orcaslicer.gcode": prusa_gcode("OrcaSlicer", size),
+        "cura.gcode": cura_gcode(size),
+        "unknown.gcode": unknown_gcode(size),
+    }
+    paths: List[str] = []
+    for fname, content in files.items():
+        path = os.path.join(dest, fname)
+        with open(path, "w") as f:
+            f.write(content)
+        paths.append(path)
+    return paths
+
+def run(paths: List[str], iterations: int) -> None:
+    print(
+        f"{'file':<24} {'size MiB':>9} {'load ms':>9} {'index ms':>9} "
+        f"{'parse ms':>9} {'fields':>7}"
+    )
+    for path in paths:
+        load = index = parse = 0.
+        fields = 0
+        for _ in range(iterations):
+            start = time.perf_counter()
+            slicer = BaseSlicer.from_file(path)
+            load += time.perf_counter() - start
+            start = time.perf_counter()
+            slicer.config_index
+            index += time.perf_counter() - start
+            start = time.perf_counter()
+            fields = len(slicer.run_parsers())
+            parse += time.perf_counter() - start
+        size = os.path.getsize(path) / (1024 * 1024)
+        print(
+            f"{os.path.basename(path)[:24]:<24} {size:>9.2f} "
+            f"{load / iterations * 1e3:>9.2f} "
+            f"{index / iterations * 1e3:>9.2f} "
+            f"{parse / iterations * 1e3:>9.2f} {fields:>7}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark gcode metadata extraction")
+    parser.add_argument(
+        "files", nargs="*", help="GCode files to benchmark.  Synthetic "
+        "files are generated when none are supplied")
+    parser.add_argument(
+        "-i", "--iterations", type=int, default=20,
+        help="Number of times each file is parsed")
+    parser.add_argument(
+        "-s", "--size", type=float, default=8.,
+        help="Approximate size of generated files in MiB")
+    args = parser.parse_args()
+    if args.files:
+        run(args.files, args.iterations)
+    else:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            gen_size = int(args.size * 1024 * 1024)
+            run(generate_files(tmpdir, gen_size), args.iterations)
@@ -0,0 +1,170 @@
+#! /usr/bin/python3
+# Benchmark for the gcode metadata cache
+#
+# Copyright (C) 2026 agent <agent@local>
+#
+# This file may be distributed under the terms of the GNU GPLv3 license
+#
+# Compares the per-read cost of handing out a deep copy of each metadata
+# record with sharing immutable records, and the startup time and
+# memory of loading all records against indexing them behind the
+# namespace cache.  Reads of indexed records are timed for cache hits and
+# for misses served by the database provider.
+import sys
+import time
+import copy
+import asyncio
+import logging
+import pathlib
+import argparse
+import tempfile
+import tracemalloc
+from typing import Any, Dict, List
+
+sys.path.insert(0, str(pathlib.Path(__file__).parents[2]))
+from moonraker.components.database import (  # noqa: E402
+    MoonrakerDatabase, NamespaceWrapper, SqliteProvider
+)
+from moonraker.components.file_manager.file_manager import (  # noqa: E402
+    MetadataRecords, METADATA_NAMESPACE
+)
+from tests.mocks import MockServer, create_config  # noqa: E402
+
+def make_record(idx: int) -> Dict[str, Any]:
+    return {
+        "size": 4000000 + idx,
+        "modified": 1700000000. + idx,
+        "uuid": f"3f9a2c1e-0000-4000-8000-{idx:012d}",
+        "slicer": "PrusaSlicer",
+        "slicer_version": "2.7.1",
+        "gcode_start_byte": 42113,
+        "gcode_end_byte": 3987654,
+        "object_height": 24.6,
+        "estimated_time": 3723,
+        "nozzle_diameter": 0.4,
+        "layer_height": 0.2,
+        "first_layer_height": 0.2,
+        "first_layer_extr_temp": 230.,
+        "first_layer_bed_temp": 85.,
+        "filament_name": "Prusament PETG",
+        "filament_type": "PETG",
+        "filament_total": 4521.12,
+        "filament_weight_total": 13.48,
+        "filament_colors": ["#FF8000"],
+        "extruder_colors": [],
+        "filament_temps": [240],
+        "thumbnails": [
+            {
+                "width": w, "height": h, "size": w * h // 4,
+                "relative_path": f".thumbs/file_{idx}-{w}x{h}.png"
+            } for (w, h) in ((32, 32), (300, 300), (400, 300))
+        ],
+        "print_start_time": None,
+        "job_id": None
+    }
+
+def open_database(db_path: pathlib.Path) -> MoonrakerDatabase:
+    # A database component without a server.  The provider thread is not
+    # started, so requests complete synchronously until it is.
+    config = create_config(MockServer(), "database")
+    db = MoonrakerDatabase.__new__(MoonrakerDatabase)
+    db.server = config.get_server()
+    db.eventloop = db.server.get_event_loop()
+    db.db_provider = SqliteProvider(config, db_path)
+    db.namespace_caches = {}
+    return db
+
+def create_database(db_path: pathlib.Path, count: int) -> None:
+    db = open_database(db_path)
+    db.insert_batch(METADATA_NAMESPACE, {
+        f"folder_{i % 50}/file_{i}.gcode": make_record(i) for i in range(count)
+    })
+    db.db_provider.sync_conn.close()
+
+def load_records(db: MoonrakerDatabase, cache_size: int) -> MetadataRecords:
+    mddb = NamespaceWrapper(METADATA_NAMESPACE, db, False)
+    db.namespace_caches.clear()
+    db._enable_cache(METADATA_NAMESPACE, cache_size)
+    records = MetadataRecords(db, mddb, cache_size)
+    records.load()
+    return records
+
+def bench_reads(db: MoonrakerDatabase, iterations: int) -> None:
+    records = load_records(db, 0)
+    keys = records.keys()[:1000]
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for key in keys:
+            copy.deepcopy(records.get(key))
+    legacy = (time.perf_counter() - start) / (iterations * len(keys)) * 1e6
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for key in keys:
+            dict(records.get(key))  # type: ignore
+    shared = (time.perf_counter() - start) / (iterations * len(keys)) * 1e6
+    print(f"{'read':<12} {'deepcopy us':>12} {'shared us':>12} {'speedup':>8}")
+    print(f"{'get':<12} {legacy:>12.2f} {shared:>12.2f} {legacy / shared:>7.1f}x")
+
+def bench_startup(db: MoonrakerDatabase, cache_sizes: List[int]) -> None:
+    print(
+        f"\n{'cache size':<12} {'load ms':>12} {'memory MiB':>12} "
+        f"{'peak MiB':>12}"
+    )
+    for size in cache_sizes:
+        tracemalloc.start()
+        start = time.perf_counter()
+        records = load_records(db, size)
+        elapsed = (time.perf_counter() - start) * 1e3
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del records
+        label = "all" if size == 0 else str(size)
+        print(
+            f"{label:<12} {elapsed:>12.2f} {current / (1024 * 1024):>12.2f} "
+            f"{peak / (1024 * 1024):>12.2f}"
+        )
+
+async def bench_lazy_reads(db: MoonrakerDatabase, cache_size: int) -> None:
+    records = load_records(db, cache_size)
+    keys = records.keys()[:cache_size]
+    provider = db.db_provider
+    await provider.async_init()
+    start = time.perf_counter()
+    for key in keys:
+        await records.fetch(key)
+    miss = (time.perf_counter() - start) / len(keys) * 1e6
+    start = time.perf_counter()
+    for key in keys:
+        records.get(key)
+    hit = (time.perf_counter() - start) / len(keys) * 1e6
+    await provider.stop()
+    provider.join()
+    print(f"\n{'lazy read':<12} {'miss us':>12} {'hit us':>12}")
+    print(f"{cache_size:<12} {miss:>12.2f} {hit:>12.2f}")
+
+async def main(count: int, iterations: int, cache_sizes: List[int]) -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db_path = pathlib.Path(tmpdir).joinpath("moonraker-sql.db")
+        create_database(db_path, count)
+        db = open_database(db_path)
+        bench_reads(db, iterations)
+        bench_startup(db, cache_sizes)
+        lazy_size = max(cache_sizes)
+        if lazy_size > 0:
+            await bench_lazy_reads(db, lazy_size)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark metadata reads and startup loading")
+    parser.add_argument(
+        "-n", "--count", type=int, default=20000,
+        help="Number of metadata records in the generated database")
+    parser.add_argument(
+        "-i", "--iterations", type=int, default=20,
+        help="Number of passes over 1000 records when timing reads")
+    parser.add_argument(
+        "-c", "--cache-sizes", type=int, nargs="+", default=[0, 100, 1000],
+        help="Cache sizes to benchmark, 0 loads all records")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+    asyncio.run(main(args.count, args.iterations, args.cache_sizes))
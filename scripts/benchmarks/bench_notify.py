@@ -0,0 +1,94 @@
+#! /usr/bin/python3
+# Benchmark for websocket notification broadcasts
+#
+# Copyright (C) 2026 agent <agent@local>
+#
+# This file may be distributed under the terms of the GNU GPLv3 license
+#
+# Compares the per-broadcast CPU cost of serializing a notification
+# separately for every connected client with encoding it a single time and
+# sending the same frame to all of them.
+import sys
+import time
+import pathlib
+import argparse
+from typing import Any, Dict, List, Union
+
+sys.path.insert(0, str(pathlib.Path(__file__).parents[2]))
+from moonraker.utils import json_wrapper as jsonw  # noqa: E402
+from moonraker.components.websockets import WebsocketManager  # noqa: E402
+
+class StubConnection:
+    def __init__(self, uid: int) -> None:
+        self.uid = uid
+        self.need_auth = False
+        self.message_buf: List[Union[bytes, str]] = []
+
+    def queue_message(self, message: Union[bytes, str, Dict[str, Any]]):
+        # Mirrors BaseRemoteConnection.queue_message without a writer
+        self.message_buf.append(
+            jsonw.dumps(message) if isinstance(message, dict) else message
+        )
+        if len(self.message_buf) > 64:
+            self.message_buf.clear()
+
+def make_payload() -> List[Any]:
+    return [{
+        "cpu_temp": 48.312,
+        "moonraker_stats": {
+            "time": 1700000000.123, "cpu_usage": 2.45, "memory": 41234,
+            "mem_units": "kB"
+        },
+        "network": {
+            iface: {"rx_bytes": 123456789, "tx_bytes": 987654321,
+                    "bandwidth": 1024.5}
+            for iface in ("lo", "eth0", "wlan0", "can0")
+        },
+        "system_cpu_usage": {f"cpu{i}": 3.25 * i for i in range(5)},
+        "websocket_connections": 12
+    }]
+
+def legacy_notify(
+    clients: Dict[int, StubConnection], name: str, data: List[Any]
+) -> None:
+    msg: Dict[str, Any] = {'jsonrpc': "2.0", 'method': "notify_" + name}
+    if data:
+        msg['params'] = data
+    for sc in list(clients.values()):
+        if sc.need_auth:
+            continue
+        sc.queue_message(msg)
+
+def run(client_counts: List[int], iterations: int) -> None:
+    payload = make_payload()
+    wsm = WebsocketManager.__new__(WebsocketManager)
+    print(f"{'clients':>8} {'legacy us':>12} {'shared us':>12} {'speedup':>8}")
+    for count in client_counts:
+        clients = {i: StubConnection(i) for i in range(count)}
+        wsm.clients = clients  # type: ignore
+        start = time.perf_counter()
+        for _ in range(iterations):
+            legacy_notify(clients, "proc_stat_update", payload)
+        legacy = (time.perf_counter() - start) / iterations * 1e6
+        start = time.perf_counter()
+        for _ in range(iterations):
+            wsm.notify_clients("proc_stat_update", payload)
+        shared = (time.perf_counter() - start) / iterations * 1e6
+        print(
+            f"{count:>8} {legacy:>12.2f} {shared:>12.2f} "
+            f"{legacy / shared:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark per-broadcast cost against client count")
+    parser.add_argument(
+        "-i", "--iterations", type=int, default=2000,
+        help="Number of broadcasts per client count")
+    parser.add_argument(
+        "-c", "--clients", type=int, nargs="+",
+        default=[1, 2, 5, 10, 15, 25, 50],
+        help="Client counts to benchmark")
+    args = parser.parse_args()
+    run(args.clients, args.iterations)
@@ -1,43 +1,55 @@
 from __future__ import annotations
 import asyncio
-from utils import ServerError
+from moonraker.utils import ServerError
 from .mock_gpio import MockGpiod
+from .mock_server import MockServer, create_config
+from typing import List, Optional
 
 __all__ = ("MockReader", "MockWriter", "MockComponent", "MockWebsocket",
-           "MockGpiod")
+           "MockGpiod", "MockServer", "create_config")
 
 class MockWriter:
-    def __init__(self, wait_drain: bool = False) -> None:
-        self.wait_drain = wait_drain
+    def __init__(self, action: str = "raise_error") -> None:
+        self.action = action
+        self.data: List[bytes] = []
 
-    def write(self, data: str) -> None:
-        pass
+    def write(self, data: bytes) -> None:
+        self.data.append(data)
 
     async def drain(self) -> None:
-        if self.wait_drain:
+        if self.action == "wait":
             evt = asyncio.Event()
             await evt.wait()
-        else:
+        elif self.action == "raise_error":
             raise ServerError("TestError")
 
+    def close(self) -> None:
+        pass
+
+    async def wait_closed(self) -> None:
+        pass
+
 class MockReader:
-    def __init__(self, action: str = "") -> None:
+    def __init__(
+        self, action: str = "", chunks: Optional[List[bytes]] = None
+    ) -> None:
         self.action = action
+        self.chunks = [b"NotJsonDecodable\x03"] if chunks is None else chunks
         self.eof = False
 
     def at_eof(self) -> bool:
         return self.eof
 
-    async def readuntil(self, stop: bytes) -> bytes:
+    async def read(self, size: int = -1) -> bytes:
         if self.action == "wait":
             evt = asyncio.Event()
             await evt.wait()
             return b""
         elif self.action == "raise_error":
             raise ServerError("TestError")
-        else:
-            self.eof = True
-            return b"NotJsonDecodable"
+        data = self.chunks.pop(0) if self.chunks else b""
+        self.eof = not self.chunks
+        return data
 
 
 class MockComponent:
@@ -0,0 +1,88 @@
+from __future__ import annotations
+import asyncio
+from moonraker.eventloop import EventLoop
+from moonraker.confighelper import ConfigHelper, DictSourceWrapper
+from moonraker.utils import ServerError, Sentinel
+from typing import Any, Dict, List, Optional, Tuple
+
+class MockServer:
+    """
+    Stands in for the Server when a component is tested without loading
+    the application.  Components are registered by the test, sent events
+    are recorded and resolved immediately.  Must be created with an event
+    loop running.
+    """
+    error = ServerError
+
+    def __init__(self, app_args: Optional[Dict[str, Any]] = None) -> None:
+        self.event_loop = EventLoop()
+        self.app_args: Dict[str, Any] = app_args or {}
+        self.components: Dict[str, Any] = {}
+        self.warnings: List[str] = []
+        self.sent_events: List[Tuple[str, Tuple[Any, ...]]] = []
+        self.server_running: bool = False
+
+    def get_event_loop(self) -> EventLoop:
+        return self.event_loop
+
+    def get_app_args(self) -> Dict[str, Any]:
+        return dict(self.app_args)
+
+    def get_app_arg(self, key: str, default=Sentinel.MISSING) -> Any:
+        val = self.app_args.get(key, default)
+        if val is Sentinel.MISSING:
+            raise KeyError(f"No key '{key}' in Application Arguments")
+        return val
+
+    def is_running(self) -> bool:
+        return self.server_running
+
+    def is_verbose_enabled(self) -> bool:
+        return False
+
+    def add_warning(self, warning: str, *args, **kwargs) -> str:
+        self.warnings.append(warning)
+        return str(id(warning))
+
+    def add_log_rollover_item(
+        self, name: str, item: str, log: bool = True
+    ) -> None:
+        pass
+
+    def lookup_component(self, name: str, default: Any = Sentinel.MISSING) -> Any:
+        component = self.components.get(name, default)
+        if component is Sentinel.MISSING:
+            raise ServerError(f"Component ({name}) not found")
+        return component
+
+    def load_component(
+        self, config: ConfigHelper, name: str, default: Any = Sentinel.MISSING
+    ) -> Any:
+        # Components are not loaded, only those registered are returned
+        return self.lookup_component(name, default)
+
+    def register_endpoint(self, *args, **kwargs) -> None:
+        pass
+
+    def register_debug_endpoint(self, *args, **kwargs) -> None:
+        pass
+
+    def register_notification(self, *args, **kwargs) -> None:
+        pass
+
+    def register_event_handler(self, *args, **kwargs) -> None:
+        pass
+
+    def send_event(self, event: str, *args) -> asyncio.Future:
+        self.sent_events.append((event, args))
+        fut = self.event_loop.create_future()
+        fut.set_result(None)
+        return fut
+
+def create_config(
+    server: MockServer, section: str, options: Optional[Dict[str, Any]] = None
+) -> ConfigHelper:
+    # Options are parsed and validated by a real ConfigHelper
+    source = DictSourceWrapper()
+    source.read_dict({section: options or {}})
+    return ConfigHelper(server, source, section, {})  # type: ignore
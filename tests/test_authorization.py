@@ -0,0 +1,146 @@
+from __future__ import annotations
+import pytest
+import asyncio
+import datetime
+import secrets
+from collections import OrderedDict
+from libnacl.sign import Signer
+from moonraker.common import UserInfo, WebRequest
+from moonraker.utils import ServerError
+from moonraker.components.authorization import Authorization, base64url_encode
+from mocks import MockServer
+from typing import Any, List, Tuple
+
+class UserTable:
+    # Records statements rather than writing to the database
+    def __init__(self) -> None:
+        self.statements: List[Tuple[str, Tuple[Any, ...]]] = []
+
+    async def __aenter__(self) -> UserTable:
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        pass
+
+    async def execute(self, statement: str, params: Tuple[Any, ...]) -> None:
+        self.statements.append((statement, params))
+
+def create_authorization() -> Authorization:
+    # An authorization shell with only the users and keys used to issue
+    # and validate tokens
+    auth = Authorization.__new__(Authorization)
+    auth.server = MockServer()  # type: ignore
+    auth.issuer = "http://moonraker.local:7125"
+    auth.users = {}
+    auth.public_jwks = {}
+    auth.jwk_verifiers = {}
+    auth.token_cache = OrderedDict()
+    auth.token_cache_hits = 0
+    auth.token_cache_misses = 0
+    auth.user_table = UserTable()  # type: ignore
+    return auth
+
+def add_user(auth: Authorization, username: str) -> Signer:
+    private_key = Signer()
+    jwk_id = base64url_encode(secrets.token_bytes()).decode()
+    auth.users[username] = UserInfo(
+        username, "", jwt_secret=private_key.hex_seed().decode(),
+        jwk_id=jwk_id
+    )
+    auth._add_jwk(jwk_id, private_key)
+    return private_key
+
+def create_token(
+    auth: Authorization, username: str, private_key: Signer,
+    **kwargs: Any
+) -> str:
+    jwk_id = auth.users[username].jwk_id
+    assert jwk_id is not None
+    return auth._generate_jwt(username, jwk_id, private_key, **kwargs)
+
+class TestTokenCache:
+    @pytest.mark.asyncio
+    async def test_cache_hit(self):
+        auth = create_authorization()
+        token = create_token(auth, "tester", add_user(auth, "tester"))
+        assert auth.decode_jwt(token).username == "tester"
+        assert auth.decode_jwt(token).username == "tester"
+        assert auth.token_cache_misses == 1
+        assert auth.token_cache_hits == 1
+        # Entries are verified again once their ttl has elapsed
+        token_hash, entry = next(iter(auth.token_cache.items()))
+        auth.token_cache[token_hash] = entry._replace(expires_at=0.)
+        assert auth.decode_jwt(token).username == "tester"
+        assert auth.token_cache_misses == 2
+
+    @pytest.mark.asyncio
+    async def test_logout(self):
+        auth = create_authorization()
+        private_key = add_user(auth, "tester")
+        other = create_token(auth, "other", add_user(auth, "other"))
+        token = create_token(auth, "tester", private_key)
+        auth.decode_jwt(token)
+        auth.decode_jwt(other)
+        jwk_id = auth.users["tester"].jwk_id
+        assert jwk_id is not None
+        auth._remove_jwk(jwk_id)
+        assert len(auth.token_cache) == 1
+        with pytest.raises(ServerError, match="Invalid key ID"):
+            auth.decode_jwt(token)
+        assert auth.decode_jwt(other).username == "other"
+
+    @pytest.mark.asyncio
+    async def test_user_deleted(self):
+        auth = create_authorization()
+        token = create_token(auth, "tester", add_user(auth, "tester"))
+        auth.decode_jwt(token)
+        web_request = WebRequest("access/user", {"username": "tester"})
+        await auth._delete_jwt_user(web_request)
+        assert not auth.token_cache
+        await asyncio.sleep(.01)
+        assert auth.server.sent_events == [  # type: ignore
+            ("authorization:user_deleted", ({"username": "tester"},))
+        ]
+        with pytest.raises(ServerError):
+            auth.decode_jwt(token)
+
+    @pytest.mark.asyncio
+    async def test_user_removed(self):
+        auth = create_authorization()
+        private_key = add_user(auth, "tester")
+        token = create_token(auth, "tester", private_key)
+        auth.decode_jwt(token)
+        # A cached token is not accepted for a user that no longer exists
+        del auth.users["tester"]
+        with pytest.raises(ServerError, match="Unknown user"):
+            auth.decode_jwt(token)
+
+    @pytest.mark.asyncio
+    async def test_expired(self):
+        auth = create_authorization()
+        token = create_token(
+            auth, "tester", add_user(auth, "tester"),
+            exp_time=datetime.timedelta(seconds=-10)
+        )
+        with pytest.raises(ServerError, match="JWT Expired"):
+            auth.decode_jwt(token)
+        # The cached entry keeps the token's expiration
+        with pytest.raises(ServerError, match="JWT Expired"):
+            auth.decode_jwt(token)
+        assert auth.token_cache_hits == 1
+        assert auth.decode_jwt(token, check_exp=False).username == "tester"
+
+    @pytest.mark.asyncio
+    async def test_token_type(self):
+        auth = create_authorization()
+        private_key = add_user(auth, "tester")
+        token = create_token(auth, "tester", private_key)
+        refresh_token = create_token(
+            auth, "tester", private_key, token_type="refresh"
+        )
+        auth.decode_jwt(token)
+        auth.decode_jwt(refresh_token, "refresh")
+        with pytest.raises(ServerError, match="type mismatch"):
+            auth.decode_jwt(token, "refresh")
+        with pytest.raises(ServerError, match="type mismatch"):
+            auth.decode_jwt(refresh_token)
@@ -6,11 +6,22 @@ import asyncio
 import copy
 from inspect import isawaitable
 from moonraker.server import Server
-from moonraker.utils import ServerError
-from typing import TYPE_CHECKING, AsyncIterator, Dict, Any, Iterator
+from moonraker.utils import ServerError, Sentinel
+import pathlib
+import sqlite3
+from moonraker.components import database
+from moonraker.components.database import (
+    MoonrakerDatabase, SqliteProvider, NAMESPACE_TABLE, decode_record
+)
+from moonraker.common import WebRequest, RequestType
+from moonraker.confighelper import ConfigError
+from moonraker.utils import json_wrapper as jsonw
+from mocks import MockServer, create_config
+from typing import (
+    TYPE_CHECKING, AsyncIterator, Awaitable, Callable, Dict, Any, Iterator, List
+)
 
 if TYPE_CHECKING:
-    from components.database import MoonrakerDatabase
     from components.database import NamespaceWrapper
     from fixtures import HttpClient, WebsocketClient
 
@@ -1459,3 +1470,413 @@ class TestWebsocketEndpoints(EndpointTest):
         with pytest.raises(websocket_client.error, match=expected):
             args = {"namespace": "planets", "key": {"ford": "pinto"}}
             await websocket_client.request("server.database.get_item", args)
+
+# The tests below run a SqliteProvider directly against a temporary
+# database, without loading a server.
+
+@pytest_asyncio.fixture
+async def create_provider(
+    tmp_path: pathlib.Path
+) -> AsyncIterator[Callable[..., Awaitable[SqliteProvider]]]:
+    providers: List[SqliteProvider] = []
+
+    async def _create(**options: Any) -> SqliteProvider:
+        db_path = tmp_path.joinpath(f"moonraker-sql-{len(providers)}.db")
+        config = create_config(MockServer(), "database", options)
+        provider = SqliteProvider(config, db_path)
+        providers.append(provider)
+        await provider.async_init()
+        return provider
+    yield _create
+    for provider in providers:
+        await provider.stop()
+        provider.join()
+
+def read_record(provider: SqliteProvider, namespace: str, key: str) -> Any:
+    # Reads from a separate connection, only committed data is visible
+    conn = sqlite3.connect(str(provider._db_path))
+    try:
+        row = conn.execute(
+            f"SELECT value FROM {NAMESPACE_TABLE} WHERE namespace = ? and key = ?",
+            (namespace, key)
+        ).fetchone()
+    finally:
+        conn.close()
+    return None if row is None else decode_record(row[0])
+
+@pytest.mark.asyncio
+class TestGroupCommit:
+    async def test_batched_commits(self, create_provider):
+        provider: SqliteProvider = await create_provider()
+        start_count = provider.commit_count
+        futs = [
+            provider.execute_db_function(
+                provider.insert_item, "fruits", f"item_{i}", {"count": i}
+            ) for i in range(20)
+        ]
+        await asyncio.gather(*futs)
+        assert provider.commit_count - start_count < len(futs)
+        assert provider.grouped_count >= len(futs)
+        for i in range(20):
+            assert read_record(provider, "fruits", f"item_{i}") == {"count": i}
+
+    async def test_failed_command_rolled_back(self, create_provider):
+        provider: SqliteProvider = await create_provider()
+
+        def insert_and_fail(conn: sqlite3.Connection, namespace: str) -> None:
+            with conn:
+                provider._insert_record(conn, namespace, "partial", "written")
+                raise ServerError("command failed")
+        provider.group_commands.add(insert_and_fail)
+        rets = await asyncio.gather(
+            provider.execute_db_function(
+                provider.insert_item, "fruits", "apples", 10
+            ),
+            provider.execute_db_function(insert_and_fail, "fruits"),
+            provider.execute_db_function(
+                provider.insert_item, "fruits", "oranges", 20
+            ),
+            return_exceptions=True
+        )
+        assert rets[0] is None and rets[2] is None
+        assert isinstance(rets[1], ServerError)
+        assert read_record(provider, "fruits", "apples") == 10
+        assert read_record(provider, "fruits", "oranges") == 20
+        assert read_record(provider, "fruits", "partial") is None
+
+    async def test_ungrouped_commits(self, create_provider):
+        provider: SqliteProvider = await create_provider()
+        provider.group_commands.clear()
+        start_count = provider.commit_count
+        await asyncio.gather(*[
+            provider.execute_db_function(
+                provider.insert_item, "fruits", f"item_{i}", i
+            ) for i in range(5)
+        ])
+        assert provider.commit_count == start_count
+        assert read_record(provider, "fruits", "item_4") == 4
+
+@pytest.mark.asyncio
+class TestJournalMode:
+    @staticmethod
+    def get_journal_mode(conn: sqlite3.Connection) -> str:
+        return conn.execute("PRAGMA journal_mode").fetchone()[0]
+
+    async def test_default_mode(self, create_provider):
+        provider: SqliteProvider = await create_provider()
+        mode = await provider.execute_db_function(self.get_journal_mode)
+        assert mode == "delete"
+        assert provider.read_pool is None
+
+    async def test_wal_mode(self, create_provider):
+        provider: SqliteProvider = await create_provider(journal_mode="wal")
+        mode = await provider.execute_db_function(self.get_journal_mode)
+        assert mode == "wal"
+        assert provider.read_pool is not None
+        await provider.execute_db_function(
+            provider.insert_item, "fruits", "apples", {"granny_smith": 10}
+        )
+        ret = await provider.execute_read_function(
+            provider.get_item, "fruits", "apples.granny_smith"
+        )
+        assert ret == 10
+
+    async def test_wal_disabled_read_pool(self, create_provider):
+        provider: SqliteProvider = await create_provider(
+            journal_mode="wal", read_connections=0
+        )
+        mode = await provider.execute_db_function(self.get_journal_mode)
+        assert mode == "wal"
+        assert provider.read_pool is None
+
+    @pytest.mark.parametrize("options", [
+        {"journal_mode": "memory"},
+        {"read_connections": 9},
+        {"commit_delay": -1},
+        {"wal_autocheckpoint": -1}
+    ])
+    async def test_invalid_options(
+        self, tmp_path: pathlib.Path, options: Dict[str, Any]
+    ):
+        db_path = tmp_path.joinpath("moonraker-sql.db")
+        config = create_config(MockServer(), "database", options)
+        with pytest.raises(ConfigError):
+            SqliteProvider(config, db_path)
+
+@pytest.mark.asyncio
+class TestReadPool:
+    async def test_connect_failure(self, tmp_path: pathlib.Path):
+        db_path = tmp_path.joinpath("moonraker-sql.db")
+        config = create_config(MockServer(), "database", {"journal_mode": "wal"})
+        provider = SqliteProvider(config, db_path)
+        assert provider.read_pool is not None
+        missing = tmp_path.joinpath("missing", "moonraker-sql.db")
+        provider.read_pool.db_uri = f"{missing.as_uri()}?mode=ro"
+        await provider.async_init()
+        try:
+            await provider.execute_db_function(
+                provider.insert_item, "fruits", "apples", 10
+            )
+            # Reads queued before the failure is detected are forwarded
+            # to the writer, later reads bypass the pool
+            ret = await asyncio.wait_for(
+                provider.execute_read_function(provider.get_item, "fruits", "apples"),
+                2.
+            )
+            assert ret == 10
+            assert not provider.read_pool.enabled
+            ret = await provider.execute_read_function(
+                provider.get_item, "fruits", "apples"
+            )
+            assert ret == 10
+        finally:
+            await provider.stop()
+            provider.join()
+
+    async def test_select_in_open_transaction(self, create_provider):
+        provider: SqliteProvider = await create_provider(journal_mode="wal")
+        await provider.execute_db_function(
+            provider.sql_execute, "CREATE TABLE test_table (val INTEGER)", ()
+        )
+        await provider.execute_db_function(provider.sql_commit)
+        await provider.execute_db_function(
+            provider.sql_execute, "INSERT INTO test_table VALUES (?)", (5,)
+        )
+        # The insert is not committed, so the select must run on the writer
+        assert provider.writer_in_transaction
+        cur = await provider.execute_sql_statement(
+            "SELECT val FROM test_table", ()
+        )
+        rows = await cur.fetchall()
+        assert [row[0] for row in rows] == [5]
+        await provider.execute_db_function(provider.sql_commit)
+        assert not provider.writer_in_transaction
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("json_patch", [True, False])
+class TestNestedKeyPatch:
+    @pytest_asyncio.fixture
+    async def provider(
+        self, create_provider, json_patch: bool, monkeypatch: pytest.MonkeyPatch
+    ) -> SqliteProvider:
+        if json_patch and not database.JSON_PATCH_SUPPORTED:
+            pytest.skip("Sqlite JSON functions not available")
+        monkeypatch.setattr(database, "JSON_PATCH_SUPPORTED", json_patch)
+        provider: SqliteProvider = await create_provider()
+        await provider.execute_db_function(
+            provider.insert_item, "automobiles", "ford", copy.deepcopy(
+                TEST_DB["automobiles"]["ford"]
+            )
+        )
+        self.record_reads = 0
+        get_record = provider._get_record
+
+        def counted_get_record(*args, **kwargs) -> Any:
+            self.record_reads += 1
+            return get_record(*args, **kwargs)
+        monkeypatch.setattr(provider, "_get_record", counted_get_record)
+        return provider
+
+    async def run(self, provider: SqliteProvider, func: Callable, *args) -> Any:
+        return await provider.execute_db_function(func, "automobiles", *args)
+
+    async def test_nested_insert(self, provider: SqliteProvider, json_patch: bool):
+        await self.run(provider, provider.insert_item, "ford.f-series.f250", 250)
+        record = read_record(provider, "automobiles", "ford")
+        assert record["f-series"]["f250"] == 250
+        assert record["mustang"] == "red"
+        assert self.record_reads == (0 if json_patch else 1)
+
+    async def test_nested_update(self, provider: SqliteProvider, json_patch: bool):
+        await self.run(
+            provider, provider.update_item, "ford.f-series.f350", {"lariat": 5}
+        )
+        record = read_record(provider, "automobiles", "ford")
+        assert record["f-series"]["f350"] == {"platinum": 10000, "lariat": 5}
+        assert self.record_reads == (0 if json_patch else 1)
+
+    async def test_nested_delete(self, provider: SqliteProvider, json_patch: bool):
+        ret = await self.run(provider, provider.delete_item, "ford.f-series.f150")
+        assert ret == [150, "black"]
+        record = read_record(provider, "automobiles", "ford")
+        assert "f150" not in record["f-series"]
+        assert self.record_reads == (0 if json_patch else 1)
+
+    async def test_delete_last_field(self, provider: SqliteProvider):
+        await self.run(provider, provider.insert_item, "chevy", {"camaro": "silver"})
+        ret = await self.run(provider, provider.delete_item, "chevy.camaro")
+        assert ret == "silver"
+        # Empty records are removed
+        assert read_record(provider, "automobiles", "chevy") is None
+
+    async def test_insert_missing_intermediate(self, provider: SqliteProvider):
+        # The patch can't create intermediate objects, the record is
+        # rewritten instead
+        await self.run(provider, provider.insert_item, "ford.ranger.xlt", 2)
+        record = read_record(provider, "automobiles", "ford")
+        assert record["ranger"] == {"xlt": 2}
+        assert self.record_reads == 1
+
+    async def test_update_missing_intermediate(self, provider: SqliteProvider):
+        with pytest.raises(ServerError, match="not found"):
+            await self.run(
+                provider, provider.update_item, "ford.ranger.xlt", 2
+            )
+        assert "ranger" not in read_record(provider, "automobiles", "ford")
+
+    async def test_delete_missing_intermediate(self, provider: SqliteProvider):
+        with pytest.raises(ServerError, match="not found"):
+            await self.run(provider, provider.delete_item, "ford.ranger.xlt")
+        assert read_record(provider, "automobiles", "ford")["mustang"] == "red"
+
+@pytest.mark.asyncio
+class TestNamespacePaging:
+    @pytest_asyncio.fixture
+    async def db(self, create_provider) -> MoonrakerDatabase:
+        provider: SqliteProvider = await create_provider()
+        records = {f"key_{i:02d}": i for i in range(0, 20, 2)}
+        await provider.execute_db_function(provider.insert_batch, "numbers", records)
+        db = MoonrakerDatabase.__new__(MoonrakerDatabase)
+        db.server = provider.server  # type: ignore
+        db.db_provider = provider
+        db.forbidden_namespaces = set()
+        db.namespace_caches = {}
+        return db
+
+    async def get_page(
+        self, db: MoonrakerDatabase, limit: int, start_key: Any = None
+    ) -> Dict[str, Any]:
+        args: Dict[str, Any] = {"namespace": "numbers", "limit": limit}
+        if start_key is not None:
+            args["start_key"] = start_key
+        web_request = WebRequest("/server/database/item", args, RequestType.GET)
+        return await db._get_namespace_page(web_request, "numbers", limit)
+
+    async def test_stable_cursor(self, db: MoonrakerDatabase):
+        page = await self.get_page(db, 3)
+        assert list(page["value"].keys()) == ["key_00", "key_02", "key_04"]
+        assert page["next_key"] == "key_04"
+        # Records inserted before the cursor are not returned, records
+        # inserted after it are returned in order
+        await db.insert_item("numbers", "key_01", 1)
+        await db.insert_item("numbers", "key_05", 5)
+        page = await self.get_page(db, 3, page["next_key"])
+        assert list(page["value"].keys()) == ["key_05", "key_06", "key_08"]
+        assert page["next_key"] == "key_08"
+
+    async def test_last_page(self, db: MoonrakerDatabase):
+        page = await self.get_page(db, 4, "key_12")
+        assert page["value"] == {"key_14": 14, "key_16": 16, "key_18": 18}
+        assert page["next_key"] is None
+        page = await self.get_page(db, 4, "key_18")
+        assert page["value"] == {} and page["next_key"] is None
+
+    async def test_removed_cursor(self, db: MoonrakerDatabase):
+        await db.delete_item("numbers", "key_04")
+        page = await self.get_page(db, 2, "key_04")
+        assert list(page["value"].keys()) == ["key_06", "key_08"]
+
+    async def test_invalid_cursor(self, db: MoonrakerDatabase):
+        # A cursor is a position in key order rather than a handle, a key
+        # that was never stored resumes at the following key
+        page = await self.get_page(db, 2, "key_03")
+        assert list(page["value"].keys()) == ["key_04", "key_06"]
+        page = await self.get_page(db, 2, "")
+        assert list(page["value"].keys()) == ["key_00", "key_02"]
+        page = await self.get_page(db, 2, "not_a_key")
+        assert page["value"] == {} and page["next_key"] is None
+
+    async def test_invalid_limit(self, db: MoonrakerDatabase):
+        with pytest.raises(ServerError, match="limit"):
+            await self.get_page(db, 0)
+
+    async def test_export(self, db: MoonrakerDatabase):
+        web_request = WebRequest(
+            "/server/database/export", {"namespace": "numbers"}, RequestType.GET
+        )
+        lines: List[bytes] = []
+        async for chunk in await db._handle_export_request(web_request):
+            lines.extend(chunk.splitlines())
+        records = [jsonw.loads(line) for line in lines]
+        assert records == [
+            {"key": f"key_{i:02d}", "value": i} for i in range(0, 20, 2)
+        ]
+
+@pytest.mark.asyncio
+class TestNamespaceCache:
+    @pytest_asyncio.fixture
+    async def db(self, create_provider) -> MoonrakerDatabase:
+        provider: SqliteProvider = await create_provider()
+        records = {"first": {"a": 1, "b": {"c": 2}}, "second": 2}
+        await provider.execute_db_function(provider.insert_batch, "cached", records)
+        db = MoonrakerDatabase.__new__(MoonrakerDatabase)
+        db.server = provider.server  # type: ignore
+        db.eventloop = provider.server.get_event_loop()  # type: ignore
+        db.db_provider = provider
+        db.namespace_caches = {}
+        db._enable_cache("cached", 4)
+        return db
+
+    async def test_sync_hit(self, db: MoonrakerDatabase):
+        cache = db.namespace_caches["cached"]
+        assert db.get_cached_item("cached", "first") is Sentinel.MISSING
+        assert await db.get_item("cached", "first") == {"a": 1, "b": {"c": 2}}
+        assert cache.misses == 1
+        assert db.get_cached_item("cached", "first.b.c") == 2
+        assert db.get_cached_item("cached", "first.d", None) is None
+        with pytest.raises(ServerError, match="not found"):
+            db.get_cached_item("cached", "first.d")
+        assert cache.hits == 3
+        # Hits decode a private copy of the record
+        value = db.get_cached_item("cached", "first")
+        value["a"] = 5
+        assert db.get_cached_item("cached", "first.a") == 1
+        assert db.get_cached_item("uncached", "first") is Sentinel.MISSING
+
+    async def test_key_with_separator(self, db: MoonrakerDatabase):
+        # A key list addresses a record whose key contains a period
+        await db.db_provider.execute_db_function(
+            db.db_provider.insert_item, "cached", ["file.gcode"], {"size": 1}
+        )
+        assert await db.get_item("cached", ["file.gcode", "size"]) == 1
+        assert db.get_cached_item("cached", ["file.gcode"]) == {"size": 1}
+
+    async def test_write_through(self, db: MoonrakerDatabase):
+        await db.insert_item("cached", "third", [1, 2])
+        assert db.get_cached_item("cached", "third") == [1, 2]
+        await db.update_item("cached", "third", [3])
+        assert db.get_cached_item("cached", "third") is Sentinel.MISSING
+        assert await db.get_item("cached", "third") == [3]
+        await db.delete_item("cached", "third")
+        assert db.get_cached_item("cached", "third") is Sentinel.MISSING
+        assert await db.get_item("cached", "third", None) is None
+
+    async def test_eviction(self, db: MoonrakerDatabase):
+        cache = db.namespace_caches["cached"]
+        for idx in range(6):
+            await db.insert_item("cached", f"item_{idx}", idx)
+        assert cache.evictions == 2
+        assert db.get_cached_item("cached", "item_0") is Sentinel.MISSING
+        assert db.get_cached_item("cached", "item_5") == 5
+        assert await db.get_batch("cached", ["item_0", "item_5"]) == {
+            "item_0": 0, "item_5": 5
+        }
+        assert db.get_cached_item("cached", "item_0") == 0
+
+    async def test_cancelled_read(self, db: MoonrakerDatabase):
+        errors: List[Dict[str, Any]] = []
+        loop = asyncio.get_running_loop()
+        loop.set_exception_handler(lambda _, ctx: errors.append(ctx))
+        try:
+            item_fut = db.get_item("cached", "first")
+            missing_fut = db.get_item("cached", "missing")
+            batch_fut = db.get_batch("cached", ["second"])
+            for fut in (item_fut, missing_fut, batch_fut):
+                fut.cancel()
+            # The cancelled requests still populate the cache
+            assert await db.get_item("cached", "second") == 2
+            await asyncio.sleep(.01)
+        finally:
+            loop.set_exception_handler(None)
+        assert errors == []
+        assert db.get_cached_item("cached", "first.a") == 1
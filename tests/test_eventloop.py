@@ -0,0 +1,165 @@
+from __future__ import annotations
+import pytest
+import pytest_asyncio
+import asyncio
+import threading
+import time
+from moonraker.eventloop import (
+    EventLoop, LoopMonitor, EXECUTOR_POOLS, LAG_BUCKETS, _profiled_handle_run
+)
+from moonraker.utils import ServerError
+from typing import AsyncIterator, Awaitable, List
+
+@pytest_asyncio.fixture
+async def evtloop() -> AsyncIterator[EventLoop]:
+    evtloop = EventLoop()
+    yield evtloop
+    evtloop.shutdown_executor_pools()
+
+def thread_name() -> str:
+    return threading.current_thread().name
+
+async def wait_active(evtloop: EventLoop, pool: str, count: int) -> None:
+    # Work is active once a worker thread has started running it
+    exec_pool = evtloop.get_executor_pool(pool)
+    while exec_pool.get_stats()["active"] < count:
+        await asyncio.sleep(.001)
+
+class TestExecutorPool:
+    @pytest.mark.asyncio
+    async def test_routing(self, evtloop: EventLoop):
+        for pool in EXECUTOR_POOLS:
+            name = await evtloop.run_in_thread(thread_name, pool=pool)
+            assert name.startswith(f"moonraker-{pool}")
+        name = await evtloop.run_in_thread(thread_name)
+        assert not name.startswith("moonraker-")
+        with pytest.raises(ServerError, match="Unknown executor pool"):
+            evtloop.run_in_thread(thread_name, pool="gpu")
+        stats = evtloop.get_executor_stats()
+        assert sorted(stats) == sorted(EXECUTOR_POOLS)
+        for pool_stats in stats.values():
+            assert pool_stats["submitted"] == 1
+            assert pool_stats["completed"] == 1
+
+    @pytest.mark.asyncio
+    async def test_queue_limit(self, evtloop: EventLoop):
+        evtloop.configure_executor_pool("cpu", 1, 1)
+        release = threading.Event()
+        running = evtloop.run_in_thread(release.wait, pool="cpu")
+        await wait_active(evtloop, "cpu", 1)
+        queued = evtloop.run_in_thread(release.wait, pool="cpu")
+        # The queue is full, work is rejected rather than waiting
+        rejected = evtloop.run_in_thread(release.wait, pool="cpu")
+        with pytest.raises(ServerError) as exc_info:
+            await rejected
+        assert exc_info.value.status_code == 503
+        stats = evtloop.get_executor_stats()["cpu"]
+        assert stats["active"] == 1 and stats["queued"] == 1
+        release.set()
+        assert await asyncio.gather(running, queued) == [True, True]
+        stats = evtloop.get_executor_stats()["cpu"]
+        assert stats["active"] == 0 and stats["queued"] == 0
+        assert stats["submitted"] == 2
+        assert stats["completed"] == 2
+        assert stats["rejected"] == 1
+        assert stats["peak_queued"] == 1
+        assert stats["saturation"] == .5
+        # Pools are configured before their first use
+        with pytest.raises(ServerError, match="already running"):
+            evtloop.configure_executor_pool("cpu", 2)
+
+    @pytest.mark.asyncio
+    async def test_unlimited_queue(self, evtloop: EventLoop):
+        evtloop.configure_executor_pool("system", 1)
+        release = threading.Event()
+        futs: List[Awaitable[bool]] = [
+            evtloop.run_in_thread(release.wait, pool="system") for _ in range(5)
+        ]
+        await wait_active(evtloop, "system", 1)
+        assert evtloop.get_executor_stats()["system"]["queued"] == 4
+        release.set()
+        assert await asyncio.gather(*futs) == [True] * 5
+        stats = evtloop.get_executor_stats()["system"]
+        assert stats["rejected"] == 0 and stats["peak_queued"] == 4
+
+    @pytest.mark.asyncio
+    async def test_idle_stats(self, evtloop: EventLoop):
+        evtloop.configure_executor_pool("network", 8, 16)
+        stats = evtloop.get_executor_stats()["network"]
+        assert stats["max_workers"] == 8 and stats["queue_limit"] == 16
+        assert stats["submitted"] == 0
+        assert "network" not in evtloop.executor_pools
+        with pytest.raises(ServerError, match="Unknown executor pool"):
+            evtloop.configure_executor_pool("gpu", 1)
+
+class TestLoopMonitor:
+    @pytest.mark.skipif(
+        EventLoop.UVLOOP_ENABLED, reason="Callbacks are not profiled by uvloop"
+    )
+    @pytest.mark.asyncio
+    async def test_handle_run_restored(self, evtloop: EventLoop):
+        orig_handle_run = asyncio.Handle._run
+        evtloop.start_loop_monitor(.01, 0.)
+        monitor = evtloop.loop_monitor
+        assert monitor is not None and monitor.profile_callbacks
+        assert asyncio.Handle._run is _profiled_handle_run
+        # Only the first active monitor patches the loop
+        other = LoopMonitor(evtloop, .01, 0.)
+        other.start()
+        other.stop()
+        assert asyncio.Handle._run is _profiled_handle_run
+        assert LoopMonitor._active is monitor
+        evtloop.aioloop.call_soon(time.sleep, .02)
+        await asyncio.sleep(.05)
+        stats = evtloop.get_loop_stats()
+        assert stats["slow_callback_count"] == 1
+        assert stats["slow_callbacks"][0]["name"] == "time.sleep"
+        evtloop.stop_loop_monitor()
+        assert asyncio.Handle._run is orig_handle_run
+        assert LoopMonitor._active is None
+        assert LoopMonitor._orig_handle_run is None
+        evtloop.aioloop.call_soon(time.sleep, .02)
+        await asyncio.sleep(.05)
+        assert evtloop.get_loop_stats()["slow_callback_count"] == 1
+
+    @pytest.mark.asyncio
+    async def test_profiling_disabled(self, evtloop: EventLoop):
+        orig_handle_run = asyncio.Handle._run
+        evtloop.start_loop_monitor(0., 0.)
+        assert asyncio.Handle._run is orig_handle_run
+        assert not evtloop.get_loop_stats()["callback_profiling"]
+        evtloop.stop_loop_monitor()
+        assert asyncio.Handle._run is orig_handle_run
+
+    @pytest.mark.parametrize("lag_ms,label", [
+        (0., "<1ms"), (.5, "<1ms"), (1., "<5ms"), (24.9, "<25ms"),
+        (25., "<50ms"), (999., "<1000ms"), (4999., "<5000ms"),
+        (5000., ">=5000ms"), (60000., ">=5000ms")
+    ])
+    @pytest.mark.asyncio
+    async def test_lag_histogram(
+        self, evtloop: EventLoop, lag_ms: float, label: str
+    ):
+        monitor = LoopMonitor(evtloop, 0., 0.)
+        # Run the probe as if its timer fired late by the lag
+        monitor.probe_time = evtloop.get_loop_time() - lag_ms / 1000.
+        monitor._probe()
+        monitor.stop()
+        histogram = monitor.get_stats()["loop_lag"]["histogram"]
+        assert len(histogram) == len(LAG_BUCKETS) + 1
+        assert {k: v for k, v in histogram.items() if v} == {label: 1}
+        assert monitor.lag_samples == 1
+        assert monitor.max_lag * 1000. == pytest.approx(lag_ms, abs=.5)
+
+    @pytest.mark.asyncio
+    async def test_probe(self, evtloop: EventLoop):
+        evtloop.start_loop_monitor(0., 0.)
+        await asyncio.sleep(.35)
+        # The probe reschedules itself while the monitor is running
+        stats = evtloop.get_loop_stats()
+        samples = stats["loop_lag"]["samples"]
+        assert stats["enabled"] and samples >= 2
+        assert sum(stats["loop_lag"]["histogram"].values()) == samples
+        evtloop.stop_loop_monitor()
+        await asyncio.sleep(.15)
+        assert evtloop.get_loop_stats()["loop_lag"]["samples"] == samples
@@ -0,0 +1,310 @@
+from __future__ import annotations
+import pytest
+import pytest_asyncio
+import asyncio
+import os
+import pathlib
+import shutil
+import threading
+from collections import deque
+from moonraker.utils import ServerError
+from moonraker.common import RequestType, WebRequest
+from moonraker.components.database import MoonrakerDatabase
+from moonraker.components.file_manager.file_manager import (
+    FileManager, FileListIndex, MetadataStorage, MetadataWorker,
+    METADATA_NAMESPACE, METADATA_VERSION
+)
+from mocks import MockServer, create_config
+from typing import Any, AsyncIterator, Callable, Coroutine, Dict, List, Optional
+
+def create_file_manager() -> FileManager:
+    # A file manager shell, the index only checks reserved paths and
+    # reads path info
+    fm = FileManager.__new__(FileManager)
+    fm.server = MockServer()  # type: ignore
+    fm.event_loop = fm.server.get_event_loop()
+    fm.reserved_paths = {}
+    fm.full_access_roots = {"gcodes"}
+    return fm
+
+class TestFileListIndex:
+    @pytest.mark.asyncio
+    async def test_dirty_rescan(
+        self, tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+    ):
+        tmp_path.joinpath("first.gcode").write_text("G28\n")
+        index = FileListIndex(create_file_manager(), "gcodes", str(tmp_path))
+        await index.wait_ready()
+        assert index.get_file_list() is not None
+        scan_threads: List[threading.Thread] = []
+        scan_tree = index._scan_tree
+
+        def record_scan(start_path: str) -> Any:
+            scan_threads.append(threading.current_thread())
+            return scan_tree(start_path)
+        monkeypatch.setattr(index, "_scan_tree", record_scan)
+        subdir = tmp_path.joinpath("subdir")
+        subdir.mkdir()
+        subdir.joinpath("second.gcode").write_text("G28\n")
+        index.mark_dirty(str(subdir))
+        # Callers read the file system directly until the rescan completes
+        assert index.get_file_list() is None
+        await index.wait_ready()
+        filelist = index.get_file_list()
+        assert filelist is not None
+        assert sorted(filelist) == ["first.gcode", "subdir/second.gcode"]
+        assert index.get_directory(str(subdir)) is not None
+        assert scan_threads and threading.main_thread() not in scan_threads
+        subdir.joinpath("second.gcode").unlink()
+        index.mark_dirty(str(subdir.joinpath("second.gcode")))
+        await index.wait_ready()
+        assert list(index.get_file_list() or {}) == ["first.gcode"]
+
+    @pytest.mark.asyncio
+    async def test_volatile_rescan(self, tmp_path: pathlib.Path):
+        gcodes = tmp_path.joinpath("gcodes")
+        gcodes.mkdir()
+        target = tmp_path.joinpath("linked.gcode")
+        target.write_text("G28\n")
+        os.symlink(target, gcodes.joinpath("linked.gcode"))
+        index = FileListIndex(create_file_manager(), "gcodes", str(gcodes))
+        await index.wait_ready()
+        assert index.volatile_paths == {"linked.gcode"}
+        filelist = index.get_file_list()
+        assert filelist is not None and filelist["linked.gcode"]["size"] == 4
+        # Symbolic links are not observed, they are rescanned when the
+        # index is awaited
+        target.write_text("G28\nG1 X10\n")
+        await index.wait_ready()
+        filelist = index.get_file_list()
+        assert filelist is not None and filelist["linked.gcode"]["size"] == 11
+
+class ObserverStub:
+    def __init__(self, index: Optional[FileListIndex] = None) -> None:
+        self.index = index
+
+    def get_file_index(self, root: str) -> Optional[FileListIndex]:
+        return self.index
+
+class TestDirectoryListing:
+    @pytest.mark.parametrize("indexed", [True, False])
+    @pytest.mark.asyncio
+    async def test_disk_usage(
+        self, tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch,
+        indexed: bool
+    ):
+        tmp_path.joinpath("first.gcode").write_text("G28\n")
+        fm = create_file_manager()
+        fm.file_paths = {"gcodes": str(tmp_path)}
+        fm.disk_usage_cache = {}
+        index: Optional[FileListIndex] = None
+        if indexed:
+            index = FileListIndex(fm, "gcodes", str(tmp_path))
+        fm.fs_observer = ObserverStub(index)  # type: ignore
+        usage_threads: List[threading.Thread] = []
+        disk_usage = shutil.disk_usage
+
+        def record_usage(path: str) -> Any:
+            usage_threads.append(threading.current_thread())
+            return disk_usage(path)
+        monkeypatch.setattr(shutil, "disk_usage", record_usage)
+        web_request = WebRequest(
+            "server/files/directory", {"path": "gcodes"}, RequestType.GET
+        )
+        result = await fm._handle_directory_request(web_request)
+        assert [f["filename"] for f in result["files"]] == ["first.gcode"]
+        assert result["disk_usage"] == disk_usage(str(tmp_path))._asdict()
+        # Disk usage is read in a thread rather than on the event loop
+        assert len(usage_threads) == 1
+        assert usage_threads[0] is not threading.main_thread()
+        # The cached value is used until it expires and the copy returned
+        # may be modified
+        result["disk_usage"]["free"] = 0
+        result = await fm._handle_directory_request(web_request)
+        assert len(usage_threads) == 1
+        assert result["disk_usage"]["free"] != 0
+        fm.disk_usage_cache.clear()
+        await fm._handle_directory_request(web_request)
+        assert len(usage_threads) == 2
+
+def create_storage(worker_count: int) -> MetadataStorage:
+    # A metadata storage shell with only the worker pool set up
+    storage = MetadataStorage.__new__(MetadataStorage)
+    storage.server = MockServer()  # type: ignore
+    storage.pending_requests = {}
+    storage.request_queue = deque()
+    storage.progress = {"total": 0, "processed": 0, "failed": 0}
+    storage.workers = [
+        MetadataWorker(storage.server, idx) for idx in range(worker_count)
+    ]
+    storage.idle_workers = list(reversed(storage.workers))
+    storage.idle_handle = None
+    return storage
+
+class TestMetadataWorkers:
+    @pytest.mark.parametrize("worker_count", [1, 2])
+    @pytest.mark.asyncio
+    async def test_worker_error(
+        self, worker_count: int, monkeypatch: pytest.MonkeyPatch
+    ):
+        storage = create_storage(worker_count)
+        processed: List[str] = []
+
+        async def process(worker: MetadataWorker, fname: str) -> None:
+            await asyncio.sleep(.01)
+            if fname.startswith("bad"):
+                raise ServerError("Metadata processing failed")
+            processed.append(fname)
+        monkeypatch.setattr(storage, "_process_metadata_update", process)
+        fnames = ["one.gcode", "bad.gcode", "two.gcode", "three.gcode"]
+        events: List[asyncio.Event] = []
+        for fname in fnames:
+            evt = asyncio.Event()
+            events.append(evt)
+            storage.pending_requests[fname] = ({}, evt)
+            storage.request_queue.append(fname)
+        storage.progress["total"] = len(fnames)
+        storage._start_workers()
+        await asyncio.wait_for(
+            asyncio.gather(*[evt.wait() for evt in events]), 2.
+        )
+        await asyncio.sleep(.05)
+        # Every worker returns to the pool and the queue is drained
+        assert sorted(processed) == ["one.gcode", "three.gcode", "two.gcode"]
+        assert storage.progress["processed"] == len(fnames)
+        assert sorted(storage.idle_workers, key=lambda w: w.index) == (
+            storage.workers
+        )
+        assert not storage.request_queue
+        assert storage.idle_handle is not None
+        storage.close()
+
+    @pytest.mark.asyncio
+    async def test_stderr_task(self):
+        worker = MetadataWorker(MockServer(), 0)  # type: ignore
+        await worker._start()
+        stderr_task = worker.stderr_task
+        assert stderr_task is not None and not stderr_task.done()
+        worker.kill()
+        assert worker.stderr_task is None
+        await asyncio.sleep(.01)
+        assert stderr_task.done()
+        await worker._start()
+        stderr_task = worker.stderr_task
+        await worker.stop()
+        assert worker.stderr_task is None
+        assert stderr_task is not None and stderr_task.done()
+
+
+METADATA_RECORDS: Dict[str, Dict[str, Any]] = {
+    f"part_{idx}.gcode": {
+        "size": 1000 + idx,
+        "modified": 1700000000. + idx,
+        "slicer": "PrusaSlicer",
+        "thumbnails": [
+            {"width": 32, "height": 32, "relative_path": f".thumbs/{idx}.png"}
+        ]
+    } for idx in range(5)
+}
+
+StorageFactory = Callable[[int], Coroutine[Any, Any, MetadataStorage]]
+
+@pytest_asyncio.fixture
+async def create_metadata(
+    tmp_path: pathlib.Path
+) -> AsyncIterator[StorageFactory]:
+    databases: List[MoonrakerDatabase] = []
+
+    async def create(cache_size: int) -> MetadataStorage:
+        # Each storage uses its own database populated with the same records
+        data_path = tmp_path.joinpath(f"cache_{cache_size}")
+        data_path.mkdir()
+        server = MockServer({
+            "data_path": str(data_path), "instance_uuid": "test",
+            "is_default_data_path": False
+        })
+        db = MoonrakerDatabase(create_config(server, "database", {}))
+        databases.append(db)
+        db.insert_item(
+            "moonraker", "file_manager.metadata_version", METADATA_VERSION
+        )
+        for key, record in METADATA_RECORDS.items():
+            db.insert_item(METADATA_NAMESPACE, [key], record)
+        config = create_config(server, "file_manager", {
+            "metadata_cache_size": cache_size, "metadata_worker_count": 1
+        })
+        storage = MetadataStorage(config, db)
+        await db.component_init()
+        return storage
+    yield create
+    for db in databases:
+        await db.close()
+
+class TestMetadataRecords:
+    @pytest.mark.asyncio
+    async def test_lazy_matches_eager(self, create_metadata: StorageFactory):
+        eager = await create_metadata(0)
+        lazy = await create_metadata(2)
+        assert not eager.metadata.is_lazy and lazy.metadata.is_lazy
+        keys = sorted(METADATA_RECORDS)
+        for storage in (eager, lazy):
+            assert sorted(storage.metadata.keys()) == keys
+            for key in keys:
+                record = await storage.fetch(key)
+                assert record == METADATA_RECORDS[key]
+                assert storage.metadata.get_file_stats(key) == (
+                    record["size"], record["modified"]
+                )
+            batch = await storage.fetch_batch(keys + ["missing.gcode"])
+            assert batch == METADATA_RECORDS
+            assert await storage.fetch("missing.gcode") is None
+            assert storage.get("missing.gcode") is None
+        # Records are modified identically in both modes
+        for storage in (eager, lazy):
+            storage.insert("new.gcode", {"size": 10, "modified": 1.})
+            storage.metadata.move_batch([("part_0.gcode", "moved.gcode")])
+            await storage.metadata.remove_batch(["part_1.gcode"])
+        for key in ["new.gcode", "moved.gcode", "part_0.gcode", "part_1.gcode"]:
+            assert (key in eager.metadata) == (key in lazy.metadata)
+            assert await eager.fetch(key) == await lazy.fetch(key)
+        assert sorted(eager.metadata.keys()) == sorted(lazy.metadata.keys())
+
+    @pytest.mark.asyncio
+    async def test_lazy_cache(self, create_metadata: StorageFactory):
+        storage = await create_metadata(2)
+        keys = sorted(METADATA_RECORDS)
+        await storage.fetch_batch(keys)
+        # Only cached records are available synchronously, a miss starts
+        # a read that caches the record
+        cached = [key for key in keys if storage.peek(key) is not None]
+        assert len(cached) <= 2
+        missed = next(key for key in keys if key not in cached)
+        assert storage.get(missed) is None
+        await asyncio.sleep(.1)
+        assert storage.peek(missed) == METADATA_RECORDS[missed]
+        assert storage.get(missed) == METADATA_RECORDS[missed]
+
+    @pytest.mark.parametrize("cache_size", [0, 2])
+    @pytest.mark.asyncio
+    async def test_copy_isolation(
+        self, create_metadata: StorageFactory, cache_size: int
+    ):
+        storage = await create_metadata(cache_size)
+        key = "part_3.gcode"
+        expected = METADATA_RECORDS[key]
+        fetched = await storage.fetch(key)
+        fetched["size"] = 0
+        fetched["print_start_time"] = 1.
+        del fetched["slicer"]
+        assert await storage.fetch(key) == expected
+        record = storage.get(key)
+        assert record == expected
+        record["thumbnails"] = []
+        assert storage.get(key) == expected
+        assert storage.peek(key) == expected
+        # The record inserted is a copy of the value passed
+        value = {"size": 10, "modified": 1.}
+        storage.insert("new.gcode", value)
+        value["size"] = 20
+        new_record = await storage.fetch("new.gcode")
+        assert new_record == {"size": 10, "modified": 1.}
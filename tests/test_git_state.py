@@ -0,0 +1,206 @@
+from __future__ import annotations
+import os
+import pytest
+import pathlib
+import subprocess
+from moonraker.components.update_manager.git_state import (
+    GitStateReader, parse_config
+)
+from typing import Iterator
+
+GIT_ENV = {
+    "GIT_CONFIG_GLOBAL": os.devnull,
+    "GIT_CONFIG_NOSYSTEM": "1",
+    "GIT_AUTHOR_NAME": "Moonraker",
+    "GIT_AUTHOR_EMAIL": "test@moonraker.local",
+    "GIT_COMMITTER_NAME": "Moonraker",
+    "GIT_COMMITTER_EMAIL": "test@moonraker.local"
+}
+
+def git(repo: pathlib.Path, *args: str) -> str:
+    env = dict(os.environ)
+    env.update(GIT_ENV)
+    ret = subprocess.run(
+        ["git", "-C", str(repo), *args], env=env, check=True,
+        capture_output=True, text=True
+    )
+    return ret.stdout.strip()
+
+@pytest.fixture
+def home_path(
+    tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+) -> pathlib.Path:
+    # Isolate the reader from the user's global git config
+    home = tmp_path.joinpath("home")
+    home.mkdir()
+    monkeypatch.setenv("HOME", str(home))
+    monkeypatch.setenv("XDG_CONFIG_HOME", str(home.joinpath(".config")))
+    return home
+
+@pytest.fixture
+def repo(tmp_path: pathlib.Path, home_path: pathlib.Path) -> Iterator[pathlib.Path]:
+    repo_path = tmp_path.joinpath("repo")
+    repo_path.mkdir()
+    git(repo_path, "init", "-q", "-b", "master")
+    repo_path.joinpath("readme.txt").write_text("first\n")
+    git(repo_path, "add", "readme.txt")
+    git(repo_path, "commit", "-q", "-m", "first")
+    yield repo_path
+
+def create_reader(repo: pathlib.Path) -> GitStateReader:
+    return GitStateReader(repo.joinpath(".git"))
+
+class TestParseConfig:
+    def test_entries(self):
+        data = (
+            "# comment\n"
+            "[core]\n"
+            "\tbare = false ; trailing comment\n"
+            "\tFileMode = true\n"
+            '[remote "Origin"]\n'
+            "\turl = https://github.com/Arksine/moonraker.git\n"
+            "\tfetch = +refs/heads/*:refs/remotes/Origin/*\n"
+            "[Branch \"master\"] remote = Origin\n"
+            "[user]\n"
+            "\tsigningkey\n"
+        )
+        assert parse_config(data) == [
+            ("core.bare", "false"),
+            ("core.filemode", "true"),
+            ("remote.Origin.url", "https://github.com/Arksine/moonraker.git"),
+            ("remote.Origin.fetch", "+refs/heads/*:refs/remotes/Origin/*"),
+            ("branch.master.remote", "Origin"),
+            ("user.signingkey", "true")
+        ]
+
+    def test_values(self):
+        data = (
+            "[test]\n"
+            '\tquoted = "  spaced ; not a comment "\n'
+            "\tinternal = one   two  \n"
+            '\tescaped = tab\\there \\"quote\\" back\\\\slash\n'
+            "\tcontinued = first \\\n"
+            "second\n"
+        )
+        assert parse_config(data) == [
+            ("test.quoted", "  spaced ; not a comment "),
+            ("test.internal", "one   two"),
+            ("test.escaped", 'tab\there "quote" back\\slash'),
+            ("test.continued", "first second")
+        ]
+
+    def test_matches_git(self, tmp_path: pathlib.Path):
+        config = tmp_path.joinpath("config")
+        config.write_text(
+            "[core]\n"
+            "\trepositoryformatversion = 0\n"
+            '[remote "origin"]\n'
+            '\turl = "https://example.com/repo.git" # comment\n'
+            "\turl = https://mirror.example.com/repo.git\n"
+            '[branch "dev/Feature"]\n'
+            "\tMerge = refs/heads/dev/Feature\n"
+        )
+        listed = git(tmp_path, "config", "--file", str(config), "--list")
+        expected = [tuple(line.split("=", 1)) for line in listed.splitlines()]
+        assert parse_config(config.read_text()) == expected
+
+    @pytest.mark.parametrize("data", [
+        "[include]\n\tpath = other.config\n",
+        '[includeIf "gitdir:~/src/"]\n\tpath = other.config\n',
+        "bare = false\n",
+        "[core\n\tbare = false\n",
+        "[core]\n\t1bare = false\n",
+        '[core]\n\tname = "unterminated\n',
+        "[core]\n\tname = bad\\escape\n"
+    ], ids=[
+        "include", "include_if", "no_section", "bad_section", "bad_name",
+        "unterminated_quote", "bad_escape"
+    ])
+    def test_unsupported(self, data: str):
+        assert parse_config(data) is None
+
+class TestRevParse:
+    def test_head(self, repo: pathlib.Path):
+        reader = create_reader(repo)
+        head = git(repo, "rev-parse", "HEAD")
+        assert reader.rev_parse("HEAD") == head
+        assert reader.rev_parse("master") == head
+        assert reader.rev_parse("heads/master") == head
+        assert reader.rev_parse("refs/heads/master") == head
+        assert reader.rev_parse(head) == head
+
+    def test_disambiguation(self, repo: pathlib.Path):
+        first = git(repo, "rev-parse", "HEAD")
+        git(repo, "branch", "feature")
+        git(repo, "checkout", "-q", "feature")
+        repo.joinpath("readme.txt").write_text("second\n")
+        git(repo, "commit", "-q", "-am", "second")
+        second = git(repo, "rev-parse", "HEAD")
+        # A tag and a remote branch share the names of local branches
+        git(repo, "tag", "feature", first)
+        git(repo, "update-ref", "refs/remotes/master", second)
+        git(repo, "update-ref", "refs/remotes/origin/master", second)
+        git(
+            repo, "symbolic-ref", "refs/remotes/origin/HEAD",
+            "refs/remotes/origin/master"
+        )
+        reader = create_reader(repo)
+        names = ["feature", "master", "origin", "origin/master", "tags/feature"]
+        for packed in (False, True):
+            if packed:
+                git(repo, "pack-refs", "--all")
+                assert not repo.joinpath(".git/refs/tags/feature").exists()
+            for name in names:
+                expected = git(repo, "rev-parse", "--verify", "-q", name)
+                assert reader.rev_parse(name) == expected, name
+        # Tags take precedence over branches
+        assert reader.rev_parse("feature") == first
+        assert reader.rev_parse("heads/feature") == second
+
+    @pytest.mark.parametrize("name", [
+        "missing", "master..feature", "-master", "master.lock", "master/",
+        "FETCH_HEAD", "master~1", "refs/heads/../HEAD"
+    ])
+    def test_unresolved(self, repo: pathlib.Path, name: str):
+        git(repo, "branch", "feature")
+        assert create_reader(repo).rev_parse(name) is None
+
+    def test_modified_packed_refs(self, repo: pathlib.Path):
+        reader = create_reader(repo)
+        first = git(repo, "rev-parse", "HEAD")
+        git(repo, "tag", "v1.0.0")
+        git(repo, "pack-refs", "--all")
+        assert reader.rev_parse("v1.0.0") == first
+        repo.joinpath("readme.txt").write_text("second\n")
+        git(repo, "commit", "-q", "-am", "second")
+        git(repo, "tag", "-f", "v1.0.0")
+        git(repo, "pack-refs", "--all")
+        assert reader.rev_parse("v1.0.0") == git(repo, "rev-parse", "HEAD")
+
+class TestRemoteUrl:
+    def test_remote_url(self, repo: pathlib.Path):
+        url = "https://github.com/Arksine/moonraker.git"
+        git(repo, "remote", "add", "origin", url)
+        git(repo, "remote", "add", "Upstream", "git@example.com:repo.git")
+        git(repo, "config", "--add", "remote.origin.url", "https://mirror.local")
+        reader = create_reader(repo)
+        assert reader.remote_names() == ["Upstream", "origin"]
+        assert reader.remote_url("origin") == git(repo, "remote", "get-url", "origin")
+        assert reader.remote_url("Upstream") == "git@example.com:repo.git"
+        # Remote names are case sensitive
+        assert reader.remote_url("upstream") is None
+        assert reader.remote_url("missing") is None
+
+    def test_local_rewrite(self, repo: pathlib.Path):
+        git(repo, "remote", "add", "origin", "gh:Arksine/moonraker.git")
+        git(repo, "config", "url.https://github.com/.insteadOf", "gh:")
+        assert create_reader(repo).remote_url("origin") is None
+
+    def test_global_rewrite(self, repo: pathlib.Path, home_path: pathlib.Path):
+        git(repo, "remote", "add", "origin", "gh:Arksine/moonraker.git")
+        reader = create_reader(repo)
+        assert reader.remote_url("origin") == "gh:Arksine/moonraker.git"
+        home_path.joinpath(".gitconfig").write_text(
+            '[url "https://github.com/"]\n\tinsteadOf = gh:\n'
+        )
+        assert reader.remote_url("origin") is None
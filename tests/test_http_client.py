@@ -0,0 +1,288 @@
+from __future__ import annotations
+import pytest
+import pytest_asyncio
+import asyncio
+import pathlib
+import time
+from tornado.httputil import HTTPHeaders
+from tornado.httpserver import HTTPServer
+from tornado.netutil import bind_sockets
+from tornado.web import Application, RequestHandler
+from moonraker.confighelper import ConfigError
+from moonraker.components.http_client import (
+    HttpClient, HttpCache, HttpResponse
+)
+from mocks import MockServer, create_config
+from typing import AsyncIterator, Dict, Any, List, Optional
+
+class ResourceHandler(RequestHandler):
+    def initialize(
+        self, requests: List[Dict[str, Any]], cache_control: str
+    ) -> None:
+        self.requests = requests
+        self.cache_control = cache_control
+
+    def get(self) -> None:
+        query = self.request.query
+        self.requests.append({
+            "query": query,
+            "if_none_match": self.request.headers.get("If-None-Match")
+        })
+        etag = f'"{query or "root"}"'
+        self.set_header("Cache-Control", self.cache_control)
+        self.set_header("Etag", etag)
+        if self.request.headers.get("If-None-Match") == etag:
+            self.set_status(304)
+            return
+        self.write(f"resource {query}")
+
+    def compute_etag(self) -> Optional[str]:
+        return None
+
+def make_response(url: str, body: bytes, etag: str = '"v1"') -> HttpResponse:
+    headers = HTTPHeaders({"Etag": etag, "Cache-Control": "max-age=0"})
+    return HttpResponse(url, url, 200, body, headers, None)
+
+def create_cache(
+    path: pathlib.Path, max_size: int = 1024, max_age: float = 3600.
+) -> HttpCache:
+    return HttpCache(MockServer(), path, max_size, max_age, 0.)  # type: ignore
+
+class TestHttpCache:
+    @pytest.mark.asyncio
+    async def test_load_persisted(self, tmp_path: pathlib.Path):
+        cache = create_cache(tmp_path)
+        url = "https://example.com/resource?page=2"
+        await cache.store(url, make_response(url, b"page two"))
+        loaded = create_cache(tmp_path)
+        await loaded.load()
+        entry = loaded.get(url)
+        assert entry is not None and entry.content is None
+        resp = await loaded.get_response(entry)
+        assert resp is not None
+        assert resp.content == b"page two"
+        assert resp.etag == '"v1"'
+        assert resp.from_cache
+
+    @pytest.mark.asyncio
+    async def test_load_removes_expired(self, tmp_path: pathlib.Path):
+        cache = create_cache(tmp_path)
+        url = "https://example.com/expired"
+        await cache.store(url, make_response(url, b"expired"))
+        cache.entries[url].validated = time.time() - 7200.
+        await cache._write_entry(cache.entries[url])
+        loaded = create_cache(tmp_path)
+        await loaded.load()
+        assert loaded.get(url) is None
+        assert list(tmp_path.iterdir()) == []
+
+    @pytest.mark.asyncio
+    async def test_evict_by_size(self, tmp_path: pathlib.Path):
+        cache = create_cache(tmp_path, max_size=250)
+        urls = [f"https://example.com/item?id={i}" for i in range(3)]
+        await cache.store(urls[0], make_response(urls[0], b"a" * 100))
+        await cache.store(urls[1], make_response(urls[1], b"b" * 100))
+        # Reading the first entry makes the second the least recently used
+        assert cache.get(urls[0]) is not None
+        await cache.store(urls[2], make_response(urls[2], b"c" * 100))
+        assert cache.get(urls[1]) is None
+        assert cache.get(urls[0]) is not None
+        assert cache.get(urls[2]) is not None
+        assert cache.total_size == 200
+        assert len(list(tmp_path.glob("*.body"))) == 2
+
+    @pytest.mark.asyncio
+    async def test_store_over_size(self, tmp_path: pathlib.Path):
+        cache = create_cache(tmp_path, max_size=50)
+        url = "https://example.com/large"
+        await cache.store(url, make_response(url, b"x" * 100))
+        assert cache.get(url) is None
+        assert cache.total_size == 0
+        assert list(tmp_path.iterdir()) == []
+
+    @pytest.mark.asyncio
+    async def test_evict_by_age(self, tmp_path: pathlib.Path):
+        cache = create_cache(tmp_path, max_age=60.)
+        url = "https://example.com/old"
+        await cache.store(url, make_response(url, b"old"))
+        cache.entries[url].validated = time.time() - 120.
+        assert cache.get(url) is None
+        await asyncio.sleep(.1)
+        assert url not in cache.entries
+        assert list(tmp_path.iterdir()) == []
+
+    @pytest.mark.asyncio
+    async def test_revalidate(self, tmp_path: pathlib.Path):
+        cache = create_cache(tmp_path)
+        url = "https://example.com/resource"
+        await cache.store(url, make_response(url, b"content"))
+        entry = cache.entries[url]
+        entry.validated = time.time() - 100.
+        headers = HTTPHeaders({"Cache-Control": "max-age=30", "Etag": '"v2"'})
+        await cache.revalidate(url, headers)
+        assert entry.get_age() < 5.
+        assert entry.lifetime == 30.
+        loaded = create_cache(tmp_path)
+        await loaded.load()
+        loaded_entry = loaded.get(url)
+        assert loaded_entry is not None
+        assert loaded_entry.headers["Etag"] == '"v2"'
+        assert loaded_entry.lifetime == 30.
+        resp = await loaded.get_response(loaded_entry)
+        assert resp is not None and resp.content == b"content"
+
+class TestHttpClientCache:
+    @pytest_asyncio.fixture
+    async def remote(self) -> AsyncIterator[Dict[str, Any]]:
+        requests: List[Dict[str, Any]] = []
+        state: Dict[str, Any] = {"requests": requests}
+        sockets = bind_sockets(0, "127.0.0.1")
+        port = sockets[0].getsockname()[1]
+        routes = {
+            "fresh": "max-age=3600",
+            "stale": "max-age=0",
+            "short": "max-age=10",
+            "no_cache": "max-age=10, no-cache",
+            "must_revalidate": "max-age=10, must-revalidate"
+        }
+        app = Application([
+            (
+                f"/{name}", ResourceHandler,
+                {"requests": requests, "cache_control": cache_control}
+            ) for name, cache_control in routes.items()
+        ])
+        http_server = HTTPServer(app)
+        http_server.add_sockets(sockets)
+        state["url"] = f"http://127.0.0.1:{port}"
+        yield state
+        http_server.stop()
+        await http_server.close_all_connections()
+
+    def create_client(
+        self, tmp_path: pathlib.Path, **options: Any
+    ) -> HttpClient:
+        server = MockServer({"data_path": str(tmp_path)})
+        options.setdefault("cache_stale_time", 0.)
+        return HttpClient(create_config(server, "http_client", options))
+
+    @pytest.mark.asyncio
+    async def test_max_age_served(
+        self, tmp_path: pathlib.Path, remote: Dict[str, Any]
+    ):
+        client = self.create_client(tmp_path)
+        await client.component_init()
+        url = f"{remote['url']}/fresh"
+        first = await client.get(url)
+        assert first.status_code == 200 and not first.from_cache
+        second = await client.get(url)
+        assert second.from_cache
+        assert second.content == b"resource "
+        assert len(remote["requests"]) == 1
+
+    @pytest.mark.asyncio
+    async def test_not_modified_refresh(
+        self, tmp_path: pathlib.Path, remote: Dict[str, Any]
+    ):
+        client = self.create_client(tmp_path)
+        await client.component_init()
+        url = f"{remote['url']}/stale"
+        await client.get(url)
+        entry = client.response_cache.entries[url]
+        entry.validated -= 100.
+        resp = await client.get(url)
+        assert resp.status_code == 304
+        assert resp.content == b"resource "
+        assert remote["requests"][-1]["if_none_match"] == '"root"'
+        assert entry.get_age() < 5.
+        # The validator is sent after a restart
+        client = self.create_client(tmp_path)
+        await client.component_init()
+        resp = await client.get(url)
+        assert resp.status_code == 304
+        assert resp.content == b"resource "
+        assert len(remote["requests"]) == 3
+
+    @pytest.mark.asyncio
+    async def test_query_string_keys(
+        self, tmp_path: pathlib.Path, remote: Dict[str, Any]
+    ):
+        client = self.create_client(tmp_path)
+        await client.component_init()
+        base = f"{remote['url']}/fresh"
+        page_one = await client.get(f"{base}?page=1")
+        page_two = await client.get(f"{base}?page=2")
+        assert page_one.content == b"resource page=1"
+        assert page_two.content == b"resource page=2"
+        assert not page_two.from_cache
+        cached = await client.get(f"{base}?page=1")
+        assert cached.from_cache
+        assert cached.content == b"resource page=1"
+        assert len(remote["requests"]) == 2
+
+    @pytest.mark.asyncio
+    async def test_stale_while_revalidate(
+        self, tmp_path: pathlib.Path, remote: Dict[str, Any]
+    ):
+        client = self.create_client(tmp_path, cache_stale_time=60.)
+        await client.component_init()
+        url = f"{remote['url']}/short"
+        await client.get(url)
+        entry = client.response_cache.entries[url]
+        entry.validated -= 20.
+        resp = await client.get(url)
+        assert resp.from_cache and resp.content == b"resource "
+        assert len(remote["requests"]) == 1
+        # The entry is revalidated in the background
+        await asyncio.sleep(.5)
+        assert len(remote["requests"]) == 2
+        assert remote["requests"][-1]["if_none_match"] == '"root"'
+        assert entry.get_age() < 5.
+
+    @pytest.mark.parametrize("route", ["stale", "no_cache", "must_revalidate"])
+    @pytest.mark.asyncio
+    async def test_stale_not_served(
+        self, tmp_path: pathlib.Path, remote: Dict[str, Any], route: str
+    ):
+        client = self.create_client(tmp_path, cache_stale_time=60.)
+        await client.component_init()
+        url = f"{remote['url']}/{route}"
+        await client.get(url)
+        client.response_cache.entries[url].validated -= 20.
+        # The response is revalidated before it is returned
+        resp = await client.get(url)
+        assert resp.status_code == 304
+        assert len(remote["requests"]) == 2
+        assert remote["requests"][-1]["if_none_match"] == '"root"'
+
+    @pytest.mark.asyncio
+    async def test_registered_url(
+        self, tmp_path: pathlib.Path, remote: Dict[str, Any]
+    ):
+        client = self.create_client(tmp_path, cache_stale_time=60.)
+        await client.component_init()
+        url = f"{remote['url']}/fresh"
+        client.register_cached_url(url, etag='"root"')
+        # The registered validator is sent, the empty placeholder is
+        # never served
+        resp = await client.get(url)
+        assert resp.status_code == 304
+        resp = await client.get(url)
+        assert resp.status_code == 304
+        assert len(remote["requests"]) == 2
+        assert remote["requests"][-1]["if_none_match"] == '"root"'
+        client.register_cached_url(url, etag='"other"')
+        resp = await client.get(url)
+        assert resp.status_code == 200 and not resp.from_cache
+        assert resp.content == b"resource "
+
+    @pytest.mark.parametrize("options", [
+        {"cache_max_size": 0},
+        {"cache_max_age": 0},
+        {"cache_stale_time": -1}
+    ])
+    @pytest.mark.asyncio
+    async def test_invalid_options(
+        self, tmp_path: pathlib.Path, options: Dict[str, Any]
+    ):
+        with pytest.raises(ConfigError):
+            self.create_client(tmp_path, **options)
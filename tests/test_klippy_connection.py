@@ -1,11 +1,21 @@
 from __future__ import annotations
 import pytest
+import pytest_asyncio
 import asyncio
 import pathlib
-from typing import TYPE_CHECKING, Dict
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
 from moonraker.server import ServerError
-from moonraker.klippy_connection import KlippyRequest
-from mocks import MockReader, MockWriter
+from moonraker.common import APITransport, BaseRemoteConnection, WebRequest
+from moonraker.utils import json_wrapper as jsonw
+from moonraker.components.klippy_connection import (
+    KlippyConnection,
+    KlippyRequest,
+    SubscriptionRegistry,
+    prune_status
+)
+from mocks import (
+    MockReader, MockWriter, MockComponent, MockServer, create_config
+)
 
 if TYPE_CHECKING:
     from server import Server
@@ -167,57 +177,113 @@ async def test_no_uds_access(base_server: Server,
     ret = await base_server.klippy_connection._do_connect()
     assert ret is False
 
+@pytest_asyncio.fixture
+async def kconn() -> KlippyConnection:
+    server = MockServer()
+    # Only the default socket path is used, no template is rendered
+    server.components["template"] = MockComponent()
+    return KlippyConnection(create_config(server, "server"))
+
+def response_frame(req: KlippyRequest, result: Dict[str, Any]) -> bytes:
+    return jsonw.dumps({"id": req.id, "result": result}) + b"\x03"
+
 @pytest.mark.asyncio
-async def test_write_not_connected(base_server: Server):
+async def test_write_not_connected(kconn: KlippyConnection):
     req = KlippyRequest("", {})
-    kconn = base_server.klippy_connection
-    await kconn._write_request(req)
-    assert isinstance(req.response, ServerError)
+    kconn._queue_request(req)
+    with pytest.raises(ServerError):
+        await req.wait()
 
 @pytest.mark.asyncio
-async def test_write_error(base_server: Server):
+async def test_write_error(kconn: KlippyConnection):
     req = KlippyRequest("", {})
-    kconn = base_server.klippy_connection
     kconn.writer = MockWriter()
-    await kconn._write_request(req)
-    assert isinstance(req.response, ServerError)
+    kconn._queue_request(req)
+    with pytest.raises(ServerError):
+        await req.wait()
+    assert kconn.writer is None
 
 @pytest.mark.asyncio
-async def test_write_cancelled(base_server: Server):
+async def test_write_cancelled(kconn: KlippyConnection):
     req = KlippyRequest("", {})
-    kconn = base_server.klippy_connection
-    kconn.writer = MockWriter(wait_drain=True)
-    task = base_server.event_loop.create_task(kconn._write_request(req))
-    base_server.event_loop.delay_callback(.01, task.cancel)
+    kconn.writer = MockWriter("wait")
+    kconn.write_buffer.append(req)
+    task = kconn.event_loop.create_task(kconn._write_requests())
+    kconn.event_loop.delay_callback(.01, task.cancel)
     with pytest.raises(asyncio.CancelledError):
         await task
+    with pytest.raises(ServerError):
+        await req.wait()
+    assert not kconn.write_busy
+
+@pytest.mark.asyncio
+async def test_write_coalesced(kconn: KlippyConnection):
+    writer = MockWriter("")
+    kconn.writer = writer
+    reqs = [KlippyRequest(f"method_{i}", {"index": i}) for i in range(3)]
+    for req in reqs:
+        kconn._queue_request(req)
+    assert kconn.write_busy
+    await asyncio.sleep(.01)
+    # Requests queued in the same loop iteration are sent in one write
+    assert len(writer.data) == 1
+    frames = writer.data[0].split(b"\x03")
+    assert frames.pop() == b""
+    assert [jsonw.loads(f) for f in frames] == [r.to_dict() for r in reqs]
+    assert not kconn.write_busy and not kconn.write_buffer
+    req = KlippyRequest("method_3", {})
+    kconn._queue_request(req)
+    await asyncio.sleep(.01)
+    assert len(writer.data) == 2
 
 @pytest.mark.asyncio
-async def test_read_error(base_server: Server,
+async def test_read_error(kconn: KlippyConnection,
                           caplog: pytest.LogCaptureFixture):
     mock_reader = MockReader("raise_error")
-    kconn = base_server.klippy_connection
-    await kconn._read_stream(mock_reader)
+    await kconn._read_stream(mock_reader)  # type: ignore
     assert "Klippy Stream Read Error" == caplog.messages[-1]
 
 @pytest.mark.asyncio
-async def test_read_cancelled(base_server: Server):
+async def test_read_cancelled(kconn: KlippyConnection):
     mock_reader = MockReader("wait")
-    kconn = base_server.klippy_connection
-    task = base_server.event_loop.create_task(
-        kconn._read_stream(mock_reader))
-    base_server.event_loop.delay_callback(.01, task.cancel)
+    task = kconn.event_loop.create_task(
+        kconn._read_stream(mock_reader))  # type: ignore
+    kconn.event_loop.delay_callback(.01, task.cancel)
     with pytest.raises(asyncio.CancelledError):
         await task
 
 @pytest.mark.asyncio
-async def test_read_decode_error(base_server: Server,
+async def test_read_decode_error(kconn: KlippyConnection,
                                  caplog: pytest.LogCaptureFixture):
     mock_reader = MockReader()
-    kconn = base_server.klippy_connection
-    await kconn._read_stream(mock_reader)
+    await kconn._read_stream(mock_reader)  # type: ignore
     assert "Error processing Klippy Host Response:" in caplog.messages[-1]
 
+@pytest.mark.asyncio
+async def test_read_split_frame(kconn: KlippyConnection):
+    req = KlippyRequest("objects/list", {})
+    kconn.pending_requests[req.id] = req
+    frame = response_frame(req, {"objects": ["toolhead"]})
+    mock_reader = MockReader(chunks=[frame[:10], frame[10:]])
+    await kconn._read_stream(mock_reader)  # type: ignore
+    assert await req.wait() == {"objects": ["toolhead"]}
+
+@pytest.mark.asyncio
+async def test_read_multiple_frames(kconn: KlippyConnection):
+    reqs = [KlippyRequest("info", {}) for _ in range(3)]
+    for req in reqs:
+        kconn.pending_requests[req.id] = req
+    frames = [response_frame(req, {"index": i}) for i, req in enumerate(reqs)]
+    # The last frame is completed by the following read
+    data = b"".join(frames)
+    split = len(data) - 5
+    mock_reader = MockReader(chunks=[data[:split], data[split:]])
+    await kconn._read_stream(mock_reader)  # type: ignore
+    assert [await req.wait() for req in reqs] == [
+        {"index": 0}, {"index": 1}, {"index": 2}
+    ]
+    assert kconn.pending_requests == {}
+
 def test_process_unknown_method(base_server: Server,
                                 caplog: pytest.LogCaptureFixture):
     cmd = {"method": "test_unknown"}
@@ -258,3 +324,340 @@ async def test_call_remote_method(base_server: Server,
     await fut
     await base_server._stop_server("terminate")
     assert fut.result() == "test"
+
+class TestSubscriptionRegistry:
+    def test_ref_counts(self):
+        registry = SubscriptionRegistry()
+        registry.add({"toolhead": ["position"], "webhooks": None})
+        registry.add({"toolhead": ["position", "homed_axes"]})
+        assert registry.get_superset() == {
+            "webhooks": None, "toolhead": ["position", "homed_axes"]
+        }
+        registry.remove({"toolhead": ["position", "homed_axes"]})
+        assert registry.get_superset() == {
+            "webhooks": None, "toolhead": ["position"]
+        }
+        registry.remove({"toolhead": ["position"], "webhooks": None})
+        assert registry.get_superset() == {}
+
+    def test_all_fields_supersede_field_refs(self):
+        registry = SubscriptionRegistry()
+        registry.add({"extruder": ["temperature"]})
+        registry.add({"extruder": None})
+        assert registry.get_superset() == {"extruder": None}
+        registry.remove({"extruder": None})
+        assert registry.get_superset() == {"extruder": ["temperature"]}
+
+    def test_duplicate_fields(self):
+        # Fields repeated in one subscription hold a single reference
+        registry = SubscriptionRegistry()
+        registry.add({"toolhead": ["position", "position"]})
+        registry.remove({"toolhead": ["position"]})
+        assert registry.get_superset() == {}
+
+    def test_unmatched_remove(self):
+        registry = SubscriptionRegistry()
+        registry.add({"toolhead": ["position"]})
+        registry.remove({"toolhead": ["homed_axes"], "webhooks": None})
+        assert registry.get_superset() == {"toolhead": ["position"]}
+
+    def test_is_covered(self):
+        registry = SubscriptionRegistry()
+        assert not registry.is_covered({"toolhead": ["position"]})
+        registry.set_upstream({
+            "toolhead": ["position", "homed_axes"], "webhooks": None,
+            "configfile": None
+        })
+        assert registry.is_covered({"toolhead": ["position"]})
+        assert registry.is_covered({"webhooks": ["state"]})
+        assert registry.is_covered({"webhooks": None})
+        assert registry.is_covered({})
+        assert not registry.is_covered({"toolhead": None})
+        assert not registry.is_covered({"toolhead": ["max_velocity"]})
+        assert not registry.is_covered({"extruder": ["temperature"]})
+        # Fields excluded from the cache are always requested from Klippy
+        assert not registry.is_covered({"configfile": None})
+        assert not registry.is_covered({"configfile": ["settings"]})
+        assert registry.is_covered({"configfile": ["save_config_pending"]})
+        registry.clear()
+        assert not registry.is_covered({"webhooks": None})
+
+@pytest.mark.asyncio
+async def test_subscription_request_failure(monkeypatch: pytest.MonkeyPatch):
+    kconn = KlippyConnection.__new__(KlippyConnection)
+    kconn.subscription_lock = asyncio.Lock()
+    kconn.sub_registry = SubscriptionRegistry()
+    kconn.sub_registry.add({"toolhead": None})
+    fut = asyncio.get_running_loop().create_future()
+    kconn._pending_sub_request = fut
+
+    async def send_request(*args: Any) -> Dict[str, Any]:
+        # A malformed response from Klippy
+        return {}
+    monkeypatch.setattr(kconn, "_send_request", send_request)
+    await kconn._send_subscription_request()
+    assert isinstance(fut.exception(), KeyError)
+    assert kconn._pending_sub_request is None
+
+class FakeKlippy:
+    # Answers subscription and query requests from the printer status
+    def __init__(
+        self, kconn: KlippyConnection, monkeypatch: pytest.MonkeyPatch,
+        status: Dict[str, Dict[str, Any]]
+    ) -> None:
+        self.kconn = kconn
+        self.status = status
+        self.eventtime = 1.
+        self.requests: List[Tuple[str, Dict[str, Any]]] = []
+        self.blocked: Optional[asyncio.Future] = None
+        kconn.writer = MockWriter("")  # type: ignore
+        monkeypatch.setattr(kconn, "_send_request", self.send_request)
+
+    async def send_request(
+        self, rpc_method: str, args: Dict[str, Any],
+        timeout: Optional[float] = None
+    ) -> Dict[str, Any]:
+        self.requests.append((rpc_method, args))
+        if self.blocked is not None:
+            await self.blocked
+        return {
+            "eventtime": self.eventtime,
+            "status": prune_status(args["objects"], self.status)
+        }
+
+    def update(self, status: Dict[str, Dict[str, Any]]) -> None:
+        self.eventtime += 1.
+        for obj_name, fields in status.items():
+            self.status.setdefault(obj_name, {}).update(fields)
+        self.kconn._process_status_update(self.eventtime, status)
+
+    async def subscribe(
+        self, conn: APITransport, objects: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        web_request = WebRequest(
+            "objects/subscribe", {"objects": objects}, transport=conn
+        )
+        return await self.kconn.request(web_request)
+
+class StatusTransport(APITransport):
+    def __init__(self) -> None:
+        self.updates: List[Dict[str, Any]] = []
+
+    def send_status(self, status: Dict[str, Any], eventtime: float) -> None:
+        self.updates.append(status)
+
+class RemoteTransport(BaseRemoteConnection):
+    # Remote connection shell, messages are recorded rather than written
+    def __init__(self, queue_busy: bool = False) -> None:
+        self.queue_busy = queue_busy
+        self.messages: List[Any] = []
+        self.updates: List[Dict[str, Any]] = []
+
+    def queue_message(self, message: Any) -> None:
+        self.messages.append(message)
+
+    def send_status(self, status: Dict[str, Any], eventtime: float) -> None:
+        self.updates.append(status)
+
+
+PRINTER_STATUS: Dict[str, Dict[str, Any]] = {
+    "extruder": {"temperature": 200., "target": 0.},
+    "heater_bed": {"temperature": 20., "target": 0.},
+    "toolhead": {"position": [0., 0., 0., 0.], "homed_axes": ""},
+    "fan": {"speed": 0.}
+}
+
+@pytest.fixture
+def klippy_status() -> Dict[str, Dict[str, Any]]:
+    return {name: dict(fields) for name, fields in PRINTER_STATUS.items()}
+
+class TestStatusIndex:
+    @pytest.mark.asyncio
+    async def test_fan_out(
+        self, kconn: KlippyConnection, monkeypatch: pytest.MonkeyPatch,
+        klippy_status: Dict[str, Dict[str, Any]]
+    ):
+        klippy = FakeKlippy(kconn, monkeypatch, klippy_status)
+        temps, motion, wildcard = [StatusTransport() for _ in range(3)]
+        await klippy.subscribe(temps, {
+            "extruder": ["temperature", "temperature"],
+            "heater_bed": ["temperature"]
+        })
+        await klippy.subscribe(
+            motion, {"toolhead": ["position"], "extruder": ["target"]}
+        )
+        await klippy.subscribe(wildcard, {"extruder": None, "toolhead": None})
+        klippy.update({
+            "extruder": {"temperature": 210., "target": 215.},
+            "heater_bed": {"temperature": 60.},
+            "toolhead": {"position": [1., 2., 3., 0.], "homed_axes": "xyz"},
+            "fan": {"speed": .5}
+        })
+        assert temps.updates == [{
+            "extruder": {"temperature": 210.},
+            "heater_bed": {"temperature": 60.}
+        }]
+        assert motion.updates == [{
+            "toolhead": {"position": [1., 2., 3., 0.]},
+            "extruder": {"target": 215.}
+        }]
+        assert wildcard.updates == [{
+            "extruder": {"temperature": 210., "target": 215.},
+            "toolhead": {"position": [1., 2., 3., 0.], "homed_axes": "xyz"}
+        }]
+        # Connections without subscribed fields in an update are skipped
+        klippy.update({"toolhead": {"homed_axes": ""}, "fan": {"speed": 1.}})
+        assert len(temps.updates) == 1 and len(motion.updates) == 1
+        assert wildcard.updates[-1] == {"toolhead": {"homed_axes": ""}}
+
+    @pytest.mark.asyncio
+    async def test_unsubscribe(
+        self, kconn: KlippyConnection, monkeypatch: pytest.MonkeyPatch,
+        klippy_status: Dict[str, Dict[str, Any]]
+    ):
+        klippy = FakeKlippy(kconn, monkeypatch, klippy_status)
+        first, second = StatusTransport(), StatusTransport()
+        await klippy.subscribe(first, {"extruder": ["temperature"]})
+        await klippy.subscribe(second, {"extruder": None})
+        kconn.remove_subscription(second)
+        klippy.update({"extruder": {"temperature": 210., "target": 215.}})
+        assert first.updates == [{"extruder": {"temperature": 210.}}]
+        assert second.updates == []
+        # A new subscription replaces the previous one
+        await klippy.subscribe(first, {"heater_bed": None})
+        klippy.update({
+            "extruder": {"temperature": 205.},
+            "heater_bed": {"temperature": 61., "target": 0.}
+        })
+        assert first.updates[-1] == {
+            "heater_bed": {"temperature": 61., "target": 0.}
+        }
+        # An empty subscription removes the connection
+        await klippy.subscribe(first, {})
+        klippy.update({"heater_bed": {"temperature": 62.}})
+        assert len(first.updates) == 2
+        assert kconn.status_index == {}
+
+    @pytest.mark.asyncio
+    async def test_shared_frame(
+        self, kconn: KlippyConnection, monkeypatch: pytest.MonkeyPatch,
+        klippy_status: Dict[str, Dict[str, Any]]
+    ):
+        klippy = FakeKlippy(kconn, monkeypatch, klippy_status)
+        sub = {"extruder": ["temperature"]}
+        idle = [RemoteTransport(), RemoteTransport()]
+        busy = RemoteTransport(queue_busy=True)
+        for conn in [*idle, busy]:
+            await klippy.subscribe(conn, sub)
+        klippy.update({"extruder": {"temperature": 210., "target": 215.}})
+        # Idle connections share one encoded frame, busy connections merge
+        # the update into their pending status
+        frame = idle[0].messages[0]
+        assert idle[1].messages == [frame]
+        assert idle[1].messages[0] is frame
+        assert jsonw.loads(frame)["params"][0] == {
+            "extruder": {"temperature": 210.}
+        }
+        assert busy.messages == []
+        assert busy.updates == [{"extruder": {"temperature": 210.}}]
+
+class TestObjectQuery:
+    async def query(
+        self, kconn: KlippyConnection, objects: Dict[str, Any],
+        fresh: bool = False
+    ) -> Dict[str, Any]:
+        args: Dict[str, Any] = {"objects": objects}
+        if fresh:
+            args["fresh"] = True
+        return await kconn.request(WebRequest("objects/query", args))
+
+    @pytest.mark.asyncio
+    async def test_covered_query(
+        self, kconn: KlippyConnection, monkeypatch: pytest.MonkeyPatch,
+        klippy_status: Dict[str, Dict[str, Any]]
+    ):
+        klippy = FakeKlippy(kconn, monkeypatch, klippy_status)
+        await klippy.subscribe(
+            StatusTransport(), {"extruder": None, "toolhead": ["position"]}
+        )
+        klippy.update({"extruder": {"temperature": 210.}})
+        count = len(klippy.requests)
+        result = await self.query(
+            kconn, {"extruder": ["temperature"], "toolhead": ["position"]}
+        )
+        assert result == {
+            "eventtime": klippy.eventtime,
+            "status": {
+                "extruder": {"temperature": 210.},
+                "toolhead": {"position": [0., 0., 0., 0.]}
+            }
+        }
+        assert len(klippy.requests) == count
+        # Fields not kept current by the subscription are requested
+        result = await self.query(kconn, {"toolhead": ["homed_axes"]})
+        assert result["status"] == {"toolhead": {"homed_axes": ""}}
+        assert len(klippy.requests) == count + 1
+
+    @pytest.mark.asyncio
+    async def test_fresh_query(
+        self, kconn: KlippyConnection, monkeypatch: pytest.MonkeyPatch,
+        klippy_status: Dict[str, Dict[str, Any]]
+    ):
+        klippy = FakeKlippy(kconn, monkeypatch, klippy_status)
+        await klippy.subscribe(StatusTransport(), {"extruder": None})
+        count = len(klippy.requests)
+        # A status change not yet reported to Moonraker
+        klippy.status["extruder"]["temperature"] = 215.
+        result = await self.query(kconn, {"extruder": None}, fresh=True)
+        assert result["status"]["extruder"]["temperature"] == 215.
+        assert klippy.requests[count:] == [
+            ("objects/query", {"objects": {"extruder": None}})
+        ]
+
+    @pytest.mark.asyncio
+    async def test_coalesced_query(
+        self, kconn: KlippyConnection, monkeypatch: pytest.MonkeyPatch,
+        klippy_status: Dict[str, Dict[str, Any]]
+    ):
+        klippy = FakeKlippy(kconn, monkeypatch, klippy_status)
+        klippy.blocked = asyncio.get_running_loop().create_future()
+        first = asyncio.create_task(
+            self.query(kconn, {"toolhead": ["position", "homed_axes"]})
+        )
+        # Field order does not change the query
+        second = asyncio.create_task(
+            self.query(kconn, {"toolhead": ["homed_axes", "position"]})
+        )
+        other = asyncio.create_task(self.query(kconn, {"fan": None}))
+        await asyncio.sleep(.01)
+        assert len(klippy.requests) == 2
+        klippy.blocked.set_result(None)
+        results = await asyncio.gather(first, second, other)
+        expected = {"position": [0., 0., 0., 0.], "homed_axes": ""}
+        assert results[0]["status"] == {"toolhead": expected}
+        assert results[1]["status"] == {"toolhead": expected}
+        assert results[2]["status"] == {"fan": {"speed": 0.}}
+        assert kconn._pending_queries == {}
+        # Later queries are sent once the pending query completes
+        await self.query(kconn, {"toolhead": ["position", "homed_axes"]})
+        assert len(klippy.requests) == 3
+
+    @pytest.mark.asyncio
+    async def test_coalesced_query_error(
+        self, kconn: KlippyConnection, monkeypatch: pytest.MonkeyPatch,
+        klippy_status: Dict[str, Dict[str, Any]]
+    ):
+        klippy = FakeKlippy(kconn, monkeypatch, klippy_status)
+        klippy.blocked = asyncio.get_running_loop().create_future()
+        queries = [
+            asyncio.create_task(self.query(kconn, {"toolhead": None}))
+            for _ in range(2)
+        ]
+        await asyncio.sleep(.01)
+        assert len(klippy.requests) == 1
+        klippy.blocked.set_exception(ServerError("Klippy Disconnected", 503))
+        results = await asyncio.gather(*queries, return_exceptions=True)
+        for result in results:
+            assert isinstance(result, ServerError)
+            assert str(result) == "Klippy Disconnected"
+        assert kconn._pending_queries == {}
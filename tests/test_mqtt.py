@@ -0,0 +1,163 @@
+from __future__ import annotations
+import pytest
+import asyncio
+from moonraker.confighelper import ConfigError
+from moonraker.components.mqtt import MQTTClient, SplitStatusPublisher
+from mocks import MockServer, create_config
+from typing import Any, Dict, List, Tuple
+
+TOPIC_PREFIX = "printer/klipper/state"
+Published = List[Tuple[str, Any, float]]
+
+def create_publisher(
+    options: Dict[str, Any]
+) -> Tuple[SplitStatusPublisher, Published]:
+    published: Published = []
+
+    def publish(topic: str, value: Any, eventtime: float) -> None:
+        published.append((topic, value, eventtime))
+    config = create_config(MockServer(), "mqtt", options)
+    return SplitStatusPublisher(config, publish), published
+
+def process(
+    publisher: SplitStatusPublisher, objkey: str, statekey: str, value: Any,
+    eventtime: float = 0.
+) -> None:
+    topic = f"{TOPIC_PREFIX}/{objkey}/{statekey}"
+    publisher.process_field(topic, objkey, statekey, value, eventtime)
+
+class TestSplitStatusPublisher:
+    @pytest.mark.asyncio
+    async def test_unchanged(self):
+        publisher, published = create_publisher({})
+        process(publisher, "toolhead", "homed_axes", "xyz")
+        process(publisher, "toolhead", "homed_axes", "xyz")
+        process(publisher, "toolhead", "homed_axes", "")
+        assert [p[1] for p in published] == ["xyz", ""]
+        stats = publisher.get_stats()
+        assert stats["published"] == 2
+        assert stats["suppressed"]["unchanged"] == 1
+
+    @pytest.mark.asyncio
+    async def test_unchanged_disabled(self):
+        publisher, published = create_publisher(
+            {"split_status_change_only": "False"}
+        )
+        process(publisher, "toolhead", "homed_axes", "xyz")
+        process(publisher, "toolhead", "homed_axes", "xyz")
+        assert len(published) == 2
+        assert publisher.get_stats()["suppressed"]["unchanged"] == 0
+
+    @pytest.mark.asyncio
+    async def test_below_delta(self):
+        publisher, published = create_publisher({
+            "split_status_min_deltas": "\nextruder=0.5"
+        })
+        process(publisher, "extruder", "temperature", 210.)
+        process(publisher, "extruder", "temperature", 210.3)
+        process(publisher, "extruder", "temperature", 210.6)
+        # Other objects are not filtered
+        process(publisher, "heater_bed", "temperature", 60.)
+        process(publisher, "heater_bed", "temperature", 60.1)
+        assert published == [
+            (f"{TOPIC_PREFIX}/extruder/temperature", 210., 0.),
+            (f"{TOPIC_PREFIX}/extruder/temperature", 210.6, 0.),
+            (f"{TOPIC_PREFIX}/heater_bed/temperature", 60., 0.),
+            (f"{TOPIC_PREFIX}/heater_bed/temperature", 60.1, 0.)
+        ]
+        assert publisher.get_stats()["suppressed"]["below_delta"] == 1
+
+    @pytest.mark.asyncio
+    async def test_below_delta_field(self):
+        publisher, published = create_publisher({
+            "split_status_min_deltas": "\ntoolhead=1\ntoolhead/position=0.1"
+        })
+        process(publisher, "toolhead", "position", [1., 2., 3., 0.])
+        process(publisher, "toolhead", "position", [1.05, 2., 3., 0.])
+        process(publisher, "toolhead", "position", [1.05, 2.5, 3., 0.])
+        process(publisher, "toolhead", "max_velocity", 300.)
+        process(publisher, "toolhead", "max_velocity", 300.5)
+        # Non numeric values are compared for equality only
+        process(publisher, "toolhead", "homed_axes", "x")
+        process(publisher, "toolhead", "homed_axes", "xy")
+        assert [p[1] for p in published] == [
+            [1., 2., 3., 0.], [1.05, 2.5, 3., 0.], 300., "x", "xy"
+        ]
+        assert publisher.get_stats()["suppressed"]["below_delta"] == 2
+
+    @pytest.mark.asyncio
+    async def test_rate_limited(self):
+        publisher, published = create_publisher({
+            "split_status_rate_limits": "\nextruder=0.2"
+        })
+        process(publisher, "extruder", "temperature", 210., 1.)
+        process(publisher, "extruder", "temperature", 211., 2.)
+        process(publisher, "extruder", "temperature", 212., 3.)
+        assert len(published) == 1
+        stats = publisher.get_stats()
+        assert stats["suppressed"]["rate_limited"] == 2
+        assert stats["pending"] == 1
+        # The latest value is published once the interval elapses
+        await asyncio.sleep(.3)
+        assert published[1:] == [
+            (f"{TOPIC_PREFIX}/extruder/temperature", 212., 3.)
+        ]
+        assert publisher.get_stats()["pending"] == 0
+
+    @pytest.mark.asyncio
+    async def test_rate_limited_unchanged(self):
+        publisher, published = create_publisher({
+            "split_status_rate_limits": "\nextruder=0.2"
+        })
+        process(publisher, "extruder", "temperature", 210.)
+        process(publisher, "extruder", "temperature", 211.)
+        # Returning to the published value discards the pending value
+        process(publisher, "extruder", "temperature", 210.)
+        await asyncio.sleep(.3)
+        assert [p[1] for p in published] == [210.]
+        assert publisher.get_stats()["pending"] == 0
+
+    @pytest.mark.asyncio
+    async def test_reset(self):
+        publisher, published = create_publisher({
+            "split_status_rate_limits": "\nextruder=0.2"
+        })
+        process(publisher, "extruder", "temperature", 210.)
+        process(publisher, "extruder", "temperature", 211.)
+        publisher.reset()
+        await asyncio.sleep(.3)
+        assert [p[1] for p in published] == [210.]
+        process(publisher, "extruder", "temperature", 210.)
+        assert [p[1] for p in published] == [210., 210.]
+
+    @pytest.mark.asyncio
+    async def test_invalid_limit(self):
+        with pytest.raises(ConfigError):
+            create_publisher({"split_status_min_deltas": "\nextruder=fast"})
+        with pytest.raises(ConfigError):
+            create_publisher({"split_status_rate_limits": "\nextruder=-1"})
+
+    @pytest.mark.asyncio
+    async def test_flush_on_disconnect(self):
+        publisher, published = create_publisher({
+            "split_status_rate_limits": "\nextruder=10"
+        })
+        process(publisher, "extruder", "temperature", 210., 1.)
+        process(publisher, "extruder", "temperature", 215., 2.)
+        process(publisher, "extruder", "target", 0., 2.)
+        process(publisher, "extruder", "target", 220., 3.)
+        assert len(published) == 2
+        # A client shell, the disconnect handler only touches the status
+        # timer, the status cache and the split publisher
+        client = MQTTClient.__new__(MQTTClient)
+        client.status_update_timer = None
+        client.status_cache = {}
+        client.split_publisher = publisher
+        client._handle_klippy_disconnect()
+        assert published[2:] == [
+            (f"{TOPIC_PREFIX}/extruder/temperature", 215., 2.),
+            (f"{TOPIC_PREFIX}/extruder/target", 220., 3.)
+        ]
+        stats = publisher.get_stats()
+        assert stats["pending"] == 0
+        assert publisher.pending_handles == {}
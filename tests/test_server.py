@@ -4,6 +4,7 @@ import pytest_asyncio
 import asyncio
 import socket
 import pathlib
+import logging
 from collections import namedtuple
 
 from moonraker.server import CORE_COMPONENTS, Server, API_VERSION
@@ -11,13 +12,15 @@ from moonraker.server import main as servermain
 from moonraker.eventloop import EventLoop
 from moonraker.utils import ServerError
 from moonraker.confighelper import ConfigError
+from moonraker.common import WebRequest
 from moonraker.components.klippy_apis import KlippyAPI
-from mocks import MockComponent, MockWebsocket
+from mocks import MockComponent, MockWebsocket, MockServer, create_config
 
 from typing import (
     TYPE_CHECKING,
     AsyncIterator,
     Dict,
+    List,
     Optional
 )
 
@@ -514,5 +517,171 @@ def test_websocket_restart(base_server: Server,
     assert result["result"] == "ok" and base_server.exit_reason == "restart"
 
 
+def create_server_shell() -> Server:
+    # A server without components, for testing methods that only use the
+    # event loop and event handlers
+    server = Server.__new__(Server)
+    server.event_loop = EventLoop()
+    server.events = {}
+    server.pending_events = []
+    server.event_dispatch_pending = False
+    return server
+
+class TestExecutorPoolConfig:
+    @pytest.mark.asyncio
+    async def test_configure(self):
+        server = create_server_shell()
+        config = create_config(
+            MockServer(), "server", {"executor_pools": "\ndisk_io=8,16\ncpu=1"}
+        )
+        server._configure_executor_pools(config)
+        stats = server.event_loop.get_executor_stats()
+        assert stats["disk_io"]["max_workers"] == 8
+        assert stats["disk_io"]["queue_limit"] == 16
+        assert stats["cpu"]["max_workers"] == 1
+        assert stats["cpu"]["queue_limit"] == 0
+
+    @pytest.mark.parametrize("pools", [
+        "disk_io=0", "disk_io=2,-1", "disk_io=1,2,3", "disk_io=two",
+        "disk_io=,4", "gpu=1"
+    ])
+    @pytest.mark.asyncio
+    async def test_invalid(self, pools: str):
+        server = create_server_shell()
+        config = create_config(
+            MockServer(), "server", {"executor_pools": f"\n{pools}"}
+        )
+        with pytest.raises(ConfigError, match="executor_pools"):
+            server._configure_executor_pools(config)
+
+class TestEventDispatch:
+    @pytest.mark.asyncio
+    async def test_ordering(self):
+        server = create_server_shell()
+        received: List[str] = []
+
+        def on_first(name: str) -> None:
+            received.append(name)
+            # Events sent by a handler are dispatched after the current batch
+            server.send_event("test:third", "third")
+
+        def on_event(name: str) -> None:
+            received.append(name)
+        server.register_event_handler("test:first", on_first)
+        server.register_event_handler("test:second", on_event)
+        server.register_event_handler("test:third", on_event)
+        first = server.send_event("test:first", "first")
+        second = server.send_event("test:second", "second")
+        # A single dispatch is scheduled for the batch
+        assert len(server.pending_events) == 2
+        assert server.event_dispatch_pending
+        server._dispatch_events()
+        assert received == ["first", "second"]
+        assert first.done() and second.done()
+        assert [evt for _, evt, _ in server.pending_events] == ["test:third"]
+        assert server.event_dispatch_pending
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        assert received == ["first", "second", "third"]
+        assert not server.pending_events
+        assert not server.event_dispatch_pending
+
+    @pytest.mark.asyncio
+    async def test_sync_inline(self, monkeypatch: pytest.MonkeyPatch):
+        server = create_server_shell()
+        received: List[str] = []
+        server.register_event_handler("test:sync", received.append)
+        server.register_event_handler("test:sync", received.append)
+
+        def no_task(*args, **kwargs):
+            raise AssertionError("Task created for synchronous handlers")
+        monkeypatch.setattr(server.event_loop, "create_task", no_task)
+        fut = server.send_event("test:sync", "value")
+        unhandled = server.send_event("test:unhandled")
+        server._dispatch_events()
+        # Futures resolve in the dispatch that calls the handlers
+        assert received == ["value", "value"]
+        assert fut.done() and fut.result() is None
+        assert unhandled.done()
+
+    @pytest.mark.asyncio
+    async def test_mixed_handlers(self):
+        server = create_server_shell()
+        received: List[str] = []
+        release = asyncio.Event()
+
+        def on_sync(name: str) -> None:
+            received.append(f"sync {name}")
+
+        async def on_async(name: str) -> None:
+            await release.wait()
+            received.append(f"async {name}")
+        server.register_event_handler("test:mixed", on_async)
+        server.register_event_handler("test:mixed", on_sync)
+        fut = server.send_event("test:mixed", "event")
+        server._dispatch_events()
+        assert received == ["sync event"]
+        await asyncio.sleep(.01)
+        # The future resolves once every awaitable handler completes
+        assert not fut.done()
+        release.set()
+        await asyncio.wait_for(fut, 1.)
+        assert received == ["sync event", "async event"]
+
+    @pytest.mark.parametrize("async_count", [1, 2])
+    @pytest.mark.asyncio
+    async def test_exceptions(
+        self, async_count: int, caplog: pytest.LogCaptureFixture
+    ):
+        caplog.set_level(logging.INFO)
+        server = create_server_shell()
+        received: List[str] = []
+
+        def sync_error() -> None:
+            raise ServerError("Sync handler failed")
+
+        async def async_error() -> None:
+            await asyncio.sleep(.01)
+            raise ServerError("Async handler failed")
+
+        async def async_handler() -> None:
+            await asyncio.sleep(.01)
+            received.append("async")
+        server.register_event_handler("test:error", sync_error)
+        server.register_event_handler("test:error", async_error)
+        if async_count > 1:
+            server.register_event_handler("test:error", async_handler)
+        server.register_event_handler("test:error", lambda: received.append("sync"))
+        fut = server.send_event("test:error")
+        # Handler errors are logged, the remaining handlers are called and
+        # the future resolves without an exception
+        assert await asyncio.wait_for(fut, 1.) is None
+        expected = ["sync", "async"] if async_count > 1 else ["sync"]
+        assert received == expected
+        assert "Error processing callback in event test:error" in caplog.text
+        assert "Sync handler failed" in caplog.text
+        assert "Async handler failed" in caplog.text
+
+class TestPerfEndpoint:
+    @pytest.mark.asyncio
+    async def test_disabled(self):
+        server = create_server_shell()
+        web_request = WebRequest("server/perf", {})
+        result = await server._handle_perf_request(web_request)
+        assert result == {"enabled": False}
+
+    @pytest.mark.asyncio
+    async def test_enabled(self):
+        server = create_server_shell()
+        server.event_loop.start_loop_monitor(0., 0.)
+        try:
+            web_request = WebRequest("server/perf", {})
+            result = await server._handle_perf_request(web_request)
+        finally:
+            server.event_loop.stop_loop_monitor()
+        assert result["enabled"]
+        assert result["loop_lag"]["samples"] == 0
+
+
 # TODO:
 # test invalid cert, key (probably should do that in test_app.py)
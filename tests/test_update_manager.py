@@ -0,0 +1,145 @@
+from __future__ import annotations
+import pytest
+import asyncio
+from moonraker.utils import ServerError
+from moonraker.components.update_manager.update_manager import UpdateManager
+from moonraker.components.update_manager.system_deploy import PackageDeploy
+from mocks import MockServer
+from typing import Any, List, Optional
+
+class CommandHelperStub:
+    # Provides the network semaphore and records refreshed notifications
+    def __init__(self, network_concurrency: int = 2) -> None:
+        self.network_sem = asyncio.Semaphore(network_concurrency)
+        self.notifications: List[List[str]] = []
+        self.refreshed: List[str] = []
+
+    def get_network_semaphore(self) -> asyncio.Semaphore:
+        return self.network_sem
+
+    def notify_update_refreshed(self) -> None:
+        self.notifications.append(list(self.refreshed))
+
+class ConcurrencyTracker:
+    def __init__(self) -> None:
+        self.running = 0
+        self.max_running = 0
+
+    def enter(self) -> None:
+        self.running += 1
+        self.max_running = max(self.running, self.max_running)
+
+    def exit(self) -> None:
+        self.running -= 1
+
+class UpdaterStub:
+    def __init__(
+        self, name: str, helper: CommandHelperStub,
+        tracker: ConcurrencyTracker, delay: float = .02,
+        error: Optional[Exception] = None
+    ) -> None:
+        self.name = name
+        self.helper = helper
+        self.tracker = tracker
+        self.delay = delay
+        self.error = error
+
+    async def refresh(self) -> None:
+        self.tracker.enter()
+        try:
+            await asyncio.sleep(self.delay)
+            if self.error is not None:
+                raise self.error
+        finally:
+            self.tracker.exit()
+        self.helper.refreshed.append(self.name)
+
+class PackageProviderStub:
+    async def get_packages(self) -> List[str]:
+        return []
+
+def create_update_manager(
+    helper: CommandHelperStub, refresh_concurrency: int
+) -> UpdateManager:
+    # An update manager shell with only the refresh options set up
+    umgr = UpdateManager.__new__(UpdateManager)
+    umgr.cmd_helper = helper  # type: ignore
+    umgr.refresh_concurrency = refresh_concurrency
+    return umgr
+
+class TestRefreshUpdaters:
+    @pytest.mark.parametrize("refresh_concurrency", [1, 3])
+    @pytest.mark.asyncio
+    async def test_concurrency(self, refresh_concurrency: int):
+        helper = CommandHelperStub()
+        tracker = ConcurrencyTracker()
+        umgr = create_update_manager(helper, refresh_concurrency)
+        updaters = [
+            UpdaterStub(f"app_{i}", helper, tracker) for i in range(6)
+        ]
+        await umgr._refresh_updaters(updaters)  # type: ignore
+        assert tracker.max_running == refresh_concurrency
+        assert sorted(helper.refreshed) == sorted(u.name for u in updaters)
+
+    @pytest.mark.asyncio
+    async def test_notifications(self):
+        helper = CommandHelperStub()
+        tracker = ConcurrencyTracker()
+        umgr = create_update_manager(helper, 3)
+        updaters = [
+            UpdaterStub("slow", helper, tracker, delay=.2),
+            UpdaterStub("fast", helper, tracker, delay=.01),
+            UpdaterStub("medium", helper, tracker, delay=.05)
+        ]
+        await umgr._refresh_updaters(updaters)  # type: ignore
+        # One notification is sent as each updater completes
+        assert helper.notifications == [
+            ["fast"], ["fast", "medium"], ["fast", "medium", "slow"]
+        ]
+
+    @pytest.mark.asyncio
+    async def test_exception(self):
+        helper = CommandHelperStub()
+        tracker = ConcurrencyTracker()
+        umgr = create_update_manager(helper, 2)
+        updaters = [
+            UpdaterStub("failed", helper, tracker, error=ServerError("Failed")),
+            UpdaterStub("first", helper, tracker, delay=.05),
+            UpdaterStub("second", helper, tracker, delay=.1)
+        ]
+        with pytest.raises(ServerError, match="Failed"):
+            await umgr._refresh_updaters(updaters)  # type: ignore
+        # The exception is raised once every updater has finished
+        assert sorted(helper.refreshed) == ["first", "second"]
+        assert len(helper.notifications) == 2
+        assert tracker.running == 0
+
+    @pytest.mark.asyncio
+    async def test_network_concurrency(self, monkeypatch: pytest.MonkeyPatch):
+        helper = CommandHelperStub(network_concurrency=2)
+        tracker = ConcurrencyTracker()
+        umgr = create_update_manager(helper, 4)
+        server = MockServer()
+        server.server_running = True
+        updaters: List[PackageDeploy] = []
+        for i in range(4):
+            # Package deploy shells, only the package cache update runs
+            deploy = PackageDeploy.__new__(PackageDeploy)
+            deploy.server = server  # type: ignore
+            deploy.cmd_helper = helper  # type: ignore
+            deploy.prefix = f"System {i}: "
+            deploy.provider = PackageProviderStub()  # type: ignore
+
+            async def update_package_cache(*args: Any, **kwargs: Any) -> None:
+                tracker.enter()
+                await asyncio.sleep(.02)
+                tracker.exit()
+            monkeypatch.setattr(
+                deploy, "_update_package_cache", update_package_cache
+            )
+            monkeypatch.setattr(deploy, "_save_state", lambda: None)
+            updaters.append(deploy)
+        await umgr._refresh_updaters(updaters)  # type: ignore
+        # Network fetches are limited independently of refreshes
+        assert tracker.max_running == 2
+        assert len(helper.notifications) == 4